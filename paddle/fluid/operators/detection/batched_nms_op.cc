@@ -0,0 +1,266 @@
+/* Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License. */
+
+#include <algorithm>
+#include <limits>
+#include <vector>
+
+#include "paddle/fluid/framework/op_registry.h"
+#include "paddle/fluid/operators/detection/nms_util.h"
+
+namespace paddle {
+namespace operators {
+
+using Tensor = framework::Tensor;
+
+class BatchedNMSOp : public framework::OperatorWithKernel {
+ public:
+  using framework::OperatorWithKernel::OperatorWithKernel;
+
+  void InferShape(framework::InferShapeContext* ctx) const override {
+    OP_INOUT_CHECK(ctx->HasInput("Boxes"), "Input", "Boxes", "BatchedNMS");
+    OP_INOUT_CHECK(ctx->HasInput("Scores"), "Input", "Scores", "BatchedNMS");
+    OP_INOUT_CHECK(ctx->HasOutput("Index"), "Output", "Index", "BatchedNMS");
+    OP_INOUT_CHECK(ctx->HasOutput("NumKept"), "Output", "NumKept",
+                   "BatchedNMS");
+    auto box_dims = ctx->GetInputDim("Boxes");
+    auto score_dims = ctx->GetInputDim("Scores");
+
+    PADDLE_ENFORCE_EQ(box_dims.size(), 3,
+                      platform::errors::InvalidArgument(
+                          "The rank of Input(Boxes) must be 3. "
+                          "But received rank = %d.",
+                          box_dims.size()));
+    PADDLE_ENFORCE_EQ(score_dims.size(), 2,
+                      platform::errors::InvalidArgument(
+                          "The rank of Input(Scores) must be 2. "
+                          "But received rank = %d.",
+                          score_dims.size()));
+    if (ctx->IsRuntime()) {
+      PADDLE_ENFORCE_EQ(box_dims[2], 4,
+                        platform::errors::InvalidArgument(
+                            "The last dimension of Input(Boxes) must be 4, "
+                            "represents the layout of coordinate "
+                            "[xmin, ymin, xmax, ymax]."));
+      PADDLE_ENFORCE_EQ(
+          box_dims[0] == score_dims[0] && box_dims[1] == score_dims[1], true,
+          platform::errors::InvalidArgument(
+              "The first two dimensions of Input(Boxes) must be equal to "
+              "the dimensions of Input(Scores), but received "
+              "Boxes's shape %s and Scores's shape %s.",
+              box_dims, score_dims));
+      if (ctx->HasInput("Labels")) {
+        PADDLE_ENFORCE_EQ(
+            ctx->GetInputDim("Labels"), score_dims,
+            platform::errors::InvalidArgument(
+                "The shape of Input(Labels) must be equal to the shape of "
+                "Input(Scores), but received Labels's shape %s and "
+                "Scores's shape %s.",
+                ctx->GetInputDim("Labels"), score_dims));
+      }
+    }
+
+    auto top_k = ctx->Attrs().Get<int>("top_k");
+    // number of boxes may be unknown (-1) at compile time
+    int64_t num_out = box_dims[1];
+    if (top_k > -1 && num_out > top_k) {
+      num_out = top_k;
+    }
+    ctx->SetOutputDim("Index", {box_dims[0], num_out});
+    ctx->SetOutputDim("NumKept", {box_dims[0]});
+  }
+
+ protected:
+  framework::OpKernelType GetExpectedKernelType(
+      const framework::ExecutionContext& ctx) const override {
+    return framework::OpKernelType(
+        OperatorWithKernel::IndicateVarDataType(ctx, "Scores"),
+        platform::CPUPlace());
+  }
+};
+
+template <typename T>
+class BatchedNMSKernel : public framework::OpKernel<T> {
+ public:
+  // Greedy NMS of one image, indices of kept boxes are written into
+  // out_index in the descending order of scores, return number of kept
+  // boxes.
+  int64_t NMS(const T* boxes, const T* scores, const int64_t* labels,
+              int64_t num_boxes, int64_t num_out, T iou_threshold,
+              T score_threshold, bool normalized, std::vector<int64_t>* perm,
+              std::vector<T>* areas, std::vector<uint8_t>* suppressed,
+              int64_t* out_index) const {
+    perm->clear();
+    for (int64_t i = 0; i < num_boxes; ++i) {
+      if (scores[i] > score_threshold) {
+        perm->push_back(i);
+      }
+    }
+    std::stable_sort(perm->begin(), perm->end(),
+                     [scores](int64_t lhs, int64_t rhs) {
+                       return scores[lhs] > scores[rhs];
+                     });
+
+    int64_t num_pre = perm->size();
+    areas->resize(num_pre);
+    for (int64_t i = 0; i < num_pre; ++i) {
+      (*areas)[i] = BBoxArea<T>(boxes + (*perm)[i] * 4, normalized);
+    }
+    suppressed->assign(num_pre, 0);
+
+    T norm = normalized ? static_cast<T>(0.) : static_cast<T>(1.);
+    int64_t num_kept = 0;
+    for (int64_t i = 0; i < num_pre && num_kept < num_out; ++i) {
+      if ((*suppressed)[i]) continue;
+      auto idx_i = (*perm)[i];
+      out_index[num_kept++] = idx_i;
+
+      const T* box_i = boxes + idx_i * 4;
+      for (int64_t j = i + 1; j < num_pre; ++j) {
+        if ((*suppressed)[j]) continue;
+        auto idx_j = (*perm)[j];
+        // boxes of different classes never suppress each other
+        if (labels != nullptr && labels[idx_i] != labels[idx_j]) continue;
+
+        const T* box_j = boxes + idx_j * 4;
+        T inter_w =
+            std::min(box_i[2], box_j[2]) - std::max(box_i[0], box_j[0]) + norm;
+        T inter_h =
+            std::min(box_i[3], box_j[3]) - std::max(box_i[1], box_j[1]) + norm;
+        if (inter_w <= 0 || inter_h <= 0) continue;
+        T inter_area = inter_w * inter_h;
+        T iou = inter_area / ((*areas)[i] + (*areas)[j] - inter_area);
+        if (iou > iou_threshold) {
+          (*suppressed)[j] = 1;
+        }
+      }
+    }
+    return num_kept;
+  }
+
+  void Compute(const framework::ExecutionContext& ctx) const override {
+    auto* boxes = ctx.Input<Tensor>("Boxes");
+    auto* scores = ctx.Input<Tensor>("Scores");
+    auto* labels = ctx.Input<Tensor>("Labels");
+    auto* index = ctx.Output<Tensor>("Index");
+    auto* num_kept = ctx.Output<Tensor>("NumKept");
+
+    auto iou_threshold = static_cast<T>(ctx.Attr<float>("iou_threshold"));
+    auto score_threshold = static_cast<T>(ctx.Attr<float>("score_threshold"));
+    auto top_k = ctx.Attr<int>("top_k");
+    auto normalized = ctx.Attr<bool>("normalized");
+
+    auto batch_size = scores->dims()[0];
+    auto num_boxes = scores->dims()[1];
+    int64_t num_out = num_boxes;
+    if (top_k > -1 && num_out > top_k) {
+      num_out = top_k;
+    }
+
+    auto* index_data =
+        index->mutable_data<int64_t>({batch_size, num_out}, ctx.GetPlace());
+    auto* num_kept_data =
+        num_kept->mutable_data<int>({batch_size}, ctx.GetPlace());
+    std::fill(index_data, index_data + batch_size * num_out,
+              static_cast<int64_t>(-1));
+
+    const T* boxes_data = boxes->data<T>();
+    const T* scores_data = scores->data<T>();
+    const int64_t* labels_data =
+        labels == nullptr ? nullptr : labels->data<int64_t>();
+
+    std::vector<int64_t> perm;
+    std::vector<T> areas;
+    std::vector<uint8_t> suppressed;
+    perm.reserve(num_boxes);
+    areas.reserve(num_boxes);
+    suppressed.reserve(num_boxes);
+    for (int64_t i = 0; i < batch_size; ++i) {
+      num_kept_data[i] = static_cast<int>(
+          NMS(boxes_data + i * num_boxes * 4, scores_data + i * num_boxes,
+              labels_data == nullptr ? nullptr : labels_data + i * num_boxes,
+              num_boxes, num_out, iou_threshold, score_threshold, normalized,
+              &perm, &areas, &suppressed, index_data + i * num_out));
+    }
+  }
+};
+
+class BatchedNMSOpMaker : public framework::OpProtoAndCheckerMaker {
+ public:
+  void Make() override {
+    AddInput("Boxes",
+             "(Tensor) A 3-D Tensor with shape [N, M, 4] represents the "
+             "predicted locations of M bounding boxes, N is the batch size. "
+             "Each bounding box has four coordinate values and the layout is "
+             "[xmin, ymin, xmax, ymax].");
+    AddInput("Scores",
+             "(Tensor) A 2-D Tensor with shape [N, M] represents the "
+             "confidence of each bounding box.");
+    AddInput("Labels",
+             "(Tensor) A 2-D int64 Tensor with shape [N, M] represents the "
+             "category of each bounding box, boxes of different categories "
+             "do not suppress each other. If not set, all boxes are "
+             "considered as the same category.")
+        .AsDispensable();
+    AddAttr<float>("iou_threshold",
+                   "(float, default 0.5) "
+                   "Boxes whose IoU with a kept box of higher score is "
+                   "larger than it are suppressed.")
+        .SetDefault(0.5);
+    AddAttr<float>("score_threshold",
+                   "(float, default -inf) "
+                   "Boxes whose score is not larger than it are ignored.")
+        .SetDefault(-std::numeric_limits<float>::infinity());
+    AddAttr<int>("top_k",
+                 "(int, default -1) "
+                 "Max number of boxes to keep for each image, -1 means "
+                 "keeping all boxes after NMS.")
+        .SetDefault(-1);
+    AddAttr<bool>("normalized",
+                  "(bool, default true) "
+                  "Whether box coordinates are normalized, 1 is added to "
+                  "width and height when computing areas if not.")
+        .SetDefault(true);
+    AddOutput("Index",
+              "(Tensor) A 2-D int64 Tensor with shape [N, K] represents the "
+              "indices of kept boxes in the descending order of scores for "
+              "each image, K is top_k if it is larger than -1, otherwise M. "
+              "Index is padded with -1 if less than K boxes are kept.");
+    AddOutput("NumKept",
+              "(Tensor) A 1-D int32 Tensor with shape [N] represents the "
+              "number of kept boxes for each image.");
+    AddComment(R"DOC(
+This operator does greedy non maximum suppression (NMS) on batched boxes
+padded into [N, M, 4] Tensor. Boxes whose scores are larger than
+score_threshold are visited in the descending order of scores, each box
+is kept if not suppressed and suppresses the following boxes of the same
+category whose IoU with it is larger than iou_threshold. At most top_k
+boxes are kept for each image if top_k is larger than -1.
+
+Unlike multiclass_nms, inputs and outputs are padded Tensors without LoD,
+and each box has one score and one category.
+)DOC");
+  }
+};
+
+}  // namespace operators
+}  // namespace paddle
+
+namespace ops = paddle::operators;
+REGISTER_OPERATOR(
+    batched_nms, ops::BatchedNMSOp, ops::BatchedNMSOpMaker,
+    paddle::framework::EmptyGradOpMaker<paddle::framework::OpDesc>,
+    paddle::framework::EmptyGradOpMaker<paddle::imperative::OpBase>);
+REGISTER_OP_CPU_KERNEL(batched_nms, ops::BatchedNMSKernel<float>,
+                       ops::BatchedNMSKernel<double>);
@@ -129,7 +129,7 @@ class MultiDeviceFeedReader {
       const std::vector<framework::proto::VarType::Type> &dtypes,
       const std::vector<bool> &need_check_feed,
       const std::vector<platform::Place> &dst_places, bool use_double_buffer,
-      bool drop_last, bool pin_memory = false)
+      bool drop_last, bool pin_memory = false, size_t buffer_size = 2)
       : queue_(queue),
         names_(names),
         pool_(new ::ThreadPool(dst_places.size())),
@@ -162,7 +162,7 @@ class MultiDeviceFeedReader {
         VLOG(10) << "Creating " << i << "-th BufferedReader";
         holder->Reset(
             framework::MakeDecoratedReader<operators::reader::BufferedReader>(
-                reader, p, 2, pin_memory_));
+                reader, p, buffer_size, pin_memory_));
       } else {
         if (platform::is_gpu_place(p)) {
           PADDLE_THROW(platform::errors::PermissionDenied(
@@ -454,11 +454,21 @@ void BindReader(py::module *module) {
            const std::vector<framework::proto::VarType::Type> &dtypes,
            const std::vector<bool> &need_check_feed,
            const std::vector<platform::Place> &dst_places,
-           bool use_double_buffer, bool drop_last, bool pin_memory) {
+           bool use_double_buffer, bool drop_last, bool pin_memory,
+           size_t buffer_size) {
+          PADDLE_ENFORCE_GT(buffer_size, 0,
+                            platform::errors::InvalidArgument(
+                                "The buffer_size of reader should be greater "
+                                "than 0, but received %d.",
+                                buffer_size));
           return new MultiDeviceFeedReader<reader::LoDTensorBlockingQueue>(
               queue, names, shapes, dtypes, need_check_feed, dst_places,
-              use_double_buffer, drop_last, pin_memory);
+              use_double_buffer, drop_last, pin_memory, buffer_size);
         },
+        py::arg("queue"), py::arg("names"), py::arg("shapes"),
+        py::arg("dtypes"), py::arg("need_check_feed"), py::arg("dst_places"),
+        py::arg("use_double_buffer"), py::arg("drop_last"),
+        py::arg("pin_memory"), py::arg("buffer_size") = 2,
         py::return_value_policy::take_ownership);
 
   m.def(
@@ -470,14 +480,22 @@ void BindReader(py::module *module) {
          const std::vector<framework::proto::VarType::Type> &dtypes,
          const std::vector<bool> &need_check_feed,
          const std::vector<platform::Place> &dst_places, bool use_double_buffer,
-         bool drop_last, bool pin_memory) {
+         bool drop_last, bool pin_memory, size_t buffer_size) {
+        PADDLE_ENFORCE_GT(buffer_size, 0,
+                          platform::errors::InvalidArgument(
+                              "The buffer_size of reader should be greater "
+                              "than 0, but received %d.",
+                              buffer_size));
         queue->SetDeviceCount(dst_places.size());
         return new MultiDeviceFeedReader<
             reader::OrderedMultiDeviceLoDTensorBlockingQueue>(
             queue, names, shapes, dtypes, need_check_feed, dst_places,
-            use_double_buffer, drop_last, pin_memory);
+            use_double_buffer, drop_last, pin_memory, buffer_size);
       },
-      py::return_value_policy::take_ownership);
+      py::arg("queue"), py::arg("names"), py::arg("shapes"), py::arg("dtypes"),
+      py::arg("need_check_feed"), py::arg("dst_places"),
+      py::arg("use_double_buffer"), py::arg("drop_last"), py::arg("pin_memory"),
+      py::arg("buffer_size") = 2, py::return_value_policy::take_ownership);
 }
 
 }  // namespace pybind
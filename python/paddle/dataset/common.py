@@ -25,6 +25,7 @@ import importlib
 import paddle.dataset
 import six.moves.cPickle as pickle
 import glob
+import numpy as np
 import paddle
 
 __all__ = []
@@ -208,3 +209,36 @@ def _check_exists_and_download(path, url, md5, module_name, download=True):
     else:
         raise ValueError('{} not exists and auto download disabled'.format(
             path))
+
+
+def _load_cached_arrays(source, cache_files, parse_fn):
+    """
+    Load arrays parsed from :attr:`source` file, arrays are cached as
+    uncompressed .npy files in :attr:`cache_files` and loaded by memory
+    mapping if the cache files are newer than the source file, otherwise
+    :attr:`parse_fn` is called to parse the arrays and the cache files
+    are written. Memory-mapped arrays are read only and shared among
+    processes by the page cache.
+    """
+    source_mtime = os.path.getmtime(source)
+    if all(
+            os.path.exists(f) and os.path.getmtime(f) >= source_mtime
+            for f in cache_files):
+        try:
+            return [np.load(f, mmap_mode='r') for f in cache_files]
+        except (IOError, OSError, ValueError):
+            # rebuild broken cache files
+            pass
+
+    arrays = parse_fn()
+    for cache_file, array in zip(cache_files, arrays):
+        tmp_file = '{}.{}.tmp'.format(cache_file, os.getpid())
+        try:
+            with open(tmp_file, 'wb') as f:
+                np.save(f, np.ascontiguousarray(array))
+            os.replace(tmp_file, cache_file)
+        except (IOError, OSError):
+            # cache is skipped if the directory is not writable
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+    return arrays
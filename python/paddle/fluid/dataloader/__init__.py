@@ -26,7 +26,15 @@ from .dataloader_iter import *
 from . import sampler
 from .sampler import *
 
+from . import sharded_cache
+from .sharded_cache import *
+
+from . import ragged
+from .ragged import *
+
 __all__ = dataset.__all__ \
         + batch_sampler.__all__ \
         + dataloader_iter.__all__ \
-        + sampler.__all__
+        + sampler.__all__ \
+        + sharded_cache.__all__ \
+        + ragged.__all__
@@ -0,0 +1,344 @@
+#   Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import mmap
+import numbers
+import numpy as np
+
+from .. import core
+from .flat import _flatten_batch
+
+try:
+    from collections.abc import Sequence, Mapping
+except:
+    from collections import Sequence, Mapping
+
+__all__ = []
+
+# shared memory files of batch ring are created under /dev/shm, which
+# is only available on Linux, multi-process DataLoader is only
+# supported on Linux currently either
+SHM_DIR = "/dev/shm"
+
+# minimum size of shared memory file of a field
+_ALIGNMENT = 64
+
+# index of data type in pickled state of LoDTensor, see _tensor_type_index
+_TYPE_INDICES = {}
+
+
+def _shared_memory_ring_available():
+    return os.path.isdir(SHM_DIR)
+
+
+def _align(size):
+    return max((size + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT, _ALIGNMENT)
+
+
+def _ring_buffer_name(name_prefix, worker_id, slot, field):
+    return "{}_{}_{}_{}".format(name_prefix, worker_id, slot, field)
+
+
+def _ring_output_name(buffer_name):
+    # a hard link of the buffer file handed out to main process for each
+    # batch, which is unlinked when main process releases the batch
+    return buffer_name + "_out"
+
+
+def _tensor_type_index(dtype):
+    # NOTE: pickled state of LoDTensor holds the index of data type in
+    #       C++, which is not exposed to Python, take it from the state
+    #       of a probe tensor in shared memory
+    dtype = np.dtype(dtype)
+    if dtype not in _TYPE_INDICES:
+        probe = core._array_to_share_memory_tensor(np.zeros([1], dtype=dtype))
+        ipc_name, _, type_idx, _, _ = probe.__getstate__()
+        _TYPE_INDICES[dtype] = type_idx
+        try:
+            os.unlink(os.path.join(SHM_DIR, ipc_name.lstrip('/')))
+        except OSError:
+            pass
+    return _TYPE_INDICES[dtype]
+
+
+class _UnsupportedBatch(Exception):
+    pass
+
+
+class _SharedMemoryBatch(object):
+    """
+    Descriptor of a batch collated into a slot of worker's shared memory
+    batch ring, only buffer names and field layout are sent through the
+    inter-process queue, field data is mapped from shared memory directly.
+
+    Each field in :attr:`fields` is in format of (name, size, shape, dtype)
+    for array in shared memory file :attr:`name`, or a numpy.ndarray for
+    small inline fields (e.g. batched numbers).
+    """
+
+    def __init__(self, worker_id, slot, fields):
+        self.worker_id = worker_id
+        self.slot = slot
+        self.fields = fields
+
+
+def _plan_layout(sample, layout):
+    # collect (shape, dtype) of each numpy.ndarray field in sample in the
+    # same order as _collate_into visiting, other fields are collated
+    # as default_collate_fn does
+    if isinstance(sample, np.ndarray):
+        if sample.dtype == np.object_:
+            raise _UnsupportedBatch()
+        layout.append((sample.shape, sample.dtype))
+    elif isinstance(sample, (numbers.Number, str, bytes)):
+        pass
+    elif isinstance(sample, Mapping):
+        for key in sample:
+            _plan_layout(sample[key], layout)
+    elif isinstance(sample, Sequence):
+        for field in sample:
+            _plan_layout(field, layout)
+    else:
+        # paddle.Tensor and other types are collated by default_collate_fn
+        raise _UnsupportedBatch()
+    return layout
+
+
+class _SharedMemoryBatchRing(object):
+    """
+    Shared memory batch ring in DataLoader worker process.
+
+    Each worker keeps :attr:`ring_size` slots, each slot keeps a shared
+    memory file for each field, which are allocated lazily and sized from
+    the first batch. Samples are written into the files of a free slot
+    directly instead of stacking into a new array and then copying it
+    into shared memory.
+
+    For each batch, a hard link of each file is handed out to main process,
+    which maps it as LoDTensor without copying, and the link is unlinked
+    when the LoDTensor is released, so a slot is free again when links of
+    all its files are gone. Buffer names are derived from
+    :attr:`name_prefix` given by main process, so main process can unlink
+    them even if the worker is killed before cleaning up.
+
+    If a batch cannot be collated into the ring, e.g. all slots are busy,
+    batch is larger than the first batch or sample contains fields not
+    supported, :code:`collate` returns None and the batch should be
+    collated by default_collate_fn.
+    """
+
+    def __init__(self, worker_id, ring_size, name_prefix):
+        self._worker_id = worker_id
+        self._name_prefix = name_prefix
+        self._ring_size = ring_size
+
+        self._disabled = False
+        self._layout = None
+        self._capacity = 0
+        self._sizes = []
+        self._buffers = [None] * ring_size
+        self._next_slot = 0
+
+    def _init_layout(self, samples):
+        try:
+            self._layout = _plan_layout(samples[0], [])
+        except _UnsupportedBatch:
+            self._disabled = True
+            return
+
+        self._capacity = len(samples)
+        for shape, dtype in self._layout:
+            nbytes = self._capacity * int(np.prod(shape)) * dtype.itemsize
+            self._sizes.append(_align(nbytes))
+
+    def _get_buffers(self, slot):
+        if self._buffers[slot] is None:
+            buffers = []
+            for field, size in enumerate(self._sizes):
+                name = _ring_buffer_name(self._name_prefix, self._worker_id,
+                                         slot, field)
+                path = os.path.join(SHM_DIR, name)
+                fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o600)
+                try:
+                    os.ftruncate(fd, size)
+                    buf = mmap.mmap(fd, size)
+                finally:
+                    os.close(fd)
+                buffers.append((name, buf))
+            self._buffers[slot] = buffers
+        return self._buffers[slot]
+
+    def _slot_free(self, slot):
+        if self._buffers[slot] is None:
+            return True
+        return not any(
+            os.path.exists(os.path.join(SHM_DIR, _ring_output_name(name)))
+            for name, _ in self._buffers[slot])
+
+    def _collate_into(self, batch, views):
+        sample = batch[0]
+        if isinstance(sample, np.ndarray):
+            shape, dtype, view = views.pop(0)
+            if any(s.shape != shape or s.dtype != dtype for s in batch):
+                raise _UnsupportedBatch()
+            return np.stack(batch, axis=0, out=view)
+        elif isinstance(sample, numbers.Number):
+            return np.array(batch)
+        elif isinstance(sample, (str, bytes)):
+            return batch
+        elif isinstance(sample, Mapping):
+            return {
+                key: self._collate_into([d[key] for d in batch], views)
+                for key in sample
+            }
+        elif isinstance(sample, Sequence):
+            sample_fields_num = len(sample)
+            if not all(len(sample) == sample_fields_num for sample in batch):
+                raise RuntimeError(
+                    "fileds number not same among samples in a batch")
+            return [
+                self._collate_into(fields, views) for fields in zip(*batch)
+            ]
+        raise _UnsupportedBatch()
+
+    def collate(self, samples):
+        """
+        Collate samples into a free slot of ring, return a tuple of
+        (_SharedMemoryBatch, structure) or None if samples cannot be
+        collated into ring.
+        """
+        if self._disabled or len(samples) == 0:
+            return None
+        if self._layout is None:
+            self._init_layout(samples)
+            if self._disabled:
+                return None
+        if len(samples) > self._capacity:
+            return None
+
+        # batches may be released out of order, e.g. held by user
+        for i in range(self._ring_size):
+            slot = (self._next_slot + i) % self._ring_size
+            if self._slot_free(slot):
+                break
+        else:
+            return None
+
+        buffers = self._get_buffers(slot)
+        batch_size = len(samples)
+        views = []
+        for (shape, dtype), (_, buf) in zip(self._layout, buffers):
+            view = np.ndarray(
+                (batch_size, ) + tuple(shape), dtype=dtype, buffer=buf)
+            views.append((shape, dtype, view))
+        shm_views = dict((id(v[2]), b) for v, b in zip(views, buffers))
+
+        try:
+            batch = self._collate_into(samples, views)
+        except _UnsupportedBatch:
+            return None
+
+        flat_batch, structure = _flatten_batch(batch)
+        fields = []
+        for field in flat_batch:
+            if id(field) in shm_views:
+                name, buf = shm_views[id(field)]
+                out_name = _ring_output_name(name)
+                os.link(
+                    os.path.join(SHM_DIR, name),
+                    os.path.join(SHM_DIR, out_name))
+                fields.append((out_name, len(buf), field.shape,
+                               field.dtype.str))
+            else:
+                fields.append(field)
+
+        self._next_slot = (slot + 1) % self._ring_size
+        return _SharedMemoryBatch(self._worker_id, slot, fields), structure
+
+    def close(self):
+        # NOTE: only buffer files are unlinked, links handed out are
+        #       unlinked by main process after batches are released
+        for buffers in self._buffers:
+            for name, buf in buffers or []:
+                try:
+                    buf.close()
+                except BufferError:
+                    pass
+                try:
+                    os.unlink(os.path.join(SHM_DIR, name))
+                except OSError:
+                    pass
+        self._buffers = [None] * self._ring_size
+
+
+class _SharedMemoryBatchReader(object):
+    """
+    Read batches collated by _SharedMemoryBatchRing in main process.
+
+    Fields are returned as LoDTensor mapping the shared memory files of
+    the batch without copying, in the same way as LoDTensor in shared
+    memory passed from workers. Files are unlinked when the LoDTensor
+    are released, e.g. when the batch is dropped by user, then the
+    worker reuses the slot for following batches. Batches not read, e.g.
+    discarded on resetting, should be released by :code:`discard`.
+
+    :code:`close` unlinks files of all workers, which should be called
+    after workers exit.
+    """
+
+    def __init__(self, name_prefix):
+        self._name_prefix = name_prefix
+
+    def read(self, batch):
+        tensors = []
+        for field in batch.fields:
+            if isinstance(field, np.ndarray):
+                tensor = core.LoDTensor()
+                tensor.set(field, core.CPUPlace())
+            else:
+                name, size, shape, dtype = field
+                # same as unpickling a LoDTensor in shared memory, which
+                # unlinks the file when released
+                tensor = core.LoDTensor.__new__(core.LoDTensor)
+                tensor.__setstate__(("/" + name, size,
+                                     _tensor_type_index(dtype),
+                                     [int(s) for s in shape], []))
+            tensors.append(tensor)
+        return tensors
+
+    def discard(self, batch):
+        for field in batch.fields:
+            if not isinstance(field, np.ndarray):
+                try:
+                    os.unlink(os.path.join(SHM_DIR, field[0]))
+                except OSError:
+                    pass
+
+    def close(self):
+        # NOTE: workers unlink their buffers on exiting, but a worker
+        #       killed by signal (e.g. by OOM killer) leaves them in
+        #       /dev/shm, unlink all files of this prefix here. Batches
+        #       still held by user keep their mapping after unlinking.
+        prefix = self._name_prefix + "_"
+        try:
+            names = os.listdir(SHM_DIR)
+        except OSError:
+            return
+        for name in names:
+            if name.startswith(prefix):
+                try:
+                    os.unlink(os.path.join(SHM_DIR, name))
+                except OSError:
+                    pass
@@ -21,7 +21,10 @@ import math
 from .sampler import Sampler, SequenceSampler, RandomSampler
 from .dataset import Dataset, IterableDataset
 
-__all__ = ["BatchSampler", "DistributedBatchSampler"]
+__all__ = [
+    "BatchSampler", "DistributedBatchSampler", "BucketBatchSampler",
+    "DistributedBucketBatchSampler"
+]
 
 
 class BatchSampler(Sampler):
@@ -342,3 +345,313 @@ class DistributedBatchSampler(BatchSampler):
                     sampler.set_epoch(epoch)
         """
         self.epoch = epoch
+
+
+class BucketBatchSampler(BatchSampler):
+    """
+    Batch sampler which groups samples with similar lengths into mini-batch
+    to reduce padding of variable-length sequence data.
+
+    Sample indices are sorted by lengths in buckets, and batches are
+    generated from the sorted indices in each bucket. A batch holds at
+    most :attr:`batch_size` samples, and if :attr:`max_tokens` is set,
+    the padded token number of a batch (sample number multiplied by the
+    max length in batch) is no more than :attr:`max_tokens`, samples
+    longer than :attr:`max_tokens` are put into a batch alone.
+
+    If :attr:`shuffle` is True, indices are shuffled before splitting into
+    buckets, samples with same length are in random order in a bucket,
+    and batches order is shuffled. Random numbers are seeded by epoch
+    number, which could be set by :code:`set_epoch`, and the epoch number
+    increases by 1 after each epoch.
+
+    Args:
+        dataset(Dataset): this could be a :code:`paddle.io.Dataset`
+                implement or other python object which implemented
+                :code:`__len__` for BatchSampler to get sample number.
+        lengths(list|numpy.ndarray|callable): lengths of samples in
+                :attr:`dataset`, or a callable with sample index as the
+                argument and returning the length of the sample, e.g.
+                :code:`lambda idx: len(dataset[idx][0])`.
+        batch_size(int, optional): max sample number in a mini-batch,
+                None for no limit. Default None.
+        max_tokens(int, optional): max padded token number in a mini-batch,
+                None for no limit. At least one of :attr:`batch_size` and
+                :attr:`max_tokens` should be set. Default None.
+        bucket_size(int, optional): sample number in a bucket, indices are
+                sorted by length in each bucket. None for sorting indices
+                of whole dataset in one bucket. Default None.
+        shuffle(bool): whether to shuffle indices before splitting into
+                buckets and shuffle batches order. Default False.
+        drop_last(bool): whether to drop the last batch of each bucket if
+                it has less than :attr:`batch_size` samples, only takes
+                effect when :attr:`max_tokens` is None. Default False.
+
+    Returns:
+        BucketBatchSampler: an iterable object for indices iterating
+
+    Examples:
+
+        .. code-block:: python
+
+            import numpy as np
+            from paddle.io import Dataset, BucketBatchSampler
+
+            class RandomSeqDataset(Dataset):
+                def __init__(self, num_samples):
+                    self.lengths = np.random.randint(1, 100, [num_samples])
+
+                def __getitem__(self, idx):
+                    return np.random.randint(0, 1000, [self.lengths[idx]])
+
+                def __len__(self):
+                    return len(self.lengths)
+
+            dataset = RandomSeqDataset(1000)
+            bs = BucketBatchSampler(dataset,
+                                    lengths=dataset.lengths,
+                                    max_tokens=1024,
+                                    shuffle=True)
+
+            for epoch in range(2):
+                bs.set_epoch(epoch)
+                for batch_indices in bs:
+                    print(batch_indices)
+
+    see `paddle.io.DataLoader`
+
+    """
+
+    def __init__(self,
+                 dataset,
+                 lengths,
+                 batch_size=None,
+                 max_tokens=None,
+                 bucket_size=None,
+                 shuffle=False,
+                 drop_last=False):
+        self.dataset = dataset
+        if callable(lengths):
+            lengths = [lengths(idx) for idx in range(len(dataset))]
+        self.lengths = np.asarray(lengths, dtype='int64').reshape([-1])
+        assert len(self.lengths) == len(dataset), \
+            "lengths number {} should be equal to dataset size {}".format(
+                len(self.lengths), len(dataset))
+
+        assert batch_size is not None or max_tokens is not None, \
+            "at least one of batch_size and max_tokens should be set"
+        assert batch_size is None or (isinstance(batch_size, int) and
+                                      batch_size > 0), \
+            "batch_size should be a positive integer, but got {}".format(
+                batch_size)
+        self.batch_size = batch_size
+        assert max_tokens is None or (isinstance(max_tokens, int) and
+                                      max_tokens > 0), \
+            "max_tokens should be a positive integer, but got {}".format(
+                max_tokens)
+        self.max_tokens = max_tokens
+        assert bucket_size is None or (isinstance(bucket_size, int) and
+                                       bucket_size > 0), \
+            "bucket_size should be a positive integer, but got {}".format(
+                bucket_size)
+        self.bucket_size = bucket_size
+        assert isinstance(shuffle, bool), \
+            "shuffle should be a boolean value, but got {}".format(type(shuffle))
+        self.shuffle = shuffle
+        assert isinstance(drop_last, bool), \
+            "drop_last should be a boolean value, but got {}".format(
+                type(drop_last))
+        self.drop_last = drop_last
+
+        self.epoch = 0
+        self._batches_cache = None
+
+    def _batch_bucket(self, bucket):
+        batches = []
+        batch_indices = []
+        max_length = 0
+        for idx in bucket:
+            length = int(self.lengths[idx])
+            new_max_length = max(max_length, length)
+            if len(batch_indices) > 0 and (
+                (self.batch_size is not None and
+                 len(batch_indices) == self.batch_size) or
+                (self.max_tokens is not None and new_max_length *
+                 (len(batch_indices) + 1) > self.max_tokens)):
+                batches.append(batch_indices)
+                batch_indices = []
+                new_max_length = length
+            batch_indices.append(int(idx))
+            max_length = new_max_length
+
+        if len(batch_indices) > 0:
+            if not (self.drop_last and self.max_tokens is None and
+                    len(batch_indices) < self.batch_size):
+                batches.append(batch_indices)
+        return batches
+
+    def _generate_batches(self):
+        num_samples = len(self.lengths)
+        indices = np.arange(num_samples)
+        if self.shuffle:
+            rng = np.random.RandomState(self.epoch)
+            rng.shuffle(indices)
+
+        bucket_size = self.bucket_size or max(num_samples, 1)
+        batches = []
+        for start in range(0, num_samples, bucket_size):
+            bucket = indices[start:start + bucket_size]
+            # stable sort keeps random order of samples with same length
+            bucket = bucket[np.argsort(
+                self.lengths[bucket], kind='mergesort')]
+            batches.extend(self._batch_bucket(bucket))
+
+        if self.shuffle:
+            rng.shuffle(batches)
+        return batches
+
+    def _get_batches(self):
+        # batches of an epoch is cached for __len__ and __iter__
+        if self._batches_cache is None or \
+                self._batches_cache[0] != self.epoch:
+            self._batches_cache = (self.epoch, self._generate_batches())
+        return self._batches_cache[1]
+
+    def __iter__(self):
+        batches = self._get_batches()
+        if self.shuffle:
+            self.epoch += 1
+        for batch_indices in batches:
+            yield batch_indices
+
+    def __len__(self):
+        return len(self._get_batches())
+
+    def set_epoch(self, epoch):
+        """
+        Sets the epoch number. When :attr:`shuffle=True`, this number is used
+        as seeds of random numbers. If set same number at each epoch, this
+        sampler will yield the same ordering at all epoches.
+
+        Arguments:
+            epoch (int): Epoch number.
+        """
+        self.epoch = epoch
+
+
+class DistributedBucketBatchSampler(BucketBatchSampler):
+    """
+    Distributed version of :code:`paddle.io.BucketBatchSampler`, each
+    process loads an exclusive subset of batches.
+
+    Batches are generated as :code:`paddle.io.BucketBatchSampler` by all
+    processes in same order, since random numbers are seeded by epoch
+    number, and are assigned to processes in round robin. The batch number
+    is padded by repeating batches from the beginning to be evenly
+    divisible by process number, or is truncated if :attr:`drop_last` is
+    True, so that all processes get same number of batches.
+
+    Args:
+        dataset(paddle.io.Dataset): this could be a `paddle.io.Dataset`
+                implement or other python object which implemented
+                `__len__` for BatchSampler to get sample number.
+        lengths(list|numpy.ndarray|callable): lengths of samples in
+                :attr:`dataset`, or a callable with sample index as the
+                argument and returning the length of the sample.
+        batch_size(int, optional): max sample number in a mini-batch,
+                None for no limit. Default None.
+        max_tokens(int, optional): max padded token number in a mini-batch,
+                None for no limit. At least one of :attr:`batch_size` and
+                :attr:`max_tokens` should be set. Default None.
+        bucket_size(int, optional): sample number in a bucket, indices are
+                sorted by length in each bucket. None for sorting indices
+                of whole dataset in one bucket. Default None.
+        num_replicas(int, optional): porcess number in distributed training.
+            If :attr:`num_replicas` is None, :attr:`num_replicas` will be
+            retrieved from :code:`paddle.distributed.ParallenEnv`.
+            Default None.
+        rank(int, optional): the rank of the current process among :attr:`num_replicas`
+            processes. If :attr:`rank` is None, :attr:`rank` is retrieved from
+            :code:`paddle.distributed.ParallenEnv`. Default None.
+        shuffle(bool): whether to shuffle indices before splitting into
+                buckets and shuffle batches order. Default False.
+        drop_last(bool): whether to drop the last batch of each bucket if
+                it has less than :attr:`batch_size` samples, and drop the
+                tail batches which are not evenly divisible by process
+                number. Default False.
+
+    Examples:
+        .. code-block:: python
+
+            import numpy as np
+            from paddle.io import Dataset, DistributedBucketBatchSampler
+
+            class RandomSeqDataset(Dataset):
+                def __init__(self, num_samples):
+                    self.lengths = np.random.randint(1, 100, [num_samples])
+
+                def __getitem__(self, idx):
+                    return np.random.randint(0, 1000, [self.lengths[idx]])
+
+                def __len__(self):
+                    return len(self.lengths)
+
+            dataset = RandomSeqDataset(1000)
+            bs = DistributedBucketBatchSampler(dataset,
+                                               lengths=dataset.lengths,
+                                               max_tokens=1024,
+                                               shuffle=True)
+
+            for epoch in range(2):
+                bs.set_epoch(epoch)
+                for batch_indices in bs:
+                    print(batch_indices)
+    """
+
+    def __init__(self,
+                 dataset,
+                 lengths,
+                 batch_size=None,
+                 max_tokens=None,
+                 bucket_size=None,
+                 num_replicas=None,
+                 rank=None,
+                 shuffle=False,
+                 drop_last=False):
+        super(DistributedBucketBatchSampler, self).__init__(
+            dataset,
+            lengths,
+            batch_size=batch_size,
+            max_tokens=max_tokens,
+            bucket_size=bucket_size,
+            shuffle=shuffle,
+            drop_last=drop_last)
+
+        from paddle.fluid.dygraph.parallel import ParallelEnv
+
+        if num_replicas is not None:
+            assert isinstance(num_replicas, int) and num_replicas > 0, \
+                    "num_replicas should be a positive integer"
+            self.nranks = num_replicas
+        else:
+            self.nranks = ParallelEnv().nranks
+
+        if rank is not None:
+            assert isinstance(rank, int) and rank >= 0, \
+                    "rank should be a non-negative integer"
+            self.local_rank = rank
+        else:
+            self.local_rank = ParallelEnv().local_rank
+
+    def _generate_batches(self):
+        batches = super(DistributedBucketBatchSampler,
+                        self)._generate_batches()
+        if len(batches) == 0:
+            return batches
+
+        if self.drop_last:
+            batches = batches[:len(batches) - len(batches) % self.nranks]
+        else:
+            padding = -len(batches) % self.nranks
+            batches += [batches[i % len(batches)] for i in range(padding)]
+        return batches[self.local_rank::self.nranks]
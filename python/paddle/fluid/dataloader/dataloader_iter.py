@@ -19,6 +19,7 @@ import time
 import signal
 import numbers
 import logging
+import copy
 import itertools
 import threading
 import numpy as np
@@ -37,9 +38,11 @@ from .fetcher import _IterableDatasetFetcher, _MapDatasetFetcher
 from .batch_sampler import _InfiniteIterableSampler
 from .collate import default_collate_fn, default_convert_fn
 from .worker import ParentWatchDog, get_worker_info, _worker_loop, \
-        _DatasetKind, _IterableDatasetStopIteration, _WorkerException, \
-        _ResumeIteration
+        _thread_worker_loop, _DatasetKind, _IterableDatasetStopIteration, \
+        _WorkerException, _ResumeIteration, _SkipSamples
 from .flat import _flatten_batch, _restore_batch
+from .batch_ring import _SharedMemoryBatch, _SharedMemoryBatchReader, \
+        _shared_memory_ring_available
 
 __all__ = ['get_worker_info']
 
@@ -94,12 +97,23 @@ class _DataLoaderIterBase(object):
         self._num_workers = loader.num_workers
         self._use_buffer_reader = loader.use_buffer_reader
         self._use_shared_memory = loader.use_shared_memory
+        self._use_shared_memory_ring = loader.use_shared_memory_ring
+        self._dispatch_mode = loader.dispatch_mode
         self._timeout = loader.timeout if loader.timeout > 0 else MP_STATUS_CHECK_INTERVAL
         self._worker_init_fn = loader.worker_init_fn
         self._dataset_kind = loader.dataset_kind
         self._pin_memory = loader.pin_memory
+        self._prefetch_depth = loader.prefetch_depth
+
+        # state loaded by DataLoader.load_state_dict to resume from, which
+        # only takes effect on the first iterator created after loading
+        resume_state = getattr(loader, '_resume_state', None)
+        loader._resume_state = None
+        self._batches_consumed = 0
+        self._resumed_batches = 0
+        self._resumed_offsets = None
+        self._init_sampler_iter(resume_state)
 
-        self._sampler_iter = iter(self._index_sampler)
         if self._auto_collate_batch:
             self._collate_fn = loader.collate_fn or default_collate_fn
         else:
@@ -114,6 +128,15 @@ class _DataLoaderIterBase(object):
         self._thread = None
         self._thread_done_event = threading.Event()
 
+        # statistics of waiting for batches in __next__, see
+        # get_prefetch_stats
+        self._prefetch_stats = {
+            'batches': 0,
+            'wait_time': 0.,
+            'queue_depth': 0,
+            'empty': 0,
+        }
+
     @property
     def _index_sampler(self):
         if self._auto_collate_batch:
@@ -124,6 +147,120 @@ class _DataLoaderIterBase(object):
             else:
                 return _InfiniteIterableSampler(self._dataset, 1)
 
+    def _init_sampler_iter(self, resume_state=None):
+        if resume_state is not None:
+            np.random.set_state(resume_state['random_state'])
+            if resume_state['sampler_epoch'] is not None:
+                self._index_sampler.epoch = resume_state['sampler_epoch']
+
+        # NOTE: record numpy random state and epoch of sampler before
+        #       iterating sampler, with which indices order of this epoch
+        #       can be regenerated on resuming
+        self._sampler_state = {
+            'random_state': np.random.get_state(),
+            'sampler_epoch': getattr(self._index_sampler, 'epoch', None),
+        }
+        sampler_iter = iter(self._index_sampler)
+        # NOTE: samplers generate random permutation lazily in the first
+        #       iteration, generate the first batch indices here to avoid
+        #       other random calls interleaved after the recorded state
+        try:
+            first = next(sampler_iter)
+        except StopIteration:
+            self._sampler_iter = iter([])
+        else:
+            self._sampler_iter = itertools.chain([first], sampler_iter)
+
+        if resume_state is None:
+            return
+        self._resumed_batches = resume_state['batches_consumed']
+        if self._dataset_kind == _DatasetKind.MAP:
+            # skip indices of consumed batches without fetching samples
+            for _ in itertools.islice(self._sampler_iter,
+                                      self._resumed_batches):
+                pass
+        else:
+            offsets = list(resume_state['iterable_offsets'])
+            if len(offsets) != max(self._num_workers, 1):
+                raise ValueError(
+                    "cannot resume IterableDataset loading of {} workers "
+                    "from state saved with {} workers".format(
+                        self._num_workers, resume_state['num_workers']))
+            self._resumed_offsets = offsets
+
+    def _samples_per_batch(self):
+        if self._auto_collate_batch:
+            return self._index_sampler.batch_size
+        return 1
+
+    def _iterable_offsets(self):
+        offset = self._resumed_offsets[0] if self._resumed_offsets else 0
+        return [offset + self._batches_consumed * self._samples_per_batch()]
+
+    def state_dict(self):
+        """
+        Returns the state of this iterator, which could be loaded by
+        :code:`DataLoader.load_state_dict` to resume data loading from
+        current position in a new DataLoader iterator.
+
+        The state contains the numpy random state and the epoch of batch
+        sampler when this epoch started, the number of batches consumed,
+        and the number of samples consumed from each worker's copy of
+        dataset for IterableDataset. Indices of consumed batches are
+        regenerated and skipped on resuming without fetching samples
+        for map-style dataset, samples consumed are skipped by iterating
+        dataset without collating for IterableDataset.
+
+        Returns:
+            dict: state of this iterator, which is picklable.
+        """
+        state = dict(self._sampler_state)
+        state['batches_consumed'] = self._resumed_batches + \
+                self._batches_consumed
+        state['num_workers'] = self._num_workers
+        if self._dataset_kind == _DatasetKind.ITER:
+            state['iterable_offsets'] = self._iterable_offsets()
+        return state
+
+    def _start_wait(self):
+        queue_depth = self._blocking_queue.size() \
+                if self._blocking_queue else 0
+        return time.time(), queue_depth
+
+    def _end_wait(self, wait_start):
+        start_time, queue_depth = wait_start
+        stats = self._prefetch_stats
+        stats['batches'] += 1
+        stats['wait_time'] += time.time() - start_time
+        stats['queue_depth'] += queue_depth
+        if queue_depth == 0:
+            stats['empty'] += 1
+
+    def get_prefetch_stats(self):
+        """
+        Get statistics of waiting for batches from the prefetch stage since
+        this iterator is created, which can be used to check whether
+        training is input-bound.
+
+        Returns:
+            dict: statistics contains :attr:`batches` (output number),
+                :attr:`wait_time` (total seconds blocked in waiting for
+                batches), :attr:`avg_wait_time` (average seconds per
+                output), :attr:`avg_queue_depth` (average number of batches
+                ready in blocking queue on requesting a batch) and
+                :attr:`empty_ratio` (ratio of requests found no batch ready,
+                close to 1 means training is input-bound).
+        """
+        stats = self._prefetch_stats
+        batches = max(stats['batches'], 1)
+        return {
+            'batches': stats['batches'],
+            'wait_time': stats['wait_time'],
+            'avg_wait_time': stats['wait_time'] / batches,
+            'avg_queue_depth': stats['queue_depth'] / batches,
+            'empty_ratio': stats['empty'] / batches,
+        }
+
     def __iter__(self):
         return self
 
@@ -153,6 +290,8 @@ class _DataLoaderIterSingleProcess(_DataLoaderIterBase):
         self._dataset_fetcher = _DatasetKind.create_fetcher(
             self._dataset_kind, self._dataset, self._auto_collate_batch,
             self._collate_fn, self._drop_last)
+        if self._resumed_offsets is not None:
+            self._dataset_fetcher.skip(self._resumed_offsets[0])
 
         # NOTE: _structrue_infos used to record the data structure of
         # batch to restore batch structure after reading Tensor
@@ -187,7 +326,7 @@ class _DataLoaderIterSingleProcess(_DataLoaderIterBase):
         self._reader = core.create_py_reader(
             self._blocking_queue, self._var_names, self._shapes, self._dtypes,
             self._need_check_feed, self._places, self._use_buffer_reader, True,
-            self._pin_memory)
+            self._pin_memory, self._prefetch_depth)
 
         self._thread = threading.Thread(
             target=self._thread_loop, args=(_current_expected_place(), ))
@@ -251,6 +390,7 @@ class _DataLoaderIterSingleProcess(_DataLoaderIterBase):
 
     def __next__(self):
         try:
+            wait_start = self._start_wait()
             if in_dygraph_mode():
                 if _in_eager_mode():
                     data = core.eager.read_next_tensor_list(
@@ -278,6 +418,8 @@ class _DataLoaderIterSingleProcess(_DataLoaderIterBase):
                 else:
                     data = self._reader.read_next()
 
+            self._end_wait(wait_start)
+            self._batches_consumed += len(self._places)
             return data
         except StopIteration:
             self._reader.shutdown()
@@ -330,6 +472,16 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
         self._persistent_workers = loader._persistent_workers
         self._resume_worker_cnt = 0
 
+        # NOTE: in dynamic dispatch mode, batch indices are put into a task
+        #       queue shared by all workers instead of assigned to workers
+        #       in round-robin, each idle worker takes the next task, so a
+        #       slow batch only stalls one worker. IterableDataset keeps
+        #       round-robin dispatch for each worker iterates its own copy
+        #       of dataset
+        self._dynamic_dispatch = self._dispatch_mode == 'dynamic' and \
+                self._dataset_kind == _DatasetKind.MAP
+        self._dispatch_epoch = 0
+
         assert self._num_workers > 0,  "Multi-process DataLoader " \
                     "invalid num_workers({})".format(self._num_workers)
 
@@ -357,8 +509,19 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
         # see _try_put_indices
         self._thread_lock = threading.Lock()
 
+        # worker of each batch sent for IterableDataset, to count samples
+        # consumed from each worker, see _iterable_offsets
+        self._sent_workers = []
+
         # init workers and indices queues and put 2 indices in each indices queue
         self._init_workers()
+        if self._resumed_offsets is not None:
+            for worker_id, offset in enumerate(self._resumed_offsets):
+                if offset > 0:
+                    self._indices_queues[worker_id].put(_SkipSamples(offset))
+            # continue round-robin from the worker of next batch
+            for _ in range(self._resumed_batches % self._num_workers):
+                next(self._workers_idx_cycle)
         for _ in range(self._outstanding_capacity):
             self._try_put_indices()
 
@@ -375,6 +538,35 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
         # create data_queue for workers
         self._data_queue = multiprocessing.Queue()
 
+        # task queue shared by workers in dynamic dispatch mode, all
+        # workers share the prefetch credit of _outstanding_capacity
+        self._task_queue = None
+        if self._dynamic_dispatch:
+            self._task_queue = multiprocessing.Queue()
+
+        # [batch number, busy seconds] of each worker, see get_worker_stats
+        self._worker_stats = multiprocessing.RawArray('d',
+                                                      2 * self._num_workers)
+        self._worker_stats_start = time.time()
+
+        # shared memory batch ring of each worker keeps slots for its
+        # outstanding batches (including batches in blocking queue) and
+        # batches held by user, batches fall back to default collating
+        # if all slots are busy
+        self._ring_size = None
+        self._ring_reader = None
+        self._ring_name_prefix = None
+        if self._use_shared_memory and self._use_shared_memory_ring and \
+                _shared_memory_ring_available():
+            self._ring_size = self._outstanding_capacity // \
+                    self._num_workers + 2
+            # buffer names are decided by main process, so that buffers
+            # of killed workers can be unlinked in _try_shutdown_all
+            self._ring_name_prefix = "paddle_dataloader_{}_{}".format(
+                os.getpid(), id(self))
+            self._ring_reader = _SharedMemoryBatchReader(
+                self._ring_name_prefix)
+
         # event for workers and thread, thread event is only need 
         # in multi-processing mode
         self._workers_done_event = multiprocessing.Event()
@@ -389,7 +581,9 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
                       self._data_queue, self._workers_done_event,
                       self._auto_collate_batch, self._collate_fn,
                       self._drop_last, self._worker_init_fn, i,
-                      self._num_workers, self._use_shared_memory))
+                      self._num_workers, self._use_shared_memory,
+                      self._ring_size, self._task_queue,
+                      self._worker_stats, self._ring_name_prefix))
             worker.daemon = True
             worker.start()
             self._workers.append(worker)
@@ -421,7 +615,7 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
         self._reader = core.create_py_reader(
             self._blocking_queue, self._var_names, self._shapes, self._dtypes,
             self._need_check_feed, self._places, self._use_buffer_reader, True,
-            self._pin_memory)
+            self._pin_memory, self._prefetch_depth)
 
         self._thread_done_event = threading.Event()
         # thread event is only need in multi-processing mode
@@ -436,6 +630,9 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
         # put _ResumeIteration to all worker as resume iteration flag
         with self._thread_lock:
             self._resume_worker_cnt = self._num_workers
+            # tasks of last epoch left in shared task queue will be
+            # skipped by workers after resuming
+            self._dispatch_epoch += 1
             for worker_id in range(self._num_workers):
                 self._indices_queues[worker_id].put(_ResumeIteration())
                 self._batches_outstanding += 1
@@ -459,18 +656,28 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
                 data = self._reader.read_next()
 
         # 3. reset all states
+        if self._ring_reader is not None:
+            # batches cached in _task_infos are discarded, release their
+            # slots, batches read out are released with their LoDTensor
+            for info in self._task_infos.values():
+                if len(info) == 3 and isinstance(info[1], _SharedMemoryBatch):
+                    self._ring_reader.discard(info[1])
         self._send_idx = 0
         self._rcvd_idx = 0
         self._batches_outstanding = 0
         self._task_infos = {}
         self._structure_infos = []
+        self._sent_workers = []
+        self._batches_consumed = 0
+        self._resumed_batches = 0
+        self._resumed_offsets = None
 
         # set all worker status available
         self._worker_status = [True] * self._num_workers
 
         # 4. reset _sampler_iter and put prefetch indices to start next epoch
         # init workers and indices queues and put 2 indices in each indices queue
-        self._sampler_iter = iter(self._index_sampler)
+        self._init_sampler_iter()
         for _ in range(self._outstanding_capacity):
             self._try_put_indices()
 
@@ -499,6 +706,11 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
                     for q in self._indices_queues:
                         q.cancel_join_thread()
                         q.close()
+                    if self._task_queue is not None:
+                        self._task_queue.cancel_join_thread()
+                        self._task_queue.close()
+                    if self._ring_reader is not None:
+                        self._ring_reader.close()
             finally:
                 core._erase_process_pids(id(self))
                 self._shutdown = True
@@ -524,7 +736,12 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
                     try:
                         # pack as LoDTensorArray
                         array = core.LoDTensorArray()
-                        if self._use_shared_memory:
+                        if isinstance(batch, _SharedMemoryBatch):
+                            # LoDTensor map ring slot without copying, the
+                            # slot is released with the LoDTensor
+                            for tensor in self._ring_reader.read(batch):
+                                array.append(tensor)
+                        elif self._use_shared_memory:
                             for tensor in batch:
                                 array.append(tensor)
                         else:
@@ -604,7 +821,8 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
                         self._shutdown_worker(i)
                 if len(failed_workers) > 0:
                     self._exit_thread_unexpectedly()
-                    pids = ', '.join(str(w.pid) for w in failed_workers)
+                    pids = ', '.join(
+                        str(getattr(w, 'pid', w.name)) for w in failed_workers)
                     raise RuntimeError("DataLoader {} workers exit unexpectedly, " \
                                 "pids: {}".format(len(failed_workers), pids))
 
@@ -669,6 +887,19 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
             except StopIteration:
                 return
 
+            if self._task_queue is not None:
+                if not any(self._worker_status):
+                    return
+                self._task_queue.put(
+                    (self._dispatch_epoch, self._send_idx, indices))
+                # worker is not known until the task is taken, only map
+                # style dataset uses dynamic dispatch, which does not
+                # check worker status by _task_infos
+                self._task_infos[self._send_idx] = (None, )
+                self._batches_outstanding += 1
+                self._send_idx += 1
+                return
+
             for i in range(self._num_workers):
                 worker_idx = next(self._workers_idx_cycle)
                 if self._worker_status[worker_idx]:
@@ -678,9 +909,44 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
 
             self._indices_queues[worker_idx].put((self._send_idx, indices))
             self._task_infos[self._send_idx] = (worker_idx, )
+            if self._dataset_kind == _DatasetKind.ITER:
+                self._sent_workers.append(worker_idx)
             self._batches_outstanding += 1
             self._send_idx += 1
 
+    def _iterable_offsets(self):
+        offsets = list(self._resumed_offsets or [0] * self._num_workers)
+        for worker_id in self._sent_workers[:self._batches_consumed]:
+            offsets[worker_id] += self._samples_per_batch()
+        return offsets
+
+    def get_worker_stats(self):
+        """
+        Get loading statistics of each worker since this iterator is
+        created, which can be used to find straggler workers.
+
+        Returns:
+            list(dict): statistics of each worker, contains
+                :attr:`worker_id`, :attr:`batches` (batch number loaded),
+                :attr:`busy_time` (seconds spent in loading batches),
+                :attr:`throughput` (batches loaded per busy second) and
+                :attr:`utilization` (busy time ratio since the iterator
+                is created).
+        """
+        elapsed = max(time.time() - self._worker_stats_start, 1e-6)
+        stats = []
+        for i in range(self._num_workers):
+            batches = int(self._worker_stats[2 * i])
+            busy_time = self._worker_stats[2 * i + 1]
+            stats.append({
+                'worker_id': i,
+                'batches': batches,
+                'busy_time': busy_time,
+                'throughput': batches / busy_time if busy_time > 0 else 0.,
+                'utilization': busy_time / elapsed,
+            })
+        return stats
+
     def __del__(self):
         self._try_shutdown_all()
 
@@ -703,6 +969,7 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
                     self._thread_done_event.set()
                     self._blocking_queue.close()
 
+            wait_start = self._start_wait()
             if in_dygraph_mode():
                 if _in_eager_mode():
                     data = core.eager.read_next_tensor_list(
@@ -729,6 +996,7 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
                         data = data[0]
                 else:
                     data = self._reader.read_next()
+            self._end_wait(wait_start)
             self._on_output_batch()
             return data
         except StopIteration:
@@ -743,5 +1011,90 @@ class _DataLoaderIterMultiProcess(_DataLoaderIterBase):
 
     def _on_output_batch(self):
         for _ in range(len(self._places)):
+            self._batches_consumed += 1
             self._batches_outstanding -= 1
             self._try_put_indices()
+
+
+class _DataLoaderIterMultiThread(_DataLoaderIterMultiProcess):
+    """
+    Multi-thread implement of DataLoaderIter for worker_mode='thread',
+    workers run the same dataset fetchers as multi-process mode in
+    threads of main process, which has no process forking, shared
+    memory and pickling cost, and is suitable for data pipelines which
+    release GIL mostly, e.g. numpy and OpenCV operations. Batch order,
+    persistent_workers, worker_init_fn and get_worker_info keep the
+    same behavior as multi-process mode.
+    """
+
+    def __init__(self, loader):
+        super(_DataLoaderIterMultiThread, self).__init__(loader)
+
+    def _init_workers(self):
+        # batches are passed to main thread by reference, shared memory
+        # is not needed
+        self._use_shared_memory = False
+        self._ring_size = None
+        self._ring_reader = None
+
+        self._workers = []
+        self._worker_status = []
+        self._indices_queues = []
+        self._workers_idx_cycle = itertools.cycle(range(self._num_workers))
+
+        self._data_queue = queue.Queue()
+        self._task_queue = queue.Queue() if self._dynamic_dispatch else None
+        self._worker_stats = [0.] * (2 * self._num_workers)
+        self._worker_stats_start = time.time()
+
+        self._workers_done_event = threading.Event()
+        self._thread_done_event = threading.Event()
+
+        for i in range(self._num_workers):
+            indices_queue = queue.Queue()
+            self._indices_queues.append(indices_queue)
+            # NOTE: each worker thread holds a shallow copy of dataset like
+            #       a worker process holds a forked copy, so that attributes
+            #       modified in worker_init_fn (e.g. start/end of splitted
+            #       IterableDataset) only take effect in this worker, data
+            #       referenced by dataset is still shared among workers
+            try:
+                dataset = copy.copy(self._dataset)
+            except Exception:
+                dataset = self._dataset
+            worker = threading.Thread(
+                target=_thread_worker_loop,
+                args=(dataset, self._dataset_kind, indices_queue,
+                      self._data_queue, self._workers_done_event,
+                      self._auto_collate_batch, self._collate_fn,
+                      self._drop_last, self._worker_init_fn, i,
+                      self._num_workers, self._task_queue,
+                      self._worker_stats))
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+            self._worker_status.append(True)
+
+    def _clear_and_remove_data_queue(self):
+        if self._data_queue is not None:
+            while True:
+                try:
+                    self._data_queue.get_nowait()
+                except queue.Empty:
+                    break
+
+    def _try_shutdown_all(self, timeout=None):
+        if not self._shutdown:
+            try:
+                self._exit_thread_expectedly()
+                self._clear_and_remove_data_queue()
+
+                self._workers_done_event.set()
+                for i in range(self._num_workers):
+                    self._shutdown_worker(i, shutdown=True)
+
+                for w in self._workers:
+                    if w is not threading.current_thread():
+                        w.join(timeout)
+            finally:
+                self._shutdown = True
@@ -15,6 +15,7 @@
 from __future__ import print_function
 
 import paddle
+import numpy as np
 from .. import framework
 
 __all__ = [
@@ -37,6 +38,15 @@ class Dataset(object):
     :code:`__len__`: return dataset sample number. This method is required
     by some implements of :code:`paddle.io.BatchSampler`
 
+    Subclasses can optionally implement following method:
+
+    :code:`__getitems__`: get a batch of samples from dataset with a list
+    of indices, and return the batch already collated (e.g. each field
+    stacked in axis 0). If this method is defined and :attr:`collate_fn`
+    of :code:`paddle.io.DataLoader` is not set, DataLoader will read each
+    batch with a single :code:`__getitems__` call instead of calling
+    :code:`__getitem__` per sample and collating the samples.
+
     see :code:`paddle.io.DataLoader`.
 
     Examples:
@@ -271,6 +281,15 @@ class TensorDataset(Dataset):
     def __getitem__(self, index):
         return tuple(tensor[index] for tensor in self.tensors)
 
+    def __getitems__(self, indices):
+        # gather the whole batch from each tensor with one index tensor,
+        # which is the same as stacking samples got by __getitem__
+        indices = paddle.to_tensor(np.asarray(indices, dtype='int64'))
+        return [
+            paddle.gather(
+                tensor, indices, axis=0) for tensor in self.tensors
+        ]
+
     def __len__(self):
         return self.tensors[0].shape[0]
 
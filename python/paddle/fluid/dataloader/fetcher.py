@@ -13,7 +13,9 @@
 # limitations under the License.
 
 import logging
+import itertools
 from ..log_helper import get_logger
+from .collate import default_collate_fn
 from collections.abc import Sequence, Mapping
 
 _WARNING_TO_LOG = True
@@ -78,6 +80,12 @@ class _IterableDatasetFetcher(_DatasetFetcher):
             dataset, auto_collate_batch, collate_fn, drop_last)
         self.dataset_iter = iter(dataset)
 
+    def skip(self, num_samples):
+        # NOTE: IterableDataset is a stream, samples can only be skipped
+        #       by iterating, collating and transferring are still saved
+        for _ in itertools.islice(self.dataset_iter, num_samples):
+            pass
+
     def fetch(self, batch_indices, done_event=None):
 
         if self.auto_collate_batch:
@@ -113,7 +121,20 @@ class _MapDatasetFetcher(_DatasetFetcher):
         super(_MapDatasetFetcher, self).__init__(dataset, auto_collate_batch,
                                                  collate_fn, drop_last)
 
+    def _use_batched_getitems(self):
+        # NOTE: __getitems__ returns an already collated batch, it can
+        #       only replace the per-sample reading pipeline when the
+        #       default collate function is used, user defined collate_fn
+        #       always gets the sample list as before
+        return hasattr(self.dataset, '__getitems__') and \
+                self.collate_fn in (None, default_collate_fn)
+
     def fetch(self, batch_indices, done_event=None):
+        if self.auto_collate_batch and self._use_batched_getitems():
+            if done_event is not None and done_event.is_set():
+                return None
+            return self.dataset.__getitems__(batch_indices)
+
         if self.auto_collate_batch:
             data = []
             for idx in batch_indices:
@@ -0,0 +1,342 @@
+#   Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import print_function
+
+import numbers
+import numpy as np
+
+import paddle
+from .. import layers
+
+try:
+    from collections.abc import Sequence, Mapping
+except:
+    from collections import Sequence, Mapping
+
+__all__ = ["RaggedArray", "pad_collate_fn"]
+
+
+class RaggedArray(object):
+    """
+    A list of variable-length numpy arrays stored in two arrays: all items
+    concatenated in axis 0 as :attr:`values`, and the int64 :attr:`offsets`
+    of the items, item i is ``values[offsets[i]:offsets[i + 1]]``.
+
+    Compared with a list of arrays or of python lists, it takes memory of
+    the values only, and the memory is not copied to DataLoader workers by
+    reference counting after fork. Indexing an item or a slice of items
+    returns views of values without copying.
+
+    Args:
+        values (numpy.ndarray): items concatenated in axis 0.
+        offsets (numpy.ndarray): offsets of items in values, which starts
+            with 0, is non-decreasing and ends with ``len(values)``.
+
+    Examples:
+
+        .. code-block:: python
+
+            import numpy as np
+            from paddle.io import RaggedArray
+
+            docs = RaggedArray.from_sequences([[1, 2, 3], [4], [5, 6]])
+            print(len(docs), docs[0], docs.lengths())
+            # 3 [1 2 3] [3 1 2]
+
+            # pad items into a batch of shape [2, 3]
+            batch, lengths = docs.pad([0, 2], pad_value=-1)
+            print(batch, lengths)
+            # [[ 1  2  3]
+            #  [ 5  6 -1]] [3 2]
+
+    """
+
+    def __init__(self, values, offsets):
+        values = np.asarray(values)
+        offsets = np.asarray(offsets, dtype='int64')
+        assert values.ndim >= 1, "values should be at least 1-D"
+        assert offsets.ndim == 1 and len(offsets) > 0 and offsets[0] == 0, \
+            "offsets should be a 1-D array starting with 0"
+        assert offsets[-1] == len(values), \
+            "offsets should end with {}, the length of values, but got " \
+            "{}".format(len(values), offsets[-1])
+        self.values = values
+        self.offsets = offsets
+
+    @classmethod
+    def from_lengths(cls, values, lengths):
+        """
+        Create a RaggedArray from values and the lengths of items.
+
+        Args:
+            values (numpy.ndarray): items concatenated in axis 0.
+            lengths (numpy.ndarray): lengths of items.
+
+        Returns:
+            RaggedArray: the items.
+        """
+        offsets = np.zeros([len(lengths) + 1], dtype='int64')
+        np.cumsum(lengths, out=offsets[1:])
+        return cls(values, offsets)
+
+    @classmethod
+    def from_sequences(cls, sequences, dtype=None):
+        """
+        Create a RaggedArray from a list of sequences, e.g. lists of ints
+        or numpy arrays.
+
+        Args:
+            sequences (list): the items.
+            dtype (str|numpy.dtype, optional): the data type of values.
+                Default: None, inferred from the sequences.
+
+        Returns:
+            RaggedArray: the items.
+        """
+        sequences = [np.asarray(s, dtype=dtype) for s in sequences]
+        if len(sequences) == 0:
+            return cls(np.zeros([0], dtype=dtype or 'int64'), [0])
+        return cls.from_lengths(
+            np.concatenate(sequences).astype(dtype or sequences[0].dtype),
+            [len(s) for s in sequences])
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            start, stop, step = idx.indices(len(self))
+            if step != 1:
+                return self.take(np.arange(start, stop, step))
+            stop = max(start, stop)
+            begin = self.offsets[start]
+            return RaggedArray(self.values[begin:self.offsets[stop]],
+                               self.offsets[start:stop + 1] - begin)
+        if isinstance(idx, (numbers.Integral, np.integer)):
+            if idx < 0:
+                idx += len(self)
+            if idx < 0 or idx >= len(self):
+                raise IndexError(
+                    "index {} is out of range of RaggedArray with {} items".
+                    format(idx, len(self)))
+            return self.values[self.offsets[idx]:self.offsets[idx + 1]]
+        return self.take(idx)
+
+    def views(self, indices):
+        """
+        Return views of the items at indices as a list.
+
+        Args:
+            indices (list|numpy.ndarray): indices of items.
+
+        Returns:
+            list: views of values of the items, not collated.
+        """
+        indices = self._indices(indices)
+        starts = self.offsets[indices]
+        ends = self.offsets[indices + 1]
+        return [self.values[s:e] for s, e in zip(starts, ends)]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.values[self.offsets[i]:self.offsets[i + 1]]
+
+    @property
+    def dtype(self):
+        return self.values.dtype
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.offsets.nbytes
+
+    def lengths(self):
+        """
+        Return the lengths of items as an int64 array.
+        """
+        return np.diff(self.offsets)
+
+    def _indices(self, indices):
+        indices = np.asarray(indices)
+        if indices.dtype == np.bool_:
+            return np.nonzero(indices)[0]
+        indices = indices.astype('int64').reshape([-1])
+        indices = np.where(indices < 0, indices + len(self), indices)
+        if len(indices) > 0 and (indices.min() < 0 or
+                                 indices.max() >= len(self)):
+            raise IndexError("indices are out of range of RaggedArray with "
+                             "{} items".format(len(self)))
+        return indices
+
+    def _positions(self, indices, lengths):
+        # positions in values of the first lengths elements of items at
+        # indices, and the batch offsets of them
+        batch_offsets = np.zeros([len(indices) + 1], dtype='int64')
+        np.cumsum(lengths, out=batch_offsets[1:])
+        positions = np.arange(batch_offsets[-1], dtype='int64') + np.repeat(
+            self.offsets[indices] - batch_offsets[:-1], lengths)
+        return positions, batch_offsets
+
+    def take(self, indices):
+        """
+        Gather the items at indices into a new RaggedArray.
+
+        Args:
+            indices (list|numpy.ndarray): indices of items.
+
+        Returns:
+            RaggedArray: the items at indices.
+        """
+        indices = self._indices(indices)
+        lengths = self.offsets[indices + 1] - self.offsets[indices]
+        positions, offsets = self._positions(indices, lengths)
+        return RaggedArray(self.values[positions], offsets)
+
+    def pad(self,
+            indices=None,
+            pad_value=0,
+            max_length=None,
+            dtype=None,
+            out=None):
+        """
+        Pad the items at indices into a batch. The items are copied into
+        the batch with one vectorized assignment, without creating an
+        array for each item.
+
+        Args:
+            indices (list|numpy.ndarray, optional): indices of items.
+                Default: None, all items.
+            pad_value (int|float, optional): the value of padded elements.
+                Default: 0.
+            max_length (int, optional): the length of the batch in axis 1,
+                longer items are truncated. Default: None, the maximum
+                length of the items.
+            dtype (str|numpy.dtype, optional): the data type of the batch.
+                Default: None, the data type of values.
+            out (numpy.ndarray, optional): a preallocated batch to pad into,
+                whose shape should be ``[len(indices), max_length, ...]``.
+                Default: None, a new batch is allocated.
+
+        Returns:
+            tuple: (batch, lengths), the padded batch and the lengths of
+                items in it.
+        """
+        indices = self._indices(indices) if indices is not None \
+            else np.arange(len(self))
+        lengths = self.offsets[indices + 1] - self.offsets[indices]
+        if max_length is not None:
+            lengths = np.minimum(lengths, max_length)
+        else:
+            max_length = int(lengths.max()) if len(lengths) > 0 else 0
+
+        shape = [len(indices), max_length] + list(self.values.shape[1:])
+        if out is None:
+            out = np.empty(shape, dtype=dtype or self.values.dtype)
+        else:
+            assert list(out.shape) == shape, \
+                "shape of out should be {}, but got {}".format(
+                    shape, list(out.shape))
+        out.fill(pad_value)
+        positions, batch_offsets = self._positions(indices, lengths)
+        rows = np.repeat(np.arange(len(indices)), lengths)
+        cols = np.arange(len(positions)) - batch_offsets[rows]
+        out[rows, cols] = self.values[positions]
+        return out, lengths
+
+
+def _pad_arrays(arrays, pad_value, return_lengths):
+    lengths = np.array([len(a) for a in arrays], dtype='int64')
+    trailing_shape = list(arrays[0].shape[1:])
+    if any(list(a.shape[1:]) != trailing_shape for a in arrays):
+        raise RuntimeError(
+            "arrays can only be padded in axis 0, but got shapes {}".format(
+                [a.shape for a in arrays]))
+    dtype = np.result_type(*arrays)
+    batch = np.full(
+        [len(arrays), int(lengths.max())] + trailing_shape,
+        pad_value,
+        dtype=dtype)
+    for i, a in enumerate(arrays):
+        batch[i, :len(a)] = a
+    return (batch, lengths) if return_lengths else batch
+
+
+def pad_collate_fn(batch, pad_value=0, return_lengths=False):
+    """
+    A batch collating function for :code:`paddle.io.DataLoader`, which is
+    the same as the default one, except that numpy arrays with different
+    lengths in axis 0, e.g. token ids of sentences, are padded with
+    :attr:`pad_value` into a preallocated batch instead of failing to be
+    stacked.
+
+    Args:
+        batch (list): a list of samples.
+        pad_value (int|float, optional): the value of padded elements.
+            Default: 0.
+        return_lengths (bool, optional): whether to return lengths of
+            padded fields, if True, each padded field is replaced with a
+            tuple of the padded batch and the lengths. Default: False.
+
+    Returns:
+        The batch with fields of samples stacked or padded.
+
+    Examples:
+
+        .. code-block:: python
+
+            import functools
+            import paddle
+            from paddle.io import DataLoader, pad_collate_fn
+            from paddle.text.datasets import Imdb
+
+            imdb = Imdb(mode='train')
+            loader = DataLoader(
+                imdb,
+                batch_size=32,
+                collate_fn=functools.partial(
+                    pad_collate_fn, pad_value=-1, return_lengths=True))
+            for (docs, lengths), labels in loader:
+                print(docs.shape, lengths.shape, labels.shape)
+                break
+
+    """
+    sample = batch[0]
+    if isinstance(sample, np.ndarray):
+        if sample.ndim > 0 and any(s.shape != sample.shape for s in batch):
+            return _pad_arrays(batch, pad_value, return_lengths)
+        return np.stack(batch, axis=0)
+    elif isinstance(sample, paddle.Tensor):
+        return layers.stack(batch, axis=0)
+    elif isinstance(sample, numbers.Number):
+        return np.array(batch)
+    elif isinstance(sample, (str, bytes)):
+        return batch
+    elif isinstance(sample, Mapping):
+        return {
+            key: pad_collate_fn([d[key] for d in batch], pad_value,
+                                return_lengths)
+            for key in sample
+        }
+    elif isinstance(sample, Sequence):
+        sample_fields_num = len(sample)
+        if not all(len(sample) == sample_fields_num for sample in iter(batch)):
+            raise RuntimeError(
+                "fileds number not same among samples in a batch")
+        return [
+            pad_collate_fn(fields, pad_value, return_lengths)
+            for fields in zip(*batch)
+        ]
+
+    raise TypeError("batch data con only contains: tensor, numpy.ndarray, "
+                    "dict, list, number, but got {}".format(type(sample)))
@@ -0,0 +1,533 @@
+#   Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import print_function
+
+import os
+import json
+import mmap
+import bisect
+import pickle
+import struct
+import hashlib
+import warnings
+import threading
+
+import numpy as np
+
+from .dataset import Dataset
+from .collate import default_collate_fn
+
+__all__ = ["ShardedCache"]
+
+# NOTE: protocol 4 is readable by all python 3 versions supported, so that
+# caches can be shared between runs on different python versions
+_PICKLE_PROTOCOL = 4
+
+_INDEX_FILE = 'index.json'
+_INDEX_VERSION = 1
+_SHARD_PATTERN = 'shard-{:05d}.bin'
+
+# a shard is the pickled samples followed by a footer of int64 offsets of
+# samples, the number of samples and the magic
+_SHARD_MAGIC = b'PDSHARD1'
+_FOOTER_TAIL = struct.Struct('<Q8s')
+
+
+def _default_cache_dir():
+    # import here to avoid importing paddle.dataset with paddle.io
+    from paddle.dataset.common import DATA_HOME
+    return os.path.join(DATA_HOME, 'cache')
+
+
+def _entry_name(fingerprint):
+    return hashlib.md5(fingerprint.encode('utf-8')).hexdigest()
+
+
+def _write_json(path, obj):
+    tmp_path = '{}.tmp.{}'.format(path, os.getpid())
+    with open(tmp_path, 'w') as f:
+        json.dump(obj, f)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+class _ShardWriter(object):
+    def __init__(self, path):
+        self.path = path
+        self.tmp_path = '{}.tmp.{}'.format(path, os.getpid())
+        self.file = open(self.tmp_path, 'wb')
+        self.offsets = [0]
+
+    @property
+    def num_samples(self):
+        return len(self.offsets) - 1
+
+    @property
+    def nbytes(self):
+        return self.offsets[-1]
+
+    def write(self, sample):
+        data = pickle.dumps(sample, protocol=_PICKLE_PROTOCOL)
+        self.file.write(data)
+        self.offsets.append(self.offsets[-1] + len(data))
+
+    def commit(self):
+        self.file.write(np.asarray(self.offsets, dtype='<i8').tobytes())
+        self.file.write(_FOOTER_TAIL.pack(self.num_samples, _SHARD_MAGIC))
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        self.file.close()
+        os.remove(self.tmp_path)
+
+
+class _ShardReader(object):
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        num_samples, magic = _FOOTER_TAIL.unpack_from(
+            self.mm, len(self.mm) - _FOOTER_TAIL.size)
+        if magic != _SHARD_MAGIC:
+            self.mm.close()
+            raise ValueError("{} is not a valid shard".format(path))
+        offsets_start = len(self.mm) - _FOOTER_TAIL.size - (num_samples + 1
+                                                            ) * 8
+        # copy offsets out so that the mmap can be closed
+        self.offsets = np.frombuffer(
+            self.mm, dtype='<i8', count=num_samples + 1,
+            offset=offsets_start).copy()
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx):
+        view = memoryview(self.mm)[self.offsets[idx]:self.offsets[idx + 1]]
+        try:
+            return pickle.loads(view)
+        finally:
+            view.release()
+
+    def close(self):
+        self.mm.close()
+
+
+class ShardedCache(Dataset):
+    """
+    Cache samples of a reader or a map-style dataset on local disk.
+
+    On the first pass, samples are pickled into shard files of about
+    :attr:`shard_size` bytes under ``cache_dir``. Each shard ends with an
+    index of sample offsets. Later passes, in this process or in other
+    processes and runs with the same :attr:`fingerprint`, read samples back
+    from memory mapped shards instead of running the source again, so the
+    cache takes little resident memory and the page cache is shared by
+    DataLoader workers.
+
+    :code:`ShardedCache` is a map-style :ref:`api_paddle_io_Dataset`, which
+    gives random access to cached samples. It can also be iterated, or
+    called as a reader by :code:`cache.reader()`, to read shards in order.
+
+    If :attr:`max_size` is set, the total size of shards of all caches in
+    ``cache_dir`` is kept under it by deleting whole shards of the least
+    recently used caches. A cache missing shards is rebuilt from its
+    source on next use, shards still on disk are kept. If a cache alone
+    is larger than :attr:`max_size`, it is not cached and samples are read
+    from the source on every pass: :code:`cache.reader()` runs the source
+    again, and random access reads samples of a map-style dataset source
+    directly. Random access to a cache of a reader source larger than
+    :attr:`max_size` raises RuntimeError.
+
+    Args:
+        source (callable|Dataset): a reader creator which returns an
+            iterable of samples, or a map-style dataset whose samples
+            are read in order of indices.
+        fingerprint (str): the key of the cache, which should change when
+            samples of the source change, e.g. a string made of the data
+            path, its modification time and parameters of preprocessing.
+        cache_dir (str, optional): the directory of caches, each cache is
+            kept in a sub-directory named by the md5 of the fingerprint.
+            Default: ``~/.cache/paddle/dataset/cache``.
+        shard_size (int, optional): size of shard files in bytes, a shard
+            is finished once it reaches this size. Default: 64MB.
+        max_size (int, optional): the maximum total size of shards in
+            ``cache_dir`` in bytes. Default: None, unlimited.
+
+    Examples:
+
+        .. code-block:: python
+
+            import numpy as np
+            import paddle
+            from paddle.io import ShardedCache, DataLoader
+
+            def reader():
+                for i in range(100):
+                    yield np.full([3, 32, 32], i, dtype='float32'), i
+
+            cache = ShardedCache(reader, fingerprint='random-v1')
+            # the first pass runs the reader and writes shards
+            for image, label in cache:
+                pass
+
+            # later passes read samples from shards with random access
+            loader = DataLoader(cache, batch_size=16, shuffle=True)
+            for image, label in loader:
+                print(image.shape, label.shape)
+
+    """
+
+    def __init__(self,
+                 source,
+                 fingerprint,
+                 cache_dir=None,
+                 shard_size=64 << 20,
+                 max_size=None):
+        assert callable(source) or isinstance(source, Dataset), \
+            "source should be a reader creator or a map-style dataset"
+        assert isinstance(fingerprint, str) and fingerprint, \
+            "fingerprint should be a non-empty string"
+        assert shard_size > 0, "shard_size should be positive"
+        assert max_size is None or max_size > 0, \
+            "max_size should be positive or None"
+
+        self.source = source
+        self.fingerprint = fingerprint
+        self.cache_dir = cache_dir or _default_cache_dir()
+        self.shard_size = int(shard_size)
+        self.max_size = max_size
+        self.path = os.path.join(self.cache_dir, _entry_name(fingerprint))
+
+        self._lock = threading.Lock()
+        self._shards = None
+        self._cumulative_sizes = None
+        self._exceeds_max_size = False
+
+    def _index_path(self):
+        return os.path.join(self.path, _INDEX_FILE)
+
+    def _shard_path(self, shard_id):
+        return os.path.join(self.path, _SHARD_PATTERN.format(shard_id))
+
+    def _load_index(self):
+        """
+        Return the index if it was written for the same fingerprint and
+        shard size, otherwise None.
+        """
+        index = _read_json(self._index_path())
+        if index is None or index.get('version') != _INDEX_VERSION or \
+                index.get('fingerprint') != self.fingerprint or \
+                index.get('shard_size') != self.shard_size:
+            return None
+        return index
+
+    def _new_index(self):
+        return {
+            'version': _INDEX_VERSION,
+            'fingerprint': self.fingerprint,
+            'shard_size': self.shard_size,
+            'shards': [],
+            'complete': False,
+        }
+
+    def _shard_exists(self, shard_id, shard):
+        path = self._shard_path(shard_id)
+        return os.path.exists(path) and \
+            os.path.getsize(path) == shard['file_size']
+
+    def is_cached(self):
+        """
+        Whether all samples of the source are cached on disk.
+
+        Returns:
+            bool: True if samples are read from shards.
+        """
+        if self._shards is not None:
+            return True
+        index = self._load_index()
+        return index is not None and index['complete'] and all(
+            self._shard_exists(i, shard)
+            for i, shard in enumerate(index['shards']))
+
+    def _open(self):
+        """
+        Open shards of a complete cache, return False if it is not cached.
+        """
+        if self._shards is not None:
+            return True
+        with self._lock:
+            if self._shards is not None:
+                return True
+            if not self.is_cached():
+                return False
+            index = self._load_index()
+            shards = [
+                _ShardReader(self._shard_path(i))
+                for i in range(len(index['shards']))
+            ]
+            cumulative_sizes = np.cumsum([len(s) for s in shards]).tolist()
+            # the modification time of index marks recently used caches
+            os.utime(self._index_path(), None)
+            self._cumulative_sizes = cumulative_sizes
+            self._shards = shards
+            return True
+
+    def _iter_source(self):
+        if isinstance(self.source, Dataset):
+            return (self.source[i] for i in range(len(self.source)))
+        return self.source()
+
+    def _cache_size(self):
+        """
+        Return (total size, shard files of all caches in cache_dir).
+        """
+        total, entries = 0, []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if not os.path.isdir(path):
+                continue
+            index_path = os.path.join(path, _INDEX_FILE)
+            atime = os.path.getmtime(index_path) if os.path.exists(
+                index_path) else 0.
+            files = []
+            for filename in os.listdir(path):
+                if not filename.endswith('.bin'):
+                    continue
+                file_path = os.path.join(path, filename)
+                size = os.path.getsize(file_path)
+                total += size
+                files.append((file_path, size))
+            entries.append((atime, path, sorted(files)))
+        return total, entries
+
+    def _reserve(self, nbytes):
+        """
+        Evict shards of the least recently used caches to make room for a
+        new shard of nbytes, return False if it is impossible.
+        """
+        if self.max_size is None:
+            return True
+        total, entries = self._cache_size()
+        if total + nbytes <= self.max_size:
+            return True
+        # shards of this cache are never evicted, they are being written
+        own_size = sum(size
+                       for atime, path, files in entries if path == self.path
+                       for _, size in files)
+        if own_size + nbytes > self.max_size:
+            return False
+        for _, path, files in sorted(entries):
+            if path == self.path:
+                continue
+            # evict the last shards first, the others are kept to be
+            # reused when the cache is rebuilt
+            for file_path, size in reversed(files):
+                try:
+                    os.remove(file_path)
+                except OSError:
+                    # removed by another process
+                    pass
+                total -= size
+                if total + nbytes <= self.max_size:
+                    return True
+        return total + nbytes <= self.max_size
+
+    def _build(self):
+        """
+        Yield samples of the source while writing missing shards.
+        """
+        if not os.path.isdir(self.path):
+            try:
+                os.makedirs(self.path)
+            except OSError:
+                # created by another process
+                pass
+        old_index = self._load_index() or self._new_index()
+        old_shards = old_index['shards']
+        index = self._new_index()
+
+        writer = None
+        shard_id, shard_samples = 0, 0
+        # skip writing shards which are still on disk
+        reuse = shard_id < len(old_shards) and self._shard_exists(
+            shard_id, old_shards[shard_id])
+        writing = not self._exceeds_max_size
+        try:
+            for sample in self._iter_source():
+                yield sample
+                if not writing:
+                    continue
+                if reuse:
+                    shard_samples += 1
+                    if shard_samples == old_shards[shard_id]['num_samples']:
+                        index['shards'].append(old_shards[shard_id])
+                        shard_id, shard_samples = shard_id + 1, 0
+                        reuse = shard_id < len(old_shards) and \
+                            self._shard_exists(shard_id, old_shards[shard_id])
+                    continue
+                if writer is None:
+                    writer = _ShardWriter(self._shard_path(shard_id))
+                writer.write(sample)
+                if writer.nbytes >= self.shard_size:
+                    writing = self._commit(writer, index)
+                    writer = None
+                    shard_id += 1
+                    reuse = shard_id < len(old_shards) and \
+                        self._shard_exists(shard_id, old_shards[shard_id])
+
+            if writing and writer is not None:
+                writing = self._commit(writer, index)
+                writer = None
+            if writing and reuse and shard_samples > 0:
+                # the source yields fewer samples than the cached shards
+                writing = False
+            if writing:
+                # shards of an older and longer source are out of date
+                for i in range(len(index['shards']), len(old_shards)):
+                    if os.path.exists(self._shard_path(i)):
+                        os.remove(self._shard_path(i))
+                index['complete'] = True
+                _write_json(self._index_path(), index)
+        finally:
+            if writer is not None:
+                writer.abort()
+
+    def _commit(self, writer, index):
+        file_size = writer.nbytes + (writer.num_samples + 1) * 8 + \
+            _FOOTER_TAIL.size
+        if not self._reserve(file_size):
+            writer.abort()
+            self._exceeds_max_size = True
+            warnings.warn(
+                "ShardedCache {} is larger than max_size {}, samples are not "
+                "cached".format(self.fingerprint, self.max_size))
+            return False
+        writer.commit()
+        index['shards'].append({
+            'num_samples': writer.num_samples,
+            'file_size': file_size
+        })
+        # save the index of finished shards, so that they are reused if
+        # this pass is interrupted
+        _write_json(self._index_path(), index)
+        return True
+
+    def build(self):
+        """
+        Run the source and write all samples to the cache if they are not
+        cached yet. If the cache is larger than :attr:`max_size`, samples
+        of a map-style dataset source are read from it directly later.
+
+        Returns:
+            ShardedCache: the cache itself.
+        """
+        if not self._open():
+            if self._from_source():
+                return self
+            for _ in self._build():
+                pass
+            if self._from_source():
+                return self
+            if not self._open():
+                raise RuntimeError(
+                    "Failed to cache {}, it is larger than max_size {}".format(
+                        self.fingerprint, self.max_size))
+        return self
+
+    def _from_source(self):
+        # NOTE: a map-style dataset source has random access itself, it is
+        #       read directly instead of failing if it is not cached
+        return self._exceeds_max_size and isinstance(self.source, Dataset)
+
+    def reader(self):
+        """
+        Yield all samples in order, from shards if cached, otherwise from
+        the source while caching them.
+        """
+        if self._open():
+            for shard in self._shards:
+                for i in range(len(shard)):
+                    yield shard[i]
+        else:
+            for sample in self._build():
+                yield sample
+
+    def __iter__(self):
+        return self.reader()
+
+    def _locate(self, idx):
+        if idx < 0:
+            idx += len(self)
+        if idx < 0 or idx >= len(self):
+            raise IndexError("index {} is out of range of ShardedCache with "
+                             "{} samples".format(idx, len(self)))
+        shard_id = bisect.bisect_right(self._cumulative_sizes, idx)
+        if shard_id > 0:
+            idx -= self._cumulative_sizes[shard_id - 1]
+        return shard_id, idx
+
+    def __getitem__(self, idx):
+        self.build()
+        if self._from_source():
+            return self.source[idx]
+        shard_id, idx = self._locate(idx)
+        return self._shards[shard_id][idx]
+
+    def __getitems__(self, indices):
+        self.build()
+        if self._from_source():
+            return default_collate_fn([self.source[idx] for idx in indices])
+        samples = []
+        for idx in indices:
+            shard_id, idx = self._locate(idx)
+            samples.append(self._shards[shard_id][idx])
+        return default_collate_fn(samples)
+
+    def __len__(self):
+        self.build()
+        if self._from_source():
+            return len(self.source)
+        return self._cumulative_sizes[-1] if self._cumulative_sizes else 0
+
+    def close(self):
+        """
+        Close memory mapped shards, they are opened again on next access.
+        """
+        with self._lock:
+            if self._shards is not None:
+                for shard in self._shards:
+                    shard.close()
+            self._shards = None
+            self._cumulative_sizes = None
+
+    def __getstate__(self):
+        # memory maps and locks can not be pickled, e.g. to spawn workers,
+        # shards are opened again in the new process
+        state = self.__dict__.copy()
+        state['_lock'] = None
+        state['_shards'] = None
+        state['_cumulative_sizes'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
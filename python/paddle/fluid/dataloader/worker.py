@@ -15,8 +15,10 @@
 import os
 import six
 import sys
+import time
 import paddle
 import numpy as np
+import threading
 import traceback
 from collections import namedtuple
 from .. import core
@@ -24,6 +26,8 @@ from .fetcher import _IterableDatasetFetcher, _MapDatasetFetcher
 from ..multiprocess_utils import _cleanup_mmap, CleanupFuncRegistrar, MP_STATUS_CHECK_INTERVAL
 from ..framework import in_dygraph_mode
 from .flat import _flatten_batch
+from .collate import default_collate_fn
+from .batch_ring import _SharedMemoryBatchRing
 
 # NOTE: queue has a different name in python2 and python3
 import queue
@@ -40,6 +44,32 @@ class _ResumeIteration(object):
     pass
 
 
+class _SkipSamples(object):
+    """
+    Control message to skip samples of IterableDataset consumed before
+    the DataLoader iterator state is saved, see
+    :code:`_DataLoaderIterBase.state_dict`.
+    """
+
+    def __init__(self, num_samples):
+        self.num_samples = num_samples
+
+
+# NOTE: in dynamic dispatch mode, workers block on the shared task queue
+#       with this timeout to check control messages (resume flag and
+#       poison pill) sent to their own indices_queue in time
+DYNAMIC_DISPATCH_POLL_INTERVAL = 0.1
+
+
+def _get_dynamic_task(indices_queue, task_queue):
+    # control messages are sent to each worker's own indices_queue,
+    # check them before taking a task from the shared task queue
+    try:
+        return indices_queue.get_nowait()
+    except queue.Empty:
+        return task_queue.get(timeout=DYNAMIC_DISPATCH_POLL_INTERVAL)
+
+
 class _DatasetKind(object):
     MAP = 0
     ITER = 1
@@ -72,6 +102,10 @@ class ParentWatchDog(object):
 # for IteratorDataset in worker processes.
 _worker_info = None
 
+# worker information for thread workers, each worker thread of
+# worker_mode='thread' DataLoader holds its own worker information
+_thread_worker_info = threading.local()
+
 
 def get_worker_info():
     """
@@ -136,7 +170,7 @@ def get_worker_info():
             # outputs: [2, 5, 3, 6, 4, 7]
 
     """
-    return _worker_info
+    return getattr(_thread_worker_info, 'info', None) or _worker_info
 
 
 class WorkerInfo(object):
@@ -254,7 +288,9 @@ def _generate_states(base_seed=0, worker_id=0):
 
 def _worker_loop(dataset, dataset_kind, indices_queue, out_queue, done_event,
                  auto_collate_batch, collate_fn, drop_last, init_fn, worker_id,
-                 num_workers, use_shared_memory):
+                 num_workers, use_shared_memory, ring_size=None,
+                 task_queue=None, worker_stats=None, ring_name_prefix=None):
+    batch_ring = None
     try:
         # NOTE: [ mmap files clear ] When the child process exits unexpectedly,
         # some shared memory objects may have been applied for but have not yet
@@ -278,30 +314,59 @@ def _worker_loop(dataset, dataset_kind, indices_queue, out_queue, done_event,
         _worker_info = WorkerInfo(
             id=worker_id, num_workers=num_workers, dataset=dataset)
 
+        # NOTE: batch ring collates samples into preallocated shared
+        #       memory directly, which only works for default_collate_fn,
+        #       dataset with __getitems__ returns collated batch already
+        if use_shared_memory and ring_size is not None and \
+                auto_collate_batch and collate_fn is default_collate_fn and \
+                not hasattr(dataset, '__getitems__'):
+            batch_ring = _SharedMemoryBatchRing(worker_id, ring_size,
+                                                ring_name_prefix)
+            fetcher_collate_fn = None
+        else:
+            fetcher_collate_fn = collate_fn
+
         init_exception = None
         try:
             if init_fn is not None:
                 init_fn(worker_id)
             fetcher = _DatasetKind.create_fetcher(dataset_kind, dataset,
                                                   auto_collate_batch,
-                                                  collate_fn, drop_last)
+                                                  fetcher_collate_fn, drop_last)
         except:
             init_exception = _WorkerException(worker_id)
 
         iterator_drained = False
         parent_watch_dog = ParentWatchDog()
 
+        # tasks in shared task queue are tagged with the epoch they are
+        # dispatched in, tasks left from the previous epoch are skipped
+        resume_epoch = 0
+
         while parent_watch_dog.is_alive():
             try:
-                data = indices_queue.get(MP_STATUS_CHECK_INTERVAL)
+                if task_queue is None:
+                    data = indices_queue.get(MP_STATUS_CHECK_INTERVAL)
+                else:
+                    data = _get_dynamic_task(indices_queue, task_queue)
             except queue.Empty:
                 continue
 
             if isinstance(data, _ResumeIteration):
                 out_queue.put((data, None, None))
                 iterator_drained = False
+                resume_epoch += 1
                 fetcher = _DatasetKind.create_fetcher(
-                    dataset_kind, dataset, auto_collate_batch, collate_fn, True)
+                    dataset_kind, dataset, auto_collate_batch,
+                    fetcher_collate_fn, True)
+                continue
+
+            if isinstance(data, _SkipSamples):
+                if init_exception is None:
+                    try:
+                        fetcher.skip(data.num_samples)
+                    except:
+                        init_exception = _WorkerException(worker_id)
                 continue
 
             # None as poison piil, so worker event should be set
@@ -314,7 +379,15 @@ def _worker_loop(dataset, dataset_kind, indices_queue, out_queue, done_event,
             if done_event.is_set() or iterator_drained:
                 continue
 
-            idx, indices = data
+            if task_queue is None:
+                idx, indices = data
+            else:
+                epoch, idx, indices = data
+                if epoch != resume_epoch:
+                    continue
+
+            ring_batch = None
+            fetch_start = time.time()
             try:
                 if init_exception is not None:
                     batch = init_exception
@@ -327,6 +400,10 @@ def _worker_loop(dataset, dataset_kind, indices_queue, out_queue, done_event,
                     #       to make sure tensor will be operated only on CPU
                     with paddle.fluid.dygraph.guard(place=paddle.CPUPlace()):
                         batch = fetcher.fetch(indices)
+                        if batch_ring is not None:
+                            ring_batch = batch_ring.collate(batch)
+                            if ring_batch is None:
+                                batch = default_collate_fn(batch)
             except Exception as e:
                 if isinstance(
                         e, StopIteration) and dataset_kind == _DatasetKind.ITER:
@@ -335,8 +412,18 @@ def _worker_loop(dataset, dataset_kind, indices_queue, out_queue, done_event,
                 else:
                     out_queue.put((idx, _WorkerException(worker_id), None))
             else:
+                if worker_stats is not None:
+                    # worker_stats records [batch number, busy seconds]
+                    # of each worker, only written by the worker itself
+                    worker_stats[2 * worker_id] += 1
+                    worker_stats[2 * worker_id + 1] += \
+                            time.time() - fetch_start
                 if isinstance(batch, _WorkerException):
                     out_queue.put((idx, batch, None))
+                if ring_batch is not None:
+                    # collated into shared memory batch ring already
+                    out_queue.put((idx, ) + ring_batch)
+                    continue
                 batch, structure = _flatten_batch(batch)
                 if use_shared_memory:
                     tensor_list = [
@@ -354,5 +441,99 @@ def _worker_loop(dataset, dataset_kind, indices_queue, out_queue, done_event,
     except:
         six.reraise(*sys.exc_info())
     finally:
+        if batch_ring is not None:
+            batch_ring.close()
         if use_shared_memory:
             _cleanup_mmap()
+
+
+def _thread_worker_loop(dataset, dataset_kind, indices_queue, out_queue,
+                        done_event, auto_collate_batch, collate_fn, drop_last,
+                        init_fn, worker_id, num_workers, task_queue=None,
+                        worker_stats=None):
+    # NOTE: thread worker for worker_mode='thread' DataLoader, which runs
+    #       the same fetcher as _worker_loop in a thread of main process,
+    #       batches are put to out_queue by reference without flattening
+    #       into shared memory. Signal handler, shared memory and numpy
+    #       random seed are process level settings, which are not set here
+    _thread_worker_info.info = WorkerInfo(
+        id=worker_id, num_workers=num_workers, dataset=dataset)
+
+    init_exception = None
+    try:
+        if init_fn is not None:
+            init_fn(worker_id)
+        fetcher = _DatasetKind.create_fetcher(
+            dataset_kind, dataset, auto_collate_batch, collate_fn, drop_last)
+    except:
+        init_exception = _WorkerException(worker_id)
+
+    iterator_drained = False
+    resume_epoch = 0
+
+    while True:
+        try:
+            if task_queue is None:
+                data = indices_queue.get(timeout=MP_STATUS_CHECK_INTERVAL)
+            else:
+                data = _get_dynamic_task(indices_queue, task_queue)
+        except queue.Empty:
+            continue
+
+        if isinstance(data, _ResumeIteration):
+            out_queue.put((data, None, None))
+            iterator_drained = False
+            resume_epoch += 1
+            fetcher = _DatasetKind.create_fetcher(
+                dataset_kind, dataset, auto_collate_batch, collate_fn, True)
+            continue
+
+        if isinstance(data, _SkipSamples):
+            if init_exception is None:
+                try:
+                    fetcher.skip(data.num_samples)
+                except:
+                    init_exception = _WorkerException(worker_id)
+            continue
+
+        # None as poison piil, so worker event should be set
+        if data is None:
+            assert done_event.is_set() or iterator_drained, \
+                    "get None when worker done_event set"
+            break
+        if done_event.is_set() or iterator_drained:
+            continue
+
+        if task_queue is None:
+            idx, indices = data
+        else:
+            epoch, idx, indices = data
+            if epoch != resume_epoch:
+                continue
+
+        fetch_start = time.time()
+        try:
+            if init_exception is not None:
+                batch = init_exception
+                init_exception = None
+            else:
+                batch = fetcher.fetch(indices, done_event)
+        except Exception as e:
+            if isinstance(
+                    e, StopIteration) and dataset_kind == _DatasetKind.ITER:
+                out_queue.put(_IterableDatasetStopIteration(worker_id))
+                iterator_drained = True
+            else:
+                out_queue.put((idx, _WorkerException(worker_id), None))
+        else:
+            # fetch returns None when done_event set
+            if batch is None:
+                continue
+            if worker_stats is not None:
+                worker_stats[2 * worker_id] += 1
+                worker_stats[2 * worker_id + 1] += time.time() - fetch_start
+            if isinstance(batch, _WorkerException):
+                out_queue.put((idx, batch, None))
+                continue
+            batch, structure = _flatten_batch(batch)
+            out_queue.put((idx, batch, structure))
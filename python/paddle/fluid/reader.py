@@ -17,13 +17,14 @@ import sys
 import six
 import numpy as np
 import threading
+import weakref
 import paddle
 from .framework import Program, Variable, program_guard, default_main_program, default_startup_program, in_dygraph_mode, cpu_places, _current_expected_place, _in_eager_mode
 from .executor import global_scope
 from .data_feeder import DataFeeder, BatchedTensorProvider
 from .multiprocess_utils import multiprocess_queue_set, CleanupFuncRegistrar, _cleanup_mmap, _cleanup, _set_SIGCHLD_handler
 from .dataloader import BatchSampler, Dataset, IterableDataset
-from .dataloader.dataloader_iter import _DataLoaderIterSingleProcess, _DataLoaderIterMultiProcess, _DatasetKind, default_collate_fn
+from .dataloader.dataloader_iter import _DataLoaderIterSingleProcess, _DataLoaderIterMultiProcess, _DataLoaderIterMultiThread, _DatasetKind, default_collate_fn
 from .dataloader.batch_sampler import _InfiniteIterableSampler
 from .layers.io import monkey_patch_reader_methods, _copy_reader_var_, double_buffer
 from .unique_name import UniqueNameGenerator
@@ -239,6 +240,47 @@ class DataLoader(object):
         worker_init_fn(callable): init function which will be called with
             worker id on each subproces starting if not set as None. Default
             None.
+        use_shared_memory_ring(bool): whether to collate batches into a ring
+            of preallocated shared memory buffers in each worker subprocess.
+            Buffers are sized from the first batch and samples are written
+            into them directly, instead of stacking samples into a new array
+            and copying it into newly allocated shared memory for each batch.
+            Main process maps the buffers without copying, a buffer is
+            reused after the batch mapping it is released.
+            Only take effect when :attr:`use_shared_memory` is True and
+            :attr:`collate_fn` is not set, batches which cannot be collated
+            into the ring (e.g. larger than the first batch, containing
+            Tensor fields) fall back to the default collating. Default False.
+        dispatch_mode(str): how batch indices are dispatched to worker
+            subprocesses, can be 'round_robin' or 'dynamic'. In 'round_robin'
+            mode, batch indices are assigned to workers in turn. In 'dynamic'
+            mode, batch indices are put into a task queue shared by all
+            workers and each idle worker takes the next one, so faster workers
+            load more batches and a slow batch does not hold back batches
+            queued behind it, output order is kept in both modes. 'dynamic'
+            mode only takes effect for map-style dataset. Loading statistics
+            of each worker can be got by :code:`get_worker_stats` of the
+            iterator. Default 'round_robin'.
+        worker_mode(str): how workers run, can be 'process' or 'thread'. In
+            'process' mode, each worker is a subprocess and batches are sent
+            to main process through inter-process queue. In 'thread' mode,
+            each worker is a thread of main process running the same data
+            pipeline, batches are passed by reference, there is no process
+            forking, shared memory and pickling cost, which is faster to
+            start and uses less memory for data pipelines which release GIL
+            mostly, e.g. numpy and OpenCV operations. Each worker thread holds
+            a shallow copy of :attr:`dataset`, :attr:`worker_init_fn` and
+            :code:`paddle.io.get_worker_info` work as in 'process' mode, but
+            numpy random seed is shared by all worker threads. Default
+            'process'.
+        prefetch_depth(int): number of batches staged ahead of training by
+            the buffered reader when :attr:`use_buffer_reader` is True. On
+            GPU, batches are staged in pinned host memory (if pinned memory
+            is enabled) and copied to device asynchronously ahead of use; on
+            CPU, it is a bounded prefetch queue. Larger value smooths jitter
+            of data loading with more memory cost. Waiting time and queue
+            depth statistics can be got by :code:`get_prefetch_stats` of the
+            iterator to check whether training is input-bound. Default 2.
 
     Returns:
         DataLoader: an iterable object for data iterating, each elemnet of the generated data is a Tensor.
@@ -326,10 +368,19 @@ class DataLoader(object):
                  use_shared_memory=True,
                  timeout=0,
                  worker_init_fn=None,
-                 persistent_workers=False):
+                 persistent_workers=False,
+                 use_shared_memory_ring=False,
+                 dispatch_mode='round_robin',
+                 worker_mode='process',
+                 prefetch_depth=2):
         self.return_list = return_list
         self.collate_fn = collate_fn
         self.use_buffer_reader = use_buffer_reader
+        if not isinstance(prefetch_depth, int) or prefetch_depth < 1:
+            raise ValueError(
+                "prefetch_depth should be a positive integer, but got {}".
+                format(prefetch_depth))
+        self.prefetch_depth = prefetch_depth
         self.worker_init_fn = worker_init_fn
 
         assert isinstance(dataset, Dataset), \
@@ -350,8 +401,13 @@ class DataLoader(object):
         self.places = _convert_places(places)
 
         assert num_workers >= 0, "num_workers should be a non-negative value"
-        if num_workers > 0 and (sys.platform == 'darwin' or
-                                sys.platform == 'win32'):
+        if worker_mode not in ['process', 'thread']:
+            raise ValueError(
+                "worker_mode should be 'process' or 'thread', but got {}".
+                format(worker_mode))
+        self.worker_mode = worker_mode
+        if num_workers > 0 and worker_mode == 'process' and (
+                sys.platform == 'darwin' or sys.platform == 'win32'):
             warnings.warn(
                 "DataLoader with multi-process mode is not supported on MacOs and Windows currently." \
                 " Please use signle-process mode with num_workers = 0 instead")
@@ -359,12 +415,20 @@ class DataLoader(object):
         self.num_workers = num_workers
 
         self.use_shared_memory = use_shared_memory
-        if use_shared_memory and num_workers == 0:
+        if use_shared_memory and (num_workers == 0 or
+                                  worker_mode == 'thread'):
             self.use_shared_memory = False
+        self.use_shared_memory_ring = use_shared_memory_ring
 
         assert timeout >= 0, "timeout should be a non-negative value"
         self.timeout = timeout
 
+        if dispatch_mode not in ['round_robin', 'dynamic']:
+            raise ValueError(
+                "dispatch_mode should be 'round_robin' or 'dynamic', but "
+                "got {}".format(dispatch_mode))
+        self.dispatch_mode = dispatch_mode
+
         if isinstance(dataset, IterableDataset):
             self.dataset_kind = _DatasetKind.ITER
             if shuffle:
@@ -411,6 +475,8 @@ class DataLoader(object):
 
         self._persistent_workers = persistent_workers
         self._iterator = None
+        self._resume_state = None
+        self._last_iterator = None
 
     def __len__(self):
         if self.dataset_kind == _DatasetKind.ITER:
@@ -423,15 +489,102 @@ class DataLoader(object):
 
     def __iter__(self):
         if self.num_workers == 0:
-            return _DataLoaderIterSingleProcess(self)
-        elif self._persistent_workers:
-            if self._iterator is None:
-                self._iterator = _DataLoaderIterMultiProcess(self)
-            else:
-                self._iterator._reset()
-            return self._iterator
+            iterator = _DataLoaderIterSingleProcess(self)
         else:
-            return _DataLoaderIterMultiProcess(self)
+            if self.worker_mode == 'thread':
+                iter_class = _DataLoaderIterMultiThread
+            else:
+                iter_class = _DataLoaderIterMultiProcess
+            if self._persistent_workers:
+                # persistent workers should be recreated to resume from
+                # loaded state
+                if self._iterator is not None and \
+                        self._resume_state is not None:
+                    self._iterator._try_shutdown_all()
+                    self._iterator = None
+                if self._iterator is None:
+                    self._iterator = iter_class(self)
+                else:
+                    self._iterator._reset()
+                iterator = self._iterator
+            else:
+                iterator = iter_class(self)
+
+        # NOTE: only keep a weak reference to the iterator, so that workers
+        #       can be shutdown when the iterator is released by users
+        self._last_iterator = weakref.ref(iterator)
+        return iterator
+
+    def state_dict(self):
+        """
+        Returns the state of the latest iterator of this DataLoader, which
+        records the position of data loading in current epoch and could be
+        loaded by :code:`load_state_dict` to resume data loading, e.g.
+        after job preemption.
+
+        Returns:
+            dict: state of the latest iterator, which is picklable.
+
+        Examples:
+
+            .. code-block:: python
+
+                import numpy as np
+                import paddle
+                from paddle.io import Dataset, DataLoader
+
+                class RandomDataset(Dataset):
+                    def __init__(self, num_samples):
+                        self.num_samples = num_samples
+
+                    def __getitem__(self, idx):
+                        image = np.random.random([784]).astype('float32')
+                        label = np.random.randint(0, 9, (1, )).astype('int64')
+                        return image, label
+
+                    def __len__(self):
+                        return self.num_samples
+
+                loader = DataLoader(RandomDataset(100), batch_size=10,
+                                    shuffle=True)
+                for i, data in enumerate(loader):
+                    if i == 4:
+                        state = loader.state_dict()
+                        break
+
+                # resume from the 6th batch of the epoch
+                loader.load_state_dict(state)
+                for data in loader:
+                    pass
+        """
+        iterator = self._last_iterator() \
+                if self._last_iterator is not None else None
+        if iterator is None:
+            raise RuntimeError(
+                "DataLoader is not being iterated, no state to be saved")
+        return iterator.state_dict()
+
+    def load_state_dict(self, state_dict):
+        """
+        Load iterator state saved by :code:`state_dict`, the next iterator
+        of this DataLoader will resume data loading from the saved position
+        instead of the beginning of the epoch. Batch indices consumed are
+        skipped without reading samples for map-style dataset, and samples
+        consumed are skipped in each worker for IterableDataset.
+
+        .. note::
+            Numpy global random state is set to the state saved at the
+            beginning of the epoch to regenerate the same indices order,
+            samplers with user defined random generator are not supported.
+
+        Args:
+            state_dict (dict): iterator state saved by :code:`state_dict`.
+
+        Examples:
+
+            See :code:`DataLoader.state_dict`
+        """
+        self._resume_state = state_dict
 
     def __call__(self):
         return self.__iter__()
@@ -0,0 +1,124 @@
+#   Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark of batched_nms and matrix_nms against multiclass_nms3 on the
+same detections, e.g. run with
+    python benchmark_batched_nms_op.py --batch_size 8 --num_boxes 1000
+"""
+
+from __future__ import print_function
+
+import argparse
+import time
+import numpy as np
+
+import paddle
+from paddle import _C_ops
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--batch_size', type=int, default=8)
+    parser.add_argument('--num_boxes', type=int, default=1000)
+    parser.add_argument('--num_classes', type=int, default=80)
+    parser.add_argument('--score_threshold', type=float, default=0.05)
+    parser.add_argument('--iou_threshold', type=float, default=0.5)
+    parser.add_argument('--keep_top_k', type=int, default=100)
+    parser.add_argument('--iters', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    return parser.parse_args()
+
+
+def gen_inputs(batch_size, num_boxes, num_classes):
+    xy = np.random.random((batch_size, num_boxes, 2)) * 0.8
+    wh = np.random.random((batch_size, num_boxes, 2)) * 0.2
+    boxes = np.concatenate([xy, xy + wh], axis=-1).astype('float32')
+    # sparse scores as outputs of sigmoid classifiers
+    scores = np.random.random((batch_size, num_classes, num_boxes))
+    scores = (scores**8).astype('float32')
+    return boxes, scores
+
+
+def timeit(fn, iters, warmup):
+    for _ in range(warmup):
+        fn()
+    start = time.time()
+    for _ in range(iters):
+        fn()
+    return (time.time() - start) / iters
+
+
+def main():
+    args = parse_args()
+    paddle.set_device('cpu')
+    boxes_np, scores_np = gen_inputs(args.batch_size, args.num_boxes,
+                                     args.num_classes)
+    boxes = paddle.to_tensor(boxes_np)
+    scores = paddle.to_tensor(scores_np)
+
+    # each (box, class) pair is a candidate for batched_nms, which is the
+    # same as multiclass_nms without background class
+    flat_boxes = paddle.to_tensor(
+        np.tile(boxes_np, [1, args.num_classes, 1]))
+    flat_scores = paddle.to_tensor(
+        scores_np.reshape([args.batch_size, -1]))
+    flat_labels = paddle.to_tensor(
+        np.repeat(np.arange(args.num_classes), args.num_boxes)[np.newaxis]
+        .repeat(args.batch_size, axis=0).astype('int64'))
+
+    def run_multiclass_nms():
+        return _C_ops.multiclass_nms3(
+            boxes, scores, None, 'background_label', -1, 'score_threshold',
+            args.score_threshold, 'nms_top_k', -1, 'nms_threshold',
+            args.iou_threshold, 'nms_eta', 1.0, 'keep_top_k', args.keep_top_k,
+            'normalized', True)
+
+    def run_batched_nms():
+        return paddle.vision.ops.batched_nms(
+            flat_boxes,
+            flat_scores,
+            flat_labels,
+            iou_threshold=args.iou_threshold,
+            score_threshold=args.score_threshold,
+            top_k=args.keep_top_k)
+
+    def run_matrix_nms():
+        return paddle.vision.ops.matrix_nms(
+            boxes,
+            scores,
+            score_threshold=args.score_threshold,
+            post_threshold=args.score_threshold,
+            nms_top_k=-1,
+            keep_top_k=args.keep_top_k,
+            background_label=-1)
+
+    # results of multiclass_nms and batched_nms should be the same
+    _, _, nms_rois_num = run_multiclass_nms()
+    _, num_kept = run_batched_nms()
+    np.testing.assert_array_equal(nms_rois_num.numpy(), num_kept.numpy())
+
+    print("batch_size={}, num_boxes={}, num_classes={}".format(
+        args.batch_size, args.num_boxes, args.num_classes))
+    baseline = timeit(run_multiclass_nms, args.iters, args.warmup)
+    for name, fn in [('multiclass_nms3', run_multiclass_nms),
+                     ('batched_nms', run_batched_nms),
+                     ('matrix_nms', run_matrix_nms)]:
+        elapse = timeit(fn, args.iters, args.warmup)
+        print("{:<16} {:>10.3f} ms/batch {:>10.1f} images/s {:>6.2f}x".format(
+            name, elapse * 1000, args.batch_size / elapse, baseline / elapse))
+
+
+if __name__ == '__main__':
+    main()
@@ -21,6 +21,7 @@ import paddle.fluid as fluid
 from paddle.io import BatchSampler, Dataset, Sampler, SequenceSampler, \
                         RandomSampler, WeightedRandomSampler
 from paddle.io import DistributedBatchSampler
+from paddle.io import BucketBatchSampler, DistributedBucketBatchSampler
 
 IMAGE_SIZE = 32
 
@@ -281,5 +282,57 @@ class TestWeightedRandomSampler(unittest.TestCase):
             self.assertTrue(True)
 
 
+class TestBucketBatchSampler(unittest.TestCase):
+    def setUp(self):
+        self.dataset = RandomDataset(103, 10)
+        self.lengths = np.random.RandomState(0).randint(1, 50, [103])
+
+    def test_max_tokens(self):
+        bs = BucketBatchSampler(
+            self.dataset, self.lengths, max_tokens=100, shuffle=True)
+        assert len(bs) > 0
+        batches = list(bs)
+        indices = sorted([idx for batch in batches for idx in batch])
+        assert indices == list(range(103))
+        for batch in batches:
+            assert len(batch) == 1 or \
+                    max(self.lengths[batch]) * len(batch) <= 100
+
+        # same order for same epoch
+        bs.set_epoch(0)
+        assert list(bs) == batches
+        assert list(bs) != batches
+
+    def test_batch_size(self):
+        bs = BucketBatchSampler(
+            self.dataset,
+            lambda idx: self.lengths[idx],
+            batch_size=8,
+            bucket_size=30,
+            drop_last=True)
+        batches = list(bs)
+        assert len(batches) == len(bs)
+        for batch in batches:
+            assert len(batch) == 8
+            assert list(self.lengths[batch]) == sorted(self.lengths[batch])
+
+    def test_distributed(self):
+        batches = []
+        for rank in range(3):
+            bs = DistributedBucketBatchSampler(
+                self.dataset,
+                self.lengths,
+                batch_size=8,
+                max_tokens=120,
+                num_replicas=3,
+                rank=rank,
+                shuffle=True)
+            bs.set_epoch(5)
+            batches.append(list(bs))
+        assert len(set(len(b) for b in batches)) == 1
+        indices = set(idx for b in batches for batch in b for idx in batch)
+        assert indices == set(range(103))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,167 @@
+#   Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import print_function
+
+import unittest
+import numpy as np
+from op_test import OpTest
+
+import paddle
+
+
+def iou(box_a, box_b, normalized):
+    norm = 0. if normalized else 1.
+    inter_w = min(box_a[2], box_b[2]) - max(box_a[0], box_b[0]) + norm
+    inter_h = min(box_a[3], box_b[3]) - max(box_a[1], box_b[1]) + norm
+    if inter_w <= 0 or inter_h <= 0:
+        return 0.
+    inter_area = inter_w * inter_h
+    area_a = (box_a[2] - box_a[0] + norm) * (box_a[3] - box_a[1] + norm)
+    area_b = (box_b[2] - box_b[0] + norm) * (box_b[3] - box_b[1] + norm)
+    return inter_area / (area_a + area_b - inter_area)
+
+
+def batched_nms(boxes, scores, labels, iou_threshold, score_threshold, top_k,
+                normalized):
+    batch_size, num_boxes = scores.shape
+    num_out = num_boxes if top_k < 0 else min(top_k, num_boxes)
+    index = np.full([batch_size, num_out], -1, dtype='int64')
+    num_kept = np.zeros([batch_size], dtype='int32')
+    for n in range(batch_size):
+        order = np.argsort(-scores[n], kind='mergesort')
+        keep = []
+        for i in order:
+            if scores[n, i] <= score_threshold or len(keep) == num_out:
+                break
+            suppressed = False
+            for j in keep:
+                if labels is not None and labels[n, i] != labels[n, j]:
+                    continue
+                if iou(boxes[n, i], boxes[n, j], normalized) > iou_threshold:
+                    suppressed = True
+                    break
+            if not suppressed:
+                keep.append(i)
+        index[n, :len(keep)] = keep
+        num_kept[n] = len(keep)
+    return index, num_kept
+
+
+def gen_inputs(batch_size, num_boxes, num_classes, normalized=True):
+    scale = 1. if normalized else 100.
+    xy = np.random.random((batch_size, num_boxes, 2)) * scale
+    wh = np.random.random((batch_size, num_boxes, 2)) * 0.3 * scale
+    boxes = np.concatenate([xy, xy + wh], axis=-1).astype('float32')
+    scores = np.random.random((batch_size, num_boxes)).astype('float32')
+    labels = np.random.randint(
+        0, num_classes, (batch_size, num_boxes)).astype('int64')
+    return boxes, scores, labels
+
+
+class TestBatchedNMSOp(OpTest):
+    def set_argument(self):
+        self.use_labels = True
+        self.normalized = True
+        self.top_k = 50
+
+    def setUp(self):
+        self.set_argument()
+        self.op_type = 'batched_nms'
+        iou_threshold = 0.5
+        score_threshold = 0.05
+
+        boxes, scores, labels = gen_inputs(4, 200, 5, self.normalized)
+        if not self.use_labels:
+            labels = None
+        index, num_kept = batched_nms(boxes, scores, labels, iou_threshold,
+                                      score_threshold, self.top_k,
+                                      self.normalized)
+
+        self.inputs = {'Boxes': boxes, 'Scores': scores}
+        if labels is not None:
+            self.inputs['Labels'] = labels
+        self.outputs = {'Index': index, 'NumKept': num_kept}
+        self.attrs = {
+            'iou_threshold': iou_threshold,
+            'score_threshold': score_threshold,
+            'top_k': self.top_k,
+            'normalized': self.normalized,
+        }
+
+    def test_check_output(self):
+        self.check_output()
+
+
+class TestBatchedNMSOpNoLabels(TestBatchedNMSOp):
+    def set_argument(self):
+        self.use_labels = False
+        self.normalized = True
+        self.top_k = -1
+
+
+class TestBatchedNMSOpNotNormalized(TestBatchedNMSOp):
+    def set_argument(self):
+        self.use_labels = True
+        self.normalized = False
+        self.top_k = 1000
+
+
+class TestBatchedNMSAPI(unittest.TestCase):
+    def setUp(self):
+        self.boxes, self.scores, self.labels = gen_inputs(2, 100, 3)
+        self.expected = batched_nms(self.boxes, self.scores, self.labels, 0.4,
+                                    0.1, 20, True)
+
+    def test_dygraph(self):
+        with paddle.fluid.dygraph.guard():
+            index, num_kept = paddle.vision.ops.batched_nms(
+                paddle.to_tensor(self.boxes),
+                paddle.to_tensor(self.scores),
+                paddle.to_tensor(self.labels.astype('int32')),
+                iou_threshold=0.4,
+                score_threshold=0.1,
+                top_k=20)
+            np.testing.assert_array_equal(index.numpy(), self.expected[0])
+            np.testing.assert_array_equal(num_kept.numpy(), self.expected[1])
+
+    def test_static(self):
+        paddle.enable_static()
+        with paddle.static.program_guard(paddle.static.Program()):
+            boxes = paddle.static.data('boxes', [None, 100, 4], 'float32')
+            scores = paddle.static.data('scores', [None, 100], 'float32')
+            labels = paddle.static.data('labels', [None, 100], 'int64')
+            index, num_kept = paddle.vision.ops.batched_nms(
+                boxes,
+                scores,
+                labels,
+                iou_threshold=0.4,
+                score_threshold=0.1,
+                top_k=20)
+            self.assertEqual(index.shape, (-1, 20))
+
+            exe = paddle.static.Executor(paddle.CPUPlace())
+            out = exe.run(feed={
+                'boxes': self.boxes,
+                'scores': self.scores,
+                'labels': self.labels
+            },
+                          fetch_list=[index, num_kept])
+        np.testing.assert_array_equal(out[0], self.expected[0])
+        np.testing.assert_array_equal(out[1], self.expected[1])
+
+
+if __name__ == '__main__':
+    paddle.enable_static()
+    unittest.main()
@@ -17,6 +17,7 @@ import unittest
 import numpy as np
 import copy
 from op_test import OpTest
+import paddle
 import paddle.fluid as fluid
 from paddle.fluid import Program, program_guard
 
@@ -304,5 +305,32 @@ class TestMatrixNMSError(unittest.TestCase):
             test_coverage()
 
 
+class TestMatrixNMSAPI(unittest.TestCase):
+    def test_dygraph(self):
+        with fluid.dygraph.guard():
+            N, M, C = 3, 100, 5
+            scores = np.random.random((N * M, C)).astype('float32')
+            scores = np.apply_along_axis(softmax, 1, scores)
+            scores = np.transpose(np.reshape(scores, (N, M, C)), (0, 2, 1))
+            boxes = np.random.random((N, M, 4)).astype('float32')
+            boxes[:, :, 0:2] = boxes[:, :, 0:2] * 0.5
+            boxes[:, :, 2:4] = boxes[:, :, 2:4] * 0.5 + 0.5
+
+            det_outs, index_outs, lod = batched_multiclass_nms(
+                boxes, scores, 0, 0.01, 0., 40, 20, True, False, 2.)
+
+            out, rois_num, index = paddle.vision.ops.matrix_nms(
+                paddle.to_tensor(boxes),
+                paddle.to_tensor(scores),
+                score_threshold=0.01,
+                post_threshold=0.,
+                nms_top_k=40,
+                keep_top_k=20,
+                return_index=True)
+            np.testing.assert_allclose(out.numpy(), det_outs, rtol=1e-5)
+            np.testing.assert_array_equal(rois_num.numpy(), lod)
+            np.testing.assert_array_equal(index.numpy()[:, 0], index_outs)
+
+
 if __name__ == '__main__':
     unittest.main()
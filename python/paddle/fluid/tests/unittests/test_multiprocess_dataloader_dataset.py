@@ -14,6 +14,7 @@
 
 from __future__ import division
 
+import os
 import unittest
 import numpy as np
 
@@ -422,5 +423,159 @@ class TestDatasetWithDropLast(unittest.TestCase):
         self.run_main(dataset, 10, 3)
 
 
+class BatchedNumpyDataset(Dataset):
+    def __init__(self, sample_num):
+        np.random.seed(0)
+        self.images = np.random.random(
+            [sample_num, IMAGE_SIZE]).astype('float32')
+        self.labels = np.random.randint(0, 9,
+                                        (sample_num, 1)).astype('int64')
+
+    def __len__(self):
+        return len(self.images)
+
+    def __getitem__(self, idx):
+        raise AssertionError("__getitem__ should not be called")
+
+    def __getitems__(self, indices):
+        return self.images[indices], self.labels[indices]
+
+
+class TestBatchedGetitemsDataset(unittest.TestCase):
+    def run_main(self, num_workers):
+        place = paddle.CPUPlace()
+        with fluid.dygraph.guard(place):
+            dataset = BatchedNumpyDataset(16)
+            dataloader = DataLoader(
+                dataset,
+                places=place,
+                num_workers=num_workers,
+                batch_size=4,
+                drop_last=True)
+
+            for i, (image, label) in enumerate(dataloader()):
+                assert image.shape == [4, IMAGE_SIZE]
+                assert label.shape == [4, 1]
+                assert np.allclose(image.numpy(),
+                                   dataset.images[i * 4:(i + 1) * 4])
+                assert np.array_equal(label.numpy(),
+                                      dataset.labels[i * 4:(i + 1) * 4])
+
+    def test_main(self):
+        for num_workers in [0, 2]:
+            self.run_main(num_workers)
+
+    def test_user_collate_fn(self):
+        # user defined collate_fn still gets sample list by __getitem__
+        dataset = BatchedNumpyDataset(4)
+        dataloader = DataLoader(
+            dataset, batch_size=2, collate_fn=lambda batch: batch)
+        self.assertRaises(AssertionError, next, iter(dataloader))
+
+
+class TestTensorDatasetGetitems(unittest.TestCase):
+    def test_main(self):
+        place = paddle.CPUPlace()
+        with fluid.dygraph.guard(place):
+            input_np = np.random.random([8, 3, 4]).astype('float32')
+            label_np = np.random.randint(0, 9, [8, 1]).astype('int64')
+            dataset = TensorDataset(
+                [paddle.to_tensor(input_np), paddle.to_tensor(label_np)])
+
+            indices = [5, 1, 3]
+            input, label = dataset.__getitems__(indices)
+            assert input.shape == [3, 3, 4]
+            assert label.shape == [3, 1]
+            assert np.allclose(input.numpy(), input_np[indices])
+            assert np.array_equal(label.numpy(), label_np[indices])
+
+            dataloader = DataLoader(
+                dataset, places=place, batch_size=3, drop_last=False)
+            outputs = [label.numpy() for _, label in dataloader()]
+            assert np.array_equal(np.concatenate(outputs), label_np)
+
+
+class TestSharedMemoryRing(unittest.TestCase):
+    def run_main(self, dataset, use_shared_memory_ring, persistent_workers):
+        place = paddle.CPUPlace()
+        with fluid.dygraph.guard(place):
+            dataloader = DataLoader(
+                dataset,
+                places=place,
+                num_workers=2,
+                batch_size=3,
+                drop_last=False,
+                use_shared_memory_ring=use_shared_memory_ring,
+                persistent_workers=persistent_workers)
+
+            outputs = []
+            for _ in range(2):
+                for image, label in dataloader():
+                    outputs.append((image.numpy(), label.numpy()))
+            return outputs
+
+    def test_main(self):
+        dataset = RandomDataset(16)
+        for persistent_workers in [False, True]:
+            expected = self.run_main(dataset, False, persistent_workers)
+            outputs = self.run_main(dataset, True, persistent_workers)
+            assert len(outputs) == len(expected)
+            # the last batch is smaller than the first batch
+            assert outputs[5][0].shape == (1, IMAGE_SIZE)
+            for (image, label), (image_t, label_t) in zip(outputs, expected):
+                assert np.allclose(image, image_t)
+                assert np.array_equal(label, label_t)
+
+    def test_release(self):
+        from paddle.fluid.dataloader.batch_ring import \
+                _SharedMemoryBatchRing, _SharedMemoryBatchReader
+
+        name_prefix = "paddle_dataloader_test_release_{}".format(os.getpid())
+        ring = _SharedMemoryBatchRing(0, 1, name_prefix)
+        reader = _SharedMemoryBatchReader(name_prefix)
+        samples = [(np.full([IMAGE_SIZE], i, 'float32'), i) for i in range(3)]
+        batch, _ = ring.collate(samples)
+        image, label = reader.read(batch)
+        np.testing.assert_array_equal(
+            np.array(image), np.stack([s[0] for s in samples]))
+        np.testing.assert_array_equal(np.array(label), np.arange(3))
+
+        # the only slot is mapped by image until it is released
+        self.assertIsNone(ring.collate(samples))
+        del image
+        self.assertIsNotNone(ring.collate(samples))
+        ring.close()
+        reader.close()
+
+    def test_killed_worker(self):
+        import signal
+        import multiprocessing
+        from paddle.fluid.dataloader.batch_ring import SHM_DIR, \
+                _SharedMemoryBatchRing, _SharedMemoryBatchReader
+
+        def collate_and_wait(name_prefix, ready_event):
+            ring = _SharedMemoryBatchRing(0, 2, name_prefix)
+            ring.collate([np.ones([IMAGE_SIZE], 'float32')] * 3)
+            ring.collate([np.ones([IMAGE_SIZE], 'float32')] * 3)
+            ready_event.set()
+            signal.pause()
+
+        name_prefix = "paddle_dataloader_test_{}".format(os.getpid())
+        ready_event = multiprocessing.Event()
+        worker = multiprocessing.Process(
+            target=collate_and_wait, args=(name_prefix, ready_event))
+        worker.start()
+        assert ready_event.wait(30)
+        os.kill(worker.pid, signal.SIGKILL)
+        worker.join()
+
+        def ring_files():
+            return [f for f in os.listdir(SHM_DIR) if f.startswith(name_prefix)]
+
+        # buffer of each slot and its link handed out
+        assert len(ring_files()) == 4
+        _SharedMemoryBatchReader(name_prefix).close()
+        assert len(ring_files()) == 0
+
 if __name__ == '__main__':
     unittest.main()
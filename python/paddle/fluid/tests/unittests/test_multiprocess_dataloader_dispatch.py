@@ -0,0 +1,110 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import division
+
+import time
+import unittest
+import numpy as np
+
+import paddle
+import paddle.fluid as fluid
+from paddle.io import Dataset, IterableDataset, DataLoader
+
+IMAGE_SIZE = 8
+SAMPLE_NUM = 32
+BATCH_SIZE = 2
+
+
+class SlowSampleDataset(Dataset):
+    def __init__(self, sample_num, slow_indices=[0]):
+        self.sample_num = sample_num
+        self.slow_indices = slow_indices
+
+    def __len__(self):
+        return self.sample_num
+
+    def __getitem__(self, idx):
+        if idx in self.slow_indices:
+            time.sleep(0.5)
+        image = np.full([IMAGE_SIZE], idx).astype('float32')
+        label = np.array([idx]).astype('int64')
+        return image, label
+
+
+class RangeIterableDataset(IterableDataset):
+    def __init__(self, sample_num):
+        self.sample_num = sample_num
+
+    def __iter__(self):
+        for i in range(self.sample_num):
+            yield np.array([i]).astype('int64')
+
+
+class TestDynamicDispatch(unittest.TestCase):
+    def run_main(self, dataset, dispatch_mode, persistent_workers,
+                 num_workers=4):
+        place = paddle.CPUPlace()
+        with fluid.dygraph.guard(place):
+            dataloader = DataLoader(
+                dataset,
+                places=place,
+                num_workers=num_workers,
+                batch_size=BATCH_SIZE,
+                dispatch_mode=dispatch_mode,
+                persistent_workers=persistent_workers)
+
+            labels = []
+            for _ in range(2):
+                data_iter = iter(dataloader)
+                for data in data_iter:
+                    label = data[1] if isinstance(data, list) else data
+                    labels.append(label.numpy())
+            return np.concatenate(labels), data_iter
+
+    def test_keep_order(self):
+        dataset = SlowSampleDataset(SAMPLE_NUM)
+        for persistent_workers in [False, True]:
+            labels, data_iter = self.run_main(dataset, 'dynamic',
+                                              persistent_workers)
+            expected = np.concatenate([np.arange(SAMPLE_NUM)] * 2)
+            assert np.array_equal(labels.flatten(), expected)
+
+    def test_worker_stats(self):
+        dataset = SlowSampleDataset(SAMPLE_NUM)
+        _, data_iter = self.run_main(dataset, 'dynamic', True)
+        stats = data_iter.get_worker_stats()
+        assert len(stats) == 4
+        assert sum(s['batches'] for s in stats) == \
+                2 * SAMPLE_NUM // BATCH_SIZE
+        for s in stats:
+            assert s['busy_time'] >= 0
+            assert s['throughput'] >= 0
+            assert 0 <= s['utilization'] <= 1
+
+    def test_iterable_dataset(self):
+        # IterableDataset keeps round-robin dispatch
+        dataset = RangeIterableDataset(SAMPLE_NUM)
+        labels, _ = self.run_main(dataset, 'dynamic', False, num_workers=1)
+        expected = np.concatenate([np.arange(SAMPLE_NUM)] * 2)
+        assert np.array_equal(labels.flatten(), expected)
+
+    def test_invalid_mode(self):
+        dataset = SlowSampleDataset(SAMPLE_NUM)
+        self.assertRaises(
+            ValueError, DataLoader, dataset, dispatch_mode='random')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -172,5 +172,33 @@ class TestDygraphDataLoaderWithBatchedDataset(TestDygraphDataLoader):
         return ret
 
 
+class TestDygraphDataLoaderPrefetch(unittest.TestCase):
+    def test_prefetch_stats(self):
+        for p in prepare_places(False):
+            with fluid.dygraph.guard(p[0]):
+                dataset = RandomDataset(SAMPLE_NUM, CLASS_NUM)
+                for num_workers in [0, 2]:
+                    dataloader = DataLoader(
+                        dataset,
+                        num_workers=num_workers,
+                        batch_size=BATCH_SIZE,
+                        drop_last=True,
+                        prefetch_depth=4)
+                    data_iter = iter(dataloader)
+                    step = 0
+                    for image, label in data_iter:
+                        step += 1
+                    stats = data_iter.get_prefetch_stats()
+                    self.assertEqual(stats['batches'], step)
+                    self.assertGreaterEqual(stats['wait_time'], 0.)
+                    self.assertGreaterEqual(stats['empty_ratio'], 0.)
+                    self.assertLessEqual(stats['empty_ratio'], 1.)
+
+    def test_invalid_prefetch_depth(self):
+        dataset = RandomDataset(SAMPLE_NUM, CLASS_NUM)
+        with self.assertRaises(ValueError):
+            DataLoader(dataset, batch_size=BATCH_SIZE, prefetch_depth=0)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,121 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import division
+
+import pickle
+import unittest
+import numpy as np
+
+import paddle
+import paddle.fluid as fluid
+from paddle.io import Dataset, IterableDataset, DataLoader
+
+SAMPLE_NUM = 40
+BATCH_SIZE = 4
+RESUME_STEP = 3
+
+
+class CountedDataset(Dataset):
+    def __init__(self, sample_num):
+        self.sample_num = sample_num
+        self.read_indices = []
+
+    def __len__(self):
+        return self.sample_num
+
+    def __getitem__(self, idx):
+        self.read_indices.append(idx)
+        return np.array([idx]).astype('int64')
+
+
+class RangeIterableDataset(IterableDataset):
+    def __init__(self, sample_num):
+        self.sample_num = sample_num
+
+    def __iter__(self):
+        worker_info = paddle.io.get_worker_info()
+        if worker_info is None:
+            start, step = 0, 1
+        else:
+            start, step = worker_info.id, worker_info.num_workers
+        for i in range(start, self.sample_num, step):
+            yield np.array([i]).astype('int64')
+
+
+class TestDataLoaderResume(unittest.TestCase):
+    def create_loader(self, dataset, num_workers, shuffle=False):
+        return DataLoader(
+            dataset,
+            places=paddle.CPUPlace(),
+            num_workers=num_workers,
+            batch_size=BATCH_SIZE,
+            shuffle=shuffle)
+
+    def run_resume(self, dataset, num_workers, shuffle=False):
+        with fluid.dygraph.guard(paddle.CPUPlace()):
+            np.random.seed(2022)
+            loader = self.create_loader(dataset, num_workers, shuffle)
+            batches = []
+            state = None
+            for i, data in enumerate(loader):
+                batches.append(data.numpy().flatten().tolist())
+                if i == RESUME_STEP:
+                    state = pickle.loads(pickle.dumps(loader.state_dict()))
+            self.assertEqual(state['batches_consumed'], RESUME_STEP + 1)
+
+            # resume in a new DataLoader, numpy random state is changed
+            np.random.seed(1)
+            loader = self.create_loader(dataset, num_workers, shuffle)
+            loader.load_state_dict(state)
+            resumed = [data.numpy().flatten().tolist() for data in loader]
+            self.assertEqual(resumed, batches[RESUME_STEP + 1:])
+
+            # load state only takes effect on the next iterator
+            self.assertEqual(len(list(loader)), len(batches))
+            return batches
+
+    def test_map_dataset(self):
+        for num_workers in [0, 2]:
+            for shuffle in [False, True]:
+                self.run_resume(
+                    CountedDataset(SAMPLE_NUM), num_workers, shuffle=shuffle)
+
+    def test_skip_without_reading(self):
+        dataset = CountedDataset(SAMPLE_NUM)
+        with fluid.dygraph.guard(paddle.CPUPlace()):
+            loader = self.create_loader(dataset, 0)
+            loader.load_state_dict({
+                'random_state': np.random.get_state(),
+                'sampler_epoch': None,
+                'batches_consumed': RESUME_STEP + 1,
+                'num_workers': 0,
+            })
+            for data in loader:
+                pass
+        self.assertEqual(
+            sorted(dataset.read_indices),
+            list(range((RESUME_STEP + 1) * BATCH_SIZE, SAMPLE_NUM)))
+
+    def test_iterable_dataset(self):
+        for num_workers in [0, 2]:
+            self.run_resume(RangeIterableDataset(SAMPLE_NUM), num_workers)
+
+    def test_no_iterator(self):
+        loader = self.create_loader(CountedDataset(SAMPLE_NUM), 0)
+        self.assertRaises(RuntimeError, loader.state_dict)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import division
+
+import math
+import unittest
+import numpy as np
+
+import paddle
+import paddle.fluid as fluid
+from paddle.io import Dataset, IterableDataset, DataLoader, get_worker_info
+
+IMAGE_SIZE = 8
+SAMPLE_NUM = 20
+BATCH_SIZE = 4
+
+
+class RangeDataset(Dataset):
+    def __init__(self, sample_num):
+        self.sample_num = sample_num
+
+    def __len__(self):
+        return self.sample_num
+
+    def __getitem__(self, idx):
+        image = np.full([IMAGE_SIZE], idx).astype('float32')
+        label = np.array([idx]).astype('int64')
+        return image, label
+
+
+class RangeIterableDataset(IterableDataset):
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+
+    def __iter__(self):
+        for i in range(self.start, self.end):
+            yield np.array([i])
+
+
+def worker_init_fn(worker_id):
+    worker_info = get_worker_info()
+    assert worker_info.id == worker_id
+
+    dataset = worker_info.dataset
+    start = dataset.start
+    end = dataset.end
+    num_per_worker = int(
+        math.ceil((end - start) / float(worker_info.num_workers)))
+    dataset.start = start + worker_id * num_per_worker
+    dataset.end = min(dataset.start + num_per_worker, end)
+
+
+class ErrorDataset(Dataset):
+    def __len__(self):
+        return 4
+
+    def __getitem__(self, idx):
+        raise ValueError("error in getitem")
+
+
+class TestMultiThreadDataLoader(unittest.TestCase):
+    def run_main(self, persistent_workers, dispatch_mode):
+        place = paddle.CPUPlace()
+        with fluid.dygraph.guard(place):
+            dataset = RangeDataset(SAMPLE_NUM)
+            dataloader = DataLoader(
+                dataset,
+                places=place,
+                num_workers=2,
+                batch_size=BATCH_SIZE,
+                worker_mode='thread',
+                dispatch_mode=dispatch_mode,
+                persistent_workers=persistent_workers)
+            assert len(dataloader) == SAMPLE_NUM // BATCH_SIZE
+
+            for _ in range(2):
+                labels = []
+                for image, label in dataloader():
+                    assert image.shape == [BATCH_SIZE, IMAGE_SIZE]
+                    labels.append(label.numpy())
+                labels = np.concatenate(labels).flatten()
+                assert np.array_equal(labels, np.arange(SAMPLE_NUM))
+
+    def test_main(self):
+        for persistent_workers in [False, True]:
+            for dispatch_mode in ['round_robin', 'dynamic']:
+                self.run_main(persistent_workers, dispatch_mode)
+
+    def test_iterable_dataset_split(self):
+        place = paddle.CPUPlace()
+        with fluid.dygraph.guard(place):
+            dataset = RangeIterableDataset(start=2, end=9)
+            dataloader = DataLoader(
+                dataset,
+                places=place,
+                num_workers=2,
+                batch_size=1,
+                drop_last=True,
+                worker_mode='thread',
+                worker_init_fn=worker_init_fn)
+
+            rets = [data.numpy()[0][0] for data in dataloader()]
+            assert tuple(sorted(rets)) == tuple(range(2, 9))
+            # worker_init_fn modifies worker copies of dataset only
+            self.assertEqual((dataset.start, dataset.end), (2, 9))
+
+    def test_worker_exception(self):
+        place = paddle.CPUPlace()
+        with fluid.dygraph.guard(place):
+            dataloader = DataLoader(
+                ErrorDataset(),
+                places=place,
+                num_workers=2,
+                batch_size=2,
+                worker_mode='thread')
+            with self.assertRaises(ValueError):
+                for _ in dataloader():
+                    pass
+
+    def test_invalid_mode(self):
+        self.assertRaises(
+            ValueError,
+            DataLoader,
+            RangeDataset(SAMPLE_NUM),
+            worker_mode='coroutine')
+
+
+if __name__ == '__main__':
+    unittest.main()
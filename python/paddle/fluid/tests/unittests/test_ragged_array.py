@@ -0,0 +1,159 @@
+#   Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import division
+
+import unittest
+import numpy as np
+
+import paddle
+from paddle.io import Dataset, DataLoader, RaggedArray, pad_collate_fn
+
+SAMPLE_NUM = 50
+MAX_LENGTH = 8
+
+
+def random_sequences(sample_num, trailing_shape=[]):
+    np.random.seed(0)
+    return [
+        np.random.random([np.random.randint(0, MAX_LENGTH)] +
+                         trailing_shape).astype('float32')
+        for _ in range(sample_num)
+    ]
+
+
+class RaggedDataset(Dataset):
+    def __init__(self, sample_num):
+        self.sequences = RaggedArray.from_sequences(
+            random_sequences(sample_num))
+
+    def __len__(self):
+        return len(self.sequences)
+
+    def __getitem__(self, idx):
+        return self.sequences[idx], np.array([idx]).astype('int64')
+
+
+class TestRaggedArray(unittest.TestCase):
+    def setUp(self):
+        self.seqs = random_sequences(SAMPLE_NUM)
+        self.array = RaggedArray.from_sequences(self.seqs)
+
+    def check(self, array, seqs):
+        self.assertEqual(len(array), len(seqs))
+        for item, seq in zip(array, seqs):
+            np.testing.assert_array_equal(item, seq)
+
+    def test_from_sequences(self):
+        self.assertEqual(self.array.dtype, np.float32)
+        self.assertEqual(self.array.offsets.dtype, np.int64)
+        np.testing.assert_array_equal(self.array.lengths(),
+                                      [len(s) for s in self.seqs])
+        self.check(self.array, self.seqs)
+
+        empty = RaggedArray.from_sequences([])
+        self.assertEqual(len(empty), 0)
+        with self.assertRaises(AssertionError):
+            RaggedArray(np.arange(3), [0, 2])
+
+    def test_index(self):
+        np.testing.assert_array_equal(self.array[3], self.seqs[3])
+        np.testing.assert_array_equal(self.array[-1], self.seqs[-1])
+        with self.assertRaises(IndexError):
+            self.array[SAMPLE_NUM]
+
+        # items and slices are views of values
+        self.assertTrue(np.shares_memory(self.array[3], self.array.values))
+        sliced = self.array[10:20]
+        self.assertTrue(np.shares_memory(sliced.values, self.array.values))
+        self.check(sliced, self.seqs[10:20])
+        self.check(self.array[20:10], [])
+        self.check(self.array[::3], self.seqs[::3])
+
+        indices = [5, 3, 3, -1, 0]
+        expected = [self.seqs[i] for i in indices]
+        self.check(self.array[indices], expected)
+        self.check(self.array.take(np.array(indices)), expected)
+        self.check(self.array.views(indices), expected)
+        # NOTE: __getitems__ of datasets returns a collated batch, which
+        #       RaggedArray can not do without a pad value
+        self.assertFalse(hasattr(self.array, '__getitems__'))
+        mask = np.arange(SAMPLE_NUM) % 2 == 0
+        self.check(self.array.take(mask), self.seqs[::2])
+
+    def test_pad(self):
+        indices = [7, 1, 30]
+        batch, lengths = self.array.pad(indices, pad_value=-1)
+        max_length = max(len(self.seqs[i]) for i in indices)
+        self.assertEqual(batch.shape, (len(indices), max_length))
+        for row, length, idx in zip(batch, lengths, indices):
+            self.assertEqual(length, len(self.seqs[idx]))
+            np.testing.assert_array_equal(row[:length], self.seqs[idx])
+            self.assertTrue(np.all(row[length:] == -1))
+
+        out = np.empty([SAMPLE_NUM, 3], dtype='float64')
+        batch, lengths = self.array.pad(max_length=3, out=out)
+        self.assertIs(batch, out)
+        for row, length, seq in zip(batch, lengths, self.seqs):
+            self.assertEqual(length, min(len(seq), 3))
+            np.testing.assert_allclose(row[:length], seq[:3])
+            self.assertTrue(np.all(row[length:] == 0))
+
+    def test_pad_multi_dim(self):
+        seqs = random_sequences(SAMPLE_NUM, [2, 3])
+        array = RaggedArray.from_sequences(seqs)
+        batch, lengths = array.pad(dtype='float64')
+        self.assertEqual(batch.dtype, np.float64)
+        self.assertEqual(batch.shape, (SAMPLE_NUM, max(lengths), 2, 3))
+        for row, length, seq in zip(batch, lengths, seqs):
+            np.testing.assert_allclose(row[:length], seq)
+            self.assertTrue(np.all(row[length:] == 0))
+
+
+class TestPadCollateFn(unittest.TestCase):
+    def test_collate(self):
+        seqs = random_sequences(4)
+        batch = [{'seq': s, 'label': i} for i, s in enumerate(seqs)]
+        collated = pad_collate_fn(batch, pad_value=-1, return_lengths=True)
+        padded, lengths = collated['seq']
+        np.testing.assert_array_equal(lengths, [len(s) for s in seqs])
+        np.testing.assert_array_equal(collated['label'], np.arange(4))
+        for row, seq in zip(padded, seqs):
+            np.testing.assert_array_equal(row[:len(seq)], seq)
+            self.assertTrue(np.all(row[len(seq):] == -1))
+
+        # arrays of the same shape are stacked
+        stacked = pad_collate_fn([np.ones([2, 3]), np.zeros([2, 3])])
+        self.assertEqual(stacked.shape, (2, 2, 3))
+        with self.assertRaises(RuntimeError):
+            pad_collate_fn([np.ones([2, 3]), np.ones([2, 4])])
+
+    def test_dataloader(self):
+        dataset = RaggedDataset(SAMPLE_NUM)
+        for num_workers in [0, 2]:
+            loader = DataLoader(
+                dataset,
+                batch_size=10,
+                shuffle=False,
+                num_workers=num_workers,
+                drop_last=False,
+                collate_fn=pad_collate_fn)
+            for seqs, labels in loader():
+                seqs, labels = seqs.numpy(), labels.numpy().reshape([-1])
+                expected, _ = dataset.sequences.pad(labels)
+                np.testing.assert_array_equal(seqs, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+#   Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import division
+
+import os
+import shutil
+import tempfile
+import unittest
+import itertools
+import numpy as np
+
+import paddle
+from paddle.io import Dataset, DataLoader, ShardedCache
+
+IMAGE_SIZE = 32
+SAMPLE_NUM = 100
+SHARD_SIZE = 16 * IMAGE_SIZE * 4
+
+
+class RandomDataset(Dataset):
+    def __init__(self, sample_num):
+        self.sample_num = sample_num
+
+    def __len__(self):
+        return self.sample_num
+
+    def __getitem__(self, idx):
+        np.random.seed(idx)
+        image = np.random.random([IMAGE_SIZE]).astype('float32')
+        label = np.array([idx]).astype('int64')
+        return image, label
+
+
+class CountingReader(object):
+    def __init__(self, sample_num):
+        self.dataset = RandomDataset(sample_num)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        for i in range(len(self.dataset)):
+            yield self.dataset[i]
+
+
+def shard_files(cache):
+    return [f for f in os.listdir(cache.path) if f.endswith('.bin')]
+
+
+class TestShardedCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.dataset = RandomDataset(SAMPLE_NUM)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def new_cache(self, source, fingerprint='random', max_size=None):
+        return ShardedCache(
+            source,
+            fingerprint,
+            cache_dir=self.cache_dir,
+            shard_size=SHARD_SIZE,
+            max_size=max_size)
+
+    def check_samples(self, samples, indices=None):
+        indices = range(SAMPLE_NUM) if indices is None else indices
+        samples = list(samples)
+        self.assertEqual(len(samples), len(indices))
+        for (image, label), idx in zip(samples, indices):
+            expected_image, expected_label = self.dataset[idx]
+            np.testing.assert_array_equal(image, expected_image)
+            np.testing.assert_array_equal(label, expected_label)
+
+    def test_reader(self):
+        reader = CountingReader(SAMPLE_NUM)
+        cache = self.new_cache(reader)
+        self.assertFalse(cache.is_cached())
+        self.check_samples(cache.reader())
+        self.assertTrue(cache.is_cached())
+        self.assertGreater(len(shard_files(cache)), 1)
+
+        # later passes and caches of the same fingerprint read shards
+        self.check_samples(cache.reader())
+        self.check_samples(self.new_cache(reader))
+        self.assertEqual(reader.calls, 1)
+
+    def test_random_access(self):
+        cache = self.new_cache(self.dataset)
+        self.assertEqual(len(cache), SAMPLE_NUM)
+        indices = np.random.permutation(SAMPLE_NUM).tolist()
+        self.check_samples([cache[i] for i in indices], indices)
+        images, labels = cache.__getitems__(indices)
+        self.check_samples(zip(images, labels), indices)
+        self.check_samples([cache[-1]], [SAMPLE_NUM - 1])
+        with self.assertRaises(IndexError):
+            cache[SAMPLE_NUM]
+
+    def test_interrupted(self):
+        reader = CountingReader(SAMPLE_NUM)
+        cache = self.new_cache(reader)
+        list(itertools.islice(cache.reader(), SAMPLE_NUM // 2))
+        self.assertFalse(cache.is_cached())
+        self.check_samples(cache.reader())
+        self.assertTrue(cache.is_cached())
+        self.assertEqual(reader.calls, 2)
+
+    def test_eviction(self):
+        old = self.new_cache(self.dataset, 'old').build()
+        size = sum(
+            os.path.getsize(os.path.join(old.path, f))
+            for f in shard_files(old))
+        num_shards = len(shard_files(old))
+        old.close()
+        # the old cache is the least recently used one
+        os.utime(os.path.join(old.path, 'index.json'), (0, 0))
+
+        new = self.new_cache(self.dataset, 'new', max_size=size * 3 // 2)
+        self.check_samples(new.reader())
+        self.assertTrue(new.is_cached())
+        self.assertFalse(old.is_cached())
+        self.assertLess(len(shard_files(old)), num_shards)
+
+        # evicted shards are written again
+        reader = CountingReader(SAMPLE_NUM)
+        old = self.new_cache(reader, 'old')
+        self.check_samples(old)
+        self.assertTrue(old.is_cached())
+        self.assertEqual(reader.calls, 1)
+
+    def test_exceed_max_size(self):
+        reader = CountingReader(SAMPLE_NUM)
+        cache = self.new_cache(reader, max_size=SHARD_SIZE * 2)
+        for _ in range(2):
+            self.check_samples(cache.reader())
+        self.assertFalse(cache.is_cached())
+        self.assertEqual(reader.calls, 2)
+        with self.assertRaises(RuntimeError):
+            len(cache)
+
+    def test_exceed_max_size_dataset(self):
+        cache = self.new_cache(self.dataset, max_size=SHARD_SIZE * 2)
+        # samples of a dataset source are read directly if not cached
+        self.assertEqual(len(cache), SAMPLE_NUM)
+        self.assertFalse(cache.is_cached())
+        indices = np.random.permutation(SAMPLE_NUM).tolist()
+        self.check_samples([cache[i] for i in indices], indices)
+        images, labels = cache.__getitems__(indices)
+        self.check_samples(zip(images, labels), indices)
+        self.check_samples(cache.reader())
+
+    def test_dataloader(self):
+        cache = self.new_cache(self.dataset).build()
+        for num_workers in [0, 2]:
+            loader = DataLoader(
+                cache,
+                batch_size=10,
+                shuffle=False,
+                num_workers=num_workers,
+                drop_last=False)
+            images, labels = [], []
+            for image, label in loader():
+                images.append(image.numpy())
+                labels.append(label.numpy())
+            self.check_samples(
+                zip(np.concatenate(images), np.concatenate(labels)))
+
+
+if __name__ == '__main__':
+    unittest.main()
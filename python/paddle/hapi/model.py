@@ -16,6 +16,7 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import copy
 import inspect
 import os
 import pickle
@@ -54,10 +55,19 @@ from paddle.distributed.fleet.base import role_maker
 from .callbacks import config_callbacks, EarlyStopping
 from .model_summary import summary
 
+try:
+    from collections.abc import MutableMapping
+except:
+    from collections import MutableMapping
+
 __all__ = []
 
 _parallel_context_initialized = False
 
+# metric outputs of at most so many steps are kept on device before they
+# are copied to host and updated into metrics, see DynamicGraphAdapter
+_MAX_PENDING_METRIC_STEPS = 100
+
 
 def to_list(value):
     if value is None:
@@ -107,6 +117,96 @@ def _all_gather(x, nranks, ring_id=0, use_calc_stream=True):
         x, nranks, ring_id=ring_id, use_calc_stream=use_calc_stream)
 
 
+def _all_reduce_max_min(max_values, min_values):
+    """
+    Return element-wise maximum of max_values and minimum of min_values
+    among processes, by a single all_reduce.
+    """
+    size = len(max_values)
+    buffer = paddle.to_tensor(
+        np.concatenate([
+            np.asarray(
+                max_values, dtype='int64'), -np.asarray(
+                    min_values, dtype='int64')
+        ]))
+    dist.all_reduce(buffer, op=dist.ReduceOp.MAX)
+    buffer = buffer.numpy()
+    return buffer[:size], -buffer[size:]
+
+
+def _all_reduce_shapes(shapes):
+    """
+    Agree on shapes of metric states among processes. shapes are lists of
+    shapes of states of each metric in the current process, which are
+    empty for metrics without states yet. Return shapes of states of each
+    metric in processes having them.
+    """
+    # encode shapes of states of a metric as [num_states, ndim, *shape, ...]
+    descs = []
+    for metric_shapes in shapes:
+        desc = [len(metric_shapes)]
+        for shape in metric_shapes:
+            desc += [len(shape)] + list(shape)
+        descs.append(desc)
+    lengths, _ = _all_reduce_max_min([len(d) for d in descs], [0] * len(descs))
+
+    # metrics without states do not take part in the minimum
+    no_state = np.iinfo('int64').max
+    max_descs, min_descs = [], []
+    for desc, length in zip(descs, lengths):
+        padded = desc + [0] * (int(length) - len(desc))
+        max_descs += padded
+        min_descs += padded if desc[0] > 0 else [no_state] * int(length)
+    max_descs, min_descs = _all_reduce_max_min(max_descs, min_descs)
+
+    agreed = []
+    offset = 0
+    for i, length in enumerate(lengths):
+        end = offset + int(length)
+        desc = max_descs[offset:end].tolist()
+        if desc[0] > 0 and desc != min_descs[offset:end].tolist():
+            raise ValueError(
+                "Shapes of states of metric {} mismatch among processes, "
+                "they can not be merged".format(i))
+        offset = end
+        metric_shapes, pos = [], 1
+        for _ in range(desc[0]):
+            ndim = desc[pos]
+            metric_shapes.append(tuple(desc[pos + 1:pos + 1 + ndim]))
+            pos += 1 + ndim
+        agreed.append(metric_shapes)
+    return agreed
+
+
+def _local_padding_mask(sampler):
+    """
+    Return a bool array marking padded samples among samples of current
+    process yielded by a DistributedBatchSampler in the current epoch.
+
+    DistributedBatchSampler pads indices by repeating the leading ones
+    before shuffling, so padded samples can be anywhere. Batches of all
+    processes are replayed by copies of the sampler, and occurrences of
+    an index after its first one, in order of rank, are marked as padded,
+    which is the same in all processes.
+    """
+    # the epoch of shuffling is increased once iteration starts
+    epoch = sampler.epoch - 1 if sampler.shuffle else sampler.epoch
+    seen = set()
+    local_mask = None
+    for rank in range(sampler.nranks):
+        replica = copy.copy(sampler)
+        replica.local_rank = rank
+        replica.epoch = epoch
+        mask = []
+        for batch in replica:
+            for idx in batch:
+                mask.append(idx in seen)
+                seen.add(idx)
+        if rank == sampler.local_rank:
+            local_mask = np.array(mask, dtype=bool)
+    return local_mask
+
+
 def wait_server_ready(endpoints):
     assert not isinstance(endpoints, six.string_types)
     while True:
@@ -244,6 +344,65 @@ def _update_input_info(inputs):
     return shapes, dtypes
 
 
+class _LazyValue(object):
+    """
+    A log value computed only when it is read, e.g. metric accumulation
+    or copying loss from device to host.
+    """
+
+    def __init__(self, func):
+        self._func = func
+        self._value = None
+        self.materialized = False
+
+    def get(self):
+        if not self.materialized:
+            self._value = self._func()
+            self._func = None
+            self.materialized = True
+        return self._value
+
+
+class _DeferredLogs(MutableMapping):
+    """
+    Logs passed to callbacks in `Model._run_one_epoch`. Values set as
+    :code:`_LazyValue` are materialized when they are read by callbacks.
+
+    NOTE: it is not a dict subclass, since `dict(logs)` and `{**logs}`
+    copy values of a dict subclass without calling `__getitem__`, which
+    would pass `_LazyValue` to callbacks. Use `dict(logs)` to get a plain
+    dict, e.g. for serialization.
+    """
+
+    def __init__(self, logs=None):
+        self._logs = dict(logs or {})
+
+    def __getitem__(self, key):
+        value = self._logs[key]
+        if isinstance(value, _LazyValue):
+            value = value.get()
+        return value
+
+    def __setitem__(self, key, value):
+        self._logs[key] = value
+
+    def __delitem__(self, key):
+        del self._logs[key]
+
+    def __iter__(self):
+        return iter(self._logs)
+
+    def __len__(self):
+        return len(self._logs)
+
+    def copy(self):
+        return self.materialize()
+
+    def materialize(self):
+        """Materialize all lazy values and return them in a plain dict."""
+        return dict(self.items())
+
+
 class StaticGraphAdapter(object):
     """
     Model traning/inference with a static graph.
@@ -681,6 +840,21 @@ class DynamicGraphAdapter(object):
         self._amp_configs = {}
         self._amp_custom_lists = {}
         self._use_fp16_guard = True
+        # keep losses and metric outputs on device instead of copying to
+        # numpy, set by `Model._run_one_epoch` to copy them only when they
+        # are logged
+        self._defer_host_sync = False
+        # metric index -> metric outputs of steps not updated yet
+        self._pending_metric_outs = {}
+        # merge metric states among processes at the end of evaluation
+        # instead of gathering outputs in each step, set by
+        # `Model._run_one_epoch`
+        self._merge_states = False
+        # shapes of metric states, see `_merge_metric_states`
+        self._metric_state_shapes = None
+        # padded samples of current evaluation, see `_cut_local_padding`
+        self._padding_mask = None
+        self._padding_offset = 0
 
         if self._nranks > 1:
             dist.init_parallel_env()
@@ -743,13 +917,13 @@ class DynamicGraphAdapter(object):
                 self.model.network.clear_gradients()
 
         metrics = []
-        for metric in self.model._metrics:
+        for i, metric in enumerate(self.model._metrics):
             metric_outs = metric.compute(*(to_list(outputs) + labels))
-            m = metric.update(*[to_numpy(m) for m in to_list(metric_outs)])
+            m = self._update_metric(i, metric, metric_outs)
             metrics.append(m)
 
-        return ([to_numpy(l) for l in losses], metrics) \
-            if len(metrics) > 0 else [to_numpy(l) for l in losses]
+        losses = self._loss_outputs([l.detach() for l in losses])
+        return (losses, metrics) if len(metrics) > 0 else losses
 
     def eval_batch(self, inputs, labels=None):
         self.model.network.eval()
@@ -764,13 +938,23 @@ class DynamicGraphAdapter(object):
             losses = self.model._loss(*(to_list(outputs) + labels))
             losses = to_list(losses)
 
-        if self._nranks > 1:
+        # NOTE: if all metrics support merging states, metrics are updated
+        # by outputs of local process and states are merged among processes
+        # by `_merge_metric_states` once at the end of evaluation, instead of
+        # gathering outputs and labels in each step.
+        merge_states = self._merge_states and self._nranks > 1 and \
+            self._metric_states_mergeable()
+        if merge_states:
+            outputs, labels = self._cut_local_padding(
+                to_list(outputs), labels)
+        elif self._nranks > 1:
             outputs = [_all_gather(o, self._nranks) for o in to_list(outputs)]
             labels = [_all_gather(l, self._nranks) for l in labels]
         metrics = []
-        for metric in self.model._metrics:
+        for i, metric in enumerate(self.model._metrics):
             # cut off padding value.
-            if self.model._test_dataloader is not None and self._nranks > 1 \
+            if not merge_states and self.model._test_dataloader is not None \
+                    and self._nranks > 1 \
                     and isinstance(self.model._test_dataloader, DataLoader):
                 total_size = len(self.model._test_dataloader.dataset)
                 samples = outputs[0].shape[0]
@@ -790,16 +974,129 @@ class DynamicGraphAdapter(object):
                     self._merge_count[self.mode + '_batch'] = samples
 
             metric_outs = metric.compute(*(to_list(outputs) + labels))
-            m = metric.update(*[to_numpy(m) for m in to_list(metric_outs)])
+            m = self._update_metric(i, metric, metric_outs)
             metrics.append(m)
 
         if self.model._loss and len(metrics):
-            return [to_numpy(l) for l in losses], metrics
+            return self._loss_outputs(losses), metrics
         elif self.model._loss:
-            return [to_numpy(l) for l in losses]
+            return self._loss_outputs(losses)
         else:
             return metrics
 
+    def _metric_states_mergeable(self):
+        return len(self.model._metrics) > 0 and all(
+            type(m).state_tensors is not Metric.state_tensors
+            for m in self.model._metrics)
+
+    def _cut_local_padding(self, outputs, labels):
+        # DistributedBatchSampler pads samples to be evenly divisible among
+        # processes, cut off padded samples in local outputs and labels
+        loader = self.model._test_dataloader
+        if loader is None or not isinstance(loader, DataLoader) or \
+                not isinstance(loader.batch_sampler, DistributedBatchSampler):
+            return outputs, labels
+        if self._padding_mask is None:
+            self._padding_mask = _local_padding_mask(loader.batch_sampler)
+            self._padding_offset = 0
+        samples = outputs[0].shape[0]
+        mask = self._padding_mask[self._padding_offset:self._padding_offset +
+                                  samples]
+        # mask covers samples yielded by the sampler in this epoch, which
+        # is reset after all of them are evaluated
+        self._padding_offset += samples
+        if self._padding_offset >= len(self._padding_mask):
+            self._padding_mask = None
+
+        if not np.any(mask):
+            return outputs, labels
+        if np.all(mask):
+            return [o[:0] for o in outputs], [l[:0] for l in labels]
+        keep = paddle.to_tensor(np.nonzero(~mask)[0])
+        outputs = [paddle.gather(o, keep) for o in outputs]
+        labels = [paddle.gather(l, keep) for l in labels]
+        return outputs, labels
+
+    def _merge_metric_states(self):
+        """
+        Sum up states of metrics among processes by a single all_reduce on
+        a flat buffer packing states of all metrics.
+
+        Shapes of states are taken in `prepare`, which are the same among
+        processes. States of some metrics are unknown before the first
+        update, e.g. states of multi-class Auc, their shapes are agreed
+        among processes once, and processes without states pack zeros,
+        otherwise the all_reduce calls mismatch.
+        """
+        states = [m.state_tensors() for m in self.model._metrics]
+        shapes = self._metric_state_shapes
+        if shapes is None or any(len(ss) == 0 for ss in shapes):
+            shapes = _all_reduce_shapes(
+                [[np.shape(s) for s in ss] for ss in states])
+            if all(len(ss) > 0 for ss in shapes):
+                self._metric_state_shapes = shapes
+        if sum(len(ss) for ss in shapes) == 0:
+            return
+
+        flat_states = []
+        for i, (ss, metric_shapes) in enumerate(zip(states, shapes)):
+            if len(ss) == 0:
+                ss = [np.zeros(shape) for shape in metric_shapes]
+            if [tuple(np.shape(s)) for s in ss] != list(metric_shapes):
+                raise ValueError(
+                    "Shapes of states of metric {} changed from {} to {}, "
+                    "they can not be merged".format(i, metric_shapes, [
+                        np.shape(s) for s in ss
+                    ]))
+            flat_states.extend(
+                np.asarray(
+                    s, dtype='float64').reshape([-1]) for s in ss)
+        buffer = paddle.to_tensor(np.concatenate(flat_states))
+        dist.all_reduce(buffer)
+        buffer = buffer.numpy()
+
+        offset = 0
+        for metric, metric_shapes in zip(self.model._metrics, shapes):
+            merged = []
+            for shape in metric_shapes:
+                size = int(np.prod(shape))
+                merged.append(buffer[offset:offset + size].reshape(shape))
+                offset += size
+            metric.reset()
+            metric.merge(merged)
+
+    def _loss_outputs(self, losses):
+        if self._defer_host_sync:
+            return losses
+        return [to_numpy(l) for l in losses]
+
+    def _update_metric(self, index, metric, metric_outs):
+        # NOTE: states of mergeable metrics are sums over samples, updating
+        # by outputs of several steps concatenated is the same as updating
+        # step by step, so outputs are kept on device and updated together
+        # in `flush_metrics`, and None is returned as the metric of step
+        if self._defer_host_sync and self._metric_states_mergeable():
+            pending = self._pending_metric_outs.setdefault(index, [])
+            pending.append(to_list(metric_outs))
+            if len(pending) >= _MAX_PENDING_METRIC_STEPS:
+                self.flush_metrics()
+            return None
+        return metric.update(*[to_numpy(m) for m in to_list(metric_outs)])
+
+    def flush_metrics(self):
+        """
+        Update metrics by outputs kept on device since last flush, outputs
+        of all steps are concatenated and copied to host once.
+        """
+        pending, self._pending_metric_outs = self._pending_metric_outs, {}
+        steps = 0
+        for index, steps_outs in pending.items():
+            outs = [paddle.concat(list(o)) for o in zip(*steps_outs)]
+            self.model._metrics[index].update(*[to_numpy(o) for o in outs])
+            steps = max(steps, len(steps_outs))
+        if steps > 1:
+            self.model.avoided_host_syncs += steps - 1
+
     def predict_batch(self, inputs):
         self.model.network.eval()
         self.mode = 'test'
@@ -902,6 +1199,15 @@ class DynamicGraphAdapter(object):
         if self._amp_level != "O0":
             self.model._scaler = None
 
+        # NOTE: shapes of metric states only depend on metric settings,
+        # which are the same among processes, states unknown before the
+        # first update are agreed in `_merge_metric_states`
+        self._metric_state_shapes = None
+        if self._metric_states_mergeable():
+            self._metric_state_shapes = [[
+                tuple(np.shape(s)) for s in m.state_tensors()
+            ] for m in self.model._metrics]
+
 
 class Model(object):
     """
@@ -1023,6 +1329,10 @@ class Model(object):
         self._is_shape_inferred = False
         self._test_dataloader = None
         self.stop_training = False
+        # number of device to host copies skipped in dygraph mode, counting
+        # losses never read by callbacks and steps whose metric outputs are
+        # copied together with outputs of other steps
+        self.avoided_host_syncs = 0
 
         if not in_dygraph_mode():
             if not isinstance(inputs, (list, tuple, dict, Input)):
@@ -2063,75 +2373,130 @@ class Model(object):
             data_loader,
             callbacks,
             mode,
-            logs={}, ):
+            logs=None, ):
         outputs = []
-        for step, data in enumerate(data_loader):
-            # data might come from different types of data_loader and have
-            # different format, as following:
-            # 1. DataLoader in static graph:
-            #    [[input1, input2, ..., label1, lable2, ...]]
-            # 2. DataLoader in dygraph
-            #    [input1, input2, ..., label1, lable2, ...]
-            # 3. custumed iterator yield concated inputs and labels:
-            #   [input1, input2, ..., label1, lable2, ...]
-            # 4. custumed iterator yield seperated inputs and labels:
-            #   ([input1, input2, ...], [label1, lable2, ...])
-            # To handle all of these, flatten (nested) list to list.
-            data = flatten(data)
-            # LoDTensor.shape is callable, where LoDTensor comes from
-            # DataLoader in static graph
-
-            batch_size = data[0].shape()[0] if callable(data[
-                0].shape) else data[0].shape[0]
-
-            callbacks.on_batch_begin(mode, step, logs)
-
-            if mode != 'predict':
-
-                _inputs = [data[:len(self._inputs)], data[len(self._inputs):]]
-                if mode == 'train':
-                    _inputs.append((step + 1) % self._accumulate == 0 or
-                                   step + 1 == len(data_loader))
-
-                outs = getattr(self, mode + '_batch')(*_inputs)
-
-                if self._metrics and self._loss:
-                    metrics = [[l[0] for l in outs[0]]]
-                elif self._loss:
-                    metrics = [[l[0] for l in outs]]
-                else:
-                    metrics = []
+        # NOTE: losses and metrics are set in logs as lazy values, metric
+        # accumulation and copying loss to host are only performed when
+        # callbacks read them (e.g. every `log_freq` steps in ProgBarLogger
+        # or at epoch end). In dygraph mode, metric outputs are kept on
+        # device until then, see `DynamicGraphAdapter._update_metric`.
+        # Skipped copies are counted in `avoided_host_syncs`.
+        logs = _DeferredLogs(logs)
+        pending = []
+        defer = fluid.in_dygraph_mode() and mode != 'predict'
+        if defer:
+            self._adapter._defer_host_sync = True
+            self._adapter._merge_states = mode == 'eval'
+        try:
+            for step, data in enumerate(data_loader):
+                # data might come from different types of data_loader and have
+                # different format, as following:
+                # 1. DataLoader in static graph:
+                #    [[input1, input2, ..., label1, lable2, ...]]
+                # 2. DataLoader in dygraph
+                #    [input1, input2, ..., label1, lable2, ...]
+                # 3. custumed iterator yield concated inputs and labels:
+                #   [input1, input2, ..., label1, lable2, ...]
+                # 4. custumed iterator yield seperated inputs and labels:
+                #   ([input1, input2, ...], [label1, lable2, ...])
+                # To handle all of these, flatten (nested) list to list.
+                data = flatten(data)
+                # LoDTensor.shape is callable, where LoDTensor comes from
+                # DataLoader in static graph
+
+                batch_size = data[0].shape()[0] if callable(data[
+                    0].shape) else data[0].shape[0]
+
+                callbacks.on_batch_begin(mode, step, logs)
+
+                if mode != 'predict':
+
+                    _inputs = [
+                        data[:len(self._inputs)], data[len(self._inputs):]
+                    ]
+                    if mode == 'train':
+                        _inputs.append((step + 1) % self._accumulate == 0 or
+                                       step + 1 == len(data_loader))
 
-                # metrics
-                for metric in self._metrics:
-                    res = metric.accumulate()
-                    metrics.extend(to_list(res))
+                    outs = getattr(self, mode + '_batch')(*_inputs)
 
-                assert len(self._metrics_name()) == len(metrics)
-                for k, v in zip(self._metrics_name(), metrics):
-                    logs[k] = v
-            else:
-                if self._inputs is not None:
-                    outs = self.predict_batch(data[:len(self._inputs)])
+                    self.avoided_host_syncs += sum(
+                        1 for v in pending if not v.materialized)
+                    pending = []
+                    metrics = []
+                    if self._loss:
+                        losses = outs[0] if self._metrics else outs
+                        loss_value = _LazyValue(
+                            lambda losses=losses: [
+                                (to_numpy(l) if isinstance(
+                                    l, (Variable, core.VarBase)) else l)[0]
+                                for l in losses
+                            ])
+                        if defer:
+                            pending.append(loss_value)
+                        metrics.append(loss_value)
+
+                    # metrics
+                    for metric in self._metrics:
+                        res = _LazyValue(lambda metric=metric: to_list(
+                            self._accumulate_metric(metric)))
+                        metrics.extend([
+                            _LazyValue(lambda res=res, i=i: res.get()[i])
+                            for i in range(len(to_list(metric.name())))
+                        ])
+
+                    assert len(self._metrics_name()) == len(metrics)
+                    for k, v in zip(self._metrics_name(), metrics):
+                        logs[k] = v
                 else:
-                    outs = self.predict_batch(data)
+                    if self._inputs is not None:
+                        outs = self.predict_batch(data[:len(self._inputs)])
+                    else:
+                        outs = self.predict_batch(data)
 
-                outputs.append(outs)
+                    outputs.append(outs)
 
-            logs['step'] = step
-            if mode == 'train' or self._adapter._merge_count.get(
-                    mode + '_batch', 0) <= 0:
-                logs['batch_size'] = batch_size * ParallelEnv().nranks
-            else:
-                logs['batch_size'] = self._adapter._merge_count[mode + '_batch']
-
-            callbacks.on_batch_end(mode, step, logs)
-            if hasattr(self, 'num_iters') and self.num_iters is not None:
-                self.num_iters -= 1
-                if self.num_iters <= 0:
-                    self.stop_training = True
-                    del self.num_iters
-                    break
+                logs['step'] = step
+                if mode == 'train' or self._adapter._merge_count.get(
+                        mode + '_batch', 0) <= 0:
+                    logs['batch_size'] = batch_size * ParallelEnv().nranks
+                else:
+                    logs['batch_size'] = self._adapter._merge_count[mode +
+                                                                    '_batch']
+
+                callbacks.on_batch_end(mode, step, logs)
+                if hasattr(self, 'num_iters') and self.num_iters is not None:
+                    self.num_iters -= 1
+                    if self.num_iters <= 0:
+                        self.stop_training = True
+                        del self.num_iters
+                        break
+
+            # resolve values deferred in the last step at epoch end, they
+            # are returned in logs, so they are never counted as avoided
+            if defer:
+                self._adapter.flush_metrics()
+            for value in pending:
+                value.get()
+        finally:
+            if defer:
+                self._adapter._defer_host_sync = False
+                self._adapter._pending_metric_outs = {}
+                self._adapter._merge_states = False
+                self._adapter._padding_mask = None
+        if mode == 'eval' and fluid.in_dygraph_mode() and \
+                self._adapter._nranks > 1 and \
+                self._adapter._metric_states_mergeable():
+            self._adapter._merge_metric_states()
+            metrics = []
+            for metric in self._metrics:
+                metrics.extend(to_list(metric.accumulate()))
+            names = self._metrics_name()[len(self._metrics_name()) - len(
+                metrics):]
+            for k, v in zip(names, metrics):
+                logs[k] = v
+        # metrics should be accumulated before reset
+        logs = logs.materialize()
         self._reset_metrics()
 
         if mode == 'predict':
@@ -2221,6 +2586,12 @@ class Model(object):
 
         return out_specs
 
+    def _accumulate_metric(self, metric):
+        # metric outputs kept on device should be updated into metric first
+        if fluid.in_dygraph_mode():
+            self._adapter.flush_metrics()
+        return metric.accumulate()
+
     def _reset_metrics(self):
         for metric in self._metrics:
             metric.reset()
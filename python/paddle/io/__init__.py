@@ -24,11 +24,16 @@ from ..fluid.dataloader import Sampler  # noqa: F401
 from ..fluid.dataloader import SequenceSampler  # noqa: F401
 from ..fluid.dataloader import RandomSampler  # noqa: F401
 from ..fluid.dataloader import DistributedBatchSampler  # noqa: F401
+from ..fluid.dataloader import BucketBatchSampler  # noqa: F401
+from ..fluid.dataloader import DistributedBucketBatchSampler  # noqa: F401
 from ..fluid.dataloader import ComposeDataset  # noqa: F401
 from ..fluid.dataloader import ChainDataset  # noqa: F401
 from ..fluid.dataloader import WeightedRandomSampler  # noqa: F401
 from ..fluid.dataloader import Subset  # noqa: F401
 from ..fluid.dataloader import random_split  # noqa: F401
+from ..fluid.dataloader import ShardedCache  # noqa: F401
+from ..fluid.dataloader import RaggedArray  # noqa: F401
+from ..fluid.dataloader import pad_collate_fn  # noqa: F401
 
 __all__ = [ #noqa
            'Dataset',
@@ -38,6 +43,8 @@ __all__ = [ #noqa
            'ChainDataset',
            'BatchSampler',
            'DistributedBatchSampler',
+           'BucketBatchSampler',
+           'DistributedBucketBatchSampler',
            'DataLoader',
            'get_worker_info',
            'Sampler',
@@ -45,5 +52,8 @@ __all__ = [ #noqa
            'RandomSampler',
            'WeightedRandomSampler',
            'random_split',
-           'Subset'
+           'Subset',
+           'ShardedCache',
+           'RaggedArray',
+           'pad_collate_fn'
 ]
@@ -176,6 +176,31 @@ class Metric(object):
         """
         return args
 
+    def state_tensors(self):
+        """
+        Returns the states of metric as a list of numpy.ndarray, which are
+        additive among data splits, states over all data could be got by
+        summing up the states of each split, e.g. in multi-card evaluation
+        states of all processes are packed into one buffer and summed up by
+        a single :code:`all_reduce`, then set back by :code:`merge`.
+
+        Metrics do not support merging states return None, which is the
+        default behaviour.
+        """
+        return None
+
+    def merge(self, states):
+        """
+        Merge states into current states of metric.
+
+        Args:
+            states (list): states in the same format as the outputs of
+                :code:`state_tensors`, e.g. states of another instance of
+                the same metric, or states summed up among processes.
+        """
+        raise NotImplementedError("function 'merge' not implemented in {}.".
+                                  format(self.__class__.__name__))
+
 
 class Accuracy(Metric):
     """
@@ -312,6 +337,24 @@ class Accuracy(Metric):
         res = res[0] if len(self.topk) == 1 else res
         return res
 
+    def state_tensors(self):
+        """
+        Returns the correct count and total count of each topk.
+        """
+        return [
+            np.array(
+                self.total, dtype='float64'), np.array(
+                    self.count, dtype='float64')
+        ]
+
+    def merge(self, states):
+        """
+        Merge correct count and total count of each topk into states.
+        """
+        total, count = states
+        self.total = [t + float(s) for t, s in zip(self.total, total)]
+        self.count = [c + int(s) for c, s in zip(self.count, count)]
+
     def _init_name(self, name):
         name = name or 'acc'
         if self.maxk != 1:
@@ -449,6 +492,20 @@ class Precision(Metric):
         ap = self.tp + self.fp
         return float(self.tp) / ap if ap != 0 else .0
 
+    def state_tensors(self):
+        """
+        Returns the true positive and false positive counts.
+        """
+        return [np.array([self.tp, self.fp], dtype='float64')]
+
+    def merge(self, states):
+        """
+        Merge true positive and false positive counts into states.
+        """
+        tp, fp = states[0]
+        self.tp += int(tp)
+        self.fp += int(fp)
+
     def name(self):
         """
         Returns metric name
@@ -575,6 +632,20 @@ class Recall(Metric):
         recall = self.tp + self.fn
         return float(self.tp) / recall if recall != 0 else .0
 
+    def state_tensors(self):
+        """
+        Returns the true positive and false negative counts.
+        """
+        return [np.array([self.tp, self.fn], dtype='float64')]
+
+    def merge(self, states):
+        """
+        Merge true positive and false negative counts into states.
+        """
+        tp, fn = states[0]
+        self.tp += int(tp)
+        self.fn += int(fn)
+
     def reset(self):
         """
         Resets all of the metric state.
@@ -591,9 +662,11 @@ class Recall(Metric):
 
 class Auc(Metric):
     """
-    The auc metric is for binary classification.
+    The auc metric is for binary classification, and multi-class
+    classification in one-vs-rest manner.
     Refer to https://en.wikipedia.org/wiki/Receiver_operating_characteristic#Area_under_the_curve.
-    Please notice that the auc metric is implemented with python, which may be a little bit slow.
+    Please notice that the auc metric is implemented with numpy, predictions
+    are counted into histograms of thresholds buckets in batch.
 
     The `auc` function creates four local variables, `true_positives`,
     `true_negatives`, `false_positives` and `false_negatives` that are used to
@@ -605,14 +678,19 @@ class Auc(Metric):
 
     Args:
         curve (str): Specifies the mode of the curve to be computed,
-            'ROC' or 'PR' for the Precision-Recall-curve. Default is 'ROC'.
+            'ROC' or 'PR' for the Precision-Recall-curve. :code:`accumulate`
+            returns the area under the chosen curve, note that 'PR' used to
+            be ignored and the ROC-AUC was returned for it. Other values
+            raise ValueError. Default is 'ROC'.
         num_thresholds (int): The number of thresholds to use when
             discretizing the roc curve. Default is 4095.
-            'ROC' or 'PR' for the Precision-Recall-curve. Default is 'ROC'.
         name (str, optional): String name of the metric instance. Default
             is `auc`.
-
-    "NOTE: only implement the ROC curve type via Python now."
+        multi_class (bool, optional): Whether to compute one-vs-rest auc for
+            multi-class classification. If True, the auc of each class is
+            computed by taking the class as positive and the others as
+            negative, and :code:`accumulate` returns the average auc of
+            classes. Default is False.
 
     Example by standalone:
         .. code-block:: python
@@ -632,6 +710,19 @@ class Auc(Metric):
           m.update(preds=preds, labels=labels)
           res = m.accumulate()
 
+          # precision and recall of each threshold
+          precision, recall, thresholds = m.pr_curve()
+
+          # one-vs-rest auc of multi-class classification
+          m = paddle.metric.Auc(multi_class=True)
+
+          preds = np.random.random(size = (n, 4))
+          preds = preds / preds.sum(axis=1, keepdims=True)
+          labels = np.random.randint(4, size = (n, 1))
+
+          m.update(preds=preds, labels=labels)
+          res = m.accumulate()
+
 
     Example with Model API:
         
@@ -675,16 +766,18 @@ class Auc(Metric):
                  curve='ROC',
                  num_thresholds=4095,
                  name='auc',
+                 multi_class=False,
                  *args,
                  **kwargs):
         super(Auc, self).__init__(*args, **kwargs)
+        if curve not in ['ROC', 'PR']:
+            raise ValueError("curve should be 'ROC' or 'PR', but got {}".format(
+                curve))
         self._curve = curve
         self._num_thresholds = num_thresholds
-
-        _num_pred_buckets = num_thresholds + 1
-        self._stat_pos = np.zeros(_num_pred_buckets)
-        self._stat_neg = np.zeros(_num_pred_buckets)
+        self._multi_class = multi_class
         self._name = name
+        self.reset()
 
     def update(self, preds, labels):
         """
@@ -693,10 +786,14 @@ class Auc(Metric):
         Args:
             preds (numpy.array): An numpy array in the shape of
                 (batch_size, 2), preds[i][j] denotes the probability of
-                classifying the instance i into the class j.
+                classifying the instance i into the class j. If
+                :attr:`multi_class` is True, the shape is (batch_size,
+                num_classes).
             labels (numpy.array): an numpy array in the shape of
                 (batch_size, 1), labels[i] is either o or 1,
-                representing the label of the instance i.
+                representing the label of the instance i. If
+                :attr:`multi_class` is True, labels[i] is the class id
+                of the instance i.
         """
         if isinstance(labels, paddle.Tensor):
             labels = labels.numpy()
@@ -708,49 +805,169 @@ class Auc(Metric):
         elif not _is_numpy_(preds):
             raise ValueError("The 'preds' must be a numpy ndarray or Tensor.")
 
-        for i, lbl in enumerate(labels):
-            value = preds[i, 1]
-            bin_idx = int(value * self._num_thresholds)
-            assert bin_idx <= self._num_thresholds
-            if lbl:
-                self._stat_pos[bin_idx] += 1.0
-            else:
-                self._stat_neg[bin_idx] += 1.0
+        labels = np.asarray(labels).reshape(-1)
+        num_buckets = self._num_thresholds + 1
+        if self._multi_class:
+            num_classes = preds.shape[1]
+            if self._stat_pos is None:
+                self._stat_pos = np.zeros([num_classes, num_buckets])
+                self._stat_neg = np.zeros([num_classes, num_buckets])
+            assert self._stat_pos.shape[0] == num_classes, \
+                "class number of preds changed from {} to {}".format(
+                    self._stat_pos.shape[0], num_classes)
+            # one-vs-rest: instance i is positive for class labels[i] and
+            # negative for the other classes, bucket index of each
+            # (instance, class) pair is offset by class in flatten stats
+            bin_idx = self._bucketize(preds)
+            bin_idx += np.arange(num_classes) * num_buckets
+            pos_mask = labels.astype('int64')[:, None] == np.arange(
+                num_classes)
+            self._stat_pos += np.bincount(
+                bin_idx[pos_mask],
+                minlength=num_classes * num_buckets).reshape(num_classes,
+                                                             num_buckets)
+            self._stat_neg += np.bincount(
+                bin_idx[~pos_mask],
+                minlength=num_classes * num_buckets).reshape(num_classes,
+                                                             num_buckets)
+        else:
+            bin_idx = self._bucketize(preds[:, 1])
+            pos_mask = labels.astype(bool)
+            self._stat_pos += np.bincount(
+                bin_idx[pos_mask], minlength=num_buckets)
+            self._stat_neg += np.bincount(
+                bin_idx[~pos_mask], minlength=num_buckets)
+
+    def _bucketize(self, values):
+        bin_idx = (np.asarray(values) * self._num_thresholds).astype('int64')
+        assert bin_idx.size == 0 or (bin_idx.min() >= 0 and
+                                     bin_idx.max() <= self._num_thresholds)
+        return bin_idx
 
     @staticmethod
     def trapezoid_area(x1, x2, y1, y2):
         return abs(x1 - x2) * (y1 + y2) / 2.0
 
+    def _cumulative_stats(self):
+        # cumulative positive and negative counts of predictions no less
+        # than each threshold, from the highest threshold to the lowest
+        tot_pos = np.cumsum(self._stat_pos[..., ::-1], axis=-1)
+        tot_neg = np.cumsum(self._stat_neg[..., ::-1], axis=-1)
+        return tot_pos, tot_neg
+
+    def _roc_auc(self, tot_pos, tot_neg):
+        tot_pos_prev = tot_pos - self._stat_pos[..., ::-1]
+        auc = np.sum(
+            self._stat_neg[..., ::-1] * (tot_pos + tot_pos_prev) / 2.0,
+            axis=-1)
+        pos, neg = tot_pos[..., -1], tot_neg[..., -1]
+        valid = (pos > 0.0) & (neg > 0.0)
+        return np.where(valid, auc / np.where(valid, pos * neg, 1.0),
+                        0.0), valid
+
+    def _pr_curve(self, tot_pos, tot_neg):
+        tot = tot_pos + tot_neg
+        precision = np.where(tot > 0, tot_pos / np.where(tot > 0, tot, 1.0),
+                             1.0)
+        pos = tot_pos[..., -1:]
+        recall = np.where(pos > 0, tot_pos / np.where(pos > 0, pos, 1.0), 0.0)
+        return precision, recall
+
+    def _pr_auc(self, tot_pos, tot_neg):
+        precision, recall = self._pr_curve(tot_pos, tot_neg)
+        # start from the point (recall=0, precision=1)
+        recall_prev = np.concatenate(
+            [np.zeros_like(recall[..., :1]), recall[..., :-1]], axis=-1)
+        precision_prev = np.concatenate(
+            [np.ones_like(precision[..., :1]), precision[..., :-1]], axis=-1)
+        auc = np.sum((recall - recall_prev) * (precision + precision_prev) /
+                     2.0,
+                     axis=-1)
+        valid = tot_pos[..., -1] > 0.0
+        return np.where(valid, auc, 0.0), valid
+
     def accumulate(self):
         """
         Return the area (a float score) under auc curve
 
         Return:
-            float: the area under auc curve
+            float: the area under auc curve, if :attr:`multi_class` is True,
+                the average area of classes which have both positive and
+                negative instances.
         """
-        tot_pos = 0.0
-        tot_neg = 0.0
-        auc = 0.0
+        if self._stat_pos is None:
+            return 0.0
 
-        idx = self._num_thresholds
-        while idx >= 0:
-            tot_pos_prev = tot_pos
-            tot_neg_prev = tot_neg
-            tot_pos += self._stat_pos[idx]
-            tot_neg += self._stat_neg[idx]
-            auc += self.trapezoid_area(tot_neg, tot_neg_prev, tot_pos,
-                                       tot_pos_prev)
-            idx -= 1
+        tot_pos, tot_neg = self._cumulative_stats()
+        if self._curve == 'PR':
+            auc, valid = self._pr_auc(tot_pos, tot_neg)
+        else:
+            auc, valid = self._roc_auc(tot_pos, tot_neg)
+
+        if self._multi_class:
+            return float(np.mean(auc[valid])) if np.any(valid) else 0.0
+        return float(auc)
+
+    def pr_curve(self):
+        """
+        Return the precision-recall curve computed from the same threshold
+        buckets as the auc.
+
+        Return:
+            tuple: (precision, recall, thresholds), precision and recall are
+                numpy arrays of precision and recall of predicting instances
+                with probability no less than each threshold in thresholds
+                as positive, thresholds are in descending order. If
+                :attr:`multi_class` is True, precision and recall are in
+                shape of (num_classes, num_thresholds + 1).
+        """
+        thresholds = np.arange(self._num_thresholds, -1,
+                               -1) / float(self._num_thresholds)
+        if self._stat_pos is None:
+            return np.zeros([0]), np.zeros([0]), thresholds
+        tot_pos, tot_neg = self._cumulative_stats()
+        precision, recall = self._pr_curve(tot_pos, tot_neg)
+        return precision, recall, thresholds
+
+    def state_tensors(self):
+        """
+        Returns the histograms of positive and negative instances over
+        threshold buckets. If :attr:`multi_class` is True, the states
+        are only available after the first update, since class number
+        is unknown before.
+        """
+        if self._stat_pos is None:
+            return []
+        return [self._stat_pos.copy(), self._stat_neg.copy()]
 
-        return auc / tot_pos / tot_neg if tot_pos > 0.0 and tot_neg > 0.0 else 0.0
+    def merge(self, states):
+        """
+        Merge histograms of positive and negative instances into states.
+        """
+        if len(states) == 0:
+            return
+        stat_pos, stat_neg = [np.asarray(s, dtype='float64') for s in states]
+        if self._stat_pos is None:
+            self._stat_pos = np.zeros_like(stat_pos)
+            self._stat_neg = np.zeros_like(stat_neg)
+        assert self._stat_pos.shape == stat_pos.shape, \
+            "shape of states mismatch, expect {} but got {}".format(
+                self._stat_pos.shape, stat_pos.shape)
+        self._stat_pos += stat_pos
+        self._stat_neg += stat_neg
 
     def reset(self):
         """
         Reset states and result
         """
         _num_pred_buckets = self._num_thresholds + 1
-        self._stat_pos = np.zeros(_num_pred_buckets)
-        self._stat_neg = np.zeros(_num_pred_buckets)
+        if self._multi_class:
+            # class number is known from the first batch of predictions
+            self._stat_pos = None
+            self._stat_neg = None
+        else:
+            self._stat_pos = np.zeros(_num_pred_buckets)
+            self._stat_neg = np.zeros(_num_pred_buckets)
 
     def name(self):
         """
@@ -12,13 +12,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from threading import Thread
+from threading import Thread, Condition
+import os
+import mmap
+import pickle
 import subprocess
 import multiprocessing
 import six
 import sys
+import tempfile
+import traceback
 import warnings
 import logging
+import collections
 
 from six.moves.queue import Queue
 from six.moves import zip_longest
@@ -27,9 +33,11 @@ from six.moves import zip
 import itertools
 import random
 import zlib
+import numpy as np
 
 import paddle.compat as cpt
 from paddle.fluid.reader import QUEUE_GET_TIMEOUT
+from paddle.fluid.dataloader.sharded_cache import ShardedCache
 
 __all__ = []
 
@@ -49,37 +57,70 @@ else:
     fork_context = multiprocessing
 
 
-def cache(reader):
+def cache(reader,
+          fingerprint=None,
+          cache_dir=None,
+          shard_size=64 << 20,
+          max_size=None):
     """
-    Cache the reader data into memory. 
+    Cache the reader data into memory, or on disk if :attr:`fingerprint`
+    is set.
 
-    Be careful that this method may take long time to process, 
-    and consume lots of memory. :code:`reader()` would only 
-    call once. 
+    Be careful that caching in memory may take long time to process,
+    and consume lots of memory. :code:`reader()` would only
+    call once.
+
+    If :attr:`fingerprint` is set, samples are written to shard files of
+    :ref:`api_paddle_io_ShardedCache` on the first pass and read back from
+    memory mapped shards on later passes. The cache is kept across runs
+    and shared by processes with the same fingerprint, and the resident
+    memory does not grow with the size of data.
 
     Args:
-        reader (generator): a reader object which yields 
+        reader (generator): a reader object which yields
             data each time.
+        fingerprint (str, optional): the key of the disk cache, which
+            should change when data of the reader changes. Default: None,
+            data is cached in memory.
+        cache_dir (str, optional): the directory of disk caches.
+            Default: ``~/.cache/paddle/dataset/cache``.
+        shard_size (int, optional): size of shard files in bytes.
+            Default: 64MB.
+        max_size (int, optional): the maximum total size of disk caches in
+            :attr:`cache_dir`, least recently used caches are evicted by
+            shards to keep under it. Default: None, unlimited.
 
     Returns:
-        generator: a decorated reader object which yields data from cached memory.
-    
+        generator: a decorated reader object which yields data from cache.
+
     Examples:
         .. code-block:: python
 
             import paddle
-            
+
             def reader():
                 for i in range(3):
                     yield i
-            
+
             # All data is cached into memory
             cached_reader = paddle.io.cache(reader)
-            
+
             # Output: 0 1 2
             for i in cached_reader():
                 print(i)
+
+            # All data is cached on disk, and reused by later runs
+            cached_reader = paddle.reader.cache(
+                reader, fingerprint='range-3')
     """
+    if fingerprint is not None:
+        return ShardedCache(
+            reader,
+            fingerprint,
+            cache_dir=cache_dir,
+            shard_size=shard_size,
+            max_size=max_size).reader
+
     all_data = tuple(reader())
 
     def __impl__():
@@ -409,7 +450,210 @@ class XmapEndSignal():
     pass
 
 
-def xmap_readers(mapper, reader, process_num, buffer_size, order=False):
+class _XmapError(object):
+    """Traceback of an exception raised by the reader or the mapper."""
+
+    def __init__(self, message):
+        self.message = message
+
+
+# NOTE: ndarrays not smaller than this in samples are sent from worker
+#       processes through files in shared memory, smaller ones are pickled
+_SHARED_MEMORY_THRESHOLD = 1 << 16
+
+
+def _shared_memory_dir():
+    return '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+
+
+def _shared_memory_prefix(pid):
+    return 'paddle_reader_{}_'.format(pid)
+
+
+def _remove_shared_memory_of(pids):
+    """Remove shared memory files created by processes of pids."""
+    prefixes = tuple(_shared_memory_prefix(pid) for pid in pids)
+    shm_dir = _shared_memory_dir()
+    for name in os.listdir(shm_dir):
+        if name.startswith(prefixes):
+            try:
+                os.unlink(os.path.join(shm_dir, name))
+            except OSError:
+                pass
+
+
+class _SharedNDArray(object):
+    """
+    Descriptor of an ndarray written into a file in shared memory by the
+    sender process, the receiver maps the file as the ndarray without
+    copying and removes the file.
+    """
+
+    def __init__(self, array):
+        array = np.ascontiguousarray(array)
+        self.dtype = array.dtype.str
+        self.shape = array.shape
+        self.nbytes = array.nbytes
+        fd, self.path = tempfile.mkstemp(
+            prefix=_shared_memory_prefix(os.getpid()),
+            dir=_shared_memory_dir())
+        with os.fdopen(fd, 'wb') as f:
+            array.tofile(f)
+
+    def load(self):
+        fd = os.open(self.path, os.O_RDWR)
+        try:
+            buf = mmap.mmap(fd, self.nbytes)
+        finally:
+            os.close(fd)
+            # pages are freed once the array is released
+            os.unlink(self.path)
+        return np.frombuffer(buf, dtype=self.dtype).reshape(self.shape)
+
+    def release(self):
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+def _to_shared(obj, threshold=_SHARED_MEMORY_THRESHOLD):
+    if isinstance(obj, np.ndarray):
+        if obj.nbytes >= threshold and not obj.dtype.hasobject:
+            return _SharedNDArray(obj)
+        return obj
+    if type(obj) in (list, tuple):
+        return type(obj)(_to_shared(o, threshold) for o in obj)
+    if type(obj) is dict:
+        return {k: _to_shared(v, threshold) for k, v in obj.items()}
+    return obj
+
+
+def _from_shared(obj):
+    if isinstance(obj, _SharedNDArray):
+        return obj.load()
+    if type(obj) in (list, tuple):
+        return type(obj)(_from_shared(o) for o in obj)
+    if type(obj) is dict:
+        return {k: _from_shared(v) for k, v in obj.items()}
+    return obj
+
+
+def _release_shared(obj):
+    if isinstance(obj, _SharedNDArray):
+        obj.release()
+    elif type(obj) in (list, tuple):
+        for o in obj:
+            _release_shared(o)
+    elif type(obj) is dict:
+        for o in obj.values():
+            _release_shared(o)
+
+
+class _ReorderBuffer(object):
+    """
+    Buffer of mapped samples between mapper workers and the consumer.
+
+    The reader reserves an order for each sample before dispatching it,
+    and is blocked if ``capacity`` samples are in flight, i.e. dispatched
+    but not consumed yet, which bounds the memory of results waiting for
+    a slow sample. If ``ordered``, samples are consumed in the order of
+    the reader, otherwise in the order they are mapped.
+    """
+
+    def __init__(self, capacity, ordered=True):
+        self._capacity = capacity
+        self._ordered = ordered
+        self._cond = Condition()
+        self._results = {} if ordered else collections.deque()
+        self._next_in = 0
+        self._next_out = 0
+        self._total = None
+        self.closed = False
+
+    def reserve(self):
+        """Reserve an order for the next sample, None if closed."""
+        with self._cond:
+            while self._next_in - self._next_out >= self._capacity and \
+                    not self.closed:
+                self._cond.wait()
+            if self.closed:
+                return None
+            order = self._next_in
+            self._next_in += 1
+            return order
+
+    def finish(self):
+        with self._cond:
+            self._total = self._next_in
+            self._cond.notify_all()
+
+    def put(self, order, result):
+        """Put a mapped sample, return False if dropped as closed."""
+        with self._cond:
+            if self.closed:
+                return False
+            if self._ordered:
+                self._results[order] = result
+                if order == self._next_out:
+                    self._cond.notify_all()
+            else:
+                self._results.append(result)
+                self._cond.notify_all()
+            return True
+
+    def _ready(self):
+        if self._ordered:
+            return self._next_out in self._results
+        return len(self._results) > 0
+
+    def get(self):
+        """Get the next mapped sample, or XmapEndSignal if all consumed."""
+        with self._cond:
+            while not self._ready():
+                if self._total is not None and self._next_out >= self._total:
+                    return XmapEndSignal()
+                self._cond.wait()
+            if self._ordered:
+                result = self._results.pop(self._next_out)
+            else:
+                result = self._results.popleft()
+            self._next_out += 1
+            # wake up the reader waiting for capacity
+            self._cond.notify_all()
+            return result
+
+    def close(self):
+        """Stop the reader when the consumer exits early, and return
+        samples not consumed."""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+            results = list(self._results.values()) if self._ordered else \
+                list(self._results)
+            self._results.clear()
+            return results
+
+
+def _xmap_process_worker(mapper, in_queue, out_queue):
+    ins = in_queue.get()
+    while ins is not None:
+        order, sample = ins
+        try:
+            result = _to_shared(mapper(sample))
+        except Exception:
+            result = _XmapError(traceback.format_exc())
+        out_queue.put((order, result))
+        ins = in_queue.get()
+    out_queue.put(None)
+
+
+def xmap_readers(mapper,
+                 reader,
+                 process_num,
+                 buffer_size,
+                 order=False,
+                 use_process=False):
     """
     Use multi-threads to map samples from reader by a mapper defined by user.
 
@@ -420,6 +664,10 @@ def xmap_readers(mapper, reader, process_num, buffer_size, order=False):
         buffer_size (int): size of the queue to read data in. 
         order (bool): whether to keep the data order from original reader. 
             Default False.
+        use_process (bool): whether to run mapper in ``process_num``
+            processes instead of threads, which scales mappers holding the
+            GIL. ndarrays of at least 64KB in mapped samples are sent back
+            through shared memory without pickling. Default False.
 
     Returns:
         callable: a decorated reader with data mapping. 
@@ -432,13 +680,20 @@ def xmap_readers(mapper, reader, process_num, buffer_size, order=False):
             in_queue.put(i)
         in_queue.put(end)
 
-    # define a worker to read samples from reader to in_queue with order flag
-    def order_read_worker(reader, in_queue):
-        in_order = 0
-        for i in reader():
-            in_queue.put((in_order, i))
-            in_order += 1
-        in_queue.put(end)
+    # define a worker to read samples from reader to in_queue with order
+    # reserved in buffer, a None is put for each mapper worker at the end
+    def order_read_worker(reader, in_queue, buffer):
+        try:
+            for i in reader():
+                order = buffer.reserve()
+                if order is None:
+                    break
+                in_queue.put((order, i))
+        except Exception:
+            buffer.put(buffer.reserve(), _XmapError(traceback.format_exc()))
+        buffer.finish()
+        for _ in range(process_num):
+            in_queue.put(None)
 
     # define a worker to handle samples from in_queue by mapper
     # and put mapped samples into out_queue
@@ -452,36 +707,40 @@ def xmap_readers(mapper, reader, process_num, buffer_size, order=False):
         out_queue.put(end)
 
     # define a worker to handle samples from in_queue by mapper
-    # and put mapped samples into out_queue by order
-    def order_handle_worker(in_queue, out_queue, mapper, out_order):
+    # and put mapped samples into buffer
+    def order_handle_worker(in_queue, buffer, mapper):
         ins = in_queue.get()
-        while not isinstance(ins, XmapEndSignal):
+        while ins is not None:
             order, sample = ins
-            r = mapper(sample)
-            while order != out_order[0]:
-                pass
-            out_queue.put(r)
-            out_order[0] += 1
+            try:
+                r = mapper(sample)
+            except Exception:
+                r = _XmapError(traceback.format_exc())
+            buffer.put(order, r)
             ins = in_queue.get()
-        in_queue.put(end)
-        out_queue.put(end)
+
+    # define a worker to put samples mapped by worker processes into buffer
+    def collect_worker(out_queue, buffer):
+        finish = 0
+        while finish < process_num:
+            ins = out_queue.get()
+            if ins is None:
+                finish += 1
+            elif not buffer.put(*ins):
+                _release_shared(ins[1])
 
     def xreader():
         in_queue = Queue(buffer_size)
         out_queue = Queue(buffer_size)
-        out_order = [0]
         # start a read worker in a thread
-        target = order_read_worker if order else read_worker
-        t = Thread(target=target, args=(reader, in_queue))
+        t = Thread(target=read_worker, args=(reader, in_queue))
         t.daemon = True
         t.start()
         # start several handle_workers
-        target = order_handle_worker if order else handle_worker
-        args = (in_queue, out_queue, mapper, out_order) if order else (
-            in_queue, out_queue, mapper)
         workers = []
         for i in range(process_num):
-            worker = Thread(target=target, args=args)
+            worker = Thread(
+                target=handle_worker, args=(in_queue, out_queue, mapper))
             worker.daemon = True
             workers.append(worker)
         for w in workers:
@@ -499,10 +758,120 @@ def xmap_readers(mapper, reader, process_num, buffer_size, order=False):
             else:
                 yield sample
 
+    def buffered_xreader():
+        # NOTE: workers wait on condition variables of the buffer instead
+        #       of spinning for their turns to output
+        buffer = _ReorderBuffer(buffer_size + process_num, order)
+        if use_process:
+            in_queue = fork_context.Queue(buffer_size)
+            out_queue = fork_context.Queue()
+            workers = [
+                fork_context.Process(
+                    target=_xmap_process_worker,
+                    args=(mapper, in_queue, out_queue))
+                for _ in range(process_num)
+            ]
+            threads = [
+                Thread(
+                    target=order_read_worker,
+                    args=(reader, in_queue, buffer)), Thread(
+                        target=collect_worker, args=(out_queue, buffer))
+            ]
+        else:
+            in_queue = Queue(buffer_size)
+            workers = [
+                Thread(
+                    target=order_handle_worker,
+                    args=(in_queue, buffer, mapper))
+                for _ in range(process_num)
+            ]
+            threads = [
+                Thread(
+                    target=order_read_worker, args=(reader, in_queue, buffer))
+            ]
+        for w in workers + threads:
+            w.daemon = True
+            w.start()
+
+        try:
+            sample = buffer.get()
+            while not isinstance(sample, XmapEndSignal):
+                if isinstance(sample, _XmapError):
+                    raise RuntimeError("xmap_readers failed to map samples:"
+                                       "\n{}".format(sample.message))
+                yield _from_shared(sample) if use_process else sample
+                sample = buffer.get()
+        finally:
+            # NOTE: if exits early, the reader stops and workers exit after
+            #       samples dispatched already are mapped, which are dropped
+            samples = buffer.close()
+            if use_process:
+                for w in workers:
+                    w.join(QUEUE_GET_TIMEOUT)
+                    if w.is_alive():
+                        w.terminate()
+                        w.join()
+                        out_queue.put(None)
+                threads[-1].join()
+                # remove shared memory of samples not consumed
+                for sample in samples:
+                    _release_shared(sample)
+                in_queue.cancel_join_thread()
+
+    if order or use_process:
+        return buffered_xreader
     return xreader
 
 
-def multiprocess_reader(readers, use_pipe=True, queue_size=1000):
+# NOTE: pickle protocol 5 (Python 3.8+) pickles contiguous ndarrays as
+#       out-of-band buffers, which are sent without copying into the
+#       pickled bytes, earlier protocols pickle them in-band
+_PICKLE_PROTOCOL = pickle.HIGHEST_PROTOCOL
+
+
+def _dumps(obj):
+    """Pickle obj, return the pickled bytes and out-of-band buffers."""
+    if _PICKLE_PROTOCOL >= 5:
+        buffers = []
+        data = pickle.dumps(
+            obj, protocol=_PICKLE_PROTOCOL, buffer_callback=buffers.append)
+        return data, [b.raw() for b in buffers]
+    return pickle.dumps(obj, protocol=_PICKLE_PROTOCOL), []
+
+
+def _send_samples(conn, samples, transport):
+    if transport == 'shared_memory':
+        samples = _to_shared(samples)
+    data, buffers = _dumps(samples)
+    conn.send_bytes(pickle.dumps((data, [b.nbytes for b in buffers])))
+    for buf in buffers:
+        conn.send_bytes(buf)
+
+
+def _recv_samples(conn, transport):
+    """Receive a list of samples, or None as the end, or '' as failed."""
+    msg = pickle.loads(conn.recv_bytes())
+    if msg is None or msg == "":
+        return msg
+    data, sizes = msg
+    # received into bytearrays so that ndarrays are writable
+    buffers = [bytearray(size) for size in sizes]
+    for buf in buffers:
+        conn.recv_bytes_into(buf)
+    if buffers:
+        samples = pickle.loads(data, buffers=buffers)
+    else:
+        samples = pickle.loads(data)
+    if transport == 'shared_memory':
+        samples = _from_shared(samples)
+    return samples
+
+
+def multiprocess_reader(readers,
+                        use_pipe=True,
+                        queue_size=1000,
+                        transport='json',
+                        samples_per_message=16):
     """
     This API use python ``multiprocessing`` to read data from ``readers`` parallelly,
     and then ``multiprocess.Queue`` or ``multiprocess.Pipe`` is used to merge 
@@ -522,6 +891,19 @@ def multiprocess_reader(readers, use_pipe=True, queue_size=1000):
        queue_size (int, optional): only useful when ``use_pipe`` is False - ``multiprocess.Queue``
            is used, default 1000. Increase this value can speed up the data reading, and more memory
            will be consumed.
+       transport (str, optional): how samples are sent from reader processes, default 'json'.
+
+           - 'json': samples are encoded by ``json`` (``ujson`` if installed) with ``Pipe``, and
+             pickled with ``Queue``, numpy arrays are not supported by ``Pipe``.
+           - 'pickle': samples are pickled in binary, numpy arrays are kept with dtypes and shapes.
+             With ``Pipe`` and Python 3.8+, arrays are sent as out-of-band buffers of pickle
+             protocol 5 without being copied into the pickled bytes.
+           - 'shared_memory': like 'pickle', but numpy arrays of at least 64KB are written into
+             shared memory and only their descriptors are sent, the received arrays are mapped
+             from shared memory without copying.
+       samples_per_message (int, optional): only useful when ``transport`` is 'pickle' or
+           'shared_memory', number of samples sent in one message to reduce system calls,
+           default 16.
 
     Returns:
         ``generator``: a new reader which can be run parallelly
@@ -588,17 +970,22 @@ def multiprocess_reader(readers, use_pipe=True, queue_size=1000):
         raise NotImplementedError(
             "The multiprocess_reader method is not supported on windows.")
 
-    # ujson is ultra fast json encoder and decoder written in pure C with bindings for Python 3.6+.
-    try:
-        import ujson as json
-    except Exception as e:
-        warnings.warn(
-            "The `ujson` module is not found, use the `json` module, `ujson` encodes and decodes faster, "
-            "you can install `ujson` through `pip install ujson`.")
-        import json
-
     assert isinstance(readers, (list, tuple)) and len(readers) > 0, (
         "`readers` must be list or tuple.")
+    assert transport in ['json', 'pickle', 'shared_memory'], (
+        "`transport` must be 'json', 'pickle' or 'shared_memory'.")
+    assert samples_per_message > 0, (
+        "`samples_per_message` must be a positive integer.")
+
+    if transport == 'json' and use_pipe:
+        # ujson is ultra fast json encoder and decoder written in pure C with bindings for Python 3.6+.
+        try:
+            import ujson as json
+        except Exception as e:
+            warnings.warn(
+                "The `ujson` module is not found, use the `json` module, `ujson` encodes and decodes faster, "
+                "you can install `ujson` through `pip install ujson`.")
+            import json
 
     def _read_into_queue(reader, queue):
         try:
@@ -682,6 +1069,106 @@ def multiprocess_reader(readers, use_pipe=True, queue_size=1000):
                 else:
                     yield sample
 
+    def _read_into_binary(reader, conn_or_queue):
+        def send(samples):
+            if use_pipe:
+                _send_samples(conn_or_queue, samples, transport)
+            elif transport == 'shared_memory':
+                conn_or_queue.put(_to_shared(samples))
+            else:
+                conn_or_queue.put(samples)
+
+        def send_end(signal):
+            if use_pipe:
+                conn_or_queue.send_bytes(pickle.dumps(signal))
+                conn_or_queue.close()
+            else:
+                conn_or_queue.put(signal)
+
+        try:
+            samples = []
+            for sample in reader():
+                if sample is None:
+                    raise ValueError("sample has None!")
+                samples.append(sample)
+                if len(samples) == samples_per_message:
+                    send(samples)
+                    samples = []
+            if samples:
+                send(samples)
+            send_end(None)
+        except:
+            send_end("")
+            six.reraise(*sys.exc_info())
+
+    def binary_reader():
+        processes = []
+        if use_pipe:
+            channels = []
+            for reader in readers:
+                parent_conn, child_conn = fork_context.Pipe()
+                channels.append(parent_conn)
+                p = fork_context.Process(
+                    target=_read_into_binary, args=(reader, child_conn))
+                p.start()
+                processes.append(p)
+                child_conn.close()
+        else:
+            queue = fork_context.Queue(queue_size)
+            for reader in readers:
+                p = fork_context.Process(
+                    target=_read_into_binary, args=(reader, queue))
+                p.start()
+                processes.append(p)
+
+        def recv(channel):
+            if use_pipe:
+                return _recv_samples(channel, transport)
+            try:
+                samples = channel.get(timeout=QUEUE_GET_TIMEOUT)
+            except:
+                logging.error(
+                    "multiprocess_reader failed to get data from the multiprocessing.Queue."
+                )
+                six.reraise(*sys.exc_info())
+            if transport == 'shared_memory' and samples:
+                samples = _from_shared(samples)
+            return samples
+
+        reader_num = len(readers)
+        finish_num = 0
+        try:
+            while finish_num < reader_num:
+                # NOTE: messages are received from each pipe in turn like
+                #       pipe_reader, and from the shared queue for queue
+                for channel in (list(channels) if use_pipe else [queue]):
+                    samples = recv(channel)
+                    if samples is None:
+                        finish_num += 1
+                        if use_pipe:
+                            channel.close()
+                            channels.remove(channel)
+                    elif samples == "":
+                        raise ValueError(
+                            "multiprocess_reader failed to send data from the reader process."
+                        )
+                    else:
+                        for sample in samples:
+                            yield sample
+        finally:
+            if finish_num < reader_num:
+                # exits early or fails, samples not received are dropped
+                for p in processes:
+                    if p.is_alive():
+                        p.terminate()
+                    p.join()
+                if transport == 'shared_memory':
+                    _remove_shared_memory_of([p.pid for p in processes])
+                if not use_pipe:
+                    queue.cancel_join_thread()
+
+    if transport != 'json':
+        return binary_reader
     if use_pipe:
         return pipe_reader
     else:
@@ -0,0 +1,79 @@
+#   Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Throughput of paddle.reader.multiprocess_reader with each transport for
+array-heavy samples, e.g. run with
+    python benchmark_multiprocess_reader.py --samples 2000 --shape 3 224 224
+"""
+
+from __future__ import print_function
+
+import time
+import argparse
+import functools
+
+import numpy as np
+
+import paddle.reader
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--readers', type=int, default=2)
+    parser.add_argument('--samples', type=int, default=2000)
+    parser.add_argument('--shape', type=int, nargs='+', default=[3, 224, 224])
+    parser.add_argument('--samples_per_message', type=int, default=16)
+    return parser.parse_args()
+
+
+def sample_reader(num_samples, shape, as_list):
+    # samples are generated once, so that only the transport is measured
+    image = np.random.random(shape).astype('float32')
+    if as_list:
+        # json can not encode ndarray
+        image = image.tolist()
+
+    def reader():
+        for i in range(num_samples):
+            yield image, i
+
+    return reader
+
+
+def main():
+    args = parse_args()
+    num_samples = args.samples // args.readers
+    for transport in ['json', 'pickle', 'shared_memory']:
+        for use_pipe in [True, False]:
+            readers = [
+                sample_reader(num_samples, args.shape, transport == 'json')
+                for _ in range(args.readers)
+            ]
+            reader = paddle.reader.multiprocess_reader(
+                readers,
+                use_pipe=use_pipe,
+                queue_size=64,
+                transport=transport,
+                samples_per_message=args.samples_per_message)
+            start = time.time()
+            total = 0
+            for image, label in reader():
+                total += 1
+            elapsed = time.time() - start
+            print("transport={:<14} channel={:<6} {:>10.1f} samples/s".format(
+                transport, 'pipe' if use_pipe else 'queue', total / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#   Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Scaling of paddle.reader.xmap_readers with the number of workers, for a
+mapper holding the GIL (pure Python) and one releasing it (hashlib), in
+thread and process mode, e.g. run with
+    python benchmark_xmap_readers.py --workers 1 2 4 8 --samples 400
+"""
+
+from __future__ import print_function
+
+import time
+import hashlib
+import argparse
+
+import numpy as np
+
+import paddle.reader
+
+PAYLOAD = np.random.randint(0, 255, 1 << 22, dtype='uint8').tobytes()
+
+
+def gil_mapper(x):
+    total = 0
+    for i in range(200000):
+        total += i * i
+    return x, total
+
+
+def nogil_mapper(x):
+    # hashlib releases the GIL for large data
+    return x, hashlib.sha256(PAYLOAD).digest()
+
+
+def array_mapper(x):
+    # large ndarray results are sent through shared memory by processes
+    return np.full([3, 224, 224], x, dtype='float32'), x
+
+
+MAPPERS = {
+    'gil': gil_mapper,
+    'nogil': nogil_mapper,
+    'array': array_mapper,
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--samples', type=int, default=400)
+    parser.add_argument('--buffer_size', type=int, default=64)
+    parser.add_argument(
+        '--mappers', type=str, nargs='+', default=sorted(MAPPERS.keys()))
+    return parser.parse_args()
+
+
+def run(mapper, num_samples, workers, buffer_size, order, use_process):
+    def reader():
+        for i in range(num_samples):
+            yield i
+
+    xreader = paddle.reader.xmap_readers(
+        mapper,
+        reader,
+        workers,
+        buffer_size,
+        order=order,
+        use_process=use_process)
+    start = time.time()
+    for _ in xreader():
+        pass
+    return num_samples / (time.time() - start)
+
+
+def main():
+    args = parse_args()
+    for name in args.mappers:
+        for use_process in [False, True]:
+            for order in [False, True]:
+                baseline = None
+                for workers in args.workers:
+                    throughput = run(MAPPERS[name], args.samples, workers,
+                                     args.buffer_size, order, use_process)
+                    baseline = baseline or throughput
+                    print("mapper={:<6} mode={:<8} order={:<6} workers={:<3} "
+                          "{:>10.1f} samples/s {:>6.2f}x".format(
+                              name, 'process' if use_process else 'thread',
+                              str(order), workers, throughput, throughput /
+                              baseline))
+
+
+if __name__ == '__main__':
+    main()
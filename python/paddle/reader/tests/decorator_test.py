@@ -12,10 +12,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
 import sys
 import time
 import unittest
+import shutil
+import tempfile
 import functools
+import numpy as np
 
 import paddle.reader
 
@@ -149,6 +153,118 @@ class TestXmap(unittest.TestCase):
                         for idx, e in enumerate(result):
                             self.assertEqual(e, mapper(idx))
 
+    def test_xmap_process(self):
+        if sys.platform == 'win32':
+            return
+
+        def mapper(x):
+            # large arrays are sent through shared memory
+            return np.full([128, 256], x, dtype='float32'), x + 1
+
+        for order in (True, False):
+            for process_num in (1, 4):
+                reader = paddle.reader.xmap_readers(
+                    mapper,
+                    reader_creator_10(0),
+                    process_num,
+                    4,
+                    order,
+                    use_process=True)
+                result = list(reader())
+                if not order:
+                    result.sort(key=lambda e: e[1])
+                for idx, e in enumerate(result):
+                    self.assertEqual(e[0].shape, (128, 256))
+                    self.assertTrue(np.all(e[0] == idx))
+                    self.assertEqual(e[1], idx + 1)
+
+    def test_xmap_order_slow_mapper(self):
+        def mapper(x):
+            # the first sample is the slowest
+            time.sleep(0.05 if x == 0 else 0.001)
+            return x
+
+        for use_process in (False, True):
+            if use_process and sys.platform == 'win32':
+                continue
+            reader = paddle.reader.xmap_readers(
+                mapper,
+                reader_creator_10(0),
+                4,
+                2,
+                order=True,
+                use_process=use_process)
+            self.assertEqual(list(reader()), list(range(10)))
+
+    def test_xmap_error(self):
+        def mapper(x):
+            if x == 5:
+                raise ValueError("invalid sample")
+            return x
+
+        for use_process in (False, True):
+            if use_process and sys.platform == 'win32':
+                continue
+            reader = paddle.reader.xmap_readers(
+                mapper,
+                reader_creator_10(0),
+                2,
+                2,
+                order=True,
+                use_process=use_process)
+            with self.assertRaises(RuntimeError):
+                list(reader())
+
+    def test_xmap_early_exit(self):
+        if sys.platform == 'win32':
+            return
+
+        def mapper(x):
+            return np.zeros([256, 256], dtype='float32')
+
+        reader = paddle.reader.xmap_readers(
+            mapper, reader_creator_10(0), 4, 4, order=True, use_process=True)
+        for sample in reader():
+            break
+        # samples not consumed are removed from shared memory
+        if os.path.isdir('/dev/shm'):
+            self.assertEqual([
+                f for f in os.listdir('/dev/shm')
+                if f.startswith('paddle_reader_')
+            ], [])
+
+
+class TestCache(unittest.TestCase):
+    def test_memory_cache(self):
+        reader = paddle.reader.cache(reader_creator_10(0))
+        for _ in range(2):
+            self.assertEqual(list(reader()), list(range(10)))
+
+    def test_disk_cache(self):
+        calls = []
+
+        def reader():
+            calls.append(1)
+            for i in range(100):
+                yield np.full([64], i, dtype='float32'), i
+
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        for _ in range(2):
+            cached_reader = paddle.reader.cache(
+                reader,
+                fingerprint='test',
+                cache_dir=cache_dir,
+                shard_size=4096)
+            for _ in range(2):
+                samples = list(cached_reader())
+                self.assertEqual([label for _, label in samples],
+                                 list(range(100)))
+                for data, label in samples:
+                    self.assertTrue((data == label).all())
+        # the reader is run once, later passes read from shards
+        self.assertEqual(len(calls), 1)
+
 
 class TestMultiProcessReader(unittest.TestCase):
     def setup(self):
@@ -178,6 +294,41 @@ class TestMultiProcessReader(unittest.TestCase):
             self.reader_test(use_pipe=False)
             self.reader_test(use_pipe=True)
 
+    def array_reader_test(self, use_pipe, transport, samples_per_message):
+        def reader(index):
+            for i in range(100):
+                if i % 2 == index:
+                    # the large array is sent by shared memory
+                    yield np.full(
+                        [64, 512], i, dtype='float32'), np.arange(
+                            i, dtype='int64'), [i]
+
+        results = list(
+            paddle.reader.multiprocess_reader(
+                [functools.partial(reader, 0), functools.partial(reader, 1)],
+                use_pipe,
+                10,
+                transport=transport,
+                samples_per_message=samples_per_message)())
+        self.assertEqual(len(results), 100)
+        results.sort(key=lambda sample: sample[2])
+        for i, (image, index, label) in enumerate(results):
+            self.assertEqual(image.dtype, np.float32)
+            self.assertEqual(image.shape, (64, 512))
+            self.assertTrue(np.all(image == i))
+            self.assertEqual(index.dtype, np.int64)
+            self.assertTrue(np.array_equal(index, np.arange(i)))
+            self.assertEqual(label, [i])
+
+    def test_binary_transport(self):
+        if sys.platform == 'win32':
+            return
+        for use_pipe in [True, False]:
+            for transport in ['pickle', 'shared_memory']:
+                for samples_per_message in [1, 7]:
+                    self.array_reader_test(use_pipe, transport,
+                                           samples_per_message)
+
 
 if __name__ == '__main__':
     unittest.main()
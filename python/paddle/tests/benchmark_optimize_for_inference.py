@@ -0,0 +1,63 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+CPU latency of models in paddle.vision.models before and after
+paddle.vision.models.optimize_for_inference, e.g. run with
+    python benchmark_optimize_for_inference.py --batch_size 1 --repeat 50
+"""
+
+from __future__ import print_function
+
+import argparse
+
+import paddle
+import paddle.vision.models as models
+
+MODELS = [
+    'resnet18', 'resnet50', 'resnext50_32x4d', 'mobilenet_v1', 'mobilenet_v2',
+    'shufflenet_v2_x1_0', 'vgg16', 'densenet121', 'squeezenet1_1', 'googlenet',
+    'inception_v3'
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--models', type=str, nargs='+', default=MODELS)
+    parser.add_argument('--batch_size', type=int, default=1)
+    parser.add_argument('--image_size', type=int, default=224)
+    parser.add_argument(
+        '--data_format',
+        type=str,
+        default='auto',
+        choices=['auto', 'NCHW', 'NHWC'])
+    parser.add_argument('--repeat', type=int, default=50)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    paddle.set_device('cpu')
+    input_shape = [args.batch_size, 3, args.image_size, args.image_size]
+    for arch in args.models:
+        print(arch, end=': ')
+        models.optimize_for_inference(
+            models.__dict__[arch](),
+            input_shape=input_shape,
+            data_format=args.data_format,
+            repeat=args.repeat,
+            verbose=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -17,10 +17,13 @@ import os
 import numpy as np
 import tempfile
 import shutil
+import multiprocessing
 import cv2
 
 import paddle.vision.transforms as T
 from paddle.vision.datasets import DatasetFolder, ImageFolder, MNIST, FashionMNIST, Flowers
+from paddle.vision.datasets import PackedImageDataset, PackedShardSampler, pack_dataset_folder
+from paddle.vision.datasets import DecodedImageCache
 from paddle.dataset.common import _check_exists_and_download
 
 
@@ -78,6 +81,41 @@ class TestFolderDatasets(unittest.TestCase):
         for _ in loader:
             pass
 
+    def test_index_cache(self):
+        from paddle.vision.datasets.folder import _DirectoryIndex
+
+        cache_file = os.path.join(self.empty_dir, 'index.pkl')
+        expected = DatasetFolder(self.data_dir, scan_workers=1).samples
+        dataset_folder = DatasetFolder(
+            self.data_dir, scan_workers=2, index_cache=cache_file)
+        self.assertEqual(dataset_folder.samples, expected)
+        self.assertTrue(os.path.isfile(cache_file))
+
+        index = _DirectoryIndex(cache_file)
+        index.walk(self.data_dir)
+        self.assertEqual(index.num_listed(), 0)
+
+        # listings of other directory trees in the cache file are kept
+        other = _DirectoryIndex(cache_file)
+        other.walk(self.empty_dir)
+        other.save()
+        index = _DirectoryIndex(cache_file)
+        index.walk(self.data_dir)
+        self.assertEqual(index.num_listed(), 0)
+        self.assertEqual(
+            index.listdir(self.data_dir), ([], ['class_0', 'class_1']))
+
+        fake_img = (np.random.random((32, 32, 3)) * 255).astype('uint8')
+        cv2.imwrite(os.path.join(self.data_dir, 'class_1', '2.jpg'), fake_img)
+        index = _DirectoryIndex(cache_file)
+        index.walk(self.data_dir)
+        self.assertEqual(index.num_listed(), 1)
+
+        dataset_folder = DatasetFolder(self.data_dir, index_cache=cache_file)
+        self.assertEqual(len(dataset_folder), 5)
+        loader = ImageFolder(self.data_dir, index_cache=cache_file)
+        self.assertEqual(len(loader), 5)
+
     def test_errors(self):
         with self.assertRaises(RuntimeError):
             ImageFolder(self.empty_dir)
@@ -88,6 +126,170 @@ class TestFolderDatasets(unittest.TestCase):
             _check_exists_and_download('temp_paddle', None, None, None, False)
 
 
+class TestPackedDatasets(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.packed_dir = tempfile.mkdtemp()
+        for i in range(2):
+            sub_dir = os.path.join(self.data_dir, 'class_' + str(i))
+            if not os.path.exists(sub_dir):
+                os.makedirs(sub_dir)
+            for j in range(3):
+                fake_img = (np.random.random((32, 32, 3)) * 255).astype('uint8')
+                cv2.imwrite(os.path.join(sub_dir, str(j) + '.png'), fake_img)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+        shutil.rmtree(self.packed_dir)
+
+    def test_encoded(self):
+        shards = pack_dataset_folder(
+            self.data_dir, self.packed_dir, shard_size=1, shuffle=False)
+        self.assertEqual(len(shards), 6)
+
+        folder = DatasetFolder(self.data_dir)
+        for backend in ['cv2', 'pil']:
+            dataset = PackedImageDataset(self.packed_dir, backend=backend)
+            self.assertEqual(len(dataset), 6)
+            self.assertEqual(dataset.classes, folder.classes)
+            for i in range(len(dataset)):
+                image, label = dataset[i]
+                expected = cv2.cvtColor(
+                    cv2.imread(folder.samples[i][0]), cv2.COLOR_BGR2RGB)
+                np.testing.assert_equal(np.array(image), expected)
+                self.assertEqual(label, folder.samples[i][1])
+
+    def test_raw(self):
+        pack_dataset_folder(
+            self.data_dir, self.packed_dir, mode='raw', image_size=(16, 24))
+        dataset = PackedImageDataset(
+            self.packed_dir, transform=T.Transpose(), backend='cv2')
+        self.assertEqual(len(dataset), 6)
+        image, label = dataset[3]
+        self.assertEqual(image.shape, (3, 16, 24))
+        self.assertEqual(sorted(dataset.targets.tolist()), [0, 0, 0, 1, 1, 1])
+
+        # raw images are read-only views of the mapped shard
+        dataset = PackedImageDataset(self.packed_dir, backend='cv2')
+        image, label = dataset[3]
+        self.assertEqual(image.shape, (16, 24, 3))
+        self.assertFalse(image.flags.writeable)
+
+    def test_shard_sampler(self):
+        pack_dataset_folder(
+            self.data_dir, self.packed_dir, mode='raw', shard_size=32 * 32 * 6)
+        dataset = PackedImageDataset(self.packed_dir)
+        self.assertEqual(dataset.shard_ranges(), [(0, 2), (2, 4), (4, 6)])
+
+        indices = []
+        for rank in range(2):
+            sampler = PackedShardSampler(
+                dataset, shuffle=True, num_replicas=2, rank=rank)
+            sampler.set_epoch(1)
+            rank_indices = list(iter(sampler))
+            self.assertEqual(len(rank_indices), len(sampler))
+            self.assertEqual(len(rank_indices), 3)
+            indices.extend(rank_indices)
+        self.assertEqual(len(set(indices)), 6)
+
+
+def _put_in_worker(cache):
+    cache.put('worker', np.ones([4, 4], dtype='int64'))
+
+
+class TestDecodedImageCache(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        for i in range(2):
+            sub_dir = os.path.join(self.data_dir, 'class_' + str(i))
+            os.makedirs(sub_dir)
+            for j in range(2):
+                fake_img = (np.random.random((32, 32, 3)) * 255).astype('uint8')
+                cv2.imwrite(os.path.join(sub_dir, str(j) + '.png'), fake_img)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def test_lru(self):
+        cache = DecodedImageCache(1024, max_entries=3)
+        a = np.random.random([8, 8]).astype('float32')
+        b = (np.random.random([8, 8, 3]) * 255).astype('uint8')
+        self.assertTrue(cache.get('a') is None)
+        self.assertTrue(cache.put('a', a))
+        self.assertTrue(cache.put('b', b))
+        np.testing.assert_array_equal(cache.get('a'), a)
+        np.testing.assert_array_equal(cache.get('b'), b)
+
+        # 'a' is least recently used and evicted
+        self.assertTrue(cache.put('c', np.zeros([1024 - 256], 'uint8')))
+        self.assertTrue(cache.get('a') is None)
+        self.assertTrue(cache.get('c') is not None)
+
+        # too large to cache
+        self.assertFalse(cache.put('d', np.zeros([2048], 'uint8')))
+
+        stats = cache.stats()
+        self.assertEqual(stats['hits'], 3)
+        self.assertEqual(stats['misses'], 2)
+        self.assertTrue(stats['evictions'] >= 1)
+        self.assertTrue(stats['bytes'] <= stats['capacity'])
+        cache.close()
+
+    def test_max_entries(self):
+        cache = DecodedImageCache(1 << 20, max_entries=16)
+        for i in range(100):
+            self.assertTrue(cache.put(str(i), np.full([4], i, 'uint8')))
+            # the image just put is never evicted by itself
+            np.testing.assert_array_equal(
+                cache.get(str(i)), np.full([4], i, 'uint8'))
+        self.assertEqual(len(cache), 16)
+        self.assertEqual(cache.stats()['evictions'], 100 - 16)
+        cache.close()
+
+    def test_shared_with_workers(self):
+        cache = DecodedImageCache(1 << 20)
+        worker = multiprocessing.Process(target=_put_in_worker, args=(cache, ))
+        worker.start()
+        worker.join()
+        np.testing.assert_array_equal(
+            cache.get('worker'), np.ones([4, 4], dtype='int64'))
+        cache.close()
+
+    def test_dataset(self):
+        cache = DecodedImageCache(1 << 20)
+        for loader in [None, lambda path: cv2.imread(path)]:
+            cache.clear()
+            cache.reset_stats()
+            dataset = DatasetFolder(self.data_dir, loader=loader, cache=cache)
+            first = [np.asarray(dataset[i][0]) for i in range(len(dataset))]
+            second = [np.asarray(dataset[i][0]) for i in range(len(dataset))]
+            for x, y in zip(first, second):
+                np.testing.assert_array_equal(x, y)
+            self.assertEqual(cache.stats()['hits'], 4)
+            self.assertEqual(cache.stats()['misses'], 4)
+            self.assertEqual(len(cache), 4)
+
+        # images loaded by the default loader are not mixed up with the
+        # ones loaded by another loader
+        folder = ImageFolder(self.data_dir, cache=cache)
+        for _ in folder:
+            pass
+        self.assertEqual(cache.stats()['hits'], 4)
+        self.assertEqual(len(cache), 8)
+        for _ in folder:
+            pass
+        self.assertEqual(cache.stats()['hits'], 8)
+
+        # images decoded for a resizing transform are cached separately
+        dataset = DatasetFolder(
+            self.data_dir, transform=T.Resize(8), cache=cache)
+        for _ in dataset:
+            pass
+        self.assertEqual(cache.stats()['hits'], 8)
+        self.assertEqual(len(cache), 12)
+        cache.close()
+
+
 class TestMNISTTest(unittest.TestCase):
     def test_main(self):
         transform = T.Transpose()
@@ -102,6 +304,25 @@ class TestMNISTTest(unittest.TestCase):
         self.assertTrue(label.shape[0] == 1)
         self.assertTrue(0 <= int(label) <= 9)
 
+    def test_getitems(self):
+        mnist = MNIST(mode='test', backend='cv2')
+        self.assertTrue(mnist._images.dtype == np.uint8)
+        self.assertTrue(mnist.images[0].dtype == np.float32)
+
+        indices = [3, 0, 9999, 42]
+        images, labels = mnist.__getitems__(indices)
+        self.assertTrue(images.shape == (4, 28, 28))
+        self.assertTrue(labels.shape == (4, 1))
+        for i, idx in enumerate(indices):
+            image, label = mnist[idx]
+            np.testing.assert_array_equal(images[i], image)
+            np.testing.assert_array_equal(labels[i], label)
+
+        # arrays are loaded from the .npy cache the second time
+        mnist = MNIST(mode='test', backend='cv2')
+        self.assertTrue(isinstance(mnist._images, np.memmap))
+        np.testing.assert_array_equal(mnist.__getitems__(indices)[0], images)
+
 
 class TestMNISTTrain(unittest.TestCase):
     def test_main(self):
@@ -22,7 +22,8 @@ import numpy as np
 import paddle
 import paddle.fluid as fluid
 
-from paddle.hapi.model import to_list
+from paddle.hapi.model import to_list, _local_padding_mask
+from paddle.io import DistributedBatchSampler
 
 
 def one_hot(x, n_class):
@@ -314,6 +315,144 @@ class TestAuc(unittest.TestCase):
         m.reset()
         self.assertEqual(m.accumulate(), 0.0)
 
+    def test_auc_batches(self):
+        np.random.seed(2022)
+        preds = np.random.random(size=(1000, 1))
+        preds = np.concatenate((1 - preds, preds), axis=1)
+        labels = np.random.randint(2, size=(1000, 1))
+
+        m = paddle.metric.Auc()
+        m.update(preds, labels)
+        expected = m.accumulate()
+
+        m.reset()
+        for i in range(0, 1000, 128):
+            m.update(preds[i:i + 128], labels[i:i + 128])
+        self.assertAlmostEqual(m.accumulate(), expected)
+
+    def test_auc_pr_curve(self):
+        x = np.array([[0.9, 0.1], [0.8, 0.2], [0.4, 0.6], [0.2, 0.8]])
+        y = np.array([[0], [0], [1], [1]])
+        m = paddle.metric.Auc(curve='PR')
+        m.update(x, y)
+        self.assertAlmostEqual(m.accumulate(), 1.0)
+
+        precision, recall, thresholds = m.pr_curve()
+        self.assertEqual(precision.shape, (4096, ))
+        self.assertEqual(recall.shape, (4096, ))
+        self.assertEqual(thresholds[0], 1.0)
+        self.assertEqual(thresholds[-1], 0.0)
+        # all instances are predicted as positive at threshold 0
+        self.assertAlmostEqual(precision[-1], 0.5)
+        self.assertAlmostEqual(recall[-1], 1.0)
+
+        self.assertRaises(ValueError, paddle.metric.Auc, curve='DET')
+
+    def test_auc_multi_class(self):
+        np.random.seed(2022)
+        preds = np.random.random(size=(64, 3))
+        preds = preds / preds.sum(axis=1, keepdims=True)
+        labels = np.random.randint(3, size=(64, 1))
+
+        m = paddle.metric.Auc(multi_class=True)
+        m.update(preds[:32], labels[:32])
+        m.update(paddle.to_tensor(preds[32:]), paddle.to_tensor(labels[32:]))
+
+        aucs = []
+        for c in range(3):
+            mc = paddle.metric.Auc()
+            mc.update(
+                np.stack(
+                    [1 - preds[:, c], preds[:, c]], axis=1),
+                (labels == c).astype('int64'))
+            aucs.append(mc.accumulate())
+        self.assertAlmostEqual(m.accumulate(), np.mean(aucs))
+
+        precision, recall, _ = m.pr_curve()
+        self.assertEqual(precision.shape, (3, 4096))
+        self.assertEqual(recall.shape, (3, 4096))
+
+        m.reset()
+        self.assertEqual(m.accumulate(), 0.0)
+
+
+class TestMergeStates(unittest.TestCase):
+    def check_merge(self, metric_fn, preds, labels):
+        m = metric_fn()
+        m.update(preds, labels)
+        expect = m.accumulate()
+
+        # states of splits are summed up as all_reduce does
+        half = preds.shape[0] // 2
+        m1, m2 = metric_fn(), metric_fn()
+        m1.update(preds[:half], labels[:half])
+        m2.update(preds[half:], labels[half:])
+        states = [
+            s1 + s2 for s1, s2 in zip(m1.state_tensors(), m2.state_tensors())
+        ]
+        merged = metric_fn()
+        merged.merge(states)
+        np.testing.assert_allclose(merged.accumulate(), expect)
+
+    def test_merge(self):
+        np.random.seed(2022)
+        probs = np.random.random(size=(64, ))
+        labels = np.random.randint(2, size=(64, 1))
+        self.check_merge(paddle.metric.Precision, probs, labels)
+        self.check_merge(paddle.metric.Recall, probs, labels)
+        self.check_merge(paddle.metric.Auc,
+                         np.stack(
+                             [1 - probs, probs], axis=1), labels)
+
+        preds = np.random.random(size=(64, 3))
+        labels = np.random.randint(3, size=(64, 1))
+        self.check_merge(lambda: paddle.metric.Auc(multi_class=True),
+                         preds / preds.sum(axis=1, keepdims=True), labels)
+
+        correct = np.random.randint(2, size=(64, 2)).astype('float32')
+        self.check_merge(lambda: paddle.metric.Accuracy(topk=(1, 2)),
+                         correct, labels)
+
+    def test_not_mergeable(self):
+        class MyMetric(paddle.metric.Metric):
+            def reset(self):
+                pass
+
+            def update(self, *args):
+                pass
+
+            def accumulate(self):
+                return 0.
+
+            def name(self):
+                return 'my_metric'
+
+        m = MyMetric()
+        self.assertIsNone(m.state_tensors())
+        self.assertRaises(NotImplementedError, m.merge, [])
+
+    def test_local_padding_mask(self):
+        dataset = list(range(10))
+        for shuffle, drop_last in [(False, False), (True, False),
+                                   (True, True)]:
+            yielded, kept = [], []
+            for rank in range(3):
+                sampler = DistributedBatchSampler(
+                    dataset,
+                    batch_size=2,
+                    num_replicas=3,
+                    rank=rank,
+                    shuffle=shuffle,
+                    drop_last=drop_last)
+                indices = [idx for batch in sampler for idx in batch]
+                mask = _local_padding_mask(sampler)
+                self.assertEqual(len(mask), len(indices))
+                yielded.extend(indices)
+                kept.extend(
+                    idx for idx, padded in zip(indices, mask) if not padded)
+            # each sample yielded is kept exactly once
+            self.assertEqual(sorted(kept), sorted(set(yielded)))
+
 
 if __name__ == '__main__':
     unittest.main()
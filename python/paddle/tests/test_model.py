@@ -37,6 +37,7 @@ import paddle.vision.models as models
 import paddle.fluid.dygraph.jit as jit
 from paddle.io import DistributedBatchSampler, Dataset
 from paddle.hapi.model import prepare_distributed_context
+from paddle.hapi.model import _LazyValue, _DeferredLogs
 from paddle.fluid.dygraph.jit import declarative
 from paddle.fluid.dygraph.dygraph_to_static.program_translator import ProgramTranslator
 
@@ -863,6 +864,49 @@ class TestModelFunction(unittest.TestCase):
             np.testing.assert_almost_equal(losses[0], losses[1], decimal=4)
             np.testing.assert_almost_equal(losses[0], losses[2], decimal=4)
 
+    def test_deferred_logs(self):
+        for dynamic in [True, False]:
+            device = paddle.set_device('cpu')
+            fluid.enable_dygraph(device) if dynamic else None
+            net = MyModel()
+            optim = fluid.optimizer.SGD(learning_rate=0.001,
+                                        parameter_list=net.parameters())
+            inputs = [InputSpec([None, 20], 'float32', 'x')]
+            labels = [InputSpec([None, 1], 'int64', 'label')]
+            model = Model(net, inputs, labels)
+            model.prepare(
+                optim, loss=CrossEntropyLoss(), metrics=Accuracy())
+            model.fit(MyDataset(), batch_size=4, epochs=1, log_freq=5)
+            if dynamic:
+                # losses and metric outputs of steps not logged are not
+                # copied to host
+                self.assertGreater(model.avoided_host_syncs, 0)
+                self.assertEqual(model._adapter._pending_metric_outs, {})
+            else:
+                # fetched values are on host already in static mode
+                self.assertEqual(model.avoided_host_syncs, 0)
+
+            result = model.evaluate(MyDataset(), batch_size=4)
+            self.assertIn('loss', result)
+            self.assertIn('acc', result)
+            self.assertIsInstance(result['loss'][0], np.floating)
+
+            data = np.random.random(size=(4, 20)).astype(np.float32)
+            label = np.random.randint(0, 10, size=(4, 1)).astype(np.int64)
+            loss, _ = model.train_batch([data], [label])
+            self.assertIsInstance(loss[0], np.ndarray)
+            fluid.disable_dygraph() if dynamic else None
+
+    def test_deferred_logs_dict(self):
+        logs = _DeferredLogs({'step': 1})
+        logs['loss'] = _LazyValue(lambda: [0.5])
+        expected = {'step': 1, 'loss': [0.5]}
+        self.assertEqual(dict(logs), expected)
+        self.assertEqual({**logs}, expected)
+        self.assertEqual(dict(logs.items()), expected)
+        self.assertEqual(logs.get('loss'), [0.5])
+        self.assertEqual(logs.copy(), expected)
+
 
 class TestModelWithLRScheduler(unittest.TestCase):
     def test_fit_by_step(self):
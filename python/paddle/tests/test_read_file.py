@@ -54,6 +54,20 @@ class TestReadFile(unittest.TestCase):
             np.testing.assert_equal(out[0].shape,
                                     img_cv2.transpose(2, 0, 1).shape)
 
+    def test_decode_jpeg_cpu(self):
+        img_bytes = read_file('fake.jpg')
+        if not img_bytes.place.is_cpu_place():
+            return
+
+        img = decode_jpeg(img_bytes)
+        self.assertEqual(img.shape, [3, 400, 300])
+        img = decode_jpeg(img_bytes, mode='gray')
+        self.assertEqual(img.shape, [1, 400, 300])
+
+        # decoded at 1/2 resolution, which is the smallest not less than 100
+        img = decode_jpeg(img_bytes, mode='rgb', target_size=100)
+        self.assertEqual(img.shape, [3, 200, 150])
+
     def test_read_file_decode_jpeg_dynamic(self):
         self.read_file_decode_jpeg()
 
@@ -0,0 +1,131 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+from paddle.io import RaggedArray
+from paddle.text.datasets import corpus
+
+
+def tokenize_pairs(text):
+    for line in corpus.split_lines(text):
+        line_split = line.split(b'\t')
+        if len(line_split) != 2:
+            continue
+        yield line_split[0].split(), line_split[1].split()
+
+
+class TestTokenOps(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(0)
+        self.seqs = [
+            np.random.randint(0, 10, [np.random.randint(0, 6)]).tolist()
+            for _ in range(50)
+        ]
+        self.tokens = RaggedArray.from_sequences(self.seqs, dtype='int32')
+
+    def check(self, tokens, seqs):
+        self.assertEqual(len(tokens), len(seqs))
+        self.assertEqual([t.tolist() for t in tokens], seqs)
+
+    def test_encode(self):
+        table = np.arange(10)[::-1]
+        self.check(
+            corpus.encode(self.tokens, table),
+            [[9 - t for t in s] for s in self.seqs])
+
+    def test_insert(self):
+        self.check(
+            corpus.insert(self.tokens, 10, 11),
+            [[10] + s + [11] for s in self.seqs])
+        self.check(
+            corpus.insert(
+                self.tokens, start=10), [[10] + s for s in self.seqs])
+        self.check(
+            corpus.insert(
+                self.tokens, end=11), [s + [11] for s in self.seqs])
+
+    def test_windows(self):
+        for size in [0, 1, 3]:
+            expected = [
+                s[i - size:i] for s in self.seqs if len(s) >= size
+                for i in range(size, len(s) + 1)
+            ]
+            windows = corpus.windows(self.tokens, size)
+            self.assertEqual(windows.shape, (len(expected), size))
+            self.assertEqual(windows.tolist(), expected)
+
+
+class TestTokenize(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(0)
+        words = [('w%d' % i).encode() for i in range(1000)]
+        lines = []
+        for i in range(5000):
+            if i % 97 == 0:
+                lines.append(b'invalid line')
+                continue
+            src = [words[j] for j in np.random.randint(0, 1000, [10])]
+            trg = [words[j] for j in np.random.randint(0, 100, [5])]
+            lines.append(b' '.join(src) + b'\t' + b' '.join(trg))
+        self.text = b'\n'.join(lines) + b'\n'
+        self.samples = [[l.split() for l in line.split(b'\t')]
+                        for line in lines if line.count(b'\t') == 1]
+
+    def test_tokenize(self):
+        for num_workers in [1, 2]:
+            texts = ((0, block)
+                     for block in corpus.read_blocks(
+                         io.BytesIO(self.text), block_size=4096))
+            words, tags, (src, trg) = corpus.tokenize(
+                texts, tokenize_pairs, num_fields=2, num_workers=num_workers)
+            self.assertEqual(len(tags), len(self.samples))
+            self.assertEqual(len(words), len(set(words)))
+            words = np.array(words, dtype=object)
+            for i, (src_words, trg_words) in enumerate(self.samples):
+                self.assertEqual(words[src[i]].tolist(), src_words)
+                self.assertEqual(words[trg[i]].tolist(), trg_words)
+
+            count = corpus.count_tokens(trg.values, len(words))
+            self.assertEqual(count.sum(), 5 * len(self.samples))
+
+
+class TestCache(unittest.TestCase):
+    def test_save_load(self):
+        path = tempfile.mkdtemp()
+        shutil.rmtree(path)
+        self.assertIsNone(corpus.load_cache(path))
+
+        tokens = RaggedArray.from_lengths(
+            np.arange(
+                10, dtype='int32'), [3, 0, 7])
+        labels = np.array([0, 1, 1])
+        corpus.save_cache(path, {'tokens': tokens, 'labels': labels}, ['a'])
+        try:
+            arrays, meta = corpus.load_cache(path)
+            self.assertEqual(meta, ['a'])
+            np.testing.assert_array_equal(arrays['labels'], labels)
+            self.assertIsInstance(arrays['tokens'], RaggedArray)
+            self.assertEqual([t.tolist() for t in arrays['tokens']],
+                             [t.tolist() for t in tokens])
+        finally:
+            shutil.rmtree(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
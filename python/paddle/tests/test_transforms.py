@@ -14,6 +14,7 @@
 
 import unittest
 import os
+import random
 import tempfile
 import cv2
 import shutil
@@ -656,6 +657,43 @@ class TestFunctional(unittest.TestCase):
 
         os.remove(path)
 
+    def test_image_load_target_size(self):
+        fake_img = Image.fromarray((np.random.random((300, 400, 3)) * 255)
+                                   .astype('uint8'))
+        fake_img.save('temp.jpg')
+        fake_img.save('temp.png')
+
+        # decoded at 1/4 resolution, which is the smallest not less than 64
+        pil_img = image_load('temp.jpg', backend='pil', target_size=64)
+        self.assertEqual(pil_img.convert('RGB').size, (100, 75))
+        np_img = image_load('temp.jpg', backend='cv2', target_size=(64, 64))
+        self.assertEqual(np_img.shape, (75, 100, 3))
+        np_img = image_load('temp.jpg', backend='cv2', target_size=(200, 64))
+        self.assertEqual(np_img.shape, (300, 400, 3))
+
+        # only JPEG is decoded at reduced resolution
+        pil_img = image_load('temp.png', backend='pil', target_size=64)
+        self.assertEqual(pil_img.size, (400, 300))
+        np_img = image_load('temp.png', backend='cv2', target_size=64)
+        self.assertEqual(np_img.shape, (300, 400, 3))
+
+        os.remove('temp.jpg')
+        os.remove('temp.png')
+
+    def test_decode_size(self):
+        self.assertEqual(
+            transforms._get_decode_size(transforms.Resize(64)), (64, 64))
+        self.assertEqual(
+            transforms._get_decode_size(
+                transforms.Compose([
+                    transforms.RandomResizedCrop(
+                        (32, 64), scale=(0.25, 1.0)), transforms.ToTensor()
+                ])), (64, 128))
+        self.assertEqual(
+            transforms._get_decode_size(
+                transforms.Compose([transforms.CenterCrop(32)])), None)
+        self.assertEqual(transforms._get_decode_size(None), None)
+
     def test_rotate(self):
         np_img = (np.random.rand(28, 28, 3) * 255).astype('uint8')
         pil_img = Image.fromarray(np_img).convert('RGB')
@@ -691,5 +729,241 @@ class TestFunctional(unittest.TestCase):
                                 np.array(rotated_pil_img).shape)
 
 
+class TestBatchTransforms(unittest.TestCase):
+    def setUp(self):
+        self.imgs = paddle.rand((4, 3, 32, 40))
+
+    def test_resized_crop_batch(self):
+        import paddle.vision.transforms.functional_tensor as F_t
+
+        boxes = [[0, 0, 32, 40]] * 4
+        out = F_t.resized_crop_batch(self.imgs, boxes, (32, 40))
+        np.testing.assert_allclose(
+            out.numpy(), self.imgs.numpy(), rtol=1e-5, atol=1e-5)
+
+        boxes = [[4, 8, 16, 20], [0, 0, 8, 10], [16, 20, 16, 20],
+                 [2, 3, 8, 10]]
+        out = F_t.resized_crop_batch(
+            self.imgs, boxes, (8, 10), interpolation='nearest')
+        self.assertEqual(out.shape, [4, 3, 8, 10])
+        # crop with the same size as output is an exact copy
+        np.testing.assert_allclose(
+            out[1].numpy(), self.imgs[1, :, 0:8, 0:10].numpy(), rtol=1e-5)
+        np.testing.assert_allclose(
+            out[3].numpy(), self.imgs[3, :, 2:10, 3:13].numpy(), rtol=1e-5)
+
+    def test_rotate_batch(self):
+        import paddle.vision.transforms.functional_tensor as F_t
+
+        angles = [0., 30., -45., 90.]
+        out = F_t.rotate_batch(
+            self.imgs, angles, interpolation='bilinear', fill=0.)
+        for i, angle in enumerate(angles):
+            expected = F_t.rotate(
+                self.imgs[i], angle, interpolation='bilinear', fill=[0.] * 3)
+            np.testing.assert_allclose(
+                out[i].numpy(), expected.numpy(), rtol=1e-5, atol=1e-5)
+
+        out = F_t.rotate_batch(
+            self.imgs.transpose((0, 2, 3, 1)), [0.] * 4, data_format='NHWC')
+        np.testing.assert_allclose(
+            out.transpose((0, 3, 1, 2)).numpy(),
+            self.imgs.numpy(),
+            rtol=1e-5)
+
+    def test_hflip_batch(self):
+        import paddle.vision.transforms.functional_tensor as F_t
+
+        out = F_t.hflip_batch(self.imgs, [True, False, False, True])
+        np.testing.assert_allclose(out[0].numpy(),
+                                   F_t.hflip(self.imgs[0]).numpy())
+        np.testing.assert_allclose(out[1].numpy(), self.imgs[1].numpy())
+
+    def test_color_batch(self):
+        import paddle.vision.transforms.functional_tensor as F_t
+
+        out = F_t.adjust_brightness_batch(self.imgs, [1., 0., 1., 2.])
+        np.testing.assert_allclose(out[0].numpy(), self.imgs[0].numpy())
+        np.testing.assert_allclose(out[1].numpy(), 0.)
+        np.testing.assert_allclose(
+            out[3].numpy(), np.clip(self.imgs[3].numpy() * 2., 0., 1.),
+            rtol=1e-6)
+
+        out = F_t.adjust_saturation_batch(self.imgs, [0.] * 4)
+        gray = F_t.to_grayscale(self.imgs[2], num_output_channels=3)
+        np.testing.assert_allclose(
+            out[2].numpy(), gray.numpy(), rtol=1e-5, atol=1e-6)
+
+        out = F_t.adjust_contrast_batch(self.imgs, [1.] * 4)
+        np.testing.assert_allclose(
+            out.numpy(), self.imgs.numpy(), rtol=1e-5, atol=1e-6)
+
+        out = F_t.adjust_hue_batch(self.imgs, [0.] * 4)
+        np.testing.assert_allclose(
+            out.numpy(), self.imgs.numpy(), rtol=1e-4, atol=1e-5)
+
+        with self.assertRaises(ValueError):
+            F_t.adjust_brightness_batch(self.imgs, [1., 1.])
+
+    def test_color_batch_uint8(self):
+        import paddle.vision.transforms.functional_tensor as F_t
+
+        np_imgs = (np.random.rand(4, 3, 32, 40) * 255).astype('uint8')
+        imgs = paddle.to_tensor(np_imgs)
+        factors = [0.7, 1.4, 1., 0.]
+
+        out = F_t.adjust_brightness_batch(imgs, factors)
+        self.assertEqual(out.dtype, paddle.uint8)
+        for i, factor in enumerate(factors):
+            expected = np.clip(
+                np.round(np_imgs[i].astype('float32') * factor), 0, 255)
+            np.testing.assert_allclose(
+                out[i].numpy().astype('float32'), expected, atol=1)
+        self.assertGreater(out[0].numpy().max(), 0)
+
+        for op, factors in [
+            (F_t.adjust_contrast_batch, [0.7, 1.4, 1., 0.]),
+            (F_t.adjust_saturation_batch, [0.7, 1.4, 1., 0.]),
+            (F_t.adjust_hue_batch, [0.2, -0.3, 0., 0.5]),
+        ]:
+            out = op(imgs, factors)
+            self.assertEqual(out.dtype, paddle.uint8)
+            expected = op(imgs.astype('float32') / 255., factors)
+            np.testing.assert_allclose(
+                out.numpy().astype('float32'),
+                expected.numpy() * 255.,
+                atol=1.5)
+
+    def test_geometric_batch_uint8(self):
+        import paddle.vision.transforms.functional_tensor as F_t
+
+        np_imgs = (np.random.rand(4, 3, 32, 40) * 255).astype('uint8')
+        imgs = paddle.to_tensor(np_imgs)
+
+        boxes = [[4, 8, 16, 20], [0, 0, 8, 10], [16, 20, 16, 20],
+                 [2, 3, 8, 10]]
+        out = F_t.resized_crop_batch(
+            imgs, boxes, (8, 10), interpolation='nearest')
+        self.assertEqual(out.dtype, paddle.uint8)
+        np.testing.assert_array_equal(out[1].numpy(), np_imgs[1, :, 0:8, 0:10])
+        np.testing.assert_array_equal(out[3].numpy(),
+                                      np_imgs[3, :, 2:10, 3:13])
+
+        angles = [0., 30., -45., 90.]
+        out = F_t.rotate_batch(
+            imgs, angles, interpolation='bilinear', fill=0)
+        self.assertEqual(out.dtype, paddle.uint8)
+        expected = F_t.rotate_batch(
+            imgs.astype('float32'), angles, interpolation='bilinear', fill=0)
+        np.testing.assert_allclose(
+            out.numpy().astype('float32'),
+            np.clip(np.round(expected.numpy()), 0, 255),
+            atol=1)
+
+        trans = transforms.Compose([
+            transforms.BatchRandomResizedCrop(24),
+            transforms.BatchRandomRotation(30, fill=0),
+        ])
+        out = trans(imgs)
+        self.assertEqual(out.dtype, paddle.uint8)
+        self.assertEqual(out.shape, [4, 3, 24, 24])
+
+    def test_batch_transforms(self):
+        trans = transforms.Compose([
+            transforms.BatchRandomResizedCrop(24),
+            transforms.BatchRandomHorizontalFlip(),
+            transforms.BatchRandomRotation(30, fill=0),
+            transforms.BatchColorJitter(0.4, 0.4, 0.4, 0.4),
+        ])
+        out = trans(self.imgs)
+        self.assertEqual(out.shape, [4, 3, 24, 24])
+
+        trans = transforms.BatchRandomResizedCrop(24, data_format='NHWC')
+        out = trans(self.imgs.transpose((0, 2, 3, 1)))
+        self.assertEqual(out.shape, [4, 24, 24, 3])
+
+        with self.assertRaises(TypeError):
+            transforms.BatchRandomRotation(30)(self.imgs[0])
+
+
+class TestFusedCompose(unittest.TestCase):
+    def setUp(self):
+        self.img = (np.random.rand(32, 40, 3) * 255).astype('uint8')
+
+    def run_compose(self, get_transforms, img, seed=2021):
+        random.seed(seed)
+        np.random.seed(seed)
+        expected = transforms.Compose(get_transforms())(img)
+        random.seed(seed)
+        np.random.seed(seed)
+        fused = transforms.FusedCompose(get_transforms())
+        return fused, fused(img), expected
+
+    def test_fuse_crop_flip(self):
+        def get_transforms():
+            return [
+                transforms.RandomCrop(24),
+                transforms.RandomHorizontalFlip(1.0),
+                transforms.CenterCrop(16),
+                transforms.RandomVerticalFlip(1.0),
+            ]
+
+        fused, result, expected = self.run_compose(get_transforms, self.img)
+        self.assertEqual(len(fused._stages), 1)
+        np.testing.assert_equal(result, expected)
+
+        tensor_img = F.to_tensor(self.img)
+        fused, result, expected = self.run_compose(get_transforms, tensor_img)
+        np.testing.assert_allclose(
+            result.numpy(), expected.numpy(), rtol=1e-6)
+
+    def test_fuse_resize_rotate(self):
+        def get_transforms():
+            return [
+                transforms.RandomResizedCrop(24),
+                transforms.RandomRotation(10),
+                transforms.Resize((12, 16)),
+                transforms.ColorJitter(0.1),
+                transforms.CenterCrop(10),
+            ]
+
+        fused, result, expected = self.run_compose(get_transforms, self.img)
+        self.assertEqual(len(fused._stages), 3)
+        self.assertEqual(result.shape, expected.shape)
+
+        pil_img = Image.fromarray(self.img)
+        fused, result, expected = self.run_compose(get_transforms, pil_img)
+        self.assertEqual(result.size, expected.size)
+
+    def test_fuse_normalize(self):
+        def get_transforms():
+            return [
+                transforms.ToTensor(),
+                transforms.Normalize(
+                    mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
+            ]
+
+        fused, result, expected = self.run_compose(get_transforms, self.img)
+        self.assertEqual(len(fused._stages), 1)
+        np.testing.assert_allclose(
+            result.numpy(), expected.numpy(), rtol=1e-5, atol=1e-5)
+
+        def get_transforms():
+            return [
+                transforms.Normalize(
+                    mean=[127.5] * 3, std=[127.5] * 3, data_format='HWC'),
+                transforms.Transpose(),
+            ]
+
+        fused, result, expected = self.run_compose(get_transforms, self.img)
+        np.testing.assert_allclose(result, expected, rtol=1e-5, atol=1e-5)
+
+        # image not in HWC format is normalized by transforms one by one
+        tensor_img = F.to_tensor(self.img)
+        fused, result, expected = self.run_compose(get_transforms,
+                                                   tensor_img.numpy())
+        np.testing.assert_allclose(result, expected, rtol=1e-5, atol=1e-5)
+
+
 if __name__ == '__main__':
     unittest.main()
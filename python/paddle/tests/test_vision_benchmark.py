@@ -0,0 +1,83 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+import paddle
+from paddle.vision import benchmark
+
+
+class TestVisionBenchmark(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.root = benchmark.make_synthetic_dataset(
+            os.path.join(self.temp_dir, 'images'),
+            num_classes=2,
+            images_per_class=8,
+            image_size=(40, 48))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_make_synthetic_dataset(self):
+        self.assertEqual(
+            sorted(os.listdir(self.root)), ['class_0', 'class_1'])
+        self.assertEqual(len(os.listdir(os.path.join(self.root, 'class_0'))),
+                         8)
+
+    def test_benchmark_pipeline(self):
+        for transform in ['none', 'eval', 'train', 'fused']:
+            result = benchmark.benchmark_pipeline(
+                self.root,
+                backend='pil',
+                transform=transform,
+                batch_size=4,
+                warmup=1,
+                image_size=32)
+            self.assertEqual(result['batches'], 3)
+            self.assertGreater(result['throughput'], 0)
+            self.assertEqual(
+                sorted(result['latency'].keys()),
+                ['collate', 'decode', 'ipc', 'transform'])
+            self.assertEqual(result['prefetch']['batches'], 4)
+
+        with self.assertRaises(ValueError):
+            benchmark.benchmark_pipeline(self.root, backend='jpeg')
+
+    def test_run_benchmark(self):
+        output = os.path.join(self.temp_dir, 'report.json')
+        benchmark.main([
+            '--root', self.root, '--backends', 'pil', 'tensor',
+            '--transforms', 'eval', 'color', '--num_workers', '0', '2',
+            '--use_shared_memory', 'true', 'false', '--batch_size', '4',
+            '--warmup', '1', '--output', output
+        ])
+        with open(output) as f:
+            report = json.load(f)
+        # use_shared_memory is not swept for num_workers=0
+        self.assertEqual(len(report['results']), 2 * 2 * 3)
+        errors = [r for r in report['results'] if 'error' in r]
+        # ColorJitter does not support tensor images
+        self.assertEqual(len(errors), 3)
+        for result in errors:
+            self.assertEqual(result['backend'], 'tensor')
+            self.assertEqual(result['transform'], 'color')
+
+
+if __name__ == '__main__':
+    unittest.main()
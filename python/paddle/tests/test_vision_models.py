@@ -11,7 +11,9 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import os
 import unittest
+import tempfile
 import numpy as np
 
 import paddle
@@ -157,5 +159,88 @@ class TestVisonModels(unittest.TestCase):
         lenet.predict_batch(x)
 
 
+class TestOptimizeForInference(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.x = np.random.random((2, 3, 64, 64)).astype('float32')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def build(self, arch):
+        net = models.__dict__[arch](pretrained=False)
+        # random statistics to make folding BatchNorm2D nontrivial
+        for layer in net.sublayers():
+            if isinstance(layer, paddle.nn.BatchNorm2D):
+                num_features = layer._num_features
+                layer._mean.set_value(np.random.random(num_features).astype(
+                    'float32'))
+                layer._variance.set_value(
+                    np.random.random(num_features).astype('float32') + 0.5)
+        net.eval()
+        return net
+
+    def check(self, arch, data_format='auto'):
+        net = self.build(arch)
+        expected = net(paddle.to_tensor(self.x)).numpy()
+
+        optimized = models.optimize_for_inference(
+            net, input_shape=[2, 3, 64, 64], data_format=data_format, repeat=2)
+        self.assertFalse(optimized.training)
+        # the original model is not changed
+        self.assertTrue(
+            any(
+                isinstance(layer, paddle.nn.BatchNorm2D)
+                for layer in net.sublayers()))
+        for layer in optimized.sublayers():
+            self.assertNotIsInstance(layer, paddle.nn.Dropout)
+
+        out = optimized(paddle.to_tensor(self.x)).numpy()
+        np.testing.assert_allclose(out, expected, rtol=1e-3, atol=1e-4)
+        return optimized
+
+    def test_resnet18(self):
+        optimized = self.check('resnet18', 'NHWC')
+        self.assertFalse(
+            any(
+                isinstance(layer, paddle.nn.BatchNorm2D)
+                for layer in optimized.sublayers()))
+        # folded BatchNorm2D do not prevent switching to channels last
+        convs = [
+            layer for layer in optimized.sublayers()
+            if isinstance(layer, paddle.nn.Conv2D)
+        ]
+        self.assertGreater(len(convs), 0)
+        for conv in convs:
+            self.assertEqual(conv._data_format, 'NHWC')
+
+        path = os.path.join(self.temp_dir.name, 'resnet18')
+        paddle.jit.save(
+            optimized,
+            path,
+            input_spec=[InputSpec([None, 3, 64, 64], 'float32')])
+        loaded = paddle.jit.load(path)
+        np.testing.assert_allclose(
+            loaded(paddle.to_tensor(self.x)).numpy(),
+            optimized(paddle.to_tensor(self.x)).numpy(),
+            rtol=1e-5,
+            atol=1e-6)
+
+    def test_mobilenet_v2(self):
+        self.check('mobilenet_v2')
+
+    def test_vgg11(self):
+        self.check('vgg11', 'NCHW')
+
+    def test_shufflenet_v2_nhwc(self):
+        # channel shuffle is done on axis 1, NCHW is kept
+        self.check('shufflenet_v2_x0_25', 'NHWC')
+
+    def test_data_format(self):
+        net = models.LeNet()
+        with self.assertRaises(ValueError):
+            models.optimize_for_inference(net, [1, 1, 28, 28], 'NDHWC')
+
+
 if __name__ == '__main__':
     unittest.main()
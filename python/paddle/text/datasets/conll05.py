@@ -20,7 +20,7 @@ import numpy as np
 import six
 from six.moves import cPickle as pickle
 
-from paddle.io import Dataset
+from paddle.io import Dataset, RaggedArray
 import paddle.compat as cpt
 from paddle.dataset.common import _check_exists_and_download
 
@@ -175,9 +175,11 @@ class Conll05st(Dataset):
             "conll05st-release/test.wsj/words/test.wsj.words.gz")
         pf = tf.extractfile(
             "conll05st-release/test.wsj/props/test.wsj.props.gz")
-        self.sentences = []
+        # NOTE: word ids of a sentence are stored once for all predicates
+        #       of it, and samples refer to sentences by index
+        word_ids, sentence_lengths = [], []
+        sentence_ids, label_ids, label_lengths, verb_indices = [], [], [], []
         self.predicates = []
-        self.labels = []
         with gzip.GzipFile(fileobj=wf) as words_file, gzip.GzipFile(
                 fileobj=pf) as props_file:
             sentences = []
@@ -223,9 +225,19 @@ class Conll05st(Dataset):
                                     raise RuntimeError('Unexpected label: %s' %
                                                        l)
 
-                            self.sentences.append(sentences)
+                            sentence_ids.append(len(sentence_lengths))
                             self.predicates.append(verb_list[i])
-                            self.labels.append(lbl_seq)
+                            label_ids.extend(
+                                [self.label_dict[l] for l in lbl_seq])
+                            label_lengths.append(len(lbl_seq))
+                            verb_indices.append(
+                                lbl_seq.index('B-V') if 'B-V' in lbl_seq else
+                                -1)
+
+                        word_ids.extend([
+                            self.word_dict.get(w, UNK_IDX) for w in sentences
+                        ])
+                        sentence_lengths.append(len(sentences))
 
                     sentences = []
                     labels = []
@@ -238,59 +250,49 @@ class Conll05st(Dataset):
         wf.close()
         tf.close()
 
+        self.sentences = RaggedArray.from_lengths(
+            np.asarray(
+                word_ids, dtype='int32'), sentence_lengths)
+        self.sentence_ids = np.asarray(sentence_ids, dtype='int64')
+        self.labels = RaggedArray.from_lengths(
+            np.asarray(
+                label_ids, dtype='int32'), label_lengths)
+        self.verb_indices = np.asarray(verb_indices, dtype='int64')
+        self.bos_idx = self.word_dict.get('bos', UNK_IDX)
+        self.eos_idx = self.word_dict.get('eos', UNK_IDX)
+
     def __getitem__(self, idx):
-        sentence = self.sentences[idx]
+        word_idx = self.sentences[self.sentence_ids[idx]].astype('int64')
         predicate = self.predicates[idx]
-        labels = self.labels[idx]
-
-        sen_len = len(sentence)
-
-        verb_index = labels.index('B-V')
-        mark = [0] * len(labels)
-        if verb_index > 0:
-            mark[verb_index - 1] = 1
-            ctx_n1 = sentence[verb_index - 1]
-        else:
-            ctx_n1 = 'bos'
-
-        if verb_index > 1:
-            mark[verb_index - 2] = 1
-            ctx_n2 = sentence[verb_index - 2]
-        else:
-            ctx_n2 = 'bos'
-
-        mark[verb_index] = 1
-        ctx_0 = sentence[verb_index]
-
-        if verb_index < len(labels) - 1:
-            mark[verb_index + 1] = 1
-            ctx_p1 = sentence[verb_index + 1]
-        else:
-            ctx_p1 = 'eos'
-
-        if verb_index < len(labels) - 2:
-            mark[verb_index + 2] = 1
-            ctx_p2 = sentence[verb_index + 2]
-        else:
-            ctx_p2 = 'eos'
-
-        word_idx = [self.word_dict.get(w, UNK_IDX) for w in sentence]
-
-        ctx_n2_idx = [self.word_dict.get(ctx_n2, UNK_IDX)] * sen_len
-        ctx_n1_idx = [self.word_dict.get(ctx_n1, UNK_IDX)] * sen_len
-        ctx_0_idx = [self.word_dict.get(ctx_0, UNK_IDX)] * sen_len
-        ctx_p1_idx = [self.word_dict.get(ctx_p1, UNK_IDX)] * sen_len
-        ctx_p2_idx = [self.word_dict.get(ctx_p2, UNK_IDX)] * sen_len
+        label_idx = self.labels[idx].astype('int64')
+
+        sen_len = len(word_idx)
+
+        verb_index = int(self.verb_indices[idx])
+        if verb_index < 0:
+            raise ValueError("'B-V' is not in labels of sample {}".format(idx))
+        mark = np.zeros([sen_len], dtype='int64')
+        mark[max(verb_index - 2, 0):verb_index + 3] = 1
+
+        ctx_n2 = word_idx[verb_index - 2] if verb_index > 1 else self.bos_idx
+        ctx_n1 = word_idx[verb_index - 1] if verb_index > 0 else self.bos_idx
+        ctx_0 = word_idx[verb_index]
+        ctx_p1 = word_idx[verb_index + 1] \
+            if verb_index < sen_len - 1 else self.eos_idx
+        ctx_p2 = word_idx[verb_index + 2] \
+            if verb_index < sen_len - 2 else self.eos_idx
 
         pred_idx = [self.predicate_dict.get(predicate)] * sen_len
-        label_idx = [self.label_dict.get(w) for w in labels]
 
-        return (np.array(word_idx), np.array(ctx_n2_idx), np.array(ctx_n1_idx),
-                np.array(ctx_0_idx), np.array(ctx_p1_idx), np.array(ctx_p2_idx),
-                np.array(pred_idx), np.array(mark), np.array(label_idx))
+        return (word_idx, np.full([sen_len], ctx_n2, dtype='int64'),
+                np.full([sen_len], ctx_n1, dtype='int64'),
+                np.full([sen_len], ctx_0, dtype='int64'),
+                np.full([sen_len], ctx_p1, dtype='int64'),
+                np.full([sen_len], ctx_p2, dtype='int64'),
+                np.array(pred_idx), mark, label_idx)
 
     def __len__(self):
-        return len(self.sentences)
+        return len(self.sentence_ids)
 
     def get_dict(self):
         """
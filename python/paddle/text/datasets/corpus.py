@@ -0,0 +1,298 @@
+#   Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Helpers to tokenize text corpora of datasets in paddle.text.datasets in
+one streaming pass with a process pool, and to cache encoded corpora as
+flat token arrays.
+"""
+
+from __future__ import print_function
+
+import os
+import shutil
+import pickle
+import hashlib
+import collections
+import multiprocessing
+
+import numpy as np
+
+import paddle.dataset.common
+from paddle.io import RaggedArray
+
+__all__ = []
+
+# bump this if the format or contents of cached corpora change
+_CACHE_VERSION = 1
+
+# bytes of text tokenized by a worker at a time
+_CHUNK_BYTES = 1 << 20
+
+
+def encode(tokens, table):
+    """
+    Return token sequences with each token replaced by ``table[token]``.
+    """
+    table = np.asarray(table, dtype='int32')
+    return RaggedArray(table[tokens.values], tokens.offsets)
+
+
+def insert(tokens, start=None, end=None):
+    """
+    Return token sequences with token start prepended and token end
+    appended to each of them, if they are not None.
+    """
+    positions, inserted = [], []
+    if start is not None:
+        positions.append(tokens.offsets[:-1])
+        inserted.append(np.full([len(tokens)], start, dtype=tokens.dtype))
+    if end is not None:
+        positions.append(tokens.offsets[1:])
+        inserted.append(np.full([len(tokens)], end, dtype=tokens.dtype))
+    if len(positions) == 0:
+        return tokens
+    num_inserted = len(positions)
+    # NOTE: insert end of sequence i before start of sequence i + 1
+    #       at the same position, np.insert keeps the order of equal
+    #       positions
+    positions = np.stack(positions, axis=1).reshape([-1])
+    inserted = np.stack(inserted, axis=1).reshape([-1])
+    values = np.insert(tokens.values, positions, inserted)
+    offsets = tokens.offsets + num_inserted * np.arange(
+        len(tokens.offsets), dtype='int64')
+    return RaggedArray(values, offsets)
+
+
+def windows(tokens, size):
+    """
+    Return all windows of size tokens in token sequences as a 2-D array.
+    """
+    counts = np.maximum(tokens.lengths() - size + 1, 0)
+    total = int(counts.sum())
+    first_window = np.zeros([len(counts)], dtype='int64')
+    np.cumsum(counts[:-1], out=first_window[1:])
+    starts = np.repeat(tokens.offsets[:-1] - first_window, counts) + \
+        np.arange(total, dtype='int64')
+    return tokens.values[starts[:, np.newaxis] + np.arange(size)]
+
+
+def _tokenize_texts(args):
+    """
+    Tokenize texts with a vocabulary local to this call, return the local
+    vocabulary, tags of samples and tokens of each field of samples.
+    """
+    tokenizer, num_fields, texts = args
+    vocab = {}
+    tags = []
+    ids = [[] for _ in range(num_fields)]
+    lengths = [[] for _ in range(num_fields)]
+    for tag, text in texts:
+        for sample in tokenizer(text):
+            tags.append(tag)
+            for field, tokens in enumerate(sample):
+                ids[field].extend(
+                    [vocab.setdefault(token, len(vocab)) for token in tokens])
+                lengths[field].append(len(tokens))
+    fields = [(np.asarray(
+        field_ids, dtype='int32'), np.asarray(
+            field_lengths, dtype='int64'))
+              for field_ids, field_lengths in zip(ids, lengths)]
+    return list(vocab), np.asarray(tags, dtype='int32'), fields
+
+
+def _chunks(texts, tokenizer, num_fields):
+    chunk, nbytes = [], 0
+    for tag, text in texts:
+        chunk.append((tag, text))
+        nbytes += len(text)
+        if nbytes >= _CHUNK_BYTES:
+            yield tokenizer, num_fields, chunk
+            chunk, nbytes = [], 0
+    if len(chunk) > 0:
+        yield tokenizer, num_fields, chunk
+
+
+def _default_num_workers():
+    return min(multiprocessing.cpu_count(), 8)
+
+
+def tokenize(texts, tokenizer, num_fields=1, num_workers=None):
+    """
+    Tokenize a corpus in one pass, texts are tokenized by a pool of
+    processes while they are read.
+
+    Args:
+        texts (iterable): (tag, text) pairs, tag is an int, e.g. the class
+            or the file of the text.
+        tokenizer (callable): a function defined at module level, which
+            takes a text and yields samples, each sample is a tuple of
+            num_fields token lists.
+        num_fields (int): number of fields of samples.
+        num_workers (int): number of processes, texts are tokenized in the
+            current process if it is 1. Default: number of CPUs, at most 8.
+
+    Returns:
+        tuple: (words, tags, fields), words is the list of distinct tokens
+            in order of occurrence, tags is an int32 array of tags of the
+            samples and fields are RaggedArrays of indices of words of each
+            field.
+    """
+    num_workers = num_workers or _default_num_workers()
+    vocab = {}
+    tags = []
+    ids = [[] for _ in range(num_fields)]
+    lengths = [[] for _ in range(num_fields)]
+
+    def merge(result):
+        words, chunk_tags, fields = result
+        # map the local vocabulary of the chunk to the global one
+        table = np.asarray(
+            [vocab.setdefault(word, len(vocab)) for word in words],
+            dtype='int32')
+        tags.append(chunk_tags)
+        for field, (field_ids, field_lengths) in enumerate(fields):
+            ids[field].append(table[field_ids])
+            lengths[field].append(field_lengths)
+
+    chunks = _chunks(texts, tokenizer, num_fields)
+    if num_workers <= 1:
+        for chunk in chunks:
+            merge(_tokenize_texts(chunk))
+    else:
+        pool = multiprocessing.Pool(num_workers)
+        try:
+            # NOTE: Pool.imap reads all inputs in advance, keep at most
+            #       2 chunks per worker in flight to bound the memory
+            pending = collections.deque()
+            for chunk in chunks:
+                pending.append(pool.apply_async(_tokenize_texts, (chunk, )))
+                if len(pending) >= 2 * num_workers:
+                    merge(pending.popleft().get())
+            while pending:
+                merge(pending.popleft().get())
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def concat(arrays, dtype):
+        return np.concatenate(arrays) if arrays else np.zeros(
+            [0], dtype=dtype)
+
+    fields = [
+        RaggedArray.from_lengths(
+            concat(field_ids, 'int32'), concat(field_lengths, 'int64'))
+        for field_ids, field_lengths in zip(ids, lengths)
+    ]
+    return list(vocab), concat(tags, 'int32'), fields
+
+
+def read_blocks(fileobj, block_size=_CHUNK_BYTES):
+    """
+    Read a file in blocks of about block_size bytes ending with newlines.
+    """
+    while True:
+        block = fileobj.read(block_size)
+        if not block:
+            break
+        yield block + fileobj.readline()
+
+
+def split_lines(block):
+    """
+    Split a block into lines as iterating a binary file, without the
+    trailing empty line.
+    """
+    lines = block.split(b'\n')
+    if len(lines[-1]) == 0:
+        lines.pop()
+    return lines
+
+
+def count_tokens(values, num_words):
+    """
+    Return the number of occurrences of each word in values.
+    """
+    return np.bincount(values, minlength=num_words).astype('int64')
+
+
+def dict_digest(word_dict):
+    """
+    Return a digest of a word dictionary, to be a parameter of
+    :code:`cache_path` if the corpus is encoded with it.
+    """
+    items = sorted(word_dict.items(), key=lambda x: x[1])
+    return hashlib.md5(repr(items).encode()).hexdigest()
+
+
+def cache_path(name, data_file, **params):
+    """
+    Return the directory to cache a corpus of the dataset name encoded
+    from data_file with params.
+    """
+    stat = os.stat(data_file)
+    key = repr((_CACHE_VERSION, os.path.abspath(data_file), stat.st_size,
+                stat.st_mtime, sorted(params.items())))
+    return os.path.join(paddle.dataset.common.DATA_HOME, name,
+                        'corpus-' + hashlib.md5(key.encode()).hexdigest())
+
+
+def load_cache(path):
+    """
+    Load arrays and meta data saved by :code:`save_cache`, arrays are
+    memory mapped. Return None if not cached.
+    """
+    if not os.path.exists(os.path.join(path, 'meta.pkl')):
+        return None
+    with open(os.path.join(path, 'meta.pkl'), 'rb') as f:
+        meta, array_names, token_array_names = pickle.load(f)
+    arrays = {}
+    for name in array_names:
+        arrays[name] = np.load(
+            os.path.join(path, name + '.npy'), mmap_mode='r')
+    for name in token_array_names:
+        arrays[name] = RaggedArray(
+            np.load(
+                os.path.join(path, name + '.values.npy'), mmap_mode='r'),
+            np.load(
+                os.path.join(path, name + '.offsets.npy'), mmap_mode='r'))
+    return arrays, meta
+
+
+def save_cache(path, arrays, meta):
+    """
+    Save a dict of ndarrays and RaggedArrays and picklable meta data
+    to the directory path.
+    """
+    tmp_path = '{}.tmp.{}'.format(path, os.getpid())
+    if os.path.exists(tmp_path):
+        shutil.rmtree(tmp_path)
+    os.makedirs(tmp_path)
+    array_names, token_array_names = [], []
+    for name, array in arrays.items():
+        if isinstance(array, RaggedArray):
+            np.save(os.path.join(tmp_path, name + '.values.npy'), array.values)
+            np.save(
+                os.path.join(tmp_path, name + '.offsets.npy'), array.offsets)
+            token_array_names.append(name)
+        else:
+            np.save(os.path.join(tmp_path, name + '.npy'), array)
+            array_names.append(name)
+    # meta is written last to mark the cache complete
+    with open(os.path.join(tmp_path, 'meta.pkl'), 'wb') as f:
+        pickle.dump((meta, array_names, token_array_names), f, protocol=4)
+    try:
+        os.rename(tmp_path, path)
+    except OSError:
+        # cached by another process at the same time
+        shutil.rmtree(tmp_path, ignore_errors=True)
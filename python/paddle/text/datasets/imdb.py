@@ -19,10 +19,10 @@ import six
 import string
 import tarfile
 import numpy as np
-import collections
 
 from paddle.io import Dataset
 from paddle.dataset.common import _check_exists_and_download
+from . import corpus
 
 __all__ = []
 
@@ -30,6 +30,16 @@ URL = 'https://dataset.bj.bcebos.com/imdb%2FaclImdb_v1.tar.gz'
 MD5 = '7c2ac02c03563afcf9b574c7e56c153a'
 
 
+# (mode, class) of documents
+_GROUPS = [('train', 'pos'), ('train', 'neg'), ('test', 'pos'), ('test', 'neg')]
+
+
+def _tokenize(text):
+    # newline and punctuations removal and ad-hoc tokenization.
+    yield (text.rstrip(six.b("\n\r")).translate(
+        None, six.b(string.punctuation)).lower().split(), )
+
+
 class Imdb(Dataset):
     """
     Implementation of `IMDB <https://www.imdb.com/interfaces/>`_ dataset.
@@ -84,60 +94,60 @@ class Imdb(Dataset):
             self.data_file = _check_exists_and_download(data_file, URL, MD5,
                                                         'imdb', download)
 
-        # Build a word dictionary from the corpus
-        self.word_idx = self._build_work_dict(cutoff)
+        # Build a word dictionary from the corpus, the corpus of both modes
+        # is encoded with it and cached once
+        cache_path = corpus.cache_path('imdb', self.data_file, cutoff=cutoff)
+        cached = corpus.load_cache(cache_path)
+        if cached is None:
+            arrays, words = self._build_corpus(cutoff)
+            corpus.save_cache(cache_path, arrays, words)
+        else:
+            arrays, words = cached
+        self.word_idx = dict(zip(words, six.moves.range(len(words))))
 
         # read dataset into memory
-        self._load_anno()
+        self._load_anno(arrays['docs'], arrays['groups'])
 
-    def _build_work_dict(self, cutoff):
-        word_freq = collections.defaultdict(int)
+    def _build_corpus(self, cutoff):
+        """
+        Tokenize all documents in one pass, build the word dictionary from
+        them and encode them with the dictionary.
+        """
         pattern = re.compile(r"aclImdb/((train)|(test))/((pos)|(neg))/.*\.txt$")
-        for doc in self._tokenize(pattern):
-            for word in doc:
-                word_freq[word] += 1
+
+        def texts():
+            with tarfile.open(self.data_file) as tarf:
+                for tf in tarf:
+                    match = pattern.match(tf.name)
+                    if match is not None:
+                        yield _GROUPS.index((match.group(1), match.group(4))), \
+                            tarf.extractfile(tf).read()
+
+        words, groups, (docs, ) = corpus.tokenize(texts(), _tokenize)
+        word_freq = corpus.count_tokens(docs.values, len(words))
 
         # Not sure if we should prune less-frequent words here.
-        word_freq = [x for x in six.iteritems(word_freq) if x[1] > cutoff]
-
-        dictionary = sorted(word_freq, key=lambda x: (-x[1], x[0]))
-        words, _ = list(zip(*dictionary))
-        word_idx = dict(list(zip(words, six.moves.range(len(words)))))
-        word_idx['<unk>'] = len(words)
-        return word_idx
-
-    def _tokenize(self, pattern):
-        data = []
-        with tarfile.open(self.data_file) as tarf:
-            tf = tarf.next()
-            while tf != None:
-                if bool(pattern.match(tf.name)):
-                    # newline and punctuations removal and ad-hoc tokenization.
-                    data.append(
-                        tarf.extractfile(tf).read().rstrip(six.b("\n\r"))
-                        .translate(None, six.b(string.punctuation)).lower(
-                        ).split())
-                tf = tarf.next()
-
-        return data
-
-    def _load_anno(self):
-        pos_pattern = re.compile(r"aclImdb/{}/pos/.*\.txt$".format(self.mode))
-        neg_pattern = re.compile(r"aclImdb/{}/neg/.*\.txt$".format(self.mode))
-
-        UNK = self.word_idx['<unk>']
-
-        self.docs = []
-        self.labels = []
-        for doc in self._tokenize(pos_pattern):
-            self.docs.append([self.word_idx.get(w, UNK) for w in doc])
-            self.labels.append(0)
-        for doc in self._tokenize(neg_pattern):
-            self.docs.append([self.word_idx.get(w, UNK) for w in doc])
-            self.labels.append(1)
+        dictionary = sorted(
+            [i for i in six.moves.range(len(words)) if word_freq[i] > cutoff],
+            key=lambda i: (-word_freq[i], words[i]))
+        word_ids = np.full([len(words)], len(dictionary), dtype='int32')
+        word_ids[dictionary] = np.arange(len(dictionary), dtype='int32')
+        words = [words[i] for i in dictionary] + ['<unk>']
+        return {'docs': corpus.encode(docs, word_ids), 'groups': groups}, words
+
+    def _load_anno(self, docs, groups):
+        # positive documents followed by negative ones, in order of the file
+        pos = np.nonzero(groups == _GROUPS.index((self.mode, 'pos')))[0]
+        neg = np.nonzero(groups == _GROUPS.index((self.mode, 'neg')))[0]
+
+        self.docs = docs.take(np.concatenate([pos, neg]))
+        self.labels = np.concatenate([
+            np.zeros([len(pos)], dtype='int64'),
+            np.ones([len(neg)], dtype='int64')
+        ])
 
     def __getitem__(self, idx):
-        return (np.array(self.docs[idx]), np.array([self.labels[idx]]))
+        return (self.docs[idx].astype('int64'), np.array([self.labels[idx]]))
 
     def __len__(self):
         return len(self.docs)
@@ -21,6 +21,7 @@ import collections
 
 from paddle.io import Dataset
 from paddle.dataset.common import _check_exists_and_download
+from . import corpus
 
 __all__ = []
 
@@ -28,6 +29,15 @@ URL = 'https://dataset.bj.bcebos.com/imikolov%2Fsimple-examples.tgz'
 MD5 = '30177ea32e27c525793142b6bf2c8e2d'
 
 
+# files of the corpus, the word dictionary is built from train and valid
+_FILES = ['train', 'valid', 'test']
+
+
+def _tokenize(text):
+    for l in corpus.split_lines(text):
+        yield (l.strip().split(), )
+
+
 class Imikolov(Dataset):
     """
     Implementation of imikolov dataset.
@@ -97,11 +107,19 @@ class Imikolov(Dataset):
             self.data_file = _check_exists_and_download(data_file, URL, MD5,
                                                         'imikolov', download)
 
-        # Build a word dictionary from the corpus
-        self.word_idx = self._build_work_dict(min_word_freq)
+        # Build a word dictionary from the corpus, the corpus of all files
+        # is encoded with it and cached once
+        cache_path = corpus.cache_path(
+            'imikolov', self.data_file, min_word_freq=min_word_freq)
+        cached = corpus.load_cache(cache_path)
+        if cached is None:
+            arrays, words = self._build_corpus()
+            corpus.save_cache(cache_path, arrays, words)
+        else:
+            arrays, words = cached
+        self.word_idx = dict(zip(words, six.moves.range(len(words))))
 
-        # read dataset into memory
-        self._load_anno()
+        self._load_anno(arrays['lines'], arrays['files'])
 
     def word_count(self, f, word_freq=None):
         if word_freq is None:
@@ -115,56 +133,76 @@ class Imikolov(Dataset):
 
         return word_freq
 
-    def _build_work_dict(self, cutoff):
-        train_filename = './simple-examples/data/ptb.train.txt'
-        test_filename = './simple-examples/data/ptb.valid.txt'
-        with tarfile.open(self.data_file) as tf:
-            trainf = tf.extractfile(train_filename)
-            testf = tf.extractfile(test_filename)
-            word_freq = self.word_count(testf, self.word_count(trainf))
-            if '<unk>' in word_freq:
-                # remove <unk> for now, since we will set it as last index
-                del word_freq['<unk>']
-
-            word_freq = [
-                x for x in six.iteritems(word_freq) if x[1] > self.min_word_freq
-            ]
-
-            word_freq_sorted = sorted(word_freq, key=lambda x: (-x[1], x[0]))
-            words, _ = list(zip(*word_freq_sorted))
-            word_idx = dict(list(zip(words, six.moves.range(len(words)))))
-            word_idx['<unk>'] = len(words)
+    def _build_corpus(self):
+        """
+        Tokenize lines of all files in one pass, build the word dictionary
+        from the train and valid files and encode lines with it.
+        """
+
+        def texts():
+            with tarfile.open(self.data_file) as tf:
+                for file_id, name in enumerate(_FILES):
+                    f = tf.extractfile(
+                        './simple-examples/data/ptb.{}.txt'.format(name))
+                    for block in corpus.read_blocks(f):
+                        yield file_id, block
+
+        words, files, (lines, ) = corpus.tokenize(texts(), _tokenize)
+        dict_lines = files != _FILES.index('test')
+        word_freq = dict(
+            zip(words,
+                corpus.count_tokens(
+                    lines.take(dict_lines).values,
+                    len(words)).tolist()))
+        word_freq['<s>'] = word_freq['<e>'] = int(dict_lines.sum())
+        word_idx = self._build_work_dict(word_freq)
+
+        UNK = word_idx['<unk>']
+        word_ids = np.asarray(
+            [word_idx.get(w, UNK) for w in words], dtype='int32')
+        words = sorted(word_idx, key=word_idx.get)
+        return {'lines': corpus.encode(lines, word_ids), 'files': files}, words
+
+    def _build_work_dict(self, word_freq):
+        if '<unk>' in word_freq:
+            # remove <unk> for now, since we will set it as last index
+            del word_freq['<unk>']
+
+        word_freq = [
+            x for x in six.iteritems(word_freq) if x[1] > self.min_word_freq
+        ]
+
+        word_freq_sorted = sorted(word_freq, key=lambda x: (-x[1], x[0]))
+        words, _ = list(zip(*word_freq_sorted))
+        word_idx = dict(list(zip(words, six.moves.range(len(words)))))
+        word_idx['<unk>'] = len(words)
 
         return word_idx
 
-    def _load_anno(self):
-        self.data = []
-        with tarfile.open(self.data_file) as tf:
-            filename = './simple-examples/data/ptb.{}.txt'.format(self.mode)
-            f = tf.extractfile(filename)
-
-            UNK = self.word_idx['<unk>']
-            for l in f:
-                if self.data_type == 'NGRAM':
-                    assert self.window_size > -1, 'Invalid gram length'
-                    l = ['<s>'] + l.strip().split() + ['<e>']
-                    if len(l) >= self.window_size:
-                        l = [self.word_idx.get(w, UNK) for w in l]
-                        for i in six.moves.range(self.window_size, len(l) + 1):
-                            self.data.append(tuple(l[i - self.window_size:i]))
-                elif self.data_type == 'SEQ':
-                    l = l.strip().split()
-                    l = [self.word_idx.get(w, UNK) for w in l]
-                    src_seq = [self.word_idx['<s>']] + l
-                    trg_seq = l + [self.word_idx['<e>']]
-                    if self.window_size > 0 and len(src_seq) > self.window_size:
-                        continue
-                    self.data.append((src_seq, trg_seq))
-                else:
-                    assert False, 'Unknow data type'
+    def _load_anno(self, lines, files):
+        lines = lines.take(files == _FILES.index(self.mode))
+        start_id, end_id = self.word_idx['<s>'], self.word_idx['<e>']
+        if self.data_type == 'NGRAM':
+            assert self.window_size > -1, 'Invalid gram length'
+            self.data = corpus.windows(
+                corpus.insert(lines, start_id, end_id),
+                self.window_size).astype('int64')
+        elif self.data_type == 'SEQ':
+            src_seq = corpus.insert(lines, start=start_id)
+            trg_seq = corpus.insert(lines, end=end_id)
+            if self.window_size > 0:
+                keep = np.nonzero(src_seq.lengths() <= self.window_size)[0]
+                src_seq, trg_seq = src_seq.take(keep), trg_seq.take(keep)
+            self.data = (src_seq, trg_seq)
+        else:
+            assert False, 'Unknow data type'
 
     def __getitem__(self, idx):
-        return tuple([np.array(d) for d in self.data[idx]])
+        if self.data_type == 'NGRAM':
+            return tuple([np.array(d) for d in self.data[idx]])
+        return tuple([d[idx].astype('int64') for d in self.data])
 
     def __len__(self):
-        return len(self.data)
+        if self.data_type == 'NGRAM':
+            return len(self.data)
+        return len(self.data[0])
@@ -22,6 +22,7 @@ import six
 from paddle.io import Dataset
 import paddle.compat as cpt
 from paddle.dataset.common import _check_exists_and_download
+from . import corpus
 
 __all__ = []
 
@@ -39,6 +40,14 @@ UNK = "<unk>"
 UNK_IDX = 2
 
 
+def _tokenize(text):
+    for line in corpus.split_lines(text):
+        line_split = cpt.to_text(line).strip().split('\t')
+        if len(line_split) != 2:
+            continue
+        yield line_split[0].split(), line_split[1].split()
+
+
 class WMT14(Dataset):
     """
     Implementation of `WMT14 <http://www.statmt.org/wmt14/>`_ test dataset.
@@ -106,6 +115,23 @@ class WMT14(Dataset):
         self._load_data()
 
     def _load_data(self):
+        cache_path = corpus.cache_path(
+            'wmt14', self.data_file, mode=self.mode, dict_size=self.dict_size)
+        cached = corpus.load_cache(cache_path)
+        if cached is None:
+            cached = self._build_corpus()
+            corpus.save_cache(cache_path, *cached)
+        arrays, (self.src_dict, self.trg_dict) = cached
+        self.src_ids = arrays['src_ids']
+        self.trg_ids = arrays['trg_ids']
+        self.trg_ids_next = arrays['trg_ids_next']
+
+    def _build_corpus(self):
+        """
+        Read the dictionaries and tokenize sequences in one pass over the
+        tar file, then encode the sequences with the dictionaries.
+        """
+
         def __to_dict(fd, size):
             out_dict = dict()
             for line_count, line in enumerate(fd):
@@ -115,58 +141,49 @@ class WMT14(Dataset):
                     break
             return out_dict
 
-        self.src_ids = []
-        self.trg_ids = []
-        self.trg_ids_next = []
-        with tarfile.open(self.data_file, mode='r') as f:
-            names = [
-                each_item.name for each_item in f
-                if each_item.name.endswith("src.dict")
-            ]
-            assert len(names) == 1
-            self.src_dict = __to_dict(f.extractfile(names[0]), self.dict_size)
-            names = [
-                each_item.name for each_item in f
-                if each_item.name.endswith("trg.dict")
-            ]
-            assert len(names) == 1
-            self.trg_dict = __to_dict(f.extractfile(names[0]), self.dict_size)
-
-            file_name = "{}/{}".format(self.mode, self.mode)
-            names = [
-                each_item.name for each_item in f
-                if each_item.name.endswith(file_name)
-            ]
-            for name in names:
-                for line in f.extractfile(name):
-                    line = cpt.to_text(line)
-                    line_split = line.strip().split('\t')
-                    if len(line_split) != 2:
-                        continue
-                    src_seq = line_split[0]  # one source sequence
-                    src_words = src_seq.split()
-                    src_ids = [
-                        self.src_dict.get(w, UNK_IDX)
-                        for w in [START] + src_words + [END]
-                    ]
-
-                    trg_seq = line_split[1]  # one target sequence
-                    trg_words = trg_seq.split()
-                    trg_ids = [self.trg_dict.get(w, UNK_IDX) for w in trg_words]
-
-                    # remove sequence whose length > 80 in training mode
-                    if len(src_ids) > 80 or len(trg_ids) > 80:
-                        continue
-                    trg_ids_next = trg_ids + [self.trg_dict[END]]
-                    trg_ids = [self.trg_dict[START]] + trg_ids
-
-                    self.src_ids.append(src_ids)
-                    self.trg_ids.append(trg_ids)
-                    self.trg_ids_next.append(trg_ids_next)
+        dicts = {'src.dict': [], 'trg.dict': []}
+        file_name = "{}/{}".format(self.mode, self.mode)
+
+        def texts():
+            with tarfile.open(self.data_file, mode='r') as f:
+                for each_item in f:
+                    for suffix in dicts:
+                        if each_item.name.endswith(suffix):
+                            dicts[suffix].append(
+                                __to_dict(
+                                    f.extractfile(each_item), self.dict_size))
+                    if each_item.name.endswith(file_name):
+                        for block in corpus.read_blocks(
+                                f.extractfile(each_item)):
+                            yield 0, block
+
+        words, _, (src_seq, trg_seq) = corpus.tokenize(
+            texts(), _tokenize, num_fields=2)
+        assert len(dicts['src.dict']) == 1
+        assert len(dicts['trg.dict']) == 1
+        src_dict, trg_dict = dicts['src.dict'][0], dicts['trg.dict'][0]
+
+        src_ids = corpus.insert(
+            corpus.encode(src_seq, [src_dict.get(w, UNK_IDX) for w in words]),
+            src_dict.get(START, UNK_IDX), src_dict.get(END, UNK_IDX))
+        trg_ids = corpus.encode(trg_seq,
+                                [trg_dict.get(w, UNK_IDX) for w in words])
+
+        # remove sequence whose length > 80 in training mode
+        keep = (src_ids.lengths() <= 80) & (trg_ids.lengths() <= 80)
+        arrays = {
+            'src_ids': src_ids.take(keep),
+            'trg_ids': corpus.insert(
+                trg_ids, start=trg_dict[START]).take(keep),
+            'trg_ids_next': corpus.insert(
+                trg_ids, end=trg_dict[END]).take(keep),
+        }
+        return arrays, (src_dict, trg_dict)
 
     def __getitem__(self, idx):
-        return (np.array(self.src_ids[idx]), np.array(self.trg_ids[idx]),
-                np.array(self.trg_ids_next[idx]))
+        return (self.src_ids[idx].astype('int64'),
+                self.trg_ids[idx].astype('int64'),
+                self.trg_ids_next[idx].astype('int64'))
 
     def __len__(self):
         return len(self.src_ids)
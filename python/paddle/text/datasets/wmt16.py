@@ -20,12 +20,12 @@ import os
 import six
 import tarfile
 import numpy as np
-from collections import defaultdict
 
 import paddle
 from paddle.io import Dataset
 import paddle.compat as cpt
 from paddle.dataset.common import _check_exists_and_download
+from . import corpus
 
 __all__ = []
 
@@ -40,6 +40,14 @@ END_MARK = "<e>"
 UNK_MARK = "<unk>"
 
 
+def _tokenize(text):
+    for line in corpus.split_lines(text):
+        line_split = cpt.to_text(line).strip().split("\t")
+        if len(line_split) != 2:
+            continue
+        yield line_split[0].split(), line_split[1].split()
+
+
 class WMT16(Dataset):
     """
     Implementation of `WMT16 <http://www.statmt.org/wmt16/>`_ test dataset.
@@ -128,6 +136,10 @@ class WMT16(Dataset):
         self.trg_dict_size = min(trg_dict_size, (TOTAL_DE_WORDS if lang == "en"
                                                  else TOTAL_EN_WORDS))
 
+        # tokenized files of the corpus, which are shared by building word
+        # dicts and loading data
+        self._corpora = {}
+
         # load source and target word dict
         self.src_dict = self._load_dict(lang, src_dict_size)
         self.trg_dict = self._load_dict("de" if lang == "en" else "en",
@@ -135,6 +147,7 @@ class WMT16(Dataset):
 
         # load data
         self.data = self._load_data()
+        self._corpora = {}
 
     def _load_dict(self, lang, dict_size, reverse=False):
         dict_path = os.path.join(paddle.dataset.common.DATA_HOME,
@@ -155,30 +168,62 @@ class WMT16(Dataset):
                     word_dict[cpt.to_text(line.strip())] = idx
         return word_dict
 
+    def _tokenize_file(self, name):
+        """
+        Tokenize a file of the corpus, return the words and the sequences
+        of words of the two columns, i.e. English and German.
+        """
+        if name not in self._corpora:
+
+            def texts():
+                with tarfile.open(self.data_file, mode="r") as f:
+                    for block in corpus.read_blocks(
+                            f.extractfile("wmt16/{}".format(name))):
+                        yield 0, block
+
+            words, _, fields = corpus.tokenize(
+                texts(), _tokenize, num_fields=2)
+            self._corpora[name] = words, fields
+        return self._corpora[name]
+
     def _build_dict(self, dict_path, dict_size, lang):
-        word_dict = defaultdict(int)
-        with tarfile.open(self.data_file, mode="r") as f:
-            for line in f.extractfile("wmt16/train"):
-                line = cpt.to_text(line)
-                line_split = line.strip().split("\t")
-                if len(line_split) != 2: continue
-                sen = line_split[0] if self.lang == "en" else line_split[1]
-                for w in sen.split():
-                    word_dict[w] += 1
+        words, fields = self._tokenize_file("train")
+        sentences = fields[0 if lang == "en" else 1]
+        word_count = corpus.count_tokens(sentences.values, len(words))
+        # words with the same count are in order of their first occurrence
+        first_occurrence = np.zeros([len(words)], dtype='int64')
+        word_ids, first_index = np.unique(sentences.values, return_index=True)
+        first_occurrence[word_ids] = first_index
+        word_ids = word_ids[np.lexsort(
+            (first_occurrence[word_ids], -word_count[word_ids]))]
 
         with open(dict_path, "wb") as fout:
             fout.write(
                 cpt.to_bytes("%s\n%s\n%s\n" % (START_MARK, END_MARK, UNK_MARK)))
-            for idx, word in enumerate(
-                    sorted(
-                        six.iteritems(word_dict),
-                        key=lambda x: x[1],
-                        reverse=True)):
+            for idx, word_id in enumerate(word_ids):
                 if idx + 3 == dict_size: break
-                fout.write(cpt.to_bytes(word[0]))
+                fout.write(cpt.to_bytes(words[word_id]))
                 fout.write(cpt.to_bytes('\n'))
 
     def _load_data(self):
+        cache_path = corpus.cache_path(
+            'wmt16',
+            self.data_file,
+            mode=self.mode,
+            lang=self.lang,
+            src_dict=corpus.dict_digest(self.src_dict),
+            trg_dict=corpus.dict_digest(self.trg_dict))
+        cached = corpus.load_cache(cache_path)
+        if cached is None:
+            arrays = self._build_data()
+            corpus.save_cache(cache_path, arrays, None)
+        else:
+            arrays, _ = cached
+        self.src_ids = arrays['src_ids']
+        self.trg_ids = arrays['trg_ids']
+        self.trg_ids_next = arrays['trg_ids_next']
+
+    def _build_data(self):
         # the index for start mark, end mark, and unk are the same in source
         # language and target language. Here uses the source language
         # dictionary to determine their indices.
@@ -189,33 +234,23 @@ class WMT16(Dataset):
         src_col = 0 if self.lang == "en" else 1
         trg_col = 1 - src_col
 
-        self.src_ids = []
-        self.trg_ids = []
-        self.trg_ids_next = []
-        with tarfile.open(self.data_file, mode="r") as f:
-            for line in f.extractfile("wmt16/{}".format(self.mode)):
-                line = cpt.to_text(line)
-                line_split = line.strip().split("\t")
-                if len(line_split) != 2:
-                    continue
-                src_words = line_split[src_col].split()
-                src_ids = [start_id] + [
-                    self.src_dict.get(w, unk_id) for w in src_words
-                ] + [end_id]
-
-                trg_words = line_split[trg_col].split()
-                trg_ids = [self.trg_dict.get(w, unk_id) for w in trg_words]
-
-                trg_ids_next = trg_ids + [end_id]
-                trg_ids = [start_id] + trg_ids
-
-                self.src_ids.append(src_ids)
-                self.trg_ids.append(trg_ids)
-                self.trg_ids_next.append(trg_ids_next)
+        words, fields = self._tokenize_file(self.mode)
+        src_ids = corpus.insert(
+            corpus.encode(fields[src_col],
+                          [self.src_dict.get(w, unk_id) for w in words]),
+            start_id, end_id)
+        trg_ids = corpus.encode(fields[trg_col],
+                                [self.trg_dict.get(w, unk_id) for w in words])
+        return {
+            'src_ids': src_ids,
+            'trg_ids': corpus.insert(trg_ids, start=start_id),
+            'trg_ids_next': corpus.insert(trg_ids, end=end_id),
+        }
 
     def __getitem__(self, idx):
-        return (np.array(self.src_ids[idx]), np.array(self.trg_ids[idx]),
-                np.array(self.trg_ids_next[idx]))
+        return (self.src_ids[idx].astype('int64'),
+                self.trg_ids[idx].astype('int64'),
+                self.trg_ids_next[idx].astype('int64'))
 
     def __len__(self):
         return len(self.src_ids)
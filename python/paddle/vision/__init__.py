@@ -17,6 +17,7 @@ from . import models  # noqa: F401
 from . import transforms  # noqa: F401
 from . import datasets  # noqa: F401
 from . import ops  # noqa: F401
+from . import benchmark  # noqa: F401
 from .image import set_image_backend  # noqa: F401
 from .image import get_image_backend  # noqa: F401
 from .image import image_load  # noqa: F401
@@ -76,6 +77,7 @@ from .models import shufflenet_v2_x1_0  # noqa: F401
 from .models import shufflenet_v2_x1_5  # noqa: F401
 from .models import shufflenet_v2_x2_0  # noqa: F401
 from .models import shufflenet_v2_swish  # noqa: F401
+from .models import optimize_for_inference  # noqa: F401
 from .transforms import BaseTransform  # noqa: F401
 from .transforms import Compose  # noqa: F401
 from .transforms import Resize  # noqa: F401
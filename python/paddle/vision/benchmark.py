@@ -0,0 +1,557 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Throughput benchmark of the vision data pipeline, i.e. ``DataLoader`` on
+``DatasetFolder`` with ``paddle.vision.transforms``.
+
+Run from the command line, e.g.
+
+.. code-block:: bash
+
+    python -m paddle.vision.benchmark --num_workers 0 2 4 \\
+        --backends pil cv2 tensor --transforms eval train \\
+        --output pipeline.json
+
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import itertools
+import threading
+
+import numpy as np
+from PIL import Image
+
+import paddle
+from paddle.io import DataLoader
+from paddle.fluid.dataloader.collate import default_collate_fn
+from . import transforms as T
+from .image import get_image_backend, set_image_backend
+from .datasets.folder import DatasetFolder, _load_sample
+
+__all__ = []
+
+BACKENDS = ['pil', 'cv2', 'tensor']
+
+TRANSFORMS = ['none', 'eval', 'train', 'color', 'fused']
+
+
+def make_synthetic_dataset(root,
+                           num_classes=10,
+                           images_per_class=100,
+                           image_size=(375, 500),
+                           extension='.jpg',
+                           seed=0):
+    """
+    Generate a synthetic ``DatasetFolder`` tree of random images in the
+    layout of ``root/class_x/xxx.jpg``.
+
+    Images are smooth random patterns with noise, so that they compress
+    like photos rather than white noise.
+
+    Args:
+        root (str): Directory to write images to, created if not exists.
+        num_classes (int, optional): Number of class directories.
+            Default: 10.
+        images_per_class (int, optional): Number of images in each class
+            directory. Default: 100.
+        image_size (tuple, optional): (height, width) of images.
+            Default: (375, 500).
+        extension (str, optional): File extension decides the image
+            format. Default: '.jpg'.
+        seed (int, optional): Random seed. Default: 0.
+
+    Returns:
+        str: :attr:`root`.
+    """
+    rng = np.random.RandomState(seed)
+    height, width = image_size
+    ys = np.linspace(0, 1, height, dtype='float32')[:, None, None]
+    xs = np.linspace(0, 1, width, dtype='float32')[None, :, None]
+    for c in range(num_classes):
+        class_dir = os.path.join(root, 'class_{}'.format(c))
+        if not os.path.exists(class_dir):
+            os.makedirs(class_dir)
+        for i in range(images_per_class):
+            freq, phase = rng.uniform(1, 8, (2, 3)), rng.uniform(0, 6, (2, 3))
+            img = np.sin(ys * freq[0] + phase[0]) * np.cos(xs * freq[1] +
+                                                           phase[1])
+            img = (img + 1) * 100 + rng.uniform(0, 55, (height, width, 3))
+            Image.fromarray(img.astype('uint8')).save(
+                os.path.join(class_dir, '{:05d}{}'.format(i, extension)))
+    return root
+
+
+def _build_transform(name, backend, size=224):
+    if name == 'none':
+        ops = []
+    elif name == 'eval':
+        ops = [T.Resize(int(size / 0.875)), T.CenterCrop(size)]
+    elif name in ['train', 'fused']:
+        ops = [T.RandomResizedCrop(size), T.RandomHorizontalFlip()]
+    elif name == 'color':
+        if backend == 'tensor':
+            raise ValueError("ColorJitter does not support tensor images")
+        ops = [
+            T.RandomResizedCrop(size), T.RandomHorizontalFlip(),
+            T.ColorJitter(0.4, 0.4, 0.4)
+        ]
+    else:
+        raise ValueError("transform should be one of {}, but got {}".format(
+            TRANSFORMS, name))
+
+    if backend == 'tensor':
+        ops = [T.ToTensor()] + ops + [T.Normalize(0.5, 0.5)]
+    else:
+        ops = ops + [T.Transpose(), T.Normalize(127.5, 127.5)]
+    if name == 'fused':
+        return T.FusedCompose(ops)
+    return T.Compose(ops)
+
+
+class _TimedDatasetFolder(DatasetFolder):
+    """DatasetFolder returns seconds of decoding and transform as well."""
+
+    def __getitem__(self, index):
+        path, target = self.samples[index]
+        start = time.time()
+        sample = _load_sample(path, self.loader, self.transform, self.cache)
+        decoded = time.time()
+        if self.transform is not None:
+            sample = self.transform(sample)
+        end = time.time()
+        return sample, np.array(
+            [target], dtype='int64'), np.array(
+                [decoded - start, end - decoded], dtype='float64')
+
+
+class _TimedCollate(object):
+    """
+    Collate function appends seconds of collation and the time when
+    collation is done, to measure latency of sending batches from workers.
+    """
+
+    def __call__(self, batch):
+        start = time.time()
+        batch = default_collate_fn(batch)
+        end = time.time()
+        batch.append(np.array([end - start, end], dtype='float64'))
+        return batch
+
+
+def _rss(pid):
+    with open('/proc/{}/statm'.format(pid)) as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def _children(pid):
+    children = []
+    task_dir = '/proc/{}/task'.format(pid)
+    for tid in os.listdir(task_dir):
+        try:
+            with open(os.path.join(task_dir, tid, 'children')) as f:
+                children.extend(int(p) for p in f.read().split())
+        except (IOError, OSError):
+            # thread exited
+            pass
+    return children
+
+
+class _PeakRSSMonitor(threading.Thread):
+    """
+    Sample resident memory of this process and its child processes, i.e.
+    DataLoader workers, only works on Linux.
+    """
+
+    def __init__(self, interval=0.05):
+        super(_PeakRSSMonitor, self).__init__()
+        self.daemon = True
+        self.interval = interval
+        self.main_peak = 0
+        self.workers_peak = 0
+        self._stop_event = threading.Event()
+
+    def _sample(self):
+        pid = os.getpid()
+        self.main_peak = max(self.main_peak, _rss(pid))
+        workers = 0
+        for child in _children(pid):
+            try:
+                workers += _rss(child)
+            except (IOError, OSError):
+                # worker exited
+                pass
+        self.workers_peak = max(self.workers_peak, workers)
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self._sample()
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self._sample()
+
+
+def _supports_rss_monitor():
+    return os.path.exists('/proc/{}/task/{}/children'.format(os.getpid(),
+                                                             os.getpid()))
+
+
+def _mean(values):
+    return float(np.mean(values)) * 1000. if len(values) > 0 else 0.
+
+
+def benchmark_pipeline(root,
+                       backend='pil',
+                       transform='train',
+                       num_workers=0,
+                       use_shared_memory=True,
+                       batch_size=32,
+                       num_batches=None,
+                       warmup=2,
+                       worker_mode='process',
+                       image_size=224):
+    """
+    Measure throughput of ``DataLoader`` loading ``DatasetFolder`` of
+    :attr:`root` with one configuration.
+
+    Per-stage latencies are measured in the pipeline: ``decode`` and
+    ``transform`` are milliseconds per sample in workers, ``collate`` is
+    milliseconds per batch in workers, and ``ipc`` is milliseconds from
+    the end of collation in a worker to the batch returned by the
+    iterator in the main process, which includes time waiting in the
+    prefetch queues.
+
+    Args:
+        root (str): Root directory of the ``DatasetFolder``.
+        backend (str, optional): 'pil', 'cv2' or 'tensor'. Images are
+            decoded by the image backend 'pil' or 'cv2', and converted to
+            ``paddle.Tensor`` before transforms for 'tensor'.
+            Default: 'pil'.
+        transform (str, optional): Name of the transform chain, one of
+            'none', 'eval' (Resize + CenterCrop), 'train' (RandomResizedCrop
+            + RandomHorizontalFlip), 'color' ('train' + ColorJitter) and
+            'fused' ('train' by FusedCompose). All chains end with
+            converting to normalized CHW image. Default: 'train'.
+        num_workers (int, optional): ``num_workers`` of ``DataLoader``.
+            Default: 0.
+        use_shared_memory (bool, optional): ``use_shared_memory`` of
+            ``DataLoader``. Default: True.
+        batch_size (int, optional): Batch size. Default: 32.
+        num_batches (int, optional): Number of batches to load, Default:
+            None, one epoch.
+        warmup (int, optional): Number of first batches excluded from
+            throughput, which includes the startup of workers. Default: 2.
+        worker_mode (str, optional): ``worker_mode`` of ``DataLoader``.
+            Default: 'process'.
+        image_size (int, optional): Output size of transforms. Default: 224.
+
+    Returns:
+        dict: The configuration and results, including ``throughput``
+            (images per second), ``latency`` (per-stage milliseconds),
+            ``peak_rss`` (bytes of the main process and sum of workers,
+            None if not supported), ``prefetch`` and ``workers``
+            statistics of the iterator.
+    """
+    if backend not in BACKENDS:
+        raise ValueError("backend should be one of {}, but got {}".format(
+            BACKENDS, backend))
+
+    config = {
+        'backend': backend,
+        'transform': transform,
+        'num_workers': num_workers,
+        'use_shared_memory': use_shared_memory,
+        'worker_mode': worker_mode,
+        'batch_size': batch_size,
+    }
+    origin_backend = get_image_backend()
+    set_image_backend('pil' if backend == 'tensor' else backend)
+    monitor = _PeakRSSMonitor() if _supports_rss_monitor() else None
+    try:
+        dataset = _TimedDatasetFolder(
+            root, transform=_build_transform(transform, backend, image_size))
+        loader = DataLoader(
+            dataset,
+            batch_size=batch_size,
+            shuffle=True,
+            drop_last=True,
+            num_workers=num_workers,
+            use_shared_memory=use_shared_memory,
+            worker_mode=worker_mode,
+            collate_fn=_TimedCollate())
+        if num_batches is None:
+            num_batches = len(loader)
+        assert num_batches > warmup, \
+            "num_batches should be larger than warmup, increase images or " \
+            "decrease batch_size"
+
+        if monitor is not None:
+            monitor.start()
+        decode, trans, collate, ipc = [], [], [], []
+        start = time.time()
+        batches = 0
+        while batches < num_batches:
+            iterator = iter(loader)
+            for data in iterator:
+                received = time.time()
+                stage_times = data[2].numpy()
+                collate_info = data[3].numpy()
+                decode.extend(stage_times[:, 0])
+                trans.extend(stage_times[:, 1])
+                collate.append(collate_info[0])
+                ipc.append(received - collate_info[1])
+                batches += 1
+                if batches == warmup:
+                    # do not count the startup of workers
+                    start = time.time()
+                    decode, trans, collate, ipc = [], [], [], []
+                if batches >= num_batches:
+                    break
+            prefetch = iterator.get_prefetch_stats()
+            workers = iterator.get_worker_stats() if hasattr(
+                iterator, 'get_worker_stats') else None
+            del iterator
+        elapsed = time.time() - start
+    finally:
+        if monitor is not None and monitor.ident is not None:
+            monitor.stop()
+        set_image_backend(origin_backend)
+
+    config.update({
+        'batches': num_batches - warmup,
+        'elapsed': elapsed,
+        'throughput': (num_batches - warmup) * batch_size / elapsed,
+        'latency': {
+            'decode': _mean(decode),
+            'transform': _mean(trans),
+            'collate': _mean(collate),
+            'ipc': _mean(ipc),
+        },
+        'peak_rss': {
+            'main': monitor.main_peak,
+            'workers': monitor.workers_peak,
+        } if monitor is not None else None,
+        'prefetch': prefetch,
+        'workers': workers,
+    })
+    return config
+
+
+def run_benchmark(root=None,
+                  backends=('pil', ),
+                  transforms=('train', ),
+                  num_workers=(0, ),
+                  use_shared_memory=(True, ),
+                  worker_modes=('process', ),
+                  batch_size=32,
+                  num_batches=None,
+                  warmup=2,
+                  num_classes=10,
+                  images_per_class=100,
+                  source_size=(375, 500),
+                  output=None,
+                  verbose=True):
+    """
+    Sweep configurations of the vision data pipeline by
+    :ref:`api_paddle_vision_benchmark_benchmark_pipeline` and report
+    results as JSON.
+
+    Args:
+        root (str, optional): Root directory of ``DatasetFolder``. Default:
+            None, a synthetic dataset is generated in a temporary directory
+            and removed after the benchmark.
+        backends (list|tuple, optional): Backends to sweep, see
+            ``benchmark_pipeline``. Default: ('pil', ).
+        transforms (list|tuple, optional): Transform chains to sweep, see
+            ``benchmark_pipeline``. Default: ('train', ).
+        num_workers (list|tuple, optional): ``num_workers`` to sweep.
+            Default: (0, ).
+        use_shared_memory (list|tuple, optional): ``use_shared_memory`` to
+            sweep. Default: (True, ).
+        worker_modes (list|tuple, optional): ``worker_mode`` to sweep.
+            Default: ('process', ).
+        batch_size (int, optional): Batch size. Default: 32.
+        num_batches (int, optional): Number of batches to load for each
+            configuration. Default: None, one epoch.
+        warmup (int, optional): Number of first batches excluded from
+            throughput. Default: 2.
+        num_classes (int, optional): Number of classes of the synthetic
+            dataset. Default: 10.
+        images_per_class (int, optional): Number of images per class of
+            the synthetic dataset. Default: 100.
+        source_size (tuple, optional): (height, width) of synthetic images.
+            Default: (375, 500).
+        output (str, optional): Path of the JSON file to write results.
+            Default: None.
+        verbose (bool, optional): Whether to print a line for each
+            configuration. Default: True.
+
+    Returns:
+        dict: ``environment`` and ``results``, a list of results of each
+            configuration. Failed configurations have ``error`` instead,
+            e.g. 'cv2' backend without OpenCV installed.
+    """
+    temp_dir = None
+    if root is None:
+        temp_dir = tempfile.mkdtemp(prefix='paddle_vision_benchmark_')
+        root = make_synthetic_dataset(temp_dir, num_classes,
+                                      images_per_class, source_size)
+
+    results = []
+    configs = set()
+    try:
+        for backend, transform, workers, shared_memory, worker_mode in \
+                itertools.product(backends, transforms, num_workers,
+                                  use_shared_memory, worker_modes):
+            # NOTE: shared memory is only used by multi-process workers
+            if workers == 0 or worker_mode == 'thread':
+                shared_memory = False
+            config = (backend, transform, workers, shared_memory,
+                      worker_mode if workers > 0 else 'process')
+            if config in configs:
+                continue
+            configs.add(config)
+
+            try:
+                result = benchmark_pipeline(
+                    root,
+                    backend=backend,
+                    transform=transform,
+                    num_workers=workers,
+                    use_shared_memory=shared_memory,
+                    batch_size=batch_size,
+                    num_batches=num_batches,
+                    warmup=warmup,
+                    worker_mode=worker_mode)
+            except Exception as e:
+                result = dict(
+                    zip([
+                        'backend', 'transform', 'num_workers',
+                        'use_shared_memory', 'worker_mode'
+                    ], config))
+                result['error'] = '{}: {}'.format(type(e).__name__, e)
+            results.append(result)
+
+            if verbose:
+                if 'error' in result:
+                    summary = result['error']
+                else:
+                    summary = '{:.1f} images/s, decode {:.2f} ms, ' \
+                              'transform {:.2f} ms, collate {:.2f} ms, ' \
+                              'ipc {:.2f} ms'.format(
+                                  result['throughput'],
+                                  *[result['latency'][k] for k in [
+                                      'decode', 'transform', 'collate', 'ipc'
+                                  ]])
+                print('backend={}, transform={}, num_workers={}, '
+                      'use_shared_memory={}, worker_mode={}: {}'.format(
+                          *(config + (summary, ))))
+                sys.stdout.flush()
+    finally:
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    report = {
+        'environment': {
+            'paddle': paddle.__version__,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'results': results,
+    }
+    if output is not None:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+def _str2bool(value):
+    return value.lower() in ['true', '1', 'yes']
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m paddle.vision.benchmark',
+        description='Throughput benchmark of the vision data pipeline.')
+    parser.add_argument(
+        '--root',
+        type=str,
+        default=None,
+        help='root of DatasetFolder, a synthetic dataset is generated if '
+        'not set')
+    parser.add_argument(
+        '--backends', type=str, nargs='+', default=['pil'], choices=BACKENDS)
+    parser.add_argument(
+        '--transforms',
+        type=str,
+        nargs='+',
+        default=['train'],
+        choices=TRANSFORMS)
+    parser.add_argument('--num_workers', type=int, nargs='+', default=[0])
+    parser.add_argument(
+        '--use_shared_memory', type=_str2bool, nargs='+', default=[True])
+    parser.add_argument(
+        '--worker_modes',
+        type=str,
+        nargs='+',
+        default=['process'],
+        choices=['process', 'thread'])
+    parser.add_argument('--batch_size', type=int, default=32)
+    parser.add_argument('--num_batches', type=int, default=None)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--num_classes', type=int, default=10)
+    parser.add_argument('--images_per_class', type=int, default=100)
+    parser.add_argument(
+        '--source_size',
+        type=int,
+        nargs=2,
+        default=[375, 500],
+        help='height and width of synthetic images')
+    parser.add_argument(
+        '--output', type=str, default=None, help='path of the JSON report')
+    args = parser.parse_args(args)
+
+    paddle.set_device('cpu')
+    report = run_benchmark(
+        root=args.root,
+        backends=args.backends,
+        transforms=args.transforms,
+        num_workers=args.num_workers,
+        use_shared_memory=args.use_shared_memory,
+        worker_modes=args.worker_modes,
+        batch_size=args.batch_size,
+        num_batches=args.num_batches,
+        warmup=args.warmup,
+        num_classes=args.num_classes,
+        images_per_class=args.images_per_class,
+        source_size=tuple(args.source_size),
+        output=args.output)
+    if args.output is None:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -20,6 +20,10 @@ from .flowers import Flowers  # noqa: F401
 from .cifar import Cifar10  # noqa: F401
 from .cifar import Cifar100  # noqa: F401
 from .voc2012 import VOC2012  # noqa: F401
+from .packed import PackedImageDataset  # noqa: F401
+from .packed import PackedShardSampler  # noqa: F401
+from .packed import pack_dataset_folder  # noqa: F401
+from .cache import DecodedImageCache  # noqa: F401
 
 __all__ = [ #noqa
     'DatasetFolder',
@@ -29,5 +33,9 @@ __all__ = [ #noqa
     'Flowers',
     'Cifar10',
     'Cifar100',
-    'VOC2012'
+    'VOC2012',
+    'PackedImageDataset',
+    'PackedShardSampler',
+    'pack_dataset_folder',
+    'DecodedImageCache'
 ]
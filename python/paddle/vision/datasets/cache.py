@@ -0,0 +1,406 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import mmap
+import hashlib
+import tempfile
+import multiprocessing
+
+import numpy as np
+from PIL import Image
+
+__all__ = []
+
+# shared memory is used if available, otherwise the cache file is created
+# in the temporary directory
+_SHM_DIR = "/dev/shm"
+
+# align each entry in data area to cache line
+_ALIGNMENT = 64
+
+# PIL image modes which can be restored from the array losslessly
+_CACHEABLE_MODES = ('L', 'RGB', 'RGBA', 'I', 'F')
+
+_MAX_NDIM = 4
+
+# the entry table is set associative, an image is cached in one of the
+# _WAYS slots of the bucket selected by the hash of its key, so a lookup
+# only scans the bucket
+_WAYS = 8
+
+_ENTRY_DTYPE = np.dtype([
+    ('valid', '<u1'),
+    ('key', '<u8'),
+    ('offset', '<i8'),
+    ('nbytes', '<i8'),
+    ('last_used', '<i8'),
+    ('ndim', '<i4'),
+    ('shape', '<i8', (_MAX_NDIM, )),
+    ('dtype', 'S8'),
+    ('mode', 'S8'),
+])
+
+# header counters
+_CLOCK = 0
+_HITS = 1
+_MISSES = 2
+_EVICTIONS = 3
+_HEADER_SIZE = 8
+
+
+def _align(size):
+    return (size + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def _hash_key(key):
+    # python hash of str is salted per process, use a stable hash which
+    # is the same in all DataLoader worker processes
+    digest = hashlib.md5(str(key).encode('utf-8')).digest()
+    return int(np.frombuffer(digest[:8], dtype='<u8')[0])
+
+
+class DecodedImageCache(object):
+    """Cache of decoded images shared among DataLoader worker processes.
+
+    Decoded images are stored in a memory-mapped file, which is created
+    in shared memory (``/dev/shm``) by default, or at :attr:`path` on a
+    local disk. The file is mapped before DataLoader workers are forked,
+    so all workers read and write the same cache. Total bytes of cached
+    images is limited by :attr:`capacity`, the least recently used images
+    are evicted when there is no space for a new image. Images are kept in
+    buckets of 8 entries chosen by the hash of their keys, so looking up an
+    image only scans one bucket, and if the bucket of a new image is full
+    its least recently used image is evicted.
+
+    Images are cached as decoded by the loader, random augmentations in
+    ``transform`` of datasets are applied after loading from the cache, so
+    only the decoding cost is saved from the second epoch on.
+
+    Both ``numpy.ndarray`` and ``PIL.Image`` in mode 'L', 'RGB', 'RGBA',
+    'I' and 'F' can be cached, other images are returned without caching.
+
+    Args:
+        capacity (int): Max bytes of cached images.
+        max_entries (int, optional): Max number of cached images, rounded
+            up to a multiple of 8. Default: None, which means
+            ``capacity // 16384``, and at least 1024.
+        path (str, optional): Path of the file to map. The file is created
+            and truncated when the cache is created. Default: None, a file
+            in shared memory is created and removed when the cache is
+            closed.
+
+    Examples:
+
+        .. code-block:: python
+
+            from paddle.io import DataLoader
+            from paddle.vision.datasets import DecodedImageCache, ImageFolder
+            import paddle.vision.transforms as T
+
+            # cache up to 8GB decoded images
+            cache = DecodedImageCache(8 << 30)
+            dataset = ImageFolder('path/to/images',
+                                  transform=T.RandomResizedCrop(224),
+                                  cache=cache)
+            loader = DataLoader(dataset, batch_size=32, num_workers=4)
+
+            for epoch in range(10):
+                for batch in loader:
+                    pass
+                print(cache.stats()['hit_rate'])
+
+    """
+
+    def __init__(self, capacity, max_entries=None, path=None):
+        assert isinstance(capacity, int) and capacity > 0, \
+            "capacity should be a positive integer"
+        if max_entries is None:
+            max_entries = max(capacity // 16384, 1024)
+        assert isinstance(max_entries, int) and max_entries > 0, \
+            "max_entries should be a positive integer"
+
+        self.capacity = capacity
+        self._num_buckets = (max_entries + _WAYS - 1) // _WAYS
+        self.max_entries = self._num_buckets * _WAYS
+
+        self._header_bytes = _align(_HEADER_SIZE * 8)
+        self._table_bytes = _align(self.max_entries * _ENTRY_DTYPE.itemsize)
+        self._size = self._header_bytes + self._table_bytes + _align(capacity)
+
+        if path is None:
+            cache_dir = _SHM_DIR if os.path.isdir(
+                _SHM_DIR) else tempfile.gettempdir()
+            fd, path = tempfile.mkstemp(
+                prefix='paddle_image_cache_', dir=cache_dir)
+            self._remove_file = True
+        else:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+            self._remove_file = False
+        try:
+            # file is sparse, pages are only allocated when written
+            os.ftruncate(fd, self._size)
+        finally:
+            os.close(fd)
+
+        self.path = path
+        self._owner_pid = os.getpid()
+        self._lock = multiprocessing.Lock()
+        self._open()
+
+    def _open(self):
+        fd = os.open(self.path, os.O_RDWR)
+        try:
+            self._buffer = mmap.mmap(fd, self._size)
+        finally:
+            os.close(fd)
+        self._header = np.ndarray(
+            (_HEADER_SIZE, ), dtype='<i8', buffer=self._buffer)
+        self._entries = np.ndarray(
+            (self.max_entries, ),
+            dtype=_ENTRY_DTYPE,
+            buffer=self._buffer,
+            offset=self._header_bytes)
+        self._data = np.ndarray(
+            (self.capacity, ),
+            dtype=np.uint8,
+            buffer=self._buffer,
+            offset=self._header_bytes + self._table_bytes)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in ['_buffer', '_header', '_entries', '_data']:
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._open()
+
+    def _bucket(self, key):
+        # first slot of the bucket of key
+        return key % self._num_buckets * _WAYS
+
+    def _find(self, key):
+        start = self._bucket(key)
+        bucket = self._entries[start:start + _WAYS]
+        slots = np.flatnonzero((bucket['key'] == key) & (bucket['valid'] == 1))
+        return start + int(slots[0]) if len(slots) > 0 else None
+
+    def _free_slot(self, key):
+        # a free slot in the bucket of key, the least recently used image
+        # of the bucket is evicted if the bucket is full
+        start = self._bucket(key)
+        bucket = self._entries[start:start + _WAYS]
+        free = np.flatnonzero(bucket['valid'] == 0)
+        if len(free) > 0:
+            return start + int(free[0])
+        slot = start + int(np.argmin(bucket['last_used']))
+        self._entries['valid'][slot] = 0
+        self._header[_EVICTIONS] += 1
+        return slot
+
+    def _tick(self):
+        self._header[_CLOCK] += 1
+        return self._header[_CLOCK]
+
+    def _evict_lru(self):
+        valid = np.flatnonzero(self._entries['valid'] == 1)
+        if len(valid) == 0:
+            return False
+        slot = valid[np.argmin(self._entries['last_used'][valid])]
+        self._entries['valid'][slot] = 0
+        self._header[_EVICTIONS] += 1
+        return True
+
+    def _find_space(self, nbytes):
+        # first fit in gaps among cached entries
+        valid = np.flatnonzero(self._entries['valid'] == 1)
+        if len(valid) == 0:
+            return 0
+        starts = self._entries['offset'][valid]
+        order = np.argsort(starts)
+        starts = starts[order]
+        ends = starts + (self._entries['nbytes'][valid][order] +
+                         _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+        gap_starts = np.concatenate([[0], ends])
+        gap_ends = np.concatenate([starts, [self.capacity]])
+        fits = np.flatnonzero(gap_ends - gap_starts >= nbytes)
+        return int(gap_starts[fits[0]]) if len(fits) > 0 else None
+
+    def get(self, key):
+        """
+        Get the cached image of :attr:`key`, return None if not cached.
+
+        Args:
+            key (str|tuple): Key of the image, e.g. path of the image file.
+
+        Returns:
+            numpy.ndarray|PIL.Image|None: Copy of the cached image.
+        """
+        key = _hash_key(key)
+        with self._lock:
+            slot = self._find(key)
+            if slot is None:
+                self._header[_MISSES] += 1
+                return None
+            entry = self._entries[slot]
+            entry['last_used'] = self._tick()
+            self._header[_HITS] += 1
+
+            offset, nbytes = int(entry['offset']), int(entry['nbytes'])
+            shape = tuple(entry['shape'][:entry['ndim']])
+            # copy out while holding the lock, the space may be reused by
+            # other workers once the entry is evicted
+            image = self._data[offset:offset + nbytes].view(
+                np.dtype(entry['dtype'].decode())).reshape(shape).copy()
+            mode = entry['mode'].decode()
+
+        if mode:
+            return Image.fromarray(image, mode=mode)
+        return image
+
+    def put(self, key, image):
+        """
+        Put :attr:`image` into the cache, the least recently used images
+        are evicted if the cache is full.
+
+        Args:
+            key (str|tuple): Key of the image, e.g. path of the image file.
+            image (numpy.ndarray|PIL.Image): The decoded image.
+
+        Returns:
+            bool: Whether the image is cached.
+        """
+        mode = ''
+        if isinstance(image, Image.Image):
+            if image.mode not in _CACHEABLE_MODES:
+                return False
+            mode = image.mode
+        elif not isinstance(image, np.ndarray):
+            return False
+
+        array = np.ascontiguousarray(image)
+        if array.dtype.hasobject or array.ndim > _MAX_NDIM or \
+                array.nbytes == 0 or array.nbytes > self.capacity:
+            return False
+
+        key = _hash_key(key)
+        with self._lock:
+            if self._find(key) is not None:
+                # already cached by other workers
+                return True
+
+            slot = self._free_slot(key)
+
+            offset = self._find_space(array.nbytes)
+            while offset is None and self._evict_lru():
+                offset = self._find_space(array.nbytes)
+            if offset is None:
+                return False
+
+            self._data[offset:offset + array.nbytes] = array.reshape(
+                [-1]).view(np.uint8)
+
+            entry = self._entries[slot]
+            entry['key'] = key
+            entry['offset'] = offset
+            entry['nbytes'] = array.nbytes
+            entry['last_used'] = self._tick()
+            entry['ndim'] = array.ndim
+            entry['shape'][:array.ndim] = array.shape
+            entry['dtype'] = array.dtype.str.encode()
+            entry['mode'] = mode.encode()
+            entry['valid'] = 1
+        return True
+
+    def get_or_load(self, key, load_fn):
+        """
+        Get the cached image of :attr:`key`, or load it by :attr:`load_fn`
+        and put it into the cache if not cached.
+
+        Args:
+            key (str|tuple): Key of the image, e.g. path of the image file.
+            load_fn (callable): Function without arguments to load the
+                image.
+
+        Returns:
+            numpy.ndarray|PIL.Image: The decoded image.
+        """
+        image = self.get(key)
+        if image is None:
+            image = load_fn()
+            self.put(key, image)
+        return image
+
+    def stats(self):
+        """
+        Statistics of the cache accumulated among all processes.
+
+        Returns:
+            dict: Statistics with keys 'hits', 'misses', 'hit_rate',
+                'evictions', 'entries', 'bytes' and 'capacity'.
+        """
+        with self._lock:
+            hits = int(self._header[_HITS])
+            misses = int(self._header[_MISSES])
+            evictions = int(self._header[_EVICTIONS])
+            valid = self._entries['valid'] == 1
+            entries = int(np.sum(valid))
+            nbytes = int(np.sum(self._entries['nbytes'][valid]))
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': float(hits) / total if total > 0 else 0.,
+            'evictions': evictions,
+            'entries': entries,
+            'bytes': nbytes,
+            'capacity': self.capacity,
+        }
+
+    def reset_stats(self):
+        """Reset the hit, miss and eviction counters."""
+        with self._lock:
+            self._header[_HITS:_EVICTIONS + 1] = 0
+
+    def clear(self):
+        """Remove all cached images."""
+        with self._lock:
+            self._entries['valid'] = 0
+
+    def __len__(self):
+        return int(np.sum(self._entries['valid'] == 1))
+
+    def close(self):
+        """
+        Unmap the cache file, the file is removed if it is created by
+        the cache in shared memory.
+        """
+        if getattr(self, '_buffer', None) is None:
+            return
+        self._header = self._entries = self._data = None
+        try:
+            self._buffer.close()
+        except BufferError:
+            pass
+        self._buffer = None
+        if self._remove_file and os.getpid() == self._owner_pid:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+    def __del__(self):
+        self.close()
@@ -22,7 +22,8 @@ from six.moves import cPickle as pickle
 
 import paddle
 from paddle.io import Dataset
-from paddle.dataset.common import _check_exists_and_download
+from paddle.fluid.dataloader.collate import default_collate_fn
+from paddle.dataset.common import _check_exists_and_download, _load_cached_arrays
 
 __all__ = []
 
@@ -135,30 +136,51 @@ class Cifar10(Dataset):
         self.flag = MODE_FLAG_MAP[self.mode + '10']
 
     def _load_data(self):
-        self.data = []
-        with tarfile.open(self.data_file, mode='r') as f:
-            names = (each_item.name for each_item in f
-                     if self.flag in each_item.name)
-
-            names = sorted(list(names))
-
-            for name in names:
-                batch = pickle.load(f.extractfile(name), encoding='bytes')
-
-                data = batch[six.b('data')]
-                labels = batch.get(
-                    six.b('labels'), batch.get(six.b('fine_labels'), None))
-                assert labels is not None
-                for sample, label in six.moves.zip(data, labels):
-                    self.data.append((sample, label))
+        # samples are kept in a contiguous uint8 array in HWC layout, which
+        # is cached as .npy files next to the data file and memory-mapped
+        def parse():
+            images = []
+            labels = []
+            with tarfile.open(self.data_file, mode='r') as f:
+                names = (each_item.name for each_item in f
+                         if self.flag in each_item.name)
+
+                names = sorted(list(names))
+
+                for name in names:
+                    batch = pickle.load(f.extractfile(name), encoding='bytes')
+
+                    data = batch[six.b('data')]
+                    batch_labels = batch.get(
+                        six.b('labels'), batch.get(six.b('fine_labels'), None))
+                    assert batch_labels is not None
+                    images.append(
+                        np.asarray(data, dtype='uint8').reshape(
+                            [-1, 3, 32, 32]))
+                    labels.append(np.asarray(batch_labels, dtype='int64'))
+
+            images = np.concatenate(images).transpose([0, 2, 3, 1])
+            return [np.ascontiguousarray(images), np.concatenate(labels)]
+
+        prefix = self.data_file
+        if prefix.endswith('.tar.gz'):
+            prefix = prefix[:-len('.tar.gz')]
+        cache_files = [
+            '{}.{}.images.npy'.format(prefix, self.flag),
+            '{}.{}.labels.npy'.format(prefix, self.flag)
+        ]
+        self.images, self.labels = _load_cached_arrays(self.data_file,
+                                                       cache_files, parse)
 
     def __getitem__(self, idx):
-        image, label = self.data[idx]
-        image = np.reshape(image, [3, 32, 32])
-        image = image.transpose([1, 2, 0])
+        image, label = self.images[idx], self.labels[idx]
 
         if self.backend == 'pil':
-            image = Image.fromarray(image.astype('uint8'))
+            image = Image.fromarray(np.asarray(image))
+        else:
+            # NOTE: images may be memory-mapped read-only, copy it so that
+            # transforms can modify it inplace
+            image = np.array(image)
         if self.transform is not None:
             image = self.transform(image)
 
@@ -167,8 +189,18 @@ class Cifar10(Dataset):
 
         return image.astype(self.dtype), np.array(label).astype('int64')
 
+    def __getitems__(self, indices):
+        if self.backend == 'cv2' and self.transform is None:
+            # gather the whole batch from the arrays at once, which is the
+            # same as stacking samples got by __getitem__
+            indices = np.asarray(indices, dtype='int64')
+            return [
+                self.images[indices].astype(self.dtype), self.labels[indices]
+            ]
+        return default_collate_fn([self[idx] for idx in indices])
+
     def __len__(self):
-        return len(self.data)
+        return len(self.labels)
 
 
 class Cifar100(Cifar10):
@@ -16,6 +16,7 @@ from __future__ import print_function
 
 import os
 import io
+import functools
 import tarfile
 import numpy as np
 from PIL import Image
@@ -59,6 +60,10 @@ class Flowers(Dataset):
             PIL.Image or numpy.ndarray. Should be one of {'pil', 'cv2'}. 
             If this option is not set, will get backend from ``paddle.vsion.get_image_backend`` ,
             default backend is 'pil'. Default: None.
+        cache(DecodedImageCache, optional): cache of decoded images shared among
+            DataLoader workers, images are loaded from it instead of decoded again
+            if cached. :attr:`transform` is applied after loading from the cache.
+            Default: None.
 
     Examples:
         
@@ -81,7 +86,8 @@ class Flowers(Dataset):
                  mode='train',
                  transform=None,
                  download=True,
-                 backend=None):
+                 backend=None,
+                 cache=None):
         assert mode.lower() in ['train', 'valid', 'test'], \
                 "mode should be 'train', 'valid' or 'test', but got {}".format(mode)
 
@@ -111,6 +117,7 @@ class Flowers(Dataset):
                 setid_file, SETID_URL, SETID_MD5, 'flowers', download)
 
         self.transform = transform
+        self.cache = cache
 
         data_tar = tarfile.open(data_file)
         self.data_path = data_file.replace(".tgz", "/")
@@ -122,15 +129,22 @@ class Flowers(Dataset):
         self.labels = scio.loadmat(label_file)['labels'][0]
         self.indexes = scio.loadmat(setid_file)[flag][0]
 
+    def _load_image(self, path):
+        if self.backend == 'pil':
+            return Image.open(path)
+        return np.array(Image.open(path))
+
+    def _load(self, path):
+        if self.cache is None:
+            return self._load_image(path)
+        return self.cache.get_or_load(path,
+                                      functools.partial(self._load_image, path))
+
     def __getitem__(self, idx):
         index = self.indexes[idx]
         label = np.array([self.labels[index - 1]])
         img_name = "jpg/image_%05d.jpg" % index
-        image = os.path.join(self.data_path, img_name)
-        if self.backend == 'pil':
-            image = Image.open(image)
-        elif self.backend == 'cv2':
-            image = np.array(Image.open(image))
+        image = self._load(os.path.join(self.data_path, img_name))
 
         if self.transform is not None:
             image = self.transform(image)
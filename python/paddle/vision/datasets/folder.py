@@ -14,6 +14,9 @@
 
 import os
 import sys
+import pickle
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 
 import paddle
@@ -39,7 +42,122 @@ def has_valid_extension(filename, extensions):
     return filename.lower().endswith(extensions)
 
 
-def make_dataset(dir, class_to_idx, extensions, is_valid_file=None):
+class _DirectoryIndex(object):
+    """
+    Listing of directory trees which can be cached on disk.
+
+    Listing of each directory is keyed by its mtime, which changes when
+    entries are added into, removed from or renamed in the directory. A
+    cached listing is reused if the mtime is not changed, so only changed
+    directories are listed again on restart. Directories can be walked
+    from multiple threads.
+    """
+
+    _VERSION = 1
+
+    def __init__(self, cache_file=None):
+        self.cache_file = cache_file
+        self._cached = {}
+        self._listings = {}
+
+        if cache_file is not None and os.path.isfile(cache_file):
+            try:
+                with open(cache_file, 'rb') as f:
+                    cache = pickle.load(f)
+                if cache.get('version') == self._VERSION:
+                    self._cached = cache['listings']
+            except Exception:
+                # rebuild a broken cache
+                self._cached = {}
+
+    def _list(self, path):
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+        listing = self._cached.get(path)
+        if listing is None or listing[0] != mtime:
+            files, dirs = [], []
+            try:
+                for entry in os.scandir(path):
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    (dirs if is_dir else files).append(entry.name)
+            except OSError:
+                pass
+            listing = (mtime, sorted(files), sorted(dirs))
+        self._listings[path] = listing
+        return listing
+
+    def listdir(self, path):
+        """
+        List directory :attr:`path`, returns (fnames, dirnames) both sorted,
+        or None if :attr:`path` is not a directory.
+        """
+        listing = self._list(path)
+        if listing is None:
+            return None
+        return listing[1], listing[2]
+
+    def walk(self, top):
+        """
+        Walk directory tree like :code:`sorted(os.walk(top, followlinks=True))`,
+        returns a list of (root, fnames) sorted by root.
+        """
+        result = []
+        stack = [top]
+        while stack:
+            path = stack.pop()
+            listing = self._list(path)
+            if listing is None:
+                continue
+            result.append((path, listing[1]))
+            stack.extend(os.path.join(path, d) for d in listing[2])
+        result.sort(key=lambda x: x[0])
+        return result
+
+    def num_listed(self):
+        """Number of directories listed instead of loaded from cache."""
+        return sum(1 for path, listing in self._listings.items()
+                   if self._cached.get(path) is not listing)
+
+    def save(self):
+        """
+        Save listings into the cache file. Listings already in the cache file
+        are kept, so that a cache file can be shared by several directory
+        trees, e.g. the train and test splits of a dataset.
+        """
+        if self.cache_file is None:
+            return
+        listings = dict(self._cached)
+        listings.update(self._listings)
+        tmp_file = '{}.{}.tmp'.format(self.cache_file, os.getpid())
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(
+                {
+                    'version': self._VERSION,
+                    'listings': listings
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, self.cache_file)
+
+
+def _walk_dirs(index, dirs, num_workers=None):
+    if num_workers is not None and num_workers <= 1:
+        return [index.walk(d) for d in dirs]
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        return list(executor.map(index.walk, dirs))
+
+
+def make_dataset(dir,
+                 class_to_idx,
+                 extensions,
+                 is_valid_file=None,
+                 num_workers=None,
+                 cache_file=None,
+                 index=None):
     images = []
     dir = os.path.expanduser(dir)
 
@@ -48,12 +166,15 @@ def make_dataset(dir, class_to_idx, extensions, is_valid_file=None):
         def is_valid_file(x):
             return has_valid_extension(x, extensions)
 
-    for target in sorted(class_to_idx.keys()):
-        d = os.path.join(dir, target)
-        if not os.path.isdir(d):
-            continue
-        for root, _, fnames in sorted(os.walk(d, followlinks=True)):
-            for fname in sorted(fnames):
+    targets = sorted(class_to_idx.keys())
+    if index is None:
+        index = _DirectoryIndex(cache_file)
+    walks = _walk_dirs(index, [os.path.join(dir, target) for target in targets],
+                       num_workers)
+    index.save()
+    for target, walk in zip(targets, walks):
+        for root, fnames in walk:
+            for fname in fnames:
                 path = os.path.join(root, fname)
                 if is_valid_file(path):
                     item = (path, class_to_idx[target])
@@ -83,6 +204,15 @@ class DatasetFolder(Dataset):
         is_valid_file (callable|optional): A function that takes path of a file
             and check if the file is a valid file (used to check of corrupt files)
             both extensions and is_valid_file should not be passed.
+        scan_workers (int|optional): Number of threads to scan class directories
+            in parallel. Default: None, decided by ``ThreadPoolExecutor``.
+        index_cache (str|optional): Path of the file to cache directory listings.
+            If set, listings of directories not changed since last scan are loaded
+            from it instead of listed again. Default: None.
+        cache (DecodedImageCache|optional): Cache of decoded samples shared among
+            DataLoader workers, samples are loaded from it instead of decoded again
+            if cached. ``transform`` is applied after loading from the cache.
+            Default: None.
 
      Attributes:
         classes (list): List of the class names.
@@ -130,20 +260,30 @@ class DatasetFolder(Dataset):
                  loader=None,
                  extensions=None,
                  transform=None,
-                 is_valid_file=None):
+                 is_valid_file=None,
+                 scan_workers=None,
+                 index_cache=None,
+                 cache=None):
         self.root = root
         self.transform = transform
         if extensions is None:
             extensions = IMG_EXTENSIONS
-        classes, class_to_idx = self._find_classes(self.root)
-        samples = make_dataset(self.root, class_to_idx, extensions,
-                               is_valid_file)
+        index = _DirectoryIndex(index_cache)
+        classes, class_to_idx = self._find_classes(self.root, index)
+        samples = make_dataset(
+            self.root,
+            class_to_idx,
+            extensions,
+            is_valid_file,
+            scan_workers,
+            index=index)
         if len(samples) == 0:
             raise (RuntimeError(
                 "Found 0 directories in subfolders of: " + self.root + "\n"
                 "Supported extensions are: " + ",".join(extensions)))
 
         self.loader = default_loader if loader is None else loader
+        self.cache = cache
         self.extensions = extensions
 
         self.classes = classes
@@ -153,19 +293,24 @@ class DatasetFolder(Dataset):
 
         self.dtype = paddle.get_default_dtype()
 
-    def _find_classes(self, dir):
+    def _find_classes(self, dir, index=None):
         """
         Finds the class folders in a dataset.
 
         Args:
             dir (string): Root directory path.
+            index (_DirectoryIndex|optional): Index to list :attr:`dir` by.
+                Default: None, :attr:`dir` is listed directly.
 
         Returns:
             tuple: (classes, class_to_idx) where classes are relative to (dir), 
                     and class_to_idx is a dictionary.
 
         """
-        if sys.version_info >= (3, 5):
+        if index is not None:
+            listing = index.listdir(dir)
+            classes = [] if listing is None else list(listing[1])
+        elif sys.version_info >= (3, 5):
             # Faster and available in Python 3.5 and above
             classes = [d.name for d in os.scandir(dir) if d.is_dir()]
         else:
@@ -186,7 +331,7 @@ class DatasetFolder(Dataset):
             tuple: (sample, target) where target is class_index of the target class.
         """
         path, target = self.samples[index]
-        sample = self.loader(path)
+        sample = _load_sample(path, self.loader, self.transform, self.cache)
         if self.transform is not None:
             sample = self.transform(sample)
 
@@ -200,23 +345,42 @@ IMG_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.ppm', '.bmp', '.pgm', '.tif',
                   '.tiff', '.webp')
 
 
-def pil_loader(path):
+def pil_loader(path, target_size=None):
+    from paddle.vision.image import _draft
     with open(path, 'rb') as f:
         img = Image.open(f)
+        if target_size is not None:
+            _draft(img, target_size)
         return img.convert('RGB')
 
 
-def cv2_loader(path):
+def cv2_loader(path, target_size=None):
+    from paddle.vision.image import _imread
     cv2 = try_import('cv2')
-    return cv2.cvtColor(cv2.imread(path), cv2.COLOR_BGR2RGB)
+    return cv2.cvtColor(_imread(path, target_size), cv2.COLOR_BGR2RGB)
 
 
-def default_loader(path):
+def default_loader(path, target_size=None):
     from paddle.vision import get_image_backend
     if get_image_backend() == 'cv2':
-        return cv2_loader(path)
+        return cv2_loader(path, target_size)
     else:
-        return pil_loader(path)
+        return pil_loader(path, target_size)
+
+
+def _load_sample(path, loader, transform=None, cache=None):
+    key = path
+    if loader is default_loader:
+        # decode at reduced resolution if the transform resizes images
+        from paddle.vision.transforms.transforms import _get_decode_size
+        target_size = _get_decode_size(transform)
+        loader = functools.partial(default_loader, target_size=target_size)
+        # NOTE: images decoded at different sizes are cached separately, a
+        # cache may be shared by datasets with different transforms
+        key = (path, target_size)
+    if cache is None:
+        return loader(path)
+    return cache.get_or_load(key, functools.partial(loader, path))
 
 
 class ImageFolder(Dataset):
@@ -236,6 +400,15 @@ class ImageFolder(Dataset):
         is_valid_file (callable, optional): A function that takes path of a file
             and check if the file is a valid file (used to check of corrupt files)
             both extensions and is_valid_file should not be passed.
+        scan_workers (int, optional): Number of threads to scan sub directories
+            in parallel. Default: None, decided by ``ThreadPoolExecutor``.
+        index_cache (str, optional): Path of the file to cache directory listings.
+            If set, listings of directories not changed since last scan are loaded
+            from it instead of listed again. Default: None.
+        cache (DecodedImageCache, optional): Cache of decoded samples shared among
+            DataLoader workers, samples are loaded from it instead of decoded again
+            if cached. ``transform`` is applied after loading from the cache.
+            Default: None.
 
      Attributes:
         samples (list): List of sample path
@@ -277,7 +450,10 @@ class ImageFolder(Dataset):
                  loader=None,
                  extensions=None,
                  transform=None,
-                 is_valid_file=None):
+                 is_valid_file=None,
+                 scan_workers=None,
+                 index_cache=None,
+                 cache=None):
         self.root = root
         if extensions is None:
             extensions = IMG_EXTENSIONS
@@ -290,8 +466,20 @@ class ImageFolder(Dataset):
             def is_valid_file(x):
                 return has_valid_extension(x, extensions)
 
-        for root, _, fnames in sorted(os.walk(path, followlinks=True)):
-            for fname in sorted(fnames):
+        # walk sub directories of root in parallel
+        index = _DirectoryIndex(index_cache)
+        listing = index.listdir(path)
+        walk = []
+        if listing is not None:
+            walk.append((path, listing[0]))
+            sub_dirs = [os.path.join(path, d) for d in listing[1]]
+            for sub_walk in _walk_dirs(index, sub_dirs, scan_workers):
+                walk.extend(sub_walk)
+            walk.sort(key=lambda x: x[0])
+        index.save()
+
+        for root, fnames in walk:
+            for fname in fnames:
                 f = os.path.join(root, fname)
                 if is_valid_file(f):
                     samples.append(f)
@@ -302,6 +490,7 @@ class ImageFolder(Dataset):
                 "Supported extensions are: " + ",".join(extensions)))
 
         self.loader = default_loader if loader is None else loader
+        self.cache = cache
         self.extensions = extensions
         self.samples = samples
         self.transform = transform
@@ -315,7 +504,7 @@ class ImageFolder(Dataset):
             sample of specific index.
         """
         path = self.samples[index]
-        sample = self.loader(path)
+        sample = _load_sample(path, self.loader, self.transform, self.cache)
         if self.transform is not None:
             sample = self.transform(sample)
         return [sample]
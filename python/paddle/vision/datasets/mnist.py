@@ -22,11 +22,40 @@ from PIL import Image
 
 import paddle
 from paddle.io import Dataset
-from paddle.dataset.common import _check_exists_and_download
+from paddle.fluid.dataloader.collate import default_collate_fn
+from paddle.dataset.common import _check_exists_and_download, _load_cached_arrays
 
 __all__ = []
 
 
+class _FloatImages(object):
+    """
+    Float32 view of the uint8 MNIST images. The contiguous uint8 array is
+    kept as storage and samples are cast when they are indexed, so reading
+    ``MNIST.images`` gives float32 samples as it did before.
+    """
+
+    def __init__(self, images):
+        self._images = images
+
+    @property
+    def shape(self):
+        return self._images.shape
+
+    @property
+    def dtype(self):
+        return np.dtype('float32')
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            # keep the uint8 storage for `dataset.images = dataset.images[:n]`
+            return _FloatImages(self._images[idx])
+        return self._images[idx].astype('float32')
+
+    def __len__(self):
+        return len(self._images)
+
+
 class MNIST(Dataset):
     """
     Implementation of `MNIST <http://yann.lecun.com/exdb/mnist/>`_ dataset
@@ -113,57 +142,58 @@ class MNIST(Dataset):
 
         self.dtype = paddle.get_default_dtype()
 
-    def _parse_dataset(self, buffer_size=100):
-        self.images = []
-        self.labels = []
-        with gzip.GzipFile(self.image_path, 'rb') as image_file:
-            img_buf = image_file.read()
+    def _parse_dataset(self):
+        # images and labels are kept in contiguous arrays, which are cached
+        # as .npy files next to the downloaded files and memory-mapped
+        def parse_images():
+            with gzip.GzipFile(self.image_path, 'rb') as image_file:
+                img_buf = image_file.read()
+            # read from Big-endian
+            # get file info from magic byte
+            # image file : 16B
+            magic_img, image_num, rows, cols = struct.unpack_from('>IIII',
+                                                                  img_buf, 0)
+            images = np.frombuffer(
+                img_buf,
+                dtype=np.uint8,
+                count=image_num * rows * cols,
+                offset=struct.calcsize('>IIII'))
+            return [images.reshape([image_num, rows, cols])]
+
+        def parse_labels():
             with gzip.GzipFile(self.label_path, 'rb') as label_file:
                 lab_buf = label_file.read()
-
-                step_label = 0
-                offset_img = 0
-                # read from Big-endian
-                # get file info from magic byte
-                # image file : 16B
-                magic_byte_img = '>IIII'
-                magic_img, image_num, rows, cols = struct.unpack_from(
-                    magic_byte_img, img_buf, offset_img)
-                offset_img += struct.calcsize(magic_byte_img)
-
-                offset_lab = 0
-                # label file : 8B
-                magic_byte_lab = '>II'
-                magic_lab, label_num = struct.unpack_from(magic_byte_lab,
-                                                          lab_buf, offset_lab)
-                offset_lab += struct.calcsize(magic_byte_lab)
-
-                while True:
-                    if step_label >= label_num:
-                        break
-                    fmt_label = '>' + str(buffer_size) + 'B'
-                    labels = struct.unpack_from(fmt_label, lab_buf, offset_lab)
-                    offset_lab += struct.calcsize(fmt_label)
-                    step_label += buffer_size
-
-                    fmt_images = '>' + str(buffer_size * rows * cols) + 'B'
-                    images_temp = struct.unpack_from(fmt_images, img_buf,
-                                                     offset_img)
-                    images = np.reshape(images_temp, (buffer_size, rows *
-                                                      cols)).astype('float32')
-                    offset_img += struct.calcsize(fmt_images)
-
-                    for i in range(buffer_size):
-                        self.images.append(images[i, :])
-                        self.labels.append(
-                            np.array([labels[i]]).astype('int64'))
+            # label file : 8B
+            magic_lab, label_num = struct.unpack_from('>II', lab_buf, 0)
+            labels = np.frombuffer(
+                lab_buf,
+                dtype=np.uint8,
+                count=label_num,
+                offset=struct.calcsize('>II'))
+            return [labels.astype('int64').reshape([label_num, 1])]
+
+        self._images, = _load_cached_arrays(
+            self.image_path, [_npy_cache_file(self.image_path)], parse_images)
+        self.labels, = _load_cached_arrays(
+            self.label_path, [_npy_cache_file(self.label_path)], parse_labels)
+
+    @property
+    def images(self):
+        return _FloatImages(self._images)
+
+    @images.setter
+    def images(self, images):
+        if isinstance(images, _FloatImages):
+            images = images._images
+        self._images = images
 
     def __getitem__(self, idx):
-        image, label = self.images[idx], self.labels[idx]
-        image = np.reshape(image, [28, 28])
+        image, label = self._images[idx], self.labels[idx]
 
         if self.backend == 'pil':
-            image = Image.fromarray(image.astype('uint8'), mode='L')
+            image = Image.fromarray(np.asarray(image), mode='L')
+        else:
+            image = image.astype('float32')
 
         if self.transform is not None:
             image = self.transform(image)
@@ -173,10 +203,26 @@ class MNIST(Dataset):
 
         return image.astype(self.dtype), label.astype('int64')
 
+    def __getitems__(self, indices):
+        if self.backend == 'cv2' and self.transform is None:
+            # gather the whole batch from the arrays at once, which is the
+            # same as stacking samples got by __getitem__
+            indices = np.asarray(indices, dtype='int64')
+            return [
+                self._images[indices].astype(self.dtype), self.labels[indices]
+            ]
+        return default_collate_fn([self[idx] for idx in indices])
+
     def __len__(self):
         return len(self.labels)
 
 
+def _npy_cache_file(path):
+    if path.endswith('.gz'):
+        path = path[:-len('.gz')]
+    return path + '.npy'
+
+
 class FashionMNIST(MNIST):
     """
     Implementation `Fashion-MNIST <https://github.com/zalandoresearch/fashion-mnist>`_ dataset.
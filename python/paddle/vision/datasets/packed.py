@@ -0,0 +1,433 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import os
+import json
+import math
+import mmap
+
+import numpy as np
+from PIL import Image
+
+from paddle.io import Dataset, Sampler
+from paddle.utils import try_import
+
+from .folder import DatasetFolder, default_loader
+
+__all__ = []
+
+_META_FILE = 'meta.json'
+_INDEX_FILE = 'index.npy'
+_SHARD_FILE = 'shard-{:05d}.bin'
+_FORMAT_VERSION = 1
+
+# records of raw images are aligned so that they can be viewed as arrays
+# in any dtype without copying
+_ALIGNMENT = 64
+
+_INDEX_DTYPE = np.dtype([
+    ('shard', '<i4'),
+    ('offset', '<i8'),
+    ('length', '<i8'),
+    ('label', '<i8'),
+    ('height', '<i4'),
+    ('width', '<i4'),
+    ('channels', '<i4'),
+])
+
+
+def _align(size):
+    return (size + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def _read_raw(path, image_size):
+    img = default_loader(path)
+    if image_size is not None:
+        from paddle.vision.transforms import functional as F
+        img = F.resize(img, image_size)
+    img = np.asarray(img, dtype=np.uint8)
+    if img.ndim == 2:
+        img = img[:, :, np.newaxis]
+    return img
+
+
+def pack_dataset_folder(root,
+                        output_dir,
+                        mode='encoded',
+                        image_size=None,
+                        shard_size=1 << 30,
+                        extensions=None,
+                        is_valid_file=None,
+                        shuffle=True,
+                        seed=0):
+    """Packs a ``DatasetFolder`` tree into a few large shard files with an
+    offset index, which can be loaded by ``PackedImageDataset``.
+
+    Args:
+        root (str): Root directory of the ``DatasetFolder`` tree.
+        output_dir (str): Directory to save shard files and index, will be
+            created if not exists.
+        mode (str, optional): How images are stored, 'encoded' to store the
+            original image files, 'raw' to store decoded RGB images in uint8.
+            Images stored in 'raw' mode are loaded by ``PackedImageDataset``
+            as read-only arrays. Default: 'encoded'.
+        image_size (int|list|tuple, optional): Size to resize images to
+            before stored, only available in 'raw' mode, see
+            ``paddle.vision.transforms.resize``. Default: None, not resized.
+        shard_size (int, optional): Maximum size in bytes of each shard file,
+            a shard holds at least one image. Default: 1GB.
+        extensions (list[str]|tuple[str], optional): A list of allowed
+            extensions, same as ``DatasetFolder``. Default: None.
+        is_valid_file (callable, optional): Same as ``DatasetFolder``.
+            Default: None.
+        shuffle (bool, optional): Whether to shuffle images before packing,
+            so that each shard holds images of all classes. Default: True.
+        seed (int, optional): Random seed to shuffle images. Default: 0.
+
+    Returns:
+        list[str]: Paths of the shard files.
+
+    Examples:
+
+        .. code-block:: python
+
+            import os
+            import cv2
+            import tempfile
+            import numpy as np
+            from paddle.vision.datasets import pack_dataset_folder, PackedImageDataset
+
+            data_dir = tempfile.mkdtemp()
+            for i in range(2):
+                sub_dir = os.path.join(data_dir, 'class_' + str(i))
+                os.makedirs(sub_dir)
+                for j in range(2):
+                    fake_img = (np.random.random((32, 32, 3)) * 255).astype('uint8')
+                    cv2.imwrite(os.path.join(sub_dir, str(j) + '.jpg'), fake_img)
+
+            packed_dir = tempfile.mkdtemp()
+            pack_dataset_folder(data_dir, packed_dir, mode='raw', image_size=(16, 16))
+
+            dataset = PackedImageDataset(packed_dir)
+            image, label = dataset[0]
+            print(image.shape, label)
+
+    """
+    assert mode in ('encoded', 'raw'), \
+        "mode should be 'encoded' or 'raw', but got {}".format(mode)
+    assert image_size is None or mode == 'raw', \
+        "image_size is only available in 'raw' mode"
+    assert shard_size > 0, "shard_size should be a positive integer"
+
+    folder = DatasetFolder(
+        root,
+        loader=lambda path: path,
+        extensions=extensions,
+        is_valid_file=is_valid_file)
+    samples = list(folder.samples)
+    if shuffle:
+        np.random.RandomState(seed).shuffle(samples)
+
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    index = np.zeros(len(samples), dtype=_INDEX_DTYPE)
+    shard_paths = []
+    shard_file = None
+    offset = 0
+    try:
+        for i, (path, label) in enumerate(samples):
+            if mode == 'raw':
+                img = _read_raw(path, image_size)
+                data = img.tobytes()
+                height, width, channels = img.shape
+            else:
+                with open(path, 'rb') as f:
+                    data = f.read()
+                height = width = channels = 0
+
+            record_size = _align(len(data))
+            if shard_file is None or (offset > 0 and
+                                      offset + record_size > shard_size):
+                if shard_file is not None:
+                    shard_file.close()
+                shard_paths.append(
+                    os.path.join(output_dir,
+                                 _SHARD_FILE.format(len(shard_paths))))
+                shard_file = open(shard_paths[-1], 'wb')
+                offset = 0
+
+            shard_file.write(data)
+            shard_file.write(b'\0' * (record_size - len(data)))
+            index[i] = (len(shard_paths) - 1, offset, len(data), label,
+                        height, width, channels)
+            offset += record_size
+    finally:
+        if shard_file is not None:
+            shard_file.close()
+
+    np.save(os.path.join(output_dir, _INDEX_FILE), index)
+    meta = {
+        'version': _FORMAT_VERSION,
+        'mode': mode,
+        'classes': folder.classes,
+        'shards': [os.path.basename(p) for p in shard_paths],
+    }
+    with open(os.path.join(output_dir, _META_FILE), 'w') as f:
+        json.dump(meta, f)
+
+    return shard_paths
+
+
+class PackedImageDataset(Dataset):
+    """Image dataset packed by ``pack_dataset_folder``.
+
+    Shard files are read through ``mmap``, images stored in 'raw' mode are
+    returned as arrays viewing the mapped shard without copying or
+    decoding, images stored in 'encoded' mode are decoded from the mapped
+    shard directly. Records of each shard are contiguous in index, which
+    enables shard-level shuffling by ``PackedShardSampler``.
+
+    .. note::
+        Arrays of 'raw' images are read-only with the 'cv2' backend, as the
+        shard is mapped read-only. Transforms that modify images inplace
+        should copy them first, e.g. by ``np.array(image)``.
+
+    Args:
+        root (str): Directory of the packed dataset.
+        transform (callable, optional): A function/transform that takes in
+            a sample and returns a transformed version. Default: None.
+        backend (str, optional): Specifies which type of image to be
+            returned: PIL.Image or numpy.ndarray. Should be one of
+            {'pil', 'cv2'}. If this option is not set, will get backend
+            from ``paddle.vision.get_image_backend``. Default: None.
+
+    Attributes:
+        classes (list): List of the class names.
+        class_to_idx (dict): Dict with items (class_name, class_index).
+        targets (np.ndarray): The class_index value for each image in the dataset.
+
+    Examples:
+
+        .. code-block:: python
+
+            from paddle.io import BatchSampler, DataLoader
+            from paddle.vision.datasets import PackedImageDataset, PackedShardSampler
+            import paddle.vision.transforms as T
+
+            # packed by paddle.vision.datasets.pack_dataset_folder
+            dataset = PackedImageDataset('path/to/packed', transform=T.ToTensor())
+            sampler = PackedShardSampler(dataset, shuffle=True)
+            batch_sampler = BatchSampler(sampler=sampler, batch_size=32)
+            loader = DataLoader(dataset, batch_sampler=batch_sampler)
+
+    """
+
+    def __init__(self, root, transform=None, backend=None):
+        self.root = root
+        self.transform = transform
+
+        if backend is None:
+            from paddle.vision import get_image_backend
+            backend = get_image_backend()
+        if backend not in ['pil', 'cv2']:
+            raise ValueError(
+                "Expected backend are one of ['pil', 'cv2'], but got {}"
+                .format(backend))
+        self.backend = backend
+
+        with open(os.path.join(root, _META_FILE)) as f:
+            meta = json.load(f)
+        if meta['version'] != _FORMAT_VERSION:
+            raise ValueError("Unsupported packed dataset version {}".format(
+                meta['version']))
+        self.mode = meta['mode']
+        self.classes = meta['classes']
+        self.class_to_idx = {c: i for i, c in enumerate(self.classes)}
+        self._shard_files = meta['shards']
+
+        self._index = np.load(os.path.join(root, _INDEX_FILE))
+        self.targets = self._index['label']
+
+        # shards are mapped lazily in each DataLoader worker process
+        self._shards = [None] * len(self._shard_files)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_shards'] = [None] * len(self._shard_files)
+        return state
+
+    def _get_shard(self, shard_id):
+        if self._shards[shard_id] is None:
+            path = os.path.join(self.root, self._shard_files[shard_id])
+            with open(path, 'rb') as f:
+                self._shards[shard_id] = mmap.mmap(
+                    f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._shards[shard_id]
+
+    def shard_ranges(self):
+        """Index ranges of shards.
+
+        Returns:
+            list[tuple]: (start, end) index of the records in each shard.
+        """
+        shards = self._index['shard']
+        bounds = np.flatnonzero(np.diff(shards)) + 1
+        starts = [0] + bounds.tolist()
+        ends = bounds.tolist() + [len(shards)]
+        return list(zip(starts, ends)) if len(shards) > 0 else []
+
+    def _load(self, record):
+        buf = self._get_shard(int(record['shard']))
+        offset = int(record['offset'])
+        length = int(record['length'])
+
+        if self.mode == 'raw':
+            img = np.ndarray(
+                (int(record['height']), int(record['width']),
+                 int(record['channels'])),
+                dtype=np.uint8,
+                buffer=buf,
+                offset=offset)
+            if self.backend == 'pil':
+                return Image.fromarray(img.squeeze(-1) if img.shape[-1] == 1
+                                       else img)
+            return img
+
+        if self.backend == 'cv2':
+            cv2 = try_import('cv2')
+            data = np.frombuffer(buf, np.uint8, length, offset)
+            return cv2.cvtColor(
+                cv2.imdecode(data, cv2.IMREAD_COLOR), cv2.COLOR_BGR2RGB)
+        return Image.open(io.BytesIO(buf[offset:offset + length])).convert(
+            'RGB')
+
+    def __getitem__(self, idx):
+        record = self._index[idx]
+        image = self._load(record)
+        if self.transform is not None:
+            image = self.transform(image)
+
+        return image, int(record['label'])
+
+    def __len__(self):
+        return len(self._index)
+
+
+class PackedShardSampler(Sampler):
+    """Sampler of ``PackedImageDataset`` with shard-level shuffling.
+
+    In each epoch, order of shards and order of records in each shard are
+    shuffled, records of shuffled shards are concatenated and split into
+    contiguous parts of the same size for each rank, so that each process
+    reads a few shards instead of random records among all shards. Indices
+    are padded by repeating the first ones to be evenly divisible among
+    ranks.
+
+    Args:
+        dataset (PackedImageDataset): The packed dataset.
+        shuffle (bool, optional): Whether to shuffle shards and records
+            each epoch. Default: False.
+        num_replicas (int, optional): Number of processes in distributed
+            training, if not set, will get from ``ParallelEnv``. Default: None.
+        rank (int, optional): The rank of current process, if not set,
+            will get from ``ParallelEnv``. Default: None.
+        seed (int, optional): Random seed for shuffling, shuffled order of
+            each epoch is the same on all ranks. Default: 0.
+
+    Examples:
+
+        .. code-block:: python
+
+            from paddle.io import BatchSampler
+            from paddle.vision.datasets import PackedImageDataset, PackedShardSampler
+
+            dataset = PackedImageDataset('path/to/packed')
+            sampler = PackedShardSampler(dataset, shuffle=True)
+            batch_sampler = BatchSampler(sampler=sampler, batch_size=32)
+
+            for epoch in range(10):
+                sampler.set_epoch(epoch)
+                for indices in batch_sampler:
+                    pass
+
+    """
+
+    def __init__(self,
+                 dataset,
+                 shuffle=False,
+                 num_replicas=None,
+                 rank=None,
+                 seed=0):
+        assert isinstance(dataset, PackedImageDataset), \
+            "dataset should be a PackedImageDataset"
+        super(PackedShardSampler, self).__init__(dataset)
+        self.dataset = dataset
+        self.shuffle = shuffle
+        self.seed = seed
+        self.epoch = 0
+
+        from paddle.fluid.dygraph.parallel import ParallelEnv
+
+        if num_replicas is not None:
+            assert isinstance(num_replicas, int) and num_replicas > 0, \
+                "num_replicas should be a positive integer"
+            self.nranks = num_replicas
+        else:
+            self.nranks = ParallelEnv().nranks
+
+        if rank is not None:
+            assert isinstance(rank, int) and rank >= 0, \
+                "rank should be a non-negative integer"
+            self.local_rank = rank
+        else:
+            self.local_rank = ParallelEnv().local_rank
+
+        self.num_samples = int(math.ceil(len(dataset) * 1.0 / self.nranks))
+
+    def __iter__(self):
+        shards = self.dataset.shard_ranges()
+        rng = np.random.RandomState(self.seed + self.epoch)
+        if self.shuffle:
+            rng.shuffle(shards)
+
+        indices = []
+        for start, end in shards:
+            shard_indices = np.arange(start, end)
+            if self.shuffle:
+                rng.shuffle(shard_indices)
+            indices.extend(shard_indices.tolist())
+
+        total_size = self.num_samples * self.nranks
+        while 0 < len(indices) < total_size:
+            indices.extend(indices[:total_size - len(indices)])
+
+        start = self.local_rank * self.num_samples
+        return iter(indices[start:start + self.num_samples])
+
+    def __len__(self):
+        return self.num_samples
+
+    def set_epoch(self, epoch):
+        """
+        Sets epoch number. When :attr:`shuffle=True`, this number is added
+        to :attr:`seed` as the seed of random numbers, it should be set at
+        the beginning of each epoch to get different orderings among
+        epoches.
+
+        Args:
+            epoch (int): Epoch number.
+        """
+        self.epoch = epoch
@@ -15,6 +15,7 @@
 from __future__ import print_function
 
 import io
+import functools
 import tarfile
 import numpy as np
 from PIL import Image
@@ -53,6 +54,10 @@ class VOC2012(Dataset):
             PIL.Image or numpy.ndarray. Should be one of {'pil', 'cv2'}. 
             If this option is not set, will get backend from ``paddle.vsion.get_image_backend`` ,
             default backend is 'pil'. Default: None.
+        cache(DecodedImageCache, optional): cache of decoded images shared among
+            DataLoader workers, images are loaded from it instead of decoded again
+            if cached. :attr:`transform` is applied after loading from the cache.
+            Default: None.
 
     Examples:
 
@@ -91,7 +96,8 @@ class VOC2012(Dataset):
                  mode='train',
                  transform=None,
                  download=True,
-                 backend=None):
+                 backend=None,
+                 cache=None):
         assert mode.lower() in ['train', 'valid', 'test'], \
             "mode should be 'train', 'valid' or 'test', but got {}".format(mode)
 
@@ -111,6 +117,7 @@ class VOC2012(Dataset):
             self.data_file = _check_exists_and_download(
                 data_file, VOC_URL, VOC_MD5, CACHE_DIR, download)
         self.transform = transform
+        self.cache = cache
 
         # read dataset into memory
         self._load_anno()
@@ -136,18 +143,28 @@ class VOC2012(Dataset):
             self.data.append(data)
             self.labels.append(label)
 
+    def _load_image(self, name):
+        data = self.data_tar.extractfile(self.name2mem[name]).read()
+        image = Image.open(io.BytesIO(data))
+        if self.backend == 'cv2':
+            image = np.array(image)
+        return image
+
+    def _load(self, name):
+        if self.cache is None:
+            return self._load_image(name)
+        # NOTE: label images in palette mode are not cached by the 'pil'
+        # backend, since the palette cannot be restored from the array
+        return self.cache.get_or_load(
+            self.data_file + ':' + name,
+            functools.partial(self._load_image, name))
+
     def __getitem__(self, idx):
         data_file = self.data[idx]
         label_file = self.labels[idx]
 
-        data = self.data_tar.extractfile(self.name2mem[data_file]).read()
-        label = self.data_tar.extractfile(self.name2mem[label_file]).read()
-        data = Image.open(io.BytesIO(data))
-        label = Image.open(io.BytesIO(label))
-
-        if self.backend == 'cv2':
-            data = np.array(data)
-            label = np.array(label)
+        data = self._load(data_file)
+        label = self._load(label_file)
 
         if self.transform is not None:
             data = self.transform(data)
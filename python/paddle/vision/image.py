@@ -107,7 +107,46 @@ def get_image_backend():
     return _image_backend
 
 
-def image_load(path, backend=None):
+def _reduce_factor(width, height, target_size):
+    # largest JPEG DCT scaling factor which keeps the decoded image not
+    # smaller than target_size in both sides
+    if isinstance(target_size, int):
+        target_size = (target_size, target_size)
+    th, tw = target_size
+    for factor in (8, 4, 2):
+        if width // factor >= tw and height // factor >= th:
+            return factor
+    return 1
+
+
+def _draft(img, target_size):
+    # only JPEG supports decoding at reduced resolution in PIL, draft is
+    # ignored by other formats
+    if img.format != 'JPEG':
+        return img
+    if isinstance(target_size, int):
+        target_size = (target_size, target_size)
+    img.draft(img.mode, (target_size[1], target_size[0]))
+    return img
+
+
+def _imread(path, target_size=None):
+    cv2 = try_import('cv2')
+    if target_size is None:
+        return cv2.imread(path)
+
+    # cv2 resizes after decoding for formats other than JPEG, which saves
+    # nothing, so the header is read by PIL to check format and size
+    with Image.open(path) as img:
+        fmt, (width, height) = img.format, img.size
+    factor = _reduce_factor(width, height, target_size) if fmt == 'JPEG' else 1
+    if factor == 1:
+        return cv2.imread(path)
+    flags = getattr(cv2, 'IMREAD_REDUCED_COLOR_{}'.format(factor))
+    return cv2.imread(path, flags)
+
+
+def image_load(path, backend=None, target_size=None):
     """Load an image.
 
     Args:
@@ -115,6 +154,14 @@ def image_load(path, backend=None):
         backend (str, optional): The image decoding backend type. Options are
             `cv2`, `pil`, `None`. If backend is None, the global _imread_backend 
             specified by ``paddle.vision.set_image_backend`` will be used. Default: None.
+        target_size (int|list|tuple, optional): Hint of the minimum size of the
+            loaded image in (height, width), an int means a square size. If set,
+            JPEG images are decoded at 1/2, 1/4 or 1/8 resolution by DCT-domain
+            scaling as long as the loaded image is not smaller than it in both
+            sides, which is much faster than decoding at full resolution when
+            the image is resized to a small size afterwards. The loaded size
+            is not exactly ``target_size``. Default: None, decode at full
+            resolution.
 
     Returns:
         PIL.Image or np.array: Loaded image.
@@ -156,7 +203,9 @@ def image_load(path, backend=None):
             .format(backend))
 
     if backend == 'pil':
-        return Image.open(path)
+        img = Image.open(path)
+        if target_size is not None:
+            _draft(img, target_size)
+        return img
     elif backend == 'cv2':
-        cv2 = try_import('cv2')
-        return cv2.imread(path)
+        return _imread(path, target_size)
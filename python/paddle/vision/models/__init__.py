@@ -60,6 +60,7 @@ from .shufflenetv2 import shufflenet_v2_x1_0  # noqa: F401
 from .shufflenetv2 import shufflenet_v2_x1_5  # noqa: F401
 from .shufflenetv2 import shufflenet_v2_x2_0  # noqa: F401
 from .shufflenetv2 import shufflenet_v2_swish  # noqa: F401
+from .inference import optimize_for_inference  # noqa: F401
 
 __all__ = [ #noqa
     'ResNet',
@@ -109,5 +110,6 @@ __all__ = [ #noqa
     'shufflenet_v2_x1_0',
     'shufflenet_v2_x1_5',
     'shufflenet_v2_x2_0',
-    'shufflenet_v2_swish'
+    'shufflenet_v2_swish',
+    'optimize_for_inference'
 ]
@@ -0,0 +1,336 @@
+# Copyright (c) 2022 PaddlePaddle Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import time
+import warnings
+import collections
+
+import numpy as np
+
+import paddle
+import paddle.nn as nn
+
+__all__ = []
+
+# dropout layers which are identity at inference time
+_DROPOUT_LAYERS = (nn.Dropout2D, nn.Dropout3D, nn.AlphaDropout)
+
+# leaf layers whose results do not depend on the layout of inputs
+_LAYOUT_AGNOSTIC_LAYERS = (
+    nn.Identity, nn.ReLU, nn.ReLU6, nn.LeakyReLU, nn.ELU, nn.GELU,
+    nn.Hardswish, nn.Hardsigmoid, nn.Sigmoid, nn.Swish, nn.Silu, nn.Tanh,
+    nn.Mish, nn.Dropout, nn.Linear, nn.Softmax)
+
+
+def _find_parent(model, name):
+    parent = model
+    names = name.split('.')
+    for sub_name in names[:-1]:
+        parent = getattr(parent, sub_name)
+    return parent, names[-1]
+
+
+def _replace_layer(model, name, layer):
+    parent, sub_name = _find_parent(model, name)
+    setattr(parent, sub_name, layer)
+
+
+def _flatten(outputs):
+    if isinstance(outputs, (list, tuple)):
+        return [t for out in outputs for t in _flatten(out)]
+    if isinstance(outputs, dict):
+        return [t for out in outputs.values() for t in _flatten(out)]
+    if isinstance(outputs, paddle.Tensor):
+        return [outputs]
+    return []
+
+
+def _run(model, x):
+    with paddle.no_grad():
+        return [t.numpy() for t in _flatten(model(x))]
+
+
+def _allclose(actual, expected):
+    if len(actual) != len(expected):
+        return False
+    for a, e in zip(actual, expected):
+        if a.shape != e.shape:
+            return False
+        atol = 1e-3 * max(1., float(np.abs(e).max()) if e.size else 1.)
+        if not np.allclose(a, e, rtol=1e-3, atol=atol):
+            return False
+    return True
+
+
+def _latency(model, x, repeat):
+    """Average latency of ``model(x)`` in milliseconds."""
+    for _ in range(max(repeat // 10, 1)):
+        _run(model, x)
+    start = time.time()
+    for _ in range(repeat):
+        # copying outputs to numpy waits for the computation on device
+        _run(model, x)
+    return (time.time() - start) * 1000. / repeat
+
+
+def _num_parameters(model):
+    return int(sum(np.prod(p.shape) for p in model.parameters()))
+
+
+def _remove_dropout(model):
+    names = []
+    for name, layer in model.named_sublayers():
+        # NOTE: Dropout in 'downscale_in_infer' mode scales outputs at
+        # inference time, it is kept
+        if isinstance(layer, _DROPOUT_LAYERS) or (
+                isinstance(layer, nn.Dropout) and
+                layer.mode == 'upscale_in_train'):
+            names.append(name)
+    for name in names:
+        _replace_layer(model, name, nn.Identity())
+    return len(names)
+
+
+def _find_conv_bn_pairs(model, x):
+    """
+    Find pairs of Conv2D and BatchNorm2D by running the model once, a
+    BatchNorm2D is paired with a Conv2D if its input is the output of
+    the Conv2D and the output is consumed by nothing else.
+    """
+    leaves = [(name, layer) for name, layer in model.named_sublayers()
+              if len(layer.sublayers()) == 0]
+    calls = collections.Counter()
+    producers = {}
+    consumers = collections.defaultdict(list)
+    bn_inputs = {}
+    # keep traced tensors alive so that ids are not reused
+    tensors = []
+
+    def pre_hook(name):
+        def hook(layer, inputs):
+            calls[name] += 1
+            for t in _flatten(inputs):
+                tensors.append(t)
+                consumers[id(t)].append(name)
+            if isinstance(layer, nn.BatchNorm2D):
+                bn_inputs[name] = id(inputs[0])
+
+        return hook
+
+    def post_hook(name):
+        def hook(layer, inputs, outputs):
+            tensors.append(outputs)
+            producers[id(outputs)] = name
+
+        return hook
+
+    helpers = []
+    for name, layer in leaves:
+        helpers.append(layer.register_forward_pre_hook(pre_hook(name)))
+        if type(layer) == nn.Conv2D:
+            helpers.append(layer.register_forward_post_hook(post_hook(name)))
+    try:
+        _run(model, x)
+    finally:
+        for helper in helpers:
+            helper.remove()
+
+    layers = dict(leaves)
+    pairs = []
+    for bn_name, tensor_id in bn_inputs.items():
+        conv_name = producers.get(tensor_id)
+        if conv_name is None or consumers[tensor_id] != [bn_name]:
+            continue
+        # layers shared by several call sites can not be folded
+        if calls[conv_name] != 1 or calls[bn_name] != 1:
+            continue
+        conv, bn = layers[conv_name], layers[bn_name]
+        if type(bn) == nn.BatchNorm2D and \
+                conv._data_format == bn._data_format == 'NCHW' and \
+                conv._out_channels == bn._num_features:
+            pairs.append([conv_name, bn_name])
+    return pairs
+
+
+def _to_channels_last(model):
+    """
+    Switch layers of the model to NHWC in place, return False if the model
+    has layers depending on the layout which can not be switched.
+    """
+    for layer in model.sublayers():
+        if len(layer.sublayers()) > 0:
+            continue
+        if isinstance(layer, (nn.Conv2D, nn.Conv2DTranspose)):
+            layer._data_format = 'NHWC'
+            layer._channel_dim = 3
+        elif isinstance(layer, (nn.BatchNorm2D, nn.AdaptiveAvgPool2D)):
+            layer._data_format = 'NHWC'
+        elif isinstance(layer, nn.AvgPool2D) or (
+                isinstance(layer, nn.MaxPool2D) and not layer.return_mask):
+            layer.data_format = 'NHWC'
+        elif not isinstance(layer, _LAYOUT_AGNOSTIC_LAYERS):
+            return False
+    return True
+
+
+class _ChannelsLast(nn.Layer):
+    """
+    Run the wrapped NHWC model on NCHW inputs, 4-D outputs are transposed
+    back to NCHW.
+    """
+
+    def __init__(self, model):
+        super(_ChannelsLast, self).__init__()
+        self.model = model
+
+    def _to_channels_first(self, out):
+        if isinstance(out, (list, tuple)):
+            return [self._to_channels_first(o) for o in out]
+        if len(out.shape) == 4:
+            return paddle.transpose(out, perm=[0, 3, 1, 2])
+        return out
+
+    def forward(self, x):
+        x = paddle.transpose(x, perm=[0, 2, 3, 1])
+        return self._to_channels_first(self.model(x))
+
+
+def optimize_for_inference(model,
+                           input_shape=(1, 3, 224, 224),
+                           data_format='auto',
+                           repeat=20,
+                           verbose=False):
+    """
+    Optimize a model for inference. The optimizations include:
+
+    1. Dropout layers are removed.
+    2. BatchNorm2D layers are folded into the preceding Conv2D layers, the
+       weights of Conv2D are scaled and biases are added.
+    3. Layers are switched to NHWC (channels last) layout if it is faster,
+       inputs and outputs of the returned model are still NCHW.
+
+    The model is run on a random input of :attr:`input_shape` to find the
+    BatchNorm2D layers consuming outputs of Conv2D, and outputs of each
+    step are compared with outputs of the original model, a step is
+    skipped if the outputs mismatch, e.g. the model concatenates feature
+    maps on axis 1 which can not run in NHWC.
+
+    The model is copied before optimizations, so it can still be trained.
+    The returned model is in eval mode and can be saved by
+    :ref:`api_paddle_jit_save`.
+
+    Args:
+        model (paddle.nn.Layer): The model to optimize, e.g. models in
+            :ref:`api_paddle_vision_models`.
+        input_shape (list|tuple, optional): Shape of the NCHW input of the
+            model. Default: (1, 3, 224, 224).
+        data_format (str, optional): Layout of the optimized model, can be
+            'NCHW', 'NHWC' or 'auto'. If 'auto', the model is switched to
+            NHWC only if it is faster on the current device. Default: 'auto'.
+        repeat (int, optional): Number of runs to measure latency.
+            Default: 20.
+        verbose (bool, optional): Whether to print the latency before and
+            after optimizations. Default: False.
+
+    Returns:
+        paddle.nn.Layer: The optimized model.
+
+    Examples:
+
+        .. code-block:: python
+
+            import paddle
+            from paddle.static import InputSpec
+            from paddle.vision.models import resnet50, optimize_for_inference
+
+            paddle.set_device('cpu')
+            model = optimize_for_inference(resnet50(), verbose=True)
+            # ResNet: folded 53 BatchNorm2D, removed 0 Dropout, NHWC, ...
+
+            paddle.jit.save(
+                model,
+                'inference/resnet50',
+                input_spec=[InputSpec([None, 3, 224, 224], 'float32')])
+
+    """
+    assert isinstance(model, nn.Layer), \
+        "model should be an instance of paddle.nn.Layer"
+    if data_format not in ['auto', 'NCHW', 'NHWC']:
+        raise ValueError(
+            "data_format should be 'auto', 'NCHW' or 'NHWC', but got {}".
+            format(data_format))
+
+    name = model.__class__.__name__
+    model = copy.deepcopy(model)
+    model.eval()
+
+    x = paddle.randn(list(input_shape))
+    expected = _run(model, x)
+    num_parameters = _num_parameters(model)
+    if verbose:
+        original_latency = _latency(model, x, repeat)
+
+    num_dropout = _remove_dropout(model)
+
+    # import here to avoid importing slim when importing paddle.vision
+    from paddle.fluid.contrib.slim.quantization.imperative import fuse_utils
+    pairs = _find_conv_bn_pairs(model, x)
+    if len(pairs) > 0:
+        fused = fuse_utils.fuse_layers(model, pairs)
+        # NOTE: folded BatchNorm2D are replaced with the Identity of slim,
+        #       use nn.Identity which is known to be layout agnostic
+        identities = [
+            layer_name for layer_name, layer in fused.named_sublayers()
+            if isinstance(layer, fuse_utils.Identity)
+        ]
+        for layer_name in identities:
+            _replace_layer(fused, layer_name, nn.Identity())
+        if _allclose(_run(fused, x), expected):
+            model = fused
+        else:
+            warnings.warn("Outputs of {} mismatch after folding BatchNorm2D, "
+                          "BatchNorm2D is not folded.".format(name))
+            pairs = []
+
+    layout = 'NCHW'
+    if data_format != 'NCHW':
+        channels_last = _ChannelsLast(copy.deepcopy(model))
+        if not _to_channels_last(channels_last.model):
+            channels_last = None
+        else:
+            try:
+                if not _allclose(_run(channels_last, x), expected):
+                    channels_last = None
+            except Exception:
+                # e.g. ops with axis 1 fails on NHWC feature maps
+                channels_last = None
+
+        if channels_last is None:
+            if data_format == 'NHWC':
+                warnings.warn("{} can not run in NHWC, NCHW is used.".format(
+                    name))
+        elif data_format == 'NHWC' or _latency(channels_last, x, repeat) < \
+                _latency(model, x, repeat):
+            model = channels_last
+            layout = 'NHWC'
+
+    if verbose:
+        print("{}: folded {} BatchNorm2D, removed {} Dropout, {}, "
+              "parameters {} -> {}, latency {:.3f} ms -> {:.3f} ms".format(
+                  name,
+                  len(pairs), num_dropout, layout, num_parameters,
+                  _num_parameters(model), original_latency,
+                  _latency(model, x, repeat)))
+    return model
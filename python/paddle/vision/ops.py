@@ -12,7 +12,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import io
 import numpy as np
+from PIL import Image
+
+import paddle
 from ..fluid.layer_helper import LayerHelper
 from ..fluid.data_feeder import check_variable_and_dtype, check_type, check_dtype
 from ..fluid import core, layers
@@ -22,6 +26,7 @@ from ..fluid.initializer import Normal
 
 from paddle.common_ops_import import *
 from paddle import _C_ops
+from .image import _draft
 
 __all__ = [ #noqa
     'yolo_loss',
@@ -36,6 +41,8 @@ __all__ = [ #noqa
     'PSRoIPool',
     'roi_align',
     'RoIAlign',
+    'batched_nms',
+    'matrix_nms',
 ]
 
 
@@ -861,7 +868,28 @@ def read_file(filename, name=None):
     return out
 
 
-def decode_jpeg(x, mode='unchanged', name=None):
+def _decode_jpeg_cpu(x, mode, target_size):
+    img = Image.open(io.BytesIO(x.numpy().tobytes()))
+    if target_size is not None:
+        _draft(img, target_size)
+    if mode == 'gray':
+        img = img.convert('L')
+    elif mode == 'rgb':
+        img = img.convert('RGB')
+    elif mode != 'unchanged':
+        raise ValueError(
+            "The provided mode is not supported for JPEG files: {}".format(
+                mode))
+
+    img = np.asarray(img)
+    if img.ndim == 2:
+        img = img[np.newaxis, :, :]
+    else:
+        img = img.transpose([2, 0, 1])
+    return paddle.to_tensor(np.ascontiguousarray(img), place=x.place)
+
+
+def decode_jpeg(x, mode='unchanged', target_size=None, name=None):
     """
     Decodes a JPEG image into a 3 dimensional RGB Tensor or 1 dimensional Gray Tensor. 
     Optionally converts the image to the desired format. 
@@ -872,6 +900,12 @@ def decode_jpeg(x, mode='unchanged', name=None):
             of the JPEG image.
         mode (str): The read mode used for optionally converting the image. 
             Default: 'unchanged'.
+        target_size (int|list|tuple, optional): Hint of the minimum size of
+            the decoded image in (height, width), an int means a square size.
+            If set, the image is decoded at 1/2, 1/4 or 1/8 resolution by
+            DCT-domain scaling as long as the decoded image is not smaller
+            than it in both sides. It only takes effect when :attr:`x` is on
+            CPU in dynamic mode, which is decoded by PIL. Default: None.
         name (str, optional): The default value is None. Normally there is no
             need for user to set this property. For more information, please
             refer to :ref:`api_guide_Name`.
@@ -895,6 +929,10 @@ def decode_jpeg(x, mode='unchanged', name=None):
     """
 
     if in_dygraph_mode():
+        # NOTE: decode_jpeg op only supports GPU, decode images on CPU by
+        # PIL, which also supports decoding at reduced resolution
+        if x.place.is_cpu_place():
+            return _decode_jpeg_cpu(x, mode, target_size)
         return _C_ops.decode_jpeg(x, "mode", mode)
 
     inputs = {'X': x}
@@ -1297,3 +1335,247 @@ class RoIAlign(Layer):
             output_size=self._output_size,
             spatial_scale=self._spatial_scale,
             aligned=aligned)
+
+
+def batched_nms(boxes,
+                scores,
+                labels=None,
+                iou_threshold=0.5,
+                score_threshold=None,
+                top_k=-1,
+                normalized=True,
+                name=None):
+    """
+    Greedy non maximum suppression (NMS) on batched boxes padded into
+    a [N, M, 4] Tensor, which is usually the output of detection heads
+    before post-processing, without the LoD of ``multiclass_nms``.
+
+    Boxes whose scores are larger than :attr:`score_threshold` are visited
+    in the descending order of scores, each box is kept if not suppressed,
+    and suppresses the following boxes of the same category whose IoU
+    with it is larger than :attr:`iou_threshold`. Boxes of different
+    categories in :attr:`labels` do not suppress each other, which is
+    the same as applying NMS on each category separately.
+
+    Args:
+        boxes (Tensor): Boxes with shape [N, M, 4] in layout of
+            [xmin, ymin, xmax, ymax], where N is the batch size and M is the
+            number of boxes of each image. The data type is float32 or float64.
+        scores (Tensor): Scores of boxes with shape [N, M]. The data type is
+            the same as :attr:`boxes`. Padded boxes can be given scores not
+            larger than :attr:`score_threshold` to be ignored.
+        labels (Tensor, optional): Categories of boxes with shape [N, M],
+            the data type is int64. Default: None, which means all boxes are
+            considered as the same category.
+        iou_threshold (float, optional): IoU threshold to suppress boxes.
+            Default: 0.5.
+        score_threshold (float, optional): Boxes whose scores are not larger
+            than it are ignored. Default: None, no boxes are ignored.
+        top_k (int, optional): Max number of boxes to keep for each image,
+            -1 means keeping all boxes after NMS. Default: -1.
+        normalized (bool, optional): Whether box coordinates are normalized,
+            1 is added to widths and heights when computing areas if not.
+            Default: True.
+        name(str, optional): For detailed information, please refer to :
+            ref:`api_guide_Name`. Usually name is no need to set and None by
+            default.
+
+    Returns:
+        tuple: A tuple of (index, num_kept). index is an int64 Tensor with
+            shape [N, K], which contains indices of kept boxes in each image
+            in the descending order of scores, and padded with -1, K is
+            :attr:`top_k` if it is larger than -1, otherwise M. num_kept is an
+            int32 Tensor with shape [N], which is the number of kept boxes
+            of each image.
+
+    Examples:
+        .. code-block:: python
+
+            import paddle
+            from paddle.vision.ops import batched_nms
+
+            boxes = paddle.rand([2, 100, 4])
+            boxes[:, :, 2:] += boxes[:, :, :2]
+            scores = paddle.rand([2, 100])
+            labels = paddle.randint(0, 10, [2, 100])
+
+            index, num_kept = batched_nms(boxes, scores, labels,
+                                          iou_threshold=0.5, top_k=20)
+            print(index.shape, num_kept.shape)  # [2, 20] [2]
+    """
+    if score_threshold is None:
+        score_threshold = -float('inf')
+    attrs = ('iou_threshold', float(iou_threshold), 'score_threshold',
+             float(score_threshold), 'top_k', top_k, 'normalized', normalized)
+    if labels is not None and labels.dtype != paddle.int64:
+        labels = labels.astype('int64')
+
+    if in_dygraph_mode():
+        return _C_ops.batched_nms(boxes, scores, labels, *attrs)
+
+    check_variable_and_dtype(boxes, 'boxes', ['float32', 'float64'],
+                             'batched_nms')
+    check_variable_and_dtype(scores, 'scores', ['float32', 'float64'],
+                             'batched_nms')
+    check_type(top_k, 'top_k', int, 'batched_nms')
+    check_type(normalized, 'normalized', bool, 'batched_nms')
+
+    helper = LayerHelper('batched_nms', **locals())
+    index = helper.create_variable_for_type_inference('int64')
+    num_kept = helper.create_variable_for_type_inference('int32')
+    inputs = {'Boxes': boxes, 'Scores': scores}
+    if labels is not None:
+        inputs['Labels'] = labels
+    helper.append_op(
+        type='batched_nms',
+        inputs=inputs,
+        outputs={'Index': index,
+                 'NumKept': num_kept},
+        attrs=dict(zip(attrs[::2], attrs[1::2])))
+    index.stop_gradient = True
+    num_kept.stop_gradient = True
+    return index, num_kept
+
+
+def matrix_nms(bboxes,
+               scores,
+               score_threshold,
+               post_threshold,
+               nms_top_k,
+               keep_top_k,
+               use_gaussian=False,
+               gaussian_sigma=2.,
+               background_label=0,
+               normalized=True,
+               return_index=False,
+               return_rois_num=True,
+               name=None):
+    """
+    Matrix non maximum suppression (NMS) on batched boxes padded into
+    a [N, M, 4] Tensor with multi-class scores.
+
+    First selects a subset of candidate bounding boxes that have higher
+    scores than score_threshold, then the top k candidate is selected if
+    nms_top_k is larger than -1. Scores of the remaining candidates are
+    then decayed in parallel according to the Matrix NMS scheme, instead
+    of suppressed one by one. After NMS step, at most keep_top_k number
+    of total bboxes are to be kept per image if keep_top_k is larger than
+    -1. Refer to `SOLOv2 <https://arxiv.org/abs/2003.10152>`_ for details.
+
+    Different from ``paddle.fluid.layers.matrix_nms``, the number of
+    detected boxes of each image is returned as a Tensor instead of LoD.
+
+    Args:
+        bboxes (Tensor): A 3-D Tensor with shape [N, M, 4] represents the
+            predicted locations of M bounding bboxes, N is the batch size.
+            The layout is [xmin, ymin, xmax, ymax]. The data type is float32
+            or float64.
+        scores (Tensor): A 3-D Tensor with shape [N, C, M] represents the
+            predicted confidence of C classes for the M bounding boxes. The
+            data type is float32 or float64.
+        score_threshold (float): Threshold to filter out bounding boxes with
+            low confidence score.
+        post_threshold (float): Threshold to filter out bounding boxes with
+            low confidence score AFTER decaying.
+        nms_top_k (int): Maximum number of detections to be kept according
+            to the confidences after the filtering detections based on
+            score_threshold.
+        keep_top_k (int): Number of total bboxes to be kept per image after
+            NMS step. -1 means keeping all bboxes after NMS step.
+        use_gaussian (bool, optional): Use Gaussian as the decay function.
+            Default: False.
+        gaussian_sigma (float, optional): Sigma for Gaussian decay function.
+            Default: 2.0.
+        background_label (int, optional): The index of background label, the
+            background label will be ignored. If set to -1, then all
+            categories will be considered. Default: 0.
+        normalized (bool, optional): Whether detections are normalized.
+            Default: True.
+        return_index (bool, optional): Whether return selected index.
+            Default: False.
+        return_rois_num (bool, optional): Whether return the number of
+            detected boxes of each image. Default: True.
+        name(str, optional): For detailed information, please refer to :
+            ref:`api_guide_Name`. Usually name is no need to set and None by
+            default.
+
+    Returns:
+        tuple: A tuple of (out, rois_num, index), rois_num and index are
+            included only if :attr:`return_rois_num` and :attr:`return_index`
+            are True. out is a Tensor with shape [No, 6], each row is
+            [label, confidence, xmin, ymin, xmax, ymax] of a detected box,
+            and boxes of all images are concatenated. rois_num is an int32
+            Tensor with shape [N], which is the number of detected boxes of
+            each image. index is an int32 Tensor with shape [No, 1], which
+            is the index of the detected boxes across the batch.
+
+    Examples:
+        .. code-block:: python
+
+            import paddle
+            from paddle.vision.ops import matrix_nms
+
+            boxes = paddle.rand([4, 1, 4])
+            boxes[..., 2] = boxes[..., 0] + boxes[..., 2]
+            boxes[..., 3] = boxes[..., 1] + boxes[..., 3]
+            scores = paddle.rand([4, 80, 1])
+            out, rois_num = matrix_nms(bboxes=boxes, scores=scores,
+                                       background_label=0,
+                                       score_threshold=0.5,
+                                       post_threshold=0.1,
+                                       nms_top_k=400,
+                                       keep_top_k=200,
+                                       normalized=False)
+    """
+    check_variable_and_dtype(bboxes, 'BBoxes', ['float32', 'float64'],
+                             'matrix_nms')
+    check_variable_and_dtype(scores, 'Scores', ['float32', 'float64'],
+                             'matrix_nms')
+    check_type(score_threshold, 'score_threshold', float, 'matrix_nms')
+    check_type(post_threshold, 'post_threshold', float, 'matrix_nms')
+    check_type(nms_top_k, 'nums_top_k', int, 'matrix_nms')
+    check_type(keep_top_k, 'keep_top_k', int, 'matrix_nms')
+    check_type(normalized, 'normalized', bool, 'matrix_nms')
+    check_type(use_gaussian, 'use_gaussian', bool, 'matrix_nms')
+    check_type(gaussian_sigma, 'gaussian_sigma', float, 'matrix_nms')
+    check_type(background_label, 'background_label', int, 'matrix_nms')
+
+    if in_dygraph_mode():
+        out, index, rois_num = _C_ops.matrix_nms(
+            bboxes, scores, 'background_label', background_label,
+            'score_threshold', score_threshold, 'post_threshold',
+            post_threshold, 'nms_top_k', nms_top_k, 'gaussian_sigma',
+            gaussian_sigma, 'use_gaussian', use_gaussian, 'keep_top_k',
+            keep_top_k, 'normalized', normalized)
+    else:
+        helper = LayerHelper('matrix_nms', **locals())
+        out = helper.create_variable_for_type_inference(dtype=bboxes.dtype)
+        index = helper.create_variable_for_type_inference(dtype='int32')
+        rois_num = helper.create_variable_for_type_inference(dtype='int32')
+        helper.append_op(
+            type="matrix_nms",
+            inputs={'BBoxes': bboxes,
+                    'Scores': scores},
+            attrs={
+                'background_label': background_label,
+                'score_threshold': score_threshold,
+                'post_threshold': post_threshold,
+                'nms_top_k': nms_top_k,
+                'gaussian_sigma': gaussian_sigma,
+                'use_gaussian': use_gaussian,
+                'keep_top_k': keep_top_k,
+                'normalized': normalized
+            },
+            outputs={'Out': out,
+                     'Index': index,
+                     'RoisNum': rois_num})
+        out.stop_gradient = True
+        index.stop_gradient = True
+        rois_num.stop_gradient = True
+
+    outputs = (out, )
+    if return_rois_num:
+        outputs += (rois_num, )
+    if return_index:
+        outputs += (index, )
+    return outputs[0] if len(outputs) == 1 else outputs
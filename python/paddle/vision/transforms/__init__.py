@@ -14,6 +14,7 @@
 
 from .transforms import BaseTransform  # noqa: F401
 from .transforms import Compose  # noqa: F401
+from .transforms import FusedCompose  # noqa: F401
 from .transforms import Resize  # noqa: F401
 from .transforms import RandomResizedCrop  # noqa: F401
 from .transforms import CenterCrop  # noqa: F401
@@ -31,6 +32,10 @@ from .transforms import Pad  # noqa: F401
 from .transforms import RandomRotation  # noqa: F401
 from .transforms import Grayscale  # noqa: F401
 from .transforms import ToTensor  # noqa: F401
+from .transforms import BatchRandomResizedCrop  # noqa: F401
+from .transforms import BatchRandomHorizontalFlip  # noqa: F401
+from .transforms import BatchColorJitter  # noqa: F401
+from .transforms import BatchRandomRotation  # noqa: F401
 from .functional import to_tensor  # noqa: F401
 from .functional import hflip  # noqa: F401
 from .functional import vflip  # noqa: F401
@@ -48,6 +53,7 @@ from .functional import normalize  # noqa: F401
 __all__ = [ #noqa
     'BaseTransform',
     'Compose',
+    'FusedCompose',
     'Resize',
     'RandomResizedCrop',
     'CenterCrop',
@@ -65,6 +71,10 @@ __all__ = [ #noqa
     'RandomRotation',
     'Grayscale',
     'ToTensor',
+    'BatchRandomResizedCrop',
+    'BatchRandomHorizontalFlip',
+    'BatchColorJitter',
+    'BatchRandomRotation',
     'to_tensor',
     'hflip',
     'vflip',
@@ -593,6 +593,59 @@ def rotate(img,
         return F_cv2.rotate(img, angle, interpolation, expand, center, fill)
 
 
+def warp_affine(img, matrix, output_size, interpolation='bilinear', fill=0):
+    """Applies an affine transformation on the image by one warp.
+
+    Args:
+        img (PIL.Image|np.array|paddle.Tensor): Image to be transformed.
+        matrix (np.array): Affine matrix in shape of [2, 3], maps the
+            coordinates of output pixels into the coordinates of input pixels,
+            origin is the upper left corner of the image and pixel (0, 0)
+            covers [0, 1] x [0, 1].
+        output_size (list|tuple): (height, width) of output image.
+        interpolation (str, optional): Interpolation method, support method
+            are "nearest" and "bilinear" for all backends, and "bicubic" for
+            pil and cv2 backend. Default: 'bilinear'.
+        fill (3-list|3-tuple or int): RGB pixel fill value for area outside the input image.
+            If int, it is used for all channels respectively.
+
+    Returns:
+        PIL.Image or np.array or paddle.Tensor: Transformed image.
+
+    Examples:
+        .. code-block:: python
+
+            import numpy as np
+            from PIL import Image
+            from paddle.vision.transforms import functional as F
+
+            fake_img = (np.random.rand(256, 300, 3) * 255.).astype('uint8')
+
+            fake_img = Image.fromarray(fake_img)
+
+            # crop the box at (top=10, left=20) and resize it to half size
+            matrix = np.array([[2., 0., 20.], [0., 2., 10.]])
+            converted_img = F.warp_affine(fake_img, matrix, (100, 120))
+            print(converted_img.size)
+
+    """
+    if not (_is_pil_image(img) or _is_numpy_image(img) or
+            _is_tensor_image(img)):
+        raise TypeError(
+            'img should be PIL Image or Tensor Image or ndarray with dim=[2 or 3]. Got {}'.
+            format(type(img)))
+
+    if isinstance(fill, list):
+        fill = tuple(fill)
+
+    if _is_pil_image(img):
+        return F_pil.warp_affine(img, matrix, output_size, interpolation, fill)
+    elif _is_tensor_image(img):
+        return F_t.warp_affine(img, matrix, output_size, interpolation, fill)
+    else:
+        return F_cv2.warp_affine(img, matrix, output_size, interpolation, fill)
+
+
 def to_grayscale(img, num_output_channels=1):
     """Converts image to grayscale version of image.
 
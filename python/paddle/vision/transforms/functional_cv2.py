@@ -509,6 +509,54 @@ def rotate(img,
             borderValue=fill)
 
 
+def warp_affine(img, matrix, output_size, interpolation='bilinear', fill=0):
+    """Applies an affine transformation on the image by one warp.
+
+    Args:
+        img (np.array): Image to be transformed.
+        matrix (np.array): Affine matrix in shape of [2, 3], maps the
+            coordinates of output pixels into the coordinates of input pixels,
+            origin is the upper left corner of the image and pixel (0, 0)
+            covers [0, 1] x [0, 1].
+        output_size (list|tuple): (height, width) of output image.
+        interpolation (str, optional): Interpolation method. when use cv2 backend, 
+            support method are as following: 
+            - "nearest": cv2.INTER_NEAREST, 
+            - "bilinear": cv2.INTER_LINEAR, 
+            - "bicubic": cv2.INTER_CUBIC
+        fill (3-tuple or int): RGB pixel fill value for area outside the input image.
+            If int, it is used for all channels respectively.
+
+    Returns:
+        np.array: Transformed image.
+
+    """
+    cv2 = try_import('cv2')
+    _cv2_interp_from_str = {
+        'nearest': cv2.INTER_NEAREST,
+        'bilinear': cv2.INTER_LINEAR,
+        'bicubic': cv2.INTER_CUBIC,
+    }
+
+    # cv2 takes the center of pixel (0, 0) as origin
+    matrix = np.array(matrix, dtype=np.float64).reshape((2, 3))
+    matrix[:, 2] += 0.5 * (matrix[:, 0] + matrix[:, 1]) - 0.5
+
+    if isinstance(fill, numbers.Number):
+        fill = (fill, ) * 4
+
+    oh, ow = output_size
+    output = cv2.warpAffine(
+        img,
+        matrix, (ow, oh),
+        flags=_cv2_interp_from_str[interpolation] | cv2.WARP_INVERSE_MAP,
+        borderValue=fill)
+    if len(img.shape) == 3 and img.shape[2] == 1:
+        return output[:, :, np.newaxis]
+    else:
+        return output
+
+
 def to_grayscale(img, num_output_channels=1):
     """Converts image to grayscale version of image.
 
@@ -442,6 +442,41 @@ def rotate(img,
         fillcolor=fill)
 
 
+def warp_affine(img, matrix, output_size, interpolation='bilinear', fill=0):
+    """Applies an affine transformation on the image by one warp.
+
+    Args:
+        img (PIL.Image): Image to be transformed.
+        matrix (np.array): Affine matrix in shape of [2, 3], maps the
+            coordinates of output pixels into the coordinates of input pixels,
+            origin is the upper left corner of the image and pixel (0, 0)
+            covers [0, 1] x [0, 1].
+        output_size (list|tuple): (height, width) of output image.
+        interpolation (str, optional): Interpolation method. when use pil backend, 
+            support method are as following: 
+            - "nearest": Image.NEAREST, 
+            - "bilinear": Image.BILINEAR, 
+            - "bicubic": Image.BICUBIC
+        fill (3-tuple or int): RGB pixel fill value for area outside the input image.
+            If int, it is used for all channels respectively.
+
+    Returns:
+        PIL.Image: Transformed image.
+
+    """
+
+    if isinstance(fill, int) and len(img.getbands()) > 1:
+        fill = tuple([fill] * len(img.getbands()))
+
+    data = tuple(np.asarray(matrix, dtype=np.float64).reshape([-1]).tolist())
+    return img.transform(
+        tuple(output_size[::-1]),
+        Image.AFFINE,
+        data,
+        _pil_interp_from_str[interpolation],
+        fillcolor=fill)
+
+
 def to_grayscale(img, num_output_channels=1):
     """Converts image to grayscale version of image.
 
@@ -17,8 +17,11 @@ from __future__ import division
 import math
 import numbers
 
+import numpy as np
+
 import paddle
 import paddle.nn.functional as F
+from paddle.fluid.data_feeder import convert_dtype
 
 import sys
 import collections
@@ -147,6 +150,8 @@ def to_grayscale(img, num_output_channels=1, data_format='CHW'):
 
 
 def _affine_grid(theta, w, h, ow, oh):
+    # theta is in shape of [N, 2, 3], base grid is shared by all samples
+    n = theta.shape[0]
     d = 0.5
     base_grid = paddle.ones((1, oh, ow, 3), dtype=theta.dtype)
 
@@ -157,13 +162,16 @@ def _affine_grid(theta, w, h, ow, oh):
 
     scaled_theta = theta.transpose(
         (0, 2, 1)) / paddle.to_tensor([0.5 * w, 0.5 * h])
-    output_grid = base_grid.reshape((1, oh * ow, 3)).bmm(scaled_theta)
+    base_grid = base_grid.reshape((1, oh * ow, 3))
+    if n > 1:
+        base_grid = base_grid.expand((n, oh * ow, 3))
+    output_grid = base_grid.bmm(scaled_theta)
 
-    return output_grid.reshape((1, oh, ow, 2))
+    return output_grid.reshape((n, oh, ow, 2))
 
 
 def _grid_transform(img, grid, mode, fill):
-    if img.shape[0] > 1:
+    if img.shape[0] > 1 and grid.shape[0] == 1:
         grid = grid.expand(img.shape[0], grid.shape[1], grid.shape[2],
                            grid.shape[3])
 
@@ -292,6 +300,52 @@ def rotate(img,
     return out.squeeze(0)
 
 
+def warp_affine(img,
+                matrix,
+                output_size,
+                interpolation='bilinear',
+                fill=None,
+                data_format='CHW'):
+    """Applies an affine transformation on the image by one grid sample.
+
+    Args:
+        img (paddle.Tensor): Image to be transformed.
+        matrix (np.array): Affine matrix in shape of [2, 3], maps the
+            coordinates of output pixels into the coordinates of input pixels,
+            origin is the upper left corner of the image and pixel (0, 0)
+            covers [0, 1] x [0, 1].
+        output_size (list|tuple): (height, width) of output image.
+        interpolation (str, optional): Interpolation method, "nearest" or
+            "bilinear". Default: 'bilinear'.
+        fill (3-tuple or int, optional): RGB pixel fill value for area outside
+            the input image. Default: None, filled with 0.
+        data_format (str, optional): Data format of img, should be 'HWC' or 
+            'CHW'. Default: 'CHW'.
+
+    Returns:
+        paddle.Tensor: Transformed image.
+
+    """
+    _assert_image_tensor(img, data_format)
+
+    w, h = _get_image_size(img, data_format)
+    oh, ow = output_size
+
+    # move origin to the center of input and output image
+    matrix = np.array(matrix, dtype='float32').reshape((2, 3))
+    matrix[:, 2] += 0.5 * (matrix[:, 0] * ow + matrix[:, 1] * oh)
+    matrix[:, 2] -= [0.5 * w, 0.5 * h]
+
+    out = affine_batch(
+        img.unsqueeze(0),
+        matrix.reshape((1, 2, 3)),
+        output_size=(oh, ow),
+        interpolation=interpolation,
+        fill=fill,
+        data_format='N' + data_format)
+    return out.squeeze(0)
+
+
 def vflip(img, data_format='CHW'):
     """Vertically flips the given paddle tensor.
 
@@ -514,3 +568,417 @@ def resize(img, size, interpolation='bilinear', data_format='CHW'):
         data_format='N' + data_format.upper())
 
     return img.squeeze(0)
+
+
+def _assert_image_batch_tensor(img, data_format):
+    if not isinstance(
+            img, paddle.Tensor) or img.ndim != 4 or not data_format.lower() in (
+                'nchw', 'nhwc'):
+        raise RuntimeError(
+            'not support [type={}, ndim={}, data_format={}] paddle image batch'.
+            format(type(img), img.ndim, data_format))
+
+
+def _to_batch_tensor(value, batch_size, img, name):
+    # per-sample parameters of batch ops, convert to float tensor of shape
+    # [N], in float32 for integer image batches so that they are not
+    # truncated
+    if not isinstance(value, paddle.Tensor):
+        value = paddle.to_tensor(
+            np.asarray(
+                value, dtype='float32').reshape([-1]), place=img.place)
+    dtype = img.dtype if paddle.is_floating_point(img) else 'float32'
+    value = value.astype(dtype).reshape([-1])
+    if value.shape[0] != batch_size:
+        raise ValueError("{} should be given for each of the {} images in "
+                         "batch, but got {}".format(name, batch_size,
+                                                    value.shape[0]))
+    return value
+
+
+def _to_float_batch(img):
+    # color ops are computed in float, see _from_float_batch
+    if paddle.is_floating_point(img):
+        return img
+    return img.astype('float32')
+
+
+def _from_float_batch(out, img):
+    # clip the result of color ops to the value range of the input image
+    # batch, [0, 1] for float images, and cast it back to the input dtype
+    if paddle.is_floating_point(img):
+        return out.clip(0., 1.)
+    bound = float(np.iinfo(convert_dtype(img.dtype)).max)
+    return paddle.round(out).clip(0., bound).astype(img.dtype)
+
+
+def _to_channel_first(img, data_format):
+    if _is_channel_first(data_format[1:]):
+        return img
+    return img.transpose((0, 3, 1, 2))
+
+
+def _from_channel_first(img, data_format):
+    if _is_channel_first(data_format[1:]):
+        return img
+    return img.transpose((0, 2, 3, 1))
+
+
+def affine_batch(img,
+                 matrix,
+                 output_size=None,
+                 interpolation='bilinear',
+                 fill=None,
+                 data_format='NCHW'):
+    """Applies a different affine transformation on each image of a batch
+    by one grid sample.
+
+    Args:
+        img (paddle.Tensor): Image batch to be transformed.
+        matrix (paddle.Tensor|np.ndarray): Affine matrices in shape of
+            [N, 2, 3], maps the coordinates of output pixels into the
+            coordinates of input pixels, both in pixels and with the origin
+            at the image center.
+        output_size (list|tuple, optional): (height, width) of output images.
+            Default: None, the same as input images.
+        interpolation (str, optional): Interpolation method, "nearest" or
+            "bilinear". Default: 'bilinear'.
+        fill (int|list|tuple, optional): Pixel fill value for area outside
+            the input images. Default: None, filled with 0.
+        data_format (str, optional): Data format of img, should be 'NHWC' or
+            'NCHW'. Default: 'NCHW'.
+
+    Returns:
+        paddle.Tensor: Transformed image batch.
+
+    """
+    _assert_image_batch_tensor(img, data_format)
+
+    n = img.shape[0]
+    w, h = _get_image_size(img, data_format[1:])
+    if output_size is None:
+        oh, ow = h, w
+    else:
+        oh, ow = output_size
+
+    if not isinstance(matrix, paddle.Tensor):
+        matrix = paddle.to_tensor(
+            np.asarray(
+                matrix, dtype='float32'), place=img.place)
+    # NOTE: the grid is built and sampled in float, integer image batches
+    # are sampled as float32 and cast back to their dtype afterwards
+    x = _to_float_batch(img)
+    matrix = matrix.astype(x.dtype).reshape((-1, 2, 3))
+    if matrix.shape[0] != n:
+        raise ValueError("matrix should be given for each of the {} images "
+                         "in batch, but got {}".format(n, matrix.shape[0]))
+
+    if fill is not None:
+        c = _get_image_num_channels(img, data_format[1:])
+        if isinstance(fill, numbers.Number):
+            fill = [float(fill)] * c
+        else:
+            fill = [float(f) for f in fill]
+
+    x = _to_channel_first(x, data_format)
+    grid = _affine_grid(matrix, w, h, ow, oh)
+    out = _grid_transform(x, grid, mode=interpolation, fill=fill)
+    out = _from_channel_first(out, data_format)
+
+    if paddle.is_floating_point(img):
+        return out
+    return _from_float_batch(out, img)
+
+
+def resized_crop_batch(img,
+                       boxes,
+                       size,
+                       interpolation='bilinear',
+                       data_format='NCHW'):
+    """Crops a different box from each image of a batch and resizes the
+    crops to the same size, cropping and resizing are done by one grid
+    sample.
+
+    Args:
+        img (paddle.Tensor): Image batch to be cropped.
+        boxes (paddle.Tensor|np.ndarray): Crop boxes in shape of [N, 4], each
+            box is in format of (top, left, height, width).
+        size (int|list|tuple): Target size of output images, with
+            (height, width) shape.
+        interpolation (str, optional): Interpolation method, "nearest" or
+            "bilinear". Default: 'bilinear'.
+        data_format (str, optional): Data format of img, should be 'NHWC' or
+            'NCHW'. Default: 'NCHW'.
+
+    Returns:
+        paddle.Tensor: Cropped and resized image batch.
+
+    """
+    _assert_image_batch_tensor(img, data_format)
+
+    if isinstance(size, int):
+        size = (size, size)
+    oh, ow = size
+    w, h = _get_image_size(img, data_format[1:])
+
+    if isinstance(boxes, paddle.Tensor):
+        boxes = boxes.numpy()
+    boxes = np.asarray(boxes, dtype='float32').reshape((-1, 4))
+    top, left, height, width = boxes.T
+
+    matrix = np.zeros((boxes.shape[0], 2, 3), dtype='float32')
+    matrix[:, 0, 0] = width / ow
+    matrix[:, 0, 2] = left + 0.5 * width - 0.5 * w
+    matrix[:, 1, 1] = height / oh
+    matrix[:, 1, 2] = top + 0.5 * height - 0.5 * h
+
+    return affine_batch(
+        img,
+        matrix,
+        output_size=(oh, ow),
+        interpolation=interpolation,
+        data_format=data_format)
+
+
+def rotate_batch(img,
+                 angles,
+                 interpolation='nearest',
+                 center=None,
+                 fill=None,
+                 data_format='NCHW'):
+    """Rotates each image of a batch by its own angle with one grid sample.
+
+    Args:
+        img (paddle.Tensor): Image batch to be rotated.
+        angles (list|np.ndarray|paddle.Tensor): Angles in degrees counter
+            clockwise order, one for each image.
+        interpolation (str, optional): Interpolation method, "nearest" or
+            "bilinear". Default: 'nearest'.
+        center (2-tuple, optional): Optional center of rotation.
+            Origin is the upper left corner.
+            Default is the center of the image.
+        fill (int|list|tuple, optional): Pixel fill value for area outside
+            the rotated image. Default: None, filled with 0.
+        data_format (str, optional): Data format of img, should be 'NHWC' or
+            'NCHW'. Default: 'NCHW'.
+
+    Returns:
+        paddle.Tensor: Rotated image batch.
+
+    """
+    _assert_image_batch_tensor(img, data_format)
+
+    w, h = _get_image_size(img, data_format[1:])
+    if isinstance(angles, paddle.Tensor):
+        angles = angles.numpy()
+    angles = np.radians(-np.asarray(angles, dtype='float64').reshape([-1]) %
+                        360)
+
+    if center is None:
+        rotn_center = [0, 0]
+    else:
+        rotn_center = [(p - s * 0.5) for p, s in zip(center, [w, h])]
+
+    cos, sin = np.cos(angles), np.sin(angles)
+    matrix = np.zeros((angles.shape[0], 2, 3), dtype='float32')
+    matrix[:, 0, 0] = cos
+    matrix[:, 0, 1] = sin
+    matrix[:, 1, 0] = -sin
+    matrix[:, 1, 1] = cos
+    matrix[:, 0, 2] = rotn_center[0] - cos * rotn_center[0] - sin * rotn_center[
+        1]
+    matrix[:, 1, 2] = rotn_center[1] + sin * rotn_center[0] - cos * rotn_center[
+        1]
+
+    return affine_batch(
+        img,
+        matrix,
+        interpolation=interpolation,
+        fill=fill,
+        data_format=data_format)
+
+
+def hflip_batch(img, flags, data_format='NCHW'):
+    """Horizontally flips the images of a batch whose flag is True.
+
+    Args:
+        img (paddle.Tensor): Image batch to be flipped.
+        flags (list|np.ndarray|paddle.Tensor): Whether to flip each image.
+        data_format (str, optional): Data format of img, should be 'NHWC' or
+            'NCHW'. Default: 'NCHW'.
+
+    Returns:
+        paddle.Tensor: Flipped image batch.
+
+    """
+    _assert_image_batch_tensor(img, data_format)
+
+    flags = _to_batch_tensor(flags, img.shape[0], img, 'flags')
+    w_axis = _get_image_w_axis(data_format[1:])
+    flags = flags.astype(img.dtype).reshape((-1, 1, 1, 1))
+
+    return img.flip(axis=[w_axis]) * flags + img * (1. - flags)
+
+
+def _rgb_to_grayscale_batch(img):
+    # img is a channel first image batch
+    if img.shape[1] == 1:
+        return img
+    rgb_weights = paddle.to_tensor(
+        [0.2989, 0.5870, 0.1140], place=img.place).astype(img.dtype)
+    return (img * rgb_weights.reshape((1, -1, 1, 1))).sum(axis=1, keepdim=True)
+
+
+def _blend_batch(img1, img2, factors):
+    return img1 * factors + img2 * (1. - factors)
+
+
+def adjust_brightness_batch(img, factors, data_format='NCHW'):
+    """Adjusts brightness of each image of a batch by its own factor.
+
+    Args:
+        img (paddle.Tensor): Image batch to be adjusted.
+        factors (list|np.ndarray|paddle.Tensor): Brightness factor of each
+            image, 0 gives a black image, 1 gives the original image.
+        data_format (str, optional): Data format of img, should be 'NHWC' or
+            'NCHW'. Default: 'NCHW'.
+
+    Returns:
+        paddle.Tensor: Brightness adjusted image batch.
+
+    """
+    _assert_image_batch_tensor(img, data_format)
+
+    factors = _to_batch_tensor(factors, img.shape[0], img, 'factors')
+    out = _to_float_batch(img) * factors.reshape((-1, 1, 1, 1))
+
+    return _from_float_batch(out, img)
+
+
+def adjust_contrast_batch(img, factors, data_format='NCHW'):
+    """Adjusts contrast of each image of a batch by its own factor.
+
+    Args:
+        img (paddle.Tensor): Image batch to be adjusted.
+        factors (list|np.ndarray|paddle.Tensor): Contrast factor of each
+            image, 0 gives a solid gray image, 1 gives the original image.
+        data_format (str, optional): Data format of img, should be 'NHWC' or
+            'NCHW'. Default: 'NCHW'.
+
+    Returns:
+        paddle.Tensor: Contrast adjusted image batch.
+
+    """
+    _assert_image_batch_tensor(img, data_format)
+
+    factors = _to_batch_tensor(factors, img.shape[0], img, 'factors')
+    x = _to_channel_first(_to_float_batch(img), data_format)
+    mean = _rgb_to_grayscale_batch(x).mean(axis=[1, 2, 3], keepdim=True)
+    out = _blend_batch(x, mean, factors.reshape((-1, 1, 1, 1)))
+
+    return _from_float_batch(_from_channel_first(out, data_format), img)
+
+
+def adjust_saturation_batch(img, factors, data_format='NCHW'):
+    """Adjusts color saturation of each image of a batch by its own factor.
+
+    Args:
+        img (paddle.Tensor): Image batch to be adjusted.
+        factors (list|np.ndarray|paddle.Tensor): Saturation factor of each
+            image, 0 gives a grayscale image, 1 gives the original image.
+        data_format (str, optional): Data format of img, should be 'NHWC' or
+            'NCHW'. Default: 'NCHW'.
+
+    Returns:
+        paddle.Tensor: Saturation adjusted image batch.
+
+    """
+    _assert_image_batch_tensor(img, data_format)
+
+    factors = _to_batch_tensor(factors, img.shape[0], img, 'factors')
+    x = _to_channel_first(_to_float_batch(img), data_format)
+    gray = _rgb_to_grayscale_batch(x)
+    out = _blend_batch(x, gray, factors.reshape((-1, 1, 1, 1)))
+
+    return _from_float_batch(_from_channel_first(out, data_format), img)
+
+
+def _rgb_to_hsv_batch(img):
+    r, g, b = img[:, 0], img[:, 1], img[:, 2]
+    maxc = img.max(axis=1)
+    minc = img.min(axis=1)
+    eqc = paddle.cast(maxc == minc, img.dtype)
+
+    # avoid dividing by zero for gray pixels, whose hue and saturation is 0
+    delta = maxc - minc
+    s = delta / (maxc + eqc)
+    cr = delta + eqc
+    rc = (maxc - r) / cr
+    gc = (maxc - g) / cr
+    bc = (maxc - b) / cr
+
+    is_r = paddle.cast(maxc == r, img.dtype)
+    is_g = paddle.cast(maxc == g, img.dtype) * (1. - is_r)
+    is_b = (1. - is_r) * (1. - is_g)
+    h = is_r * (bc - gc) + is_g * (2.0 + rc - bc) + is_b * (4.0 + gc - rc)
+    h = h / 6.0
+    h = h - paddle.floor(h)
+
+    return h, s, maxc
+
+
+def _hsv_to_rgb_batch(h, s, v):
+    i = paddle.floor(h * 6.0)
+    f = h * 6.0 - i
+    i = i - paddle.floor(i / 6.0) * 6.0
+
+    p = v * (1. - s)
+    q = v * (1. - s * f)
+    t = v * (1. - s * (1. - f))
+
+    rgb = [
+        (v, t, p),
+        (q, v, p),
+        (p, v, t),
+        (p, q, v),
+        (t, p, v),
+        (v, p, q),
+    ]
+    r = g = b = 0.
+    for k, (rk, gk, bk) in enumerate(rgb):
+        mask = paddle.cast(i == float(k), h.dtype)
+        r = r + mask * rk
+        g = g + mask * gk
+        b = b + mask * bk
+
+    return paddle.stack([r, g, b], axis=1)
+
+
+def adjust_hue_batch(img, factors, data_format='NCHW'):
+    """Adjusts hue of each image of a batch by its own factor.
+
+    Args:
+        img (paddle.Tensor): RGB image batch to be adjusted.
+        factors (list|np.ndarray|paddle.Tensor): Shift of hue channel of each
+            image, should be in [-0.5, 0.5], 0 gives the original image.
+        data_format (str, optional): Data format of img, should be 'NHWC' or
+            'NCHW'. Default: 'NCHW'.
+
+    Returns:
+        paddle.Tensor: Hue adjusted image batch.
+
+    """
+    _assert_image_batch_tensor(img, data_format)
+
+    factors = _to_batch_tensor(factors, img.shape[0], img, 'factors')
+    x = _to_channel_first(_to_float_batch(img), data_format)
+    if x.shape[1] != 3:
+        raise ValueError("adjust_hue_batch only supports RGB image batch, "
+                         "but got {} channels".format(x.shape[1]))
+
+    h, s, v = _rgb_to_hsv_batch(x)
+    h = h + factors.reshape((-1, 1, 1))
+    h = h - paddle.floor(h)
+    out = _hsv_to_rgb_batch(h, s, v)
+
+    return _from_float_batch(_from_channel_first(out, data_format), img)
@@ -25,8 +25,10 @@ import collections
 import warnings
 import traceback
 
+import paddle
 from paddle.utils import try_import
 from . import functional as F
+from . import functional_tensor as F_t
 
 if sys.version_info < (3, 3):
     Sequence = collections.Sequence
@@ -76,6 +78,14 @@ def _check_input(value,
     return value
 
 
+def _translate_matrix(x, y):
+    return np.array([[1., 0., x], [0., 1., y], [0., 0., 1.]])
+
+
+def _scale_matrix(sx, sy):
+    return np.array([[sx, 0., 0.], [0., sy, 0.], [0., 0., 1.]])
+
+
 class Compose(object):
     """
     Composes several transforms together use for composing list of transforms
@@ -127,6 +137,269 @@ class Compose(object):
         return format_string
 
 
+class FusedCompose(Compose):
+    """
+    Composes several transforms together like ``Compose``, and fuses
+    consecutive transforms to reduce the passes over image pixels.
+
+    - Consecutive geometric transforms, i.e. ``Resize``, ``RandomResizedCrop``,
+      ``CenterCrop``, ``RandomHorizontalFlip``, ``RandomVerticalFlip``,
+      ``RandomCrop`` without padding and ``RandomRotation`` without expand,
+      are folded into one affine matrix, and the image is resampled only
+      once by ``functional.warp_affine``.
+    - Consecutive ``ToTensor``, ``Normalize`` and ``Transpose`` on
+      ``PIL.Image`` or ``numpy.ndarray`` image are done by one pass over
+      image pixels.
+
+    Random parameters are sampled in the same order as ``Compose``. As the
+    image is resampled only once, the interpolation method of fused
+    geometric transforms is the first one given by them ('nearest' if none
+    is given), and results may be slightly different from ``Compose``.
+    Transforms with keys other than ``("image", )`` are not fused, and
+    fused transforms are applied one by one if the input image is not
+    supported, e.g. tensor image with 'bicubic' interpolation.
+
+    Args:
+        transforms (list|tuple): List/Tuple of transforms to compose.
+
+    Returns:
+        A compose object which is callable, __call__ for this FusedCompose
+        object will call each given :attr:`transforms` sequencely, with
+        consecutive transforms fused.
+
+    Examples:
+    
+        .. code-block:: python
+
+            import numpy as np
+            from PIL import Image
+            from paddle.vision.transforms import FusedCompose
+            import paddle.vision.transforms as T
+
+            transform = FusedCompose([
+                T.RandomResizedCrop(224),
+                T.RandomHorizontalFlip(),
+                T.RandomRotation(15),
+                T.ToTensor(),
+                T.Normalize(mean=[0.485, 0.456, 0.406],
+                            std=[0.229, 0.224, 0.225]),
+            ])
+
+            fake_img = Image.fromarray((np.random.rand(300, 320, 3) * 255.).astype(np.uint8))
+
+            fake_img = transform(fake_img)
+            print(fake_img.shape)
+
+    """
+
+    def __init__(self, transforms):
+        super(FusedCompose, self).__init__(transforms)
+        self._stages = self._plan(transforms)
+
+    def _plan(self, transforms):
+        groups = []
+        for t in transforms:
+            kind = _get_fused_kind(t)
+            if kind is not None and groups and groups[-1][0] == kind:
+                groups[-1][1].append(t)
+            else:
+                groups.append((kind, [t]))
+
+        stages = []
+        for kind, group in groups:
+            if kind == 'affine' and len(group) > 1:
+                stages.append(_FusedAffine(group))
+            elif kind == 'pixel' and len(group) > 1 and any(
+                    not isinstance(t, Transpose) for t in group):
+                stages.append(_FusedPixel(group))
+            else:
+                stages.extend(group)
+        return stages
+
+    def __call__(self, data):
+        for f in self._stages:
+            try:
+                data = f(data)
+            except Exception as e:
+                stack_info = traceback.format_exc()
+                print("fail to perform transform [{}] with error: "
+                      "{} and stack:\n{}".format(f, e, str(stack_info)))
+                raise e
+        return data
+
+
+_FUSED_INTERPOLATIONS = ('nearest', 'bilinear', 'bicubic')
+
+
+def _get_fused_kind(t):
+    if not isinstance(t, BaseTransform) or tuple(t.keys) != ('image', ):
+        return None
+    if t._affine_fusable() and getattr(t, 'interpolation',
+                                       'nearest') in _FUSED_INTERPOLATIONS:
+        return 'affine'
+    if isinstance(t, (ToTensor, Transpose)) or (isinstance(t, Normalize) and
+                                                not t.to_rgb):
+        return 'pixel'
+    return None
+
+
+def _get_decode_size(transform):
+    """
+    Get the minimum (height, width) of images needed by :attr:`transform`
+    from the first transform it applies, which is used as the hint to
+    decode images at reduced resolution. Return None if unknown.
+    """
+    while isinstance(transform, Compose):
+        if len(transform.transforms) == 0:
+            return None
+        transform = transform.transforms[0]
+    if not isinstance(transform, BaseTransform) or tuple(transform.keys) != (
+            'image', ):
+        return None
+    return transform._decode_size()
+
+
+class _FusedTransforms(object):
+    """
+    Base class of transforms fused by FusedCompose, transforms are applied
+    one by one if :code:`_get_plan` returns None for the input image.
+    """
+
+    def __init__(self, transforms):
+        self.transforms = transforms
+
+    def __call__(self, inputs):
+        image = inputs[0] if isinstance(inputs, tuple) else inputs
+        plan = self._get_plan(image)
+        if plan is None:
+            for t in self.transforms:
+                inputs = t(inputs)
+            return inputs
+
+        image = self._apply_plan(image, plan)
+        if isinstance(inputs, tuple) and len(inputs) > 1:
+            return (image, ) + inputs[1:]
+        return image
+
+    def __repr__(self):
+        return '{}({})'.format(self.__class__.__name__, ', '.join(
+            t.__class__.__name__ for t in self.transforms))
+
+
+class _FusedAffine(_FusedTransforms):
+    def __init__(self, transforms):
+        super(_FusedAffine, self).__init__(transforms)
+        self.interpolation = 'nearest'
+        for t in transforms:
+            if hasattr(t, 'interpolation'):
+                self.interpolation = t.interpolation
+                break
+        self.fill = 0
+        for t in transforms:
+            if isinstance(t, RandomRotation):
+                self.fill = t.fill
+                break
+
+    def _get_plan(self, image):
+        if F._is_tensor_image(image):
+            if len(image.shape) != 3 or self.interpolation == 'bicubic':
+                return None
+        elif not (F._is_pil_image(image) or F._is_numpy_image(image)):
+            return None
+
+        width, height = _get_image_size(image)
+        matrix = np.eye(3)
+        size = (height, width)
+        for t in self.transforms:
+            m, size = t._get_affine(size[1], size[0])
+            matrix = matrix.dot(m)
+        return matrix, size, (height, width)
+
+    def _apply_plan(self, image, plan):
+        matrix, size, input_size = plan
+        if size == input_size and np.allclose(matrix, np.eye(3)):
+            return image
+        return F.warp_affine(image, matrix[:2], size, self.interpolation,
+                             self.fill)
+
+
+class _FusedPixel(_FusedTransforms):
+    """
+    Fuse ToTensor, Normalize and Transpose on HWC image into per channel
+    scale and bias followed by a transpose, which are done by one pass
+    over image pixels.
+    """
+
+    def _get_plan(self, image):
+        if F._is_pil_image(image):
+            if image.mode != 'RGB':
+                return None
+        elif not F._is_numpy_image(image) or image.ndim != 3 or \
+                image.dtype not in (np.uint8, np.float32):
+            return None
+
+        img = np.asarray(image)
+        channels = img.shape[2]
+        # order of axes in hwc image
+        order = [0, 1, 2]
+        scale = np.ones(channels)
+        bias = np.zeros(channels)
+        is_uint8 = img.dtype == np.uint8
+        is_tensor = False
+        for t in self.transforms:
+            if isinstance(t, ToTensor):
+                if is_tensor:
+                    return None
+                if t.data_format == 'CHW':
+                    order = [order[i] for i in (2, 0, 1)]
+                if is_uint8:
+                    scale /= 255.
+                    bias /= 255.
+                    is_uint8 = False
+                is_tensor = True
+            elif isinstance(t, Normalize):
+                c_axis = 0 if t.data_format == 'CHW' else 2
+                if order[c_axis] != 2 or len(t.mean) != channels or len(
+                        t.std) != channels:
+                    return None
+                std = np.asarray(t.std, dtype=np.float64)
+                scale /= std
+                bias = (bias - np.asarray(t.mean, dtype=np.float64)) / std
+                is_uint8 = False
+            else:
+                if len(t.order) != 3:
+                    return None
+                order = [order[i] for i in t.order]
+        return img, order, scale, bias, is_tensor
+
+    def _apply_plan(self, image, plan):
+        img, order, scale, bias, is_tensor = plan
+        shape = [1, 1, 1]
+        shape[order.index(2)] = -1
+
+        img = img.transpose(order)
+        scale = scale.astype(np.float32)
+        bias = bias.astype(np.float32)
+        if img.dtype == np.uint8:
+            # NOTE: all 256 levels of each channel are scaled and biased in
+            # a lookup table, so each pixel is mapped by one table lookup
+            table = np.arange(
+                256, dtype=np.float32) * scale[:, None] + bias[:, None]
+            out = np.empty(img.shape, dtype=np.float32)
+            index = [slice(None)] * 3
+            for c in range(len(table)):
+                index[order.index(2)] = c
+                np.take(
+                    table[c], img[tuple(index)], out=out[tuple(index)],
+                    mode='clip')
+        else:
+            out = img * scale.reshape(shape) + bias.reshape(shape)
+
+        if is_tensor:
+            return paddle.to_tensor(out)
+        return out
+
+
 class BaseTransform(object):
     """
     Base class of all transforms used in computer vision.
@@ -288,6 +561,24 @@ class BaseTransform(object):
     def _apply_mask(self, mask):
         raise NotImplementedError
 
+    def _affine_fusable(self):
+        """Whether the transform on image is the affine transformation
+        given by ``_get_affine``, which can be fused by ``FusedCompose``."""
+        return False
+
+    def _get_affine(self, width, height):
+        """Sample random parameters and return a tuple of (matrix, size),
+        matrix is in shape of [3, 3] and maps the coordinates of output
+        pixels into the coordinates of input pixels, size is the
+        (height, width) of output image."""
+        raise NotImplementedError
+
+    def _decode_size(self):
+        """Minimum (height, width) of input image needed by the transform,
+        larger images can be decoded at reduced resolution before it.
+        Return None if images should be decoded at full resolution."""
+        return None
+
 
 class ToTensor(BaseTransform):
     """Convert a ``PIL.Image`` or ``numpy.ndarray`` to ``paddle.Tensor``.
@@ -408,6 +699,31 @@ class Resize(BaseTransform):
     def _apply_image(self, img):
         return F.resize(img, self.size, self.interpolation)
 
+    def _affine_fusable(self):
+        return True
+
+    def _get_affine(self, width, height):
+        if isinstance(self.size, int):
+            size = self.size
+            if (width <= height and width == size) or (height <= width and
+                                                       height == size):
+                oh, ow = height, width
+            elif width < height:
+                ow = size
+                oh = int(size * height / width)
+            else:
+                oh = size
+                ow = int(size * width / height)
+        else:
+            oh, ow = self.size
+        return _scale_matrix(width / ow, height / oh), (oh, ow)
+
+    def _decode_size(self):
+        if isinstance(self.size, int):
+            # the shorter side is not smaller than size if both are not
+            return (self.size, self.size)
+        return tuple(self.size)
+
 
 class RandomResizedCrop(BaseTransform):
     """Crop the input data to random size and aspect ratio.
@@ -479,6 +795,9 @@ class RandomResizedCrop(BaseTransform):
 
     def _get_param(self, image, attempts=10):
         width, height = _get_image_size(image)
+        return self._get_crop_box(width, height, attempts)
+
+    def _get_crop_box(self, width, height, attempts=10):
         area = height * width
 
         for _ in range(attempts):
@@ -516,6 +835,23 @@ class RandomResizedCrop(BaseTransform):
         cropped_img = F.crop(img, i, j, h, w)
         return F.resize(cropped_img, self.size, self.interpolation)
 
+    def _affine_fusable(self):
+        return True
+
+    def _get_affine(self, width, height):
+        i, j, h, w = self._get_crop_box(width, height)
+        oh, ow = self.size
+        matrix = _translate_matrix(j, i).dot(_scale_matrix(w / ow, h / oh))
+        return matrix, (oh, ow)
+
+    def _decode_size(self):
+        # sides of the smallest crop are about sqrt(scale[0]) of the image
+        scale = math.sqrt(self.scale[0])
+        if scale <= 0:
+            return None
+        oh, ow = self.size
+        return (int(math.ceil(oh / scale)), int(math.ceil(ow / scale)))
+
 
 class CenterCrop(BaseTransform):
     """Crops the given the input data at the center.
@@ -557,6 +893,15 @@ class CenterCrop(BaseTransform):
     def _apply_image(self, img):
         return F.center_crop(img, self.size)
 
+    def _affine_fusable(self):
+        return True
+
+    def _get_affine(self, width, height):
+        th, tw = self.size
+        i = int(round((height - th) / 2.))
+        j = int(round((width - tw) / 2.))
+        return _translate_matrix(j, i), (th, tw)
+
 
 class RandomHorizontalFlip(BaseTransform):
     """Horizontally flip the input data randomly with a given probability.
@@ -598,6 +943,15 @@ class RandomHorizontalFlip(BaseTransform):
             return F.hflip(img)
         return img
 
+    def _affine_fusable(self):
+        return True
+
+    def _get_affine(self, width, height):
+        if random.random() < self.prob:
+            return np.array([[-1., 0., width], [0., 1., 0.], [0., 0., 1.]
+                             ]), (height, width)
+        return np.eye(3), (height, width)
+
 
 class RandomVerticalFlip(BaseTransform):
     """Vertically flip the input data randomly with a given probability.
@@ -640,6 +994,15 @@ class RandomVerticalFlip(BaseTransform):
             return F.vflip(img)
         return img
 
+    def _affine_fusable(self):
+        return True
+
+    def _get_affine(self, width, height):
+        if random.random() < self.prob:
+            return np.array([[1., 0., 0.], [0., -1., height], [0., 0., 1.]
+                             ]), (height, width)
+        return np.eye(3), (height, width)
+
 
 class Normalize(BaseTransform):
     """Normalize the input data with mean and standard deviation.
@@ -1082,6 +1445,9 @@ class RandomCrop(BaseTransform):
             tuple: params (i, j, h, w) to be passed to ``crop`` for random crop.
         """
         w, h = _get_image_size(img)
+        return self._get_crop_box(w, h, output_size)
+
+    def _get_crop_box(self, w, h, output_size):
         th, tw = output_size
         if w == tw and h == th:
             return 0, 0, h, w
@@ -1116,6 +1482,13 @@ class RandomCrop(BaseTransform):
 
         return F.crop(img, i, j, h, w)
 
+    def _affine_fusable(self):
+        return self.padding is None and not self.pad_if_needed
+
+    def _get_affine(self, width, height):
+        i, j, h, w = self._get_crop_box(width, height, self.size)
+        return _translate_matrix(j, i), (h, w)
+
 
 class Pad(BaseTransform):
     """Pads the given CV Image on all sides with the given "pad" value.
@@ -1286,6 +1659,22 @@ class RandomRotation(BaseTransform):
         return F.rotate(img, angle, self.interpolation, self.expand,
                         self.center, self.fill)
 
+    def _affine_fusable(self):
+        return not self.expand
+
+    def _get_affine(self, width, height):
+        angle = math.radians(self._get_param(self.degrees))
+        if self.center is None:
+            cx, cy = width * 0.5, height * 0.5
+        else:
+            cx, cy = self.center
+
+        cos, sin = math.cos(angle), math.sin(angle)
+        rotation = np.array([[cos, -sin, 0.], [sin, cos, 0.], [0., 0., 1.]])
+        matrix = _translate_matrix(cx, cy).dot(rotation).dot(
+            _translate_matrix(-cx, -cy))
+        return matrix, (height, width)
+
 
 class Grayscale(BaseTransform):
     """Converts image to grayscale.
@@ -1332,3 +1721,246 @@ class Grayscale(BaseTransform):
             PIL Image: Randomly grayscaled image.
         """
         return F.to_grayscale(img, self.num_output_channels)
+
+
+def _get_batch_image_size(imgs, data_format):
+    if not F._is_tensor_image(imgs) or len(imgs.shape) != 4:
+        raise TypeError("Batch transforms only support paddle.Tensor image "
+                        "batch with 4 dimensions, but got {}".format(
+                            type(imgs)))
+    return F_t._get_image_size(imgs, data_format[1:])
+
+
+class BatchRandomResizedCrop(RandomResizedCrop):
+    """Crop each image of a batch to random size and aspect ratio, and resize
+    the crops to given size.
+
+    Crop boxes are sampled for each image as ``RandomResizedCrop`` does, then
+    all images are cropped and resized by one grid sample on the device of
+    the batch, instead of cropping and resizing image by image in DataLoader
+    workers.
+
+    Args:
+        size (int|list|tuple): Target size of output image, with (height, width) shape.
+        scale (list|tuple): Scale range of the cropped image before resizing, relatively to the origin 
+            image. Default: (0.08, 1.0)
+        ratio (list|tuple): Range of aspect ratio of the origin aspect ratio cropped. Default: (0.75, 1.33)
+        interpolation (str, optional): Interpolation method, "nearest" or "bilinear". Default: 'bilinear'.
+        data_format (str, optional): Data format of image batch, should be 'NCHW' or 'NHWC'. Default: 'NCHW'.
+        keys (list[str]|tuple[str], optional): Same as ``BaseTransform``. Default: None.
+
+    Shape:
+        - img(Paddle.Tensor): The input image batch with shape (N x C x H x W).
+        - output(Paddle.Tensor): A batch of cropped images.
+
+    Returns:
+        A callable object of BatchRandomResizedCrop.
+
+    Examples:
+    
+        .. code-block:: python
+
+            import paddle
+            from paddle.vision.transforms import BatchRandomResizedCrop
+
+            transform = BatchRandomResizedCrop(224)
+
+            fake_imgs = paddle.rand((8, 3, 300, 320))
+
+            fake_imgs = transform(fake_imgs)
+            print(fake_imgs.shape)
+
+    """
+
+    def __init__(self,
+                 size,
+                 scale=(0.08, 1.0),
+                 ratio=(3. / 4, 4. / 3),
+                 interpolation='bilinear',
+                 data_format='NCHW',
+                 keys=None):
+        super(BatchRandomResizedCrop, self).__init__(size, scale, ratio,
+                                                     interpolation, keys)
+        self.data_format = data_format
+
+    def _apply_image(self, imgs):
+        width, height = _get_batch_image_size(imgs, self.data_format)
+        boxes = [
+            self._get_crop_box(width, height) for _ in range(imgs.shape[0])
+        ]
+        return F_t.resized_crop_batch(imgs, boxes, self.size,
+                                      self.interpolation, self.data_format)
+
+
+class BatchRandomHorizontalFlip(RandomHorizontalFlip):
+    """Horizontally flip each image of a batch randomly with a given probability.
+
+    Args:
+        prob (float, optional): Probability of each image being flipped. Should be in [0, 1]. Default: 0.5
+        data_format (str, optional): Data format of image batch, should be 'NCHW' or 'NHWC'. Default: 'NCHW'.
+        keys (list[str]|tuple[str], optional): Same as ``BaseTransform``. Default: None.
+
+    Shape:
+        - img(Paddle.Tensor): The input image batch with shape (N x C x H x W).
+        - output(Paddle.Tensor): A batch of randomly flipped images.
+
+    Returns:
+        A callable object of BatchRandomHorizontalFlip.
+
+    Examples:
+    
+        .. code-block:: python
+
+            import paddle
+            from paddle.vision.transforms import BatchRandomHorizontalFlip
+
+            transform = BatchRandomHorizontalFlip(0.5)
+
+            fake_imgs = paddle.rand((8, 3, 224, 224))
+
+            fake_imgs = transform(fake_imgs)
+            print(fake_imgs.shape)
+    """
+
+    def __init__(self, prob=0.5, data_format='NCHW', keys=None):
+        super(BatchRandomHorizontalFlip, self).__init__(prob, keys)
+        self.data_format = data_format
+
+    def _apply_image(self, imgs):
+        _get_batch_image_size(imgs, self.data_format)
+        flags = np.random.random(imgs.shape[0]) < self.prob
+        return F_t.hflip_batch(imgs, flags, self.data_format)
+
+
+class BatchColorJitter(ColorJitter):
+    """Randomly change the brightness, contrast, saturation and hue of each
+    image of a batch.
+
+    Factors are sampled for each image as ``ColorJitter`` does, the order
+    of adjustments is shuffled once per batch so that each adjustment is a
+    single operation on the whole batch.
+
+    Args:
+        brightness (float): How much to jitter brightness.
+            Chosen uniformly from [max(0, 1 - brightness), 1 + brightness]. Should be non negative numbers.
+        contrast (float): How much to jitter contrast.
+            Chosen uniformly from [max(0, 1 - contrast), 1 + contrast]. Should be non negative numbers.
+        saturation (float): How much to jitter saturation.
+            Chosen uniformly from [max(0, 1 - saturation), 1 + saturation]. Should be non negative numbers.
+        hue (float): How much to jitter hue.
+            Chosen uniformly from [-hue, hue]. Should have 0<= hue <= 0.5.
+        data_format (str, optional): Data format of image batch, should be 'NCHW' or 'NHWC'. Default: 'NCHW'.
+        keys (list[str]|tuple[str], optional): Same as ``BaseTransform``. Default: None.
+
+    Shape:
+        - img(Paddle.Tensor): The input float RGB image batch with shape (N x C x H x W).
+        - output(Paddle.Tensor): A batch of color jittered images.
+
+    Returns:
+        A callable object of BatchColorJitter.
+
+    Examples:
+    
+        .. code-block:: python
+
+            import paddle
+            from paddle.vision.transforms import BatchColorJitter
+
+            transform = BatchColorJitter(0.4, 0.4, 0.4, 0.4)
+
+            fake_imgs = paddle.rand((8, 3, 224, 224))
+
+            fake_imgs = transform(fake_imgs)
+
+    """
+
+    def __init__(self,
+                 brightness=0,
+                 contrast=0,
+                 saturation=0,
+                 hue=0,
+                 data_format='NCHW',
+                 keys=None):
+        super(BatchColorJitter, self).__init__(brightness, contrast,
+                                               saturation, hue, keys)
+        self.data_format = data_format
+        self._ranges = [
+            (_check_input(brightness, 'brightness'),
+             F_t.adjust_brightness_batch),
+            (_check_input(contrast, 'contrast'), F_t.adjust_contrast_batch),
+            (_check_input(saturation, 'saturation'),
+             F_t.adjust_saturation_batch),
+            (_check_input(
+                hue, 'hue', center=0, bound=(-0.5, 0.5),
+                clip_first_on_zero=False), F_t.adjust_hue_batch),
+        ]
+
+    def _apply_image(self, imgs):
+        _get_batch_image_size(imgs, self.data_format)
+        adjustments = [(value, func) for value, func in self._ranges
+                       if value is not None]
+        random.shuffle(adjustments)
+        for value, func in adjustments:
+            factors = np.random.uniform(value[0], value[1], imgs.shape[0])
+            imgs = func(imgs, factors, self.data_format)
+        return imgs
+
+
+class BatchRandomRotation(RandomRotation):
+    """Rotates each image of a batch by a random angle.
+
+    Angles are sampled for each image, and all images are rotated by one
+    grid sample on the device of the batch. Output images are in the same
+    size as input images, as images in a batch should have the same size.
+
+    Args:
+        degrees (sequence or float or int): Range of degrees to select from.
+            If degrees is a number instead of sequence like (min, max), the range of degrees
+            will be (-degrees, +degrees) clockwise order.
+        interpolation (str, optional): Interpolation method, "nearest" or "bilinear". Default: 'nearest'.
+        center (2-tuple|optional): Optional center of rotation.
+            Origin is the upper left corner.
+            Default is the center of the image.
+        fill (int|list|tuple, optional): Pixel fill value for area outside the rotated image. Default: 0.
+        data_format (str, optional): Data format of image batch, should be 'NCHW' or 'NHWC'. Default: 'NCHW'.
+        keys (list[str]|tuple[str], optional): Same as ``BaseTransform``. Default: None.
+    
+    Shape:
+        - img(Paddle.Tensor): The input image batch with shape (N x C x H x W).
+        - output(Paddle.Tensor): A batch of rotated images.
+
+    Returns:
+        A callable object of BatchRandomRotation.
+
+    Examples:
+    
+        .. code-block:: python
+
+            import paddle
+            from paddle.vision.transforms import BatchRandomRotation
+
+            transform = BatchRandomRotation(90)
+
+            fake_imgs = paddle.rand((8, 3, 200, 150))
+
+            fake_imgs = transform(fake_imgs)
+            print(fake_imgs.shape)
+    """
+
+    def __init__(self,
+                 degrees,
+                 interpolation='nearest',
+                 center=None,
+                 fill=0,
+                 data_format='NCHW',
+                 keys=None):
+        super(BatchRandomRotation, self).__init__(
+            degrees, interpolation, False, center, fill, keys)
+        self.data_format = data_format
+
+    def _apply_image(self, imgs):
+        _get_batch_image_size(imgs, self.data_format)
+        angles = np.random.uniform(self.degrees[0], self.degrees[1],
+                                   imgs.shape[0])
+        return F_t.rotate_batch(imgs, angles, self.interpolation, self.center,
+                                self.fill, self.data_format)